@@ -5,14 +5,12 @@ Common dependencies used across API endpoints
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.ext.asyncio import AsyncSession
-from jose import JWTError, jwt
+from jose import JWTError
 from typing import Optional
 import structlog
 
-from app.core.config import settings
-from app.core.database import get_db
 from app.core.exceptions import AuthenticationError
+from app.core.keys import key_ring
 from app.models.user import User
 
 logger = structlog.get_logger()
@@ -20,19 +18,14 @@ security = HTTPBearer()
 
 
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
+    credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> User:
     """
     Get current authenticated user from JWT token
     """
     try:
         # Decode JWT token
-        payload = jwt.decode(
-            credentials.credentials,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = key_ring.decode(credentials.credentials)
         
         user_id: str = payload.get("sub")
         if user_id is None:
@@ -0,0 +1,69 @@
+"""
+Admin API Routes
+Operational endpoints restricted to ADMIN_USER_IDS
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.auth import get_admin_user
+from app.core.config import settings
+from app.core.profiler import profiler
+from app.models.auth import UserResponse
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+def require_profiler() -> None:
+    """Profiling endpoints do not exist unless PROFILER_ENABLED is set"""
+    if not settings.PROFILER_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+@router.post("/profiler/start", dependencies=[Depends(require_profiler)])
+async def start_profiler(
+    seconds: float = Query(30.0, gt=0),
+    interval_ms: float = Query(settings.PROFILER_INTERVAL_MS, ge=1),
+    admin: UserResponse = Depends(get_admin_user)
+):
+    """
+    Sample the event loop of this worker for a bounded window
+    """
+    try:
+        profiler.start(seconds=seconds, interval_ms=interval_ms)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return {
+        "message": "Profiling started",
+        "seconds": min(seconds, profiler.max_seconds),
+        "interval_ms": interval_ms
+    }
+
+
+@router.post("/profiler/stop", dependencies=[Depends(require_profiler)])
+async def stop_profiler(admin: UserResponse = Depends(get_admin_user)):
+    """
+    End the running profiling window early
+    """
+    result = profiler.stop()
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No profile recorded")
+    return result.summary()
+
+
+@router.get("/profiler/profile", dependencies=[Depends(require_profiler)])
+async def get_profile(
+    format: str = Query("json", pattern="^(json|collapsed)$"),
+    admin: UserResponse = Depends(get_admin_user)
+):
+    """
+    Get the running or last profile: a per-route summary (json) or collapsed
+    stacks for flamegraph.pl / speedscope (collapsed)
+    """
+    result = profiler.current()
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No profile recorded")
+    if format == "collapsed":
+        return PlainTextResponse(result.collapsed())
+    return {"running": profiler.running, **result.summary()}
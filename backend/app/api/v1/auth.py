@@ -9,10 +9,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 import asyncpg
 import uuid
-import user_agents
 from ipaddress import AddressValueError, ip_address
 
-from app.core.database import get_db
+from app.core import queries
+from app.core.database import get_db, get_lazy_db, LazySession
 from app.core.auth import (
     create_access_token, 
     create_refresh_token, 
@@ -34,24 +34,37 @@ from app.models.auth import (
 )
 from app.models.session import SessionCreate, DeviceInfo
 from app.services.session import SessionService
+from app.services.audit import audit_log
+from app.services.devices import classify_user_agent, device_fingerprint, MAX_USER_AGENT_LENGTH
+from app.services.security_monitor import (
+    security_monitor,
+    device_key,
+    LOGIN,
+    REFRESH,
+    FAILED_LOGIN
+)
 from app.core.config import settings
 
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
-def extract_device_info(request: Request) -> DeviceInfo:
+def extract_device_info(request: Request, ip_addr: str = None) -> DeviceInfo:
     """Extract device information from request headers"""
-    user_agent_string = request.headers.get("User-Agent", "")
-    user_agent = user_agents.parse(user_agent_string)
+    user_agent_string = request.headers.get("User-Agent", "")[:MAX_USER_AGENT_LENGTH]
+    device = classify_user_agent(user_agent_string)
+    timezone = request.headers.get("X-Timezone", "UTC")
     
     return DeviceInfo(
-        device_type="mobile" if user_agent.is_mobile else "tablet" if user_agent.is_tablet else "desktop",
-        os=f"{user_agent.os.family} {user_agent.os.version_string}",
-        browser=f"{user_agent.browser.family}",
-        browser_version=user_agent.browser.version_string,
+        device_type=device.device_type,
+        os=device.os,
+        browser=device.browser,
+        browser_version=device.browser_version,
         user_agent=user_agent_string,
-        timezone=request.headers.get("X-Timezone", "UTC")
+        timezone=timezone,
+        fingerprint=device_fingerprint(
+            user_agent_string, timezone, ip_addr or extract_ip_address(request)
+        )
     )
 
 
@@ -86,7 +99,7 @@ def extract_ip_address(request: Request) -> str:
 async def register_user(
     user_data: UserCreate,
     request: Request,
-    db: AsyncSession = Depends(get_db)
+    db: LazySession = Depends(get_lazy_db)
 ):
     """
     Register a new user account with session tracking
@@ -101,13 +114,7 @@ async def register_user(
     
     try:
         # Check if user already exists
-        from sqlalchemy import text
-        
-        result = await db.execute(
-            text("SELECT id FROM users WHERE email = :email"),
-            {"email": user_data.email}
-        )
-        existing_user = result.fetchone()
+        existing_user = await queries.USER_ID_BY_EMAIL.fetch_one(db, email=user_data.email)
             
         if existing_user:
             raise HTTPException(
@@ -119,31 +126,28 @@ async def register_user(
         hashed_password = hash_password(user_data.password)
         user_id = str(uuid.uuid4())
         now = datetime.utcnow()
+        db.bind_user(user_id)
         
         # Create user
-        await db.execute(
-            text("""
-                INSERT INTO users (id, email, full_name, hashed_password, is_active, created_at, updated_at)
-                VALUES (:id, :email, :full_name, :hashed_password, :is_active, :created_at, :updated_at)
-            """),
-            {
-                "id": user_id, 
-                "email": user_data.email, 
-                "full_name": user_data.name, 
-                "hashed_password": hashed_password, 
-                "is_active": True, 
-                "created_at": now, 
-                "updated_at": now
-            }
+        await queries.USER_INSERT.execute(
+            db,
+            id=user_id,
+            email=user_data.email,
+            full_name=user_data.name,
+            hashed_password=hashed_password,
+            is_active=True,
+            created_at=now,
+            updated_at=now
         )
         
-        # Create tokens with JTI
+        # Create tokens with JTI; the refresh token names its session
+        session_id = str(uuid.uuid4())
         access_token, access_jti = create_access_token(data={"sub": user_id})
-        refresh_token, refresh_jti = create_refresh_token(data={"sub": user_id})
+        refresh_token, refresh_jti = create_refresh_token(data={"sub": user_id, "sid": session_id, "gen": 0})
         
         # Extract session information
-        device_info = extract_device_info(request)
         ip_addr = extract_ip_address(request)
+        device_info = extract_device_info(request, ip_addr)
         
         # Create session
         session_data = SessionCreate(
@@ -151,16 +155,25 @@ async def register_user(
             ip_address=ip_addr
         )
         
-        access_expires_at = now + timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
+        # The session lives as long as its refresh token
+        session_expires_at = now + timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS)
         
         session_token = generate_session_token()
-        session_id = await SessionService.create_session(
+        await SessionService.create_session(
             db=db,
             user_id=user_id,
             jwt_jti=access_jti,
             token=session_token,
             session_data=session_data,
-            expires_at=access_expires_at
+            expires_at=session_expires_at,
+            session_id=session_id
+        )
+        audit_log.record(
+            "register", "user", user_id,
+            user_id=user_id,
+            new_values={"email": user_data.email, "session_id": session_id},
+            ip_address=ip_addr,
+            user_agent=device_info.user_agent
         )
         
         # Create user response
@@ -195,20 +208,14 @@ async def register_user(
 async def login_user(
     user_credentials: UserLogin,
     request: Request,
-    db: AsyncSession = Depends(get_db)
+    db: LazySession = Depends(get_lazy_db)
 ):
     """
     Login user and return JWT tokens with session tracking
     """
     try:
-        # Get user from database using SQLAlchemy
-        from sqlalchemy import text
-        
-        result = await db.execute(
-            text("SELECT id, email, full_name, hashed_password, is_active, created_at, updated_at FROM users WHERE email = :email"),
-            {"email": user_credentials.email}
-        )
-        user_row = result.fetchone()
+        # Get user from database
+        user_row = await queries.USER_CREDENTIALS_BY_EMAIL.fetch_one(db, email=user_credentials.email)
         
         # Verify user exists and password is correct
         if not user_row:
@@ -227,6 +234,22 @@ async def login_user(
             password_valid = False
             
         if not password_valid:
+            ip_addr = extract_ip_address(request)
+            security_monitor.record(
+                str(user_row.id),
+                FAILED_LOGIN,
+                ip_addr,
+                device_key(extract_device_info(request, ip_addr))
+            )
+            # Kept on the user as well, so every worker reports the same failures
+            await queries.USER_LOGIN_FAILED.execute(db, user_id=user_row.id)
+            await db.commit()
+            audit_log.record(
+                "login_failed", "user", user_row.id,
+                user_id=user_row.id,
+                ip_address=ip_addr,
+                user_agent=request.headers.get("User-Agent")
+            )
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password"
@@ -240,12 +263,16 @@ async def login_user(
             )
         
         # Create tokens with JTI
+        db.bind_user(str(user_row.id))
+        session_id = str(uuid.uuid4())
         access_token, access_jti = create_access_token(data={"sub": str(user_row.id)})
-        refresh_token, refresh_jti = create_refresh_token(data={"sub": str(user_row.id)})
+        refresh_token, refresh_jti = create_refresh_token(
+            data={"sub": str(user_row.id), "sid": session_id, "gen": 0}
+        )
         
         # Extract session information
-        device_info = extract_device_info(request)
         ip_addr = extract_ip_address(request)
+        device_info = extract_device_info(request, ip_addr)
         
         # Create session
         session_data = SessionCreate(
@@ -253,17 +280,28 @@ async def login_user(
             ip_address=ip_addr
         )
         
+        # The session lives as long as its refresh token
         now = datetime.utcnow()
-        access_expires_at = now + timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
+        session_expires_at = now + timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS)
         
         session_token = generate_session_token()
-        session_id = await SessionService.create_session(
+        # Committed with the session
+        await queries.USER_LOGIN_SUCCEEDED.execute(db, user_id=user_row.id)
+        await SessionService.create_session(
             db=db,
             user_id=str(user_row.id),
             jwt_jti=access_jti,
             token=session_token,
             session_data=session_data,
-            expires_at=access_expires_at
+            expires_at=session_expires_at,
+            session_id=session_id
+        )
+        security_monitor.record(str(user_row.id), LOGIN, ip_addr, device_key(device_info))
+        audit_log.record(
+            "login", "session", session_id,
+            user_id=user_row.id,
+            ip_address=ip_addr,
+            user_agent=device_info.user_agent
         )
         
         # Create user response
@@ -299,22 +337,17 @@ async def login_user(
 async def refresh_token(
     token_data: TokenRefresh,
     request: Request,
-    db: AsyncSession = Depends(get_db)
+    db: LazySession = Depends(get_lazy_db)
 ):
     """
     Refresh access token using refresh token with session validation
     """
     try:
         # Verify refresh token and get session info
-        user_id, old_jwt_jti = await verify_refresh_token(token_data.refresh_token, db)
+        user_id, session_id, generation = await verify_refresh_token(token_data.refresh_token)
         
         # Get user from database
-        from sqlalchemy import text
-        result = await db.execute(
-            text("SELECT id, email, full_name, is_active, created_at, updated_at FROM users WHERE id = :user_id"),
-            {"user_id": user_id}
-        )
-        user_row = result.fetchone()
+        user_row = await queries.USER_BY_ID.fetch_one(db, user_id=user_id)
         
         if not user_row or not user_row.is_active:
             raise HTTPException(
@@ -322,13 +355,13 @@ async def refresh_token(
                 detail="User not found or inactive"
             )
         
-        # Create new tokens with JTI
+        # Create new access token with JTI
+        db.bind_user(user_id)
         access_token, access_jti = create_access_token(data={"sub": user_id})
-        refresh_token, refresh_jti = create_refresh_token(data={"sub": user_id})
         
         # Extract session information
-        device_info = extract_device_info(request)
         ip_addr = extract_ip_address(request)
+        device_info = extract_device_info(request, ip_addr)
         
         # Update session with new JTI and extend expiry
         session_data = SessionCreate(
@@ -337,21 +370,48 @@ async def refresh_token(
         )
         
         now = datetime.utcnow()
-        access_expires_at = now + timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
+        session_expires_at = now + timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS)
         
-        # Create new session for refreshed token
-        session_token = generate_session_token()
-        await SessionService.create_session(
+        # Rotate the existing session in place (one statement, no new row)
+        new_generation, reused = await SessionService.rotate_session(
             db=db,
+            session_id=session_id,
             user_id=user_id,
+            generation=generation,
             jwt_jti=access_jti,
-            token=session_token,
             session_data=session_data,
-            expires_at=access_expires_at
+            expires_at=session_expires_at
         )
+        if reused:
+            # An already rotated refresh token came back: one of the two holders is not the user
+            audit_log.record(
+                "refresh_token_reuse", "session", session_id,
+                user_id=user_id,
+                new_values={"presented_generation": generation, "is_revoked": True},
+                ip_address=ip_addr,
+                user_agent=device_info.user_agent
+            )
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token reuse detected; session revoked"
+            )
+        if new_generation is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token: Session revoked or invalid"
+            )
         
-        # Revoke old session
-        await SessionService.revoke_sessions_by_jwt_jti(db, [old_jwt_jti])
+        refresh_token, refresh_jti = create_refresh_token(
+            data={"sub": user_id, "sid": session_id, "gen": new_generation}
+        )
+        security_monitor.record(user_id, REFRESH, ip_addr, device_key(device_info))
+        audit_log.record(
+            "token_refresh", "session", session_id,
+            user_id=user_id,
+            new_values={"generation": new_generation},
+            ip_address=ip_addr,
+            user_agent=device_info.user_agent
+        )
         
         # Create user response
         user_response = UserResponse(
@@ -383,7 +443,7 @@ async def refresh_token(
 async def logout_user(
     request: Request,
     current_user: UserResponse = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: LazySession = Depends(get_lazy_db)
 ):
     """
     Logout user and revoke current session
@@ -392,16 +452,23 @@ async def logout_user(
         # Get current session JTI from token
         auth_header = request.headers.get("Authorization")
         if auth_header:
-            from jose import jwt
+            from app.core.keys import key_ring
             
             try:
                 token = auth_header.replace("Bearer ", "")
-                payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+                payload = key_ring.decode(token)
                 jwt_jti = payload.get("jti")
                 
                 if jwt_jti:
                     # Revoke current session
                     await SessionService.revoke_sessions_by_jwt_jti(db, [jwt_jti])
+                    audit_log.record(
+                        "logout", "user", current_user.id,
+                        user_id=current_user.id,
+                        new_values={"jti": jwt_jti},
+                        ip_address=extract_ip_address(request),
+                        user_agent=request.headers.get("User-Agent")
+                    )
             except:
                 pass  # If we can't decode token, just return success
         
@@ -472,6 +539,8 @@ async def change_password(
                 new_password_hash, datetime.utcnow(), current_user.id
             )
         
+        audit_log.record("password_change", "user", current_user.id, user_id=current_user.id)
+        
         return {"message": "Password changed successfully"}
         
     except asyncpg.exceptions.PostgresError as e:
@@ -496,6 +565,13 @@ async def delete_account(
                 datetime.utcnow(), current_user.id
             )
         
+        audit_log.record(
+            "deactivate", "user", current_user.id,
+            user_id=current_user.id,
+            old_values={"is_active": True},
+            new_values={"is_active": False}
+        )
+        
         return {"message": "Account deactivated successfully"}
         
     except asyncpg.exceptions.PostgresError as e:
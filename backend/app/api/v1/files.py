@@ -7,30 +7,47 @@ from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Backgro
 from fastapi.responses import JSONResponse
 from typing import List, Optional
 import aiofiles
-import magic
 from pathlib import Path
 import structlog
 
 from app.core.config import settings
 from app.core.exceptions import FileUploadError, ValidationError
 from app.services.storage import storage_service
+from app.services.object_cache import object_cache
+from app.services.previews import preview_renderer
+from app.services.uploads import (
+    CONTENT_SAMPLE_SIZE,
+    EXPECTED_CONTENT_TYPES,
+    check_file_content,
+    incoming_owner,
+    upload_verifier,
+    verified_key
+)
+from app.services.audit import audit_log, entity_uuid
 from app.api.dependencies import get_current_user
+from app.models.upload import DirectUploadRequest, DirectUploadComplete
 from app.models.user import User
 
 logger = structlog.get_logger()
 router = APIRouter(prefix="/files", tags=["files"])
 
 
-def validate_file_type(file: UploadFile) -> str:
-    """Validate file type and return MIME type"""
-    
-    # Check file extension
-    file_extension = Path(file.filename).suffix.lower().lstrip('.')
+def validate_file_extension(filename: str) -> str:
+    """Check the file extension is allowed and return it"""
+    file_extension = Path(filename).suffix.lower().lstrip('.')
     if file_extension not in settings.allowed_file_types_list:
         raise ValidationError(
             f"File type '{file_extension}' not allowed. "
             f"Allowed types: {', '.join(settings.allowed_file_types_list)}"
         )
+    return file_extension
+
+
+def validate_file_type(file: UploadFile) -> str:
+    """Validate file type and return MIME type"""
+    
+    # Check file extension
+    file_extension = validate_file_extension(file.filename)
     
     # Validate MIME type if available
     if file.content_type:
@@ -57,32 +74,10 @@ async def validate_file_content(file: UploadFile) -> None:
     """Validate file content using python-magic"""
     try:
         # Read first 2048 bytes for magic number detection
-        content_sample = await file.read(2048)
+        content_sample = await file.read(CONTENT_SAMPLE_SIZE)
         await file.seek(0)  # Reset file pointer
         
-        # Detect file type using magic
-        detected_type = magic.from_buffer(content_sample, mime=True)
-        file_extension = Path(file.filename).suffix.lower().lstrip('.')
-        
-        # Map extensions to expected MIME types
-        expected_types = {
-            'pdf': 'application/pdf',
-            'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            'doc': 'application/msword',
-            'txt': 'text/plain'
-        }
-        
-        expected_type = expected_types.get(file_extension)
-        if expected_type and detected_type != expected_type:
-            # Some flexibility for text files and Office docs
-            if not (
-                (file_extension == 'txt' and detected_type.startswith('text/')) or
-                (file_extension in ['doc', 'docx'] and 'officedocument' in detected_type)
-            ):
-                raise ValidationError(
-                    f"File content doesn't match extension. "
-                    f"Expected: {expected_type}, Detected: {detected_type}"
-                )
+        detected_type = check_file_content(file.filename, content_sample)
         
         logger.info(
             "File content validated",
@@ -142,10 +137,12 @@ async def upload_resume(
                 "file-type": "resume",
                 "user-email": current_user.email,
                 "file-size": str(file_size)
-            }
+            },
+            size=file_size
         )
         
         # TODO: Save file info to database
+        preview_renderer.enqueue(upload_result['file_key'], file.filename)
         # TODO: Queue background task for AI processing
         
         logger.info(
@@ -155,6 +152,16 @@ async def upload_resume(
             file_size=file_size,
             file_key=upload_result['file_key']
         )
+        audit_log.record(
+            "upload", "file", entity_uuid(upload_result['file_key']),
+            user_id=current_user.id,
+            new_values={
+                "file_key": upload_result['file_key'],
+                "filename": file.filename,
+                "size": file_size,
+                "content_type": content_type
+            }
+        )
         
         return JSONResponse(
             status_code=201,
@@ -180,6 +187,128 @@ async def upload_resume(
         )
 
 
+@router.post("/upload/resume/presign")
+async def presign_resume_upload(
+    upload: DirectUploadRequest,
+    current_user: User = Depends(get_current_user)
+) -> JSONResponse:
+    """
+    Get a presigned POST for uploading a resume straight to DigitalOcean Spaces
+    
+    The form fields must be sent unchanged, followed by the file. The bucket
+    enforces the key, content type and size limit. Report the upload with
+    /upload/resume/complete; it is verified in the background either way.
+    """
+    file_extension = validate_file_extension(upload.filename)
+    if upload.size and upload.size > settings.max_file_size_bytes:
+        raise ValidationError(
+            f"File size exceeds maximum allowed size of {settings.MAX_FILE_SIZE_MB}MB"
+        )
+    content_type = EXPECTED_CONTENT_TYPES.get(file_extension, f"application/{file_extension}")
+    
+    post = await storage_service.generate_presigned_post(
+        user_id=str(current_user.id),
+        filename=upload.filename,
+        content_type=content_type,
+        max_size=settings.max_file_size_bytes,
+        folder=settings.UPLOAD_INCOMING_FOLDER,
+        expiration=settings.UPLOAD_PRESIGN_EXPIRE_SECONDS,
+        metadata={"file-type": "resume"}
+    )
+    
+    return JSONResponse(content={
+        "file_key": post['file_key'],
+        "upload_url": post['url'],
+        "fields": post['fields'],
+        "expires_in": settings.UPLOAD_PRESIGN_EXPIRE_SECONDS,
+        "max_size": settings.max_file_size_bytes
+    })
+
+
+@router.post("/upload/resume/complete")
+async def complete_resume_upload(
+    upload: DirectUploadComplete,
+    current_user: User = Depends(get_current_user)
+) -> JSONResponse:
+    """
+    Report a direct upload as finished so it is verified right away
+    """
+    if incoming_owner(upload.file_key) != str(current_user.id):
+        raise HTTPException(status_code=404, detail="Upload not found")
+    
+    queued = upload_verifier.enqueue(upload.file_key)
+    return JSONResponse(
+        status_code=202,
+        content={
+            "file_key": upload.file_key,
+            "file_id": verified_key(upload.file_key),
+            "queued": queued
+        }
+    )
+
+
+@router.get("/upload/resume/status")
+async def resume_upload_status(
+    file_key: str,
+    current_user: User = Depends(get_current_user)
+) -> JSONResponse:
+    """
+    Get the verification status of a direct upload
+    
+    pending: uploaded, not yet verified. verified: available as file_id.
+    missing: never uploaded, expired or rejected by verification.
+    """
+    if incoming_owner(file_key) != str(current_user.id):
+        raise HTTPException(status_code=404, detail="Upload not found")
+    
+    file_id = verified_key(file_key)
+    if await storage_service.file_exists(file_id):
+        upload_status = "verified"
+    elif await storage_service.file_exists(file_key):
+        upload_status = "pending"
+    else:
+        upload_status = "missing"
+    
+    return JSONResponse(content={
+        "file_key": file_key,
+        "file_id": file_id,
+        "status": upload_status
+    })
+
+
+@router.get("/preview")
+async def get_file_preview(
+    file_key: str,
+    current_user: User = Depends(get_current_user)
+) -> JSONResponse:
+    """
+    Get page preview URLs of an uploaded resume
+    
+    ready: pages holds {page, width, url} for each rendered image; the URLs
+    are immutable and served by the CDN. pending: not rendered yet (files
+    uploaded before previews existed are queued on first request).
+    """
+    parts = file_key.split("/")
+    if len(parts) != 3 or parts[0] != settings.UPLOAD_FOLDER or parts[1] != str(current_user.id):
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    pages = await preview_renderer.list_previews(file_key)
+    if not pages:
+        if not preview_renderer.is_pending(file_key):
+            metadata = await storage_service.get_file_metadata(file_key)
+            if metadata is None:
+                raise HTTPException(status_code=404, detail="File not found")
+            filename = metadata['metadata'].get('original-filename', file_key)
+            if not preview_renderer.enqueue(file_key, filename):
+                return JSONResponse(content={"file_id": file_key, "status": "unavailable", "pages": []})
+    
+    return JSONResponse(content={
+        "file_id": file_key,
+        "status": "ready" if pages else "pending",
+        "pages": pages
+    })
+
+
 @router.get("/download/{file_key}")
 async def download_file(
     file_key: str,
@@ -239,6 +368,9 @@ async def delete_file(
         if not success:
             raise HTTPException(status_code=404, detail="File not found or already deleted")
         
+        object_cache.invalidate(file_key)
+        await preview_renderer.delete(file_key)
+        
         # TODO: Update database to mark file as deleted
         
         logger.info(
@@ -246,6 +378,11 @@ async def delete_file(
             user_id=current_user.id,
             file_key=file_key
         )
+        audit_log.record(
+            "delete", "file", entity_uuid(file_key),
+            user_id=current_user.id,
+            old_values={"file_key": file_key}
+        )
         
         return JSONResponse(content={
             "message": "File deleted successfully"
@@ -0,0 +1,174 @@
+"""
+Job API Routes
+Job listings with filters and facet counts, full-text search and radius search
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
+
+from app.core import queries
+from app.core.database import get_read_db, LazySession
+from app.core.auth import get_current_active_user
+from app.models.job import (
+    JobListResponse, JobNearbyHit, JobNearbyResponse, JobSearchHit, JobSearchResponse, JobSummary
+)
+from app.models.auth import UserResponse
+from app.services.job_facets import job_facets
+from app.services.job_geo import job_geo
+from app.services.job_search import job_search
+
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+async def load_job_summaries(db: LazySession, job_ids: List[str]) -> List[JobSummary]:
+    """Job summaries in the order of job_ids; jobs deleted in the meantime are left out"""
+    if not job_ids:
+        return []
+    rows = {
+        str(row[0]): row
+        for row in await queries.JOB_FACETS_PAGE.fetch_all(db, ids=job_ids)
+    }
+    summaries = []
+    for job_id in job_ids:
+        row = rows.get(job_id)
+        if row is None:
+            continue
+        (_, title, company, logo_url, industry, city, region, country_code, remote_type, employment_type,
+         experience_level, salary_min, salary_max, salary_currency, posted_at, expires_at, application_url) = row
+        summaries.append(JobSummary(
+            id=job_id,
+            title=title,
+            company=company,
+            company_logo_url=logo_url,
+            industry=industry,
+            location=", ".join(part for part in (city, region, country_code) if part) or None,
+            remote_type=remote_type,
+            employment_type=employment_type,
+            experience_level=experience_level,
+            salary_min=salary_min,
+            salary_max=salary_max,
+            salary_currency=salary_currency,
+            posted_at=posted_at,
+            expires_at=expires_at,
+            application_url=application_url
+        ))
+    return summaries
+
+
+@router.get("", response_model=JobListResponse)
+async def list_jobs(
+    remote_type: List[str] = Query([]),
+    employment_type: List[str] = Query([]),
+    experience_level: List[str] = Query([]),
+    industry: List[str] = Query([]),
+    country: List[str] = Query([], description="ISO country codes"),
+    location: List[str] = Query([], description="Location IDs from the location facet"),
+    salary: List[str] = Query([], description="Ranges from the salary facet"),
+    salary_min: Optional[int] = Query(None, ge=0, description="Pays at least (1,000 steps)"),
+    salary_max: Optional[int] = Query(None, ge=0, description="Starts at most (1,000 steps)"),
+    offset: int = Query(0, ge=0, le=10000),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: LazySession = Depends(get_read_db)
+):
+    """
+    Active jobs, newest first, with counts per facet value
+
+    Values repeated within one filter match any of them; different filters
+    must all match. Each facet's counts ignore that facet's own filter.
+    """
+    result = job_facets.search(
+        {
+            "remote_type": remote_type,
+            "employment_type": employment_type,
+            "experience_level": experience_level,
+            "industry": industry,
+            "country": [code.upper() for code in country],
+            "location": location,
+            "salary": salary,
+        },
+        salary_min=salary_min,
+        salary_max=salary_max,
+        offset=offset,
+        limit=limit
+    )
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Job search is loading",
+            headers={"Retry-After": "5"}
+        )
+
+    jobs = await load_job_summaries(db, result["job_ids"])
+    await db.release()
+    return JobListResponse(
+        jobs=jobs,
+        total=result["total"],
+        offset=offset,
+        limit=limit,
+        facets=result["facets"]
+    )
+
+
+@router.get("/search", response_model=JobSearchResponse)
+async def search_jobs(
+    q: str = Query(..., min_length=1, max_length=200,
+                   description='Words, "quoted phrases", -excluded words, or'),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(20, ge=1, le=50),
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: LazySession = Depends(get_read_db)
+):
+    """
+    Active jobs matching the query, best match first
+
+    Matches in the title weigh most, then requirements and responsibilities,
+    then the description. Each hit has a description excerpt with the
+    matching words marked.
+    """
+    try:
+        result = await job_search.search(db, q, cursor=cursor, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    hits = {hit["id"]: hit for hit in result["hits"]}
+    jobs = await load_job_summaries(db, list(hits))
+    await db.release()
+    return JobSearchResponse(
+        query=result["query"],
+        hits=[JobSearchHit(job=job, rank=hits[job.id]["rank"], snippet=hits[job.id]["snippet"]) for job in jobs],
+        next_cursor=result["next_cursor"]
+    )
+
+
+@router.get("/nearby", response_model=JobNearbyResponse)
+async def nearby_jobs(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(50, gt=0, le=500),
+    include_remote: bool = Query(True, description="Add remote jobs located outside the radius"),
+    offset: int = Query(0, ge=0, le=10000),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: LazySession = Depends(get_read_db)
+):
+    """
+    Active jobs located within radius_km of a point, nearest first
+
+    Jobs at the same location are newest first. Remote jobs located
+    elsewhere follow, newest first, without a distance.
+    """
+    result = await job_geo.nearby(
+        db, lat, lng, radius_km, include_remote=include_remote, offset=offset, limit=limit
+    )
+
+    distances = {hit["id"]: hit["distance_km"] for hit in result["hits"]}
+    jobs = await load_job_summaries(db, list(distances))
+    await db.release()
+    return JobNearbyResponse(
+        hits=[JobNearbyHit(job=job, distance_km=distances[job.id]) for job in jobs],
+        offset=offset,
+        limit=limit,
+        has_more=result["has_more"]
+    )
@@ -9,9 +9,11 @@ from fastapi import APIRouter
 from app.api.v1.files import router as files_router
 from app.api.v1.auth import router as auth_router
 from app.api.v1.sessions import router as sessions_router
+from app.api.v1.admin import router as admin_router
 # from app.api.v1.users import router as users_router
 # from app.api.v1.resumes import router as resumes_router
-# from app.api.v1.jobs import router as jobs_router
+from app.api.v1.jobs import router as jobs_router
+from app.api.v1.typeahead import router as typeahead_router
 
 # Create main API router
 api_router = APIRouter()
@@ -20,6 +22,8 @@ api_router = APIRouter()
 api_router.include_router(files_router)
 api_router.include_router(auth_router)
 api_router.include_router(sessions_router)
+api_router.include_router(admin_router)
 # api_router.include_router(users_router)
 # api_router.include_router(resumes_router)
-# api_router.include_router(jobs_router)
+api_router.include_router(jobs_router)
+api_router.include_router(typeahead_router)
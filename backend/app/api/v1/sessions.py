@@ -4,12 +4,12 @@ Handles user session management, device tracking, and security
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import datetime
 import asyncio
 
-from app.core.database import get_db
+from app.core import queries
+from app.core.database import get_lazy_db, get_read_db, LazySession
 from app.core.auth import get_current_active_user
 from app.models.auth import UserResponse
 from app.models.session import (
@@ -21,6 +21,8 @@ from app.models.session import (
     SessionResponse
 )
 from app.services.session import SessionService
+from app.services.security_monitor import merge_alerts, persisted_alert, security_monitor
+from app.services.audit import audit_log
 
 
 router = APIRouter(prefix="/sessions", tags=["Session Management"])
@@ -29,7 +31,7 @@ router = APIRouter(prefix="/sessions", tags=["Session Management"])
 @router.get("/active", response_model=ActiveSessionsResponse)
 async def get_active_sessions(
     current_user: UserResponse = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: LazySession = Depends(get_read_db)
 ):
     """
     Get all active sessions for the current user
@@ -39,6 +41,7 @@ async def get_active_sessions(
             db=db, 
             user_id=current_user.id
         )
+        await db.release()
         return sessions
         
     except Exception as e:
@@ -52,7 +55,7 @@ async def get_active_sessions(
 async def revoke_session(
     session_revoke: SessionRevoke,
     current_user: UserResponse = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: LazySession = Depends(get_lazy_db)
 ):
     """
     Revoke a specific session
@@ -69,6 +72,7 @@ async def revoke_session(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Session not found or already revoked"
             )
+        audit_log.record("revoke", "session", session_revoke.session_id, user_id=current_user.id)
             
     except HTTPException:
         raise
@@ -83,7 +87,7 @@ async def revoke_session(
 async def revoke_all_sessions(
     request: Request,
     current_user: UserResponse = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: LazySession = Depends(get_lazy_db)
 ):
     """
     Revoke all sessions except the current one
@@ -94,18 +98,17 @@ async def revoke_all_sessions(
         auth_header = request.headers.get("Authorization")
         if auth_header:
             # Extract JTI from current token to identify current session
-            from jose import jwt
-            from app.core.config import settings
+            from app.core.keys import key_ring
             
             try:
                 token = auth_header.replace("Bearer ", "")
-                payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+                payload = key_ring.decode(token)
                 jwt_jti = payload.get("jti")
                 
                 if jwt_jti:
                     current_session = await SessionService.get_session_by_jwt_jti(db, jwt_jti)
                     if current_session:
-                        current_session_id = current_session["id"]
+                        current_session_id = str(current_session.id)
             except:
                 pass  # If we can't get current session, revoke all
         
@@ -115,6 +118,12 @@ async def revoke_all_sessions(
             exclude_session_id=current_session_id
         )
         
+        audit_log.record(
+            "revoke_all", "user", current_user.id,
+            user_id=current_user.id,
+            new_values={"revoked_count": revoked_count, "kept_session_id": current_session_id}
+        )
+        
         return {"message": f"Successfully revoked {revoked_count} sessions"}
         
     except Exception as e:
@@ -128,7 +137,7 @@ async def revoke_all_sessions(
 async def revoke_bulk_sessions(
     bulk_revoke: BulkSessionRevoke,
     current_user: UserResponse = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: LazySession = Depends(get_lazy_db)
 ):
     """
     Revoke multiple sessions by ID
@@ -144,6 +153,7 @@ async def revoke_bulk_sessions(
             )
             if success:
                 revoked_count += 1
+                audit_log.record("revoke", "session", session_id, user_id=current_user.id)
         
         return {
             "message": f"Successfully revoked {revoked_count} out of {len(bulk_revoke.session_ids)} sessions"
@@ -159,7 +169,7 @@ async def revoke_bulk_sessions(
 @router.get("/stats", response_model=SessionStats)
 async def get_session_stats(
     current_user: UserResponse = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: LazySession = Depends(get_read_db)
 ):
     """
     Get session statistics for the current user
@@ -169,6 +179,7 @@ async def get_session_stats(
             db=db,
             user_id=current_user.id
         )
+        await db.release()
         return stats
         
     except Exception as e:
@@ -181,66 +192,38 @@ async def get_session_stats(
 @router.get("/security", response_model=SessionSecurity)
 async def get_session_security(
     current_user: UserResponse = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: LazySession = Depends(get_read_db)
 ):
     """
     Get security information for user sessions
     """
     try:
-        from sqlalchemy import text
-        
-        # Get suspicious activities (multiple failed logins, unusual locations, etc.)
-        result = await db.execute(
-            text("""
-                SELECT 
-                    failed_login_attempts,
-                    locked_until,
-                    last_login_at
-                FROM users 
-                WHERE id = :user_id
-            """),
-            {"user_id": current_user.id}
-        )
-        
-        user_security = result.fetchone()
-        
-        # Check for recent failed login attempts from audit logs
-        suspicious_activities = []
+        user_security = await queries.USER_SECURITY.fetch_one(db, user_id=current_user.id)
         
-        # Get recent login attempts from different IPs
-        session_result = await db.execute(
-            text("""
-                SELECT 
-                    ip_address,
-                    device_info,
-                    created_at,
-                    COUNT(*) as login_count
-                FROM user_sessions 
-                WHERE user_id = :user_id 
-                AND created_at >= NOW() - INTERVAL '24 hours'
-                GROUP BY ip_address, device_info, DATE_TRUNC('hour', created_at)
-                HAVING COUNT(*) > 3
-                ORDER BY created_at DESC
-            """),
-            {"user_id": current_user.id}
+        # Alerts are precomputed by the security monitor as login/refresh events arrive
+        # and persisted in the background. Other workers only see their own events, so
+        # persisted alerts are always read; local ones cover any not yet written.
+        alert_rows = await queries.SECURITY_ALERTS_RECENT.fetch_all(db, user_id=current_user.id)
+        await db.release()
+        suspicious_activities = merge_alerts(
+            [persisted_alert(row) for row in alert_rows],
+            security_monitor.get_alerts(current_user.id)
         )
         
-        for row in session_result.fetchall():
-            suspicious_activities.append({
-                "type": "multiple_logins",
-                "description": f"Multiple logins from IP {row.ip_address}",
-                "timestamp": row.created_at.isoformat(),
-                "metadata": {
-                    "ip_address": str(row.ip_address),
-                    "login_count": row.login_count,
-                    "device_info": row.device_info
-                }
-            })
+        last_failed_login = user_security.last_failed_login_at
+        local_failed_login = security_monitor.get_last_failed_login(current_user.id)
+        if last_failed_login is not None:
+            last_failed_login = last_failed_login.replace(tzinfo=None)
+        if local_failed_login is not None and (last_failed_login is None or local_failed_login > last_failed_login):
+            last_failed_login = local_failed_login
         
         return SessionSecurity(
             suspicious_activities=suspicious_activities,
-            login_attempts=user_security.failed_login_attempts or 0,
-            last_failed_login=None,  # Would need audit log implementation
+            login_attempts=max(
+                user_security.failed_login_attempts or 0,
+                security_monitor.get_recent_failures(current_user.id)
+            ),
+            last_failed_login=last_failed_login,
             account_locked=user_security.locked_until is not None and user_security.locked_until > datetime.utcnow(),
             lock_expires_at=user_security.locked_until
         )
@@ -255,7 +238,7 @@ async def get_session_security(
 @router.post("/cleanup", status_code=status.HTTP_200_OK)
 async def cleanup_expired_sessions(
     current_user: UserResponse = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: LazySession = Depends(get_lazy_db)
 ):
     """
     Clean up expired sessions (admin/maintenance endpoint)
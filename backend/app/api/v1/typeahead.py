@@ -0,0 +1,40 @@
+"""
+Typeahead API Routes
+Autocomplete for company and skill names
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Literal
+
+from app.core.auth import get_current_active_user
+from app.models.auth import UserResponse
+from app.models.typeahead import TypeaheadResponse
+from app.services.typeahead import KINDS, typeahead
+
+
+router = APIRouter(prefix="/typeahead", tags=["Typeahead"])
+
+
+@router.get("", response_model=TypeaheadResponse)
+async def suggest(
+    q: str = Query(..., min_length=1, max_length=100),
+    kind: Literal["companies", "skills", "both"] = Query("both"),
+    limit: int = Query(10, ge=1, le=50, description="Capped at the configured TYPEAHEAD_LIMIT"),
+    current_user: UserResponse = Depends(get_current_active_user)
+):
+    """
+    Companies and skills whose name or alias, or any word in it, starts
+    with the query
+
+    Case and accents are ignored. Names starting with the query come
+    first, most active jobs first; from three letters on, names one typo
+    away follow when there are fewer than limit.
+    """
+    result = typeahead.lookup(q, KINDS if kind == "both" else (kind,), limit)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Typeahead is loading",
+            headers={"Retry-After": "5"}
+        )
+    return TypeaheadResponse(**result)
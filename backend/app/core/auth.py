@@ -5,29 +5,41 @@ FastAPI dependencies for authentication and authorization with session managemen
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.ext.asyncio import AsyncSession
-from jose import JWTError, jwt
+from jose import JWTError
 from datetime import datetime, timedelta
+from typing import Optional
 import asyncpg
 import uuid
 import secrets
 
+from app.core import queries
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_lazy_db, LazySession
+from app.core.keys import key_ring
+from app.core.replica import bind_request_user
 from app.models.auth import UserResponse
 from app.services.session import SessionService
+from app.services.session_epochs import session_epochs
 
 
 # Security scheme for JWT tokens
 security = HTTPBearer()
+# Monitoring endpoints answer 404 rather than 403 without credentials
+monitoring_security = HTTPBearer(auto_error=False)
 
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
+    db: LazySession = Depends(get_lazy_db)
 ) -> UserResponse:
     """
-    Get current authenticated user from JWT token with session validation
+    Get current authenticated user from JWT token with session validation.
+    With session epochs enabled, a token whose epoch is current skips the
+    user_sessions lookup, and the user profile comes from the worker cache.
+
+    Session and user lookups always run on the primary: a lagging replica
+    would accept sessions just revoked and reject tokens just issued, and
+    the read-your-writes pin does not follow the user to other workers.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -36,16 +48,15 @@ async def get_current_user(
     )
 
     try:
-        payload = jwt.decode(
-            credentials.credentials, 
-            settings.JWT_SECRET_KEY, 
-            algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = key_ring.decode(credentials.credentials)
         user_id: str = payload.get("sub")
         jwt_jti: str = payload.get("jti")  # JWT ID for session tracking
         
         if user_id is None or jwt_jti is None:
             raise credentials_exception
+        
+        # Route the endpoint's own reads (replica unless the user wrote recently)
+        bind_request_user(user_id)
             
         # Check token expiration
         exp = payload.get("exp")
@@ -56,26 +67,32 @@ async def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
             
-        # Validate session exists and is not revoked
-        session = await SessionService.get_session_by_jwt_jti(db, jwt_jti)
-        if not session or session["is_revoked"]:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Session revoked or invalid",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        # Nothing revoked for this user since the token was issued
+        epoch_current = session_epochs.enabled and session_epochs.verify(user_id, payload.get("sep"))
+        if epoch_current:
+            cached_user = session_epochs.cached_user(user_id)
+            if cached_user is not None:
+                return cached_user
+        else:
+            # Validate session exists and is not revoked
+            session = await SessionService.get_session_by_jwt_jti(db, jwt_jti)
+            if not session or session.is_revoked:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Session revoked or invalid",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
             
     except JWTError:
         raise credentials_exception
 
     # Get user from database
     try:
-        from sqlalchemy import text
-        result = await db.execute(
-            text("SELECT id, email, full_name, is_active, created_at, updated_at FROM users WHERE id = :user_id"),
-            {"user_id": user_id}
-        )
-        user_row = result.fetchone()
+        epoch = session_epochs.current(user_id)
+        user_row = await queries.USER_BY_ID.fetch_one(db, user_id=user_id)
+        
+        # Hand the connection back before the route handler runs
+        await db.release()
             
         if user_row is None:
             raise credentials_exception
@@ -86,7 +103,7 @@ async def get_current_user(
                 detail="User account is disabled"
             )
             
-        return UserResponse(
+        user = UserResponse(
             id=str(user_row.id),
             email=user_row.email,
             name=user_row.full_name,
@@ -94,6 +111,8 @@ async def get_current_user(
             created_at=user_row.created_at,
             updated_at=user_row.updated_at
         )
+        session_epochs.cache_user(user, epoch)
+        return user
         
     except Exception as e:
         raise HTTPException(
@@ -116,6 +135,40 @@ async def get_current_active_user(
     return current_user
 
 
+async def get_admin_user(
+    current_user: UserResponse = Depends(get_current_active_user)
+) -> UserResponse:
+    """
+    Require a user listed in ADMIN_USER_IDS
+    """
+    if str(current_user.id) not in settings.admin_user_ids:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+
+def require_monitoring_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(monitoring_security)
+) -> None:
+    """
+    Monitoring endpoints do not exist unless MONITORING_TOKEN is set, and
+    then need it as a bearer token (no user or database lookup, so
+    scrapers keep working while the database is down)
+    """
+    if not settings.MONITORING_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if credentials is None or not secrets.compare_digest(
+        credentials.credentials.encode(), settings.MONITORING_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid monitoring token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     """
     Create JWT access token with JTI for session tracking
@@ -134,14 +187,17 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
         "iat": datetime.utcnow(),
         "type": "access"
     })
+    if session_epochs.enabled:
+        to_encode["sep"] = session_epochs.current(str(to_encode["sub"]))
     
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    encoded_jwt = key_ring.encode(to_encode)
     return encoded_jwt, jti
 
 
 def create_refresh_token(data: dict, expires_delta: timedelta = None):
     """
-    Create JWT refresh token with JTI for session tracking
+    Create JWT refresh token with JTI for session tracking.
+    data carries the session ("sid") and its refresh generation ("gen").
     """
     to_encode = data.copy()
     if expires_delta:
@@ -158,21 +214,23 @@ def create_refresh_token(data: dict, expires_delta: timedelta = None):
         "type": "refresh"
     })
     
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    encoded_jwt = key_ring.encode(to_encode)
     return encoded_jwt, jti
 
 
-async def verify_refresh_token(token: str, db: AsyncSession) -> tuple[str, str]:
+async def verify_refresh_token(token: str) -> tuple[str, str, int]:
     """
-    Verify refresh token and return user ID and JTI
+    Verify refresh token and return user ID, session ID and refresh generation.
+    The session itself is checked when it is rotated (SessionService.rotate_session).
     """
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        payload = key_ring.decode(token)
         user_id: str = payload.get("sub")
         token_type: str = payload.get("type")
-        jwt_jti: str = payload.get("jti")
+        session_id: str = payload.get("sid")
+        generation = payload.get("gen")
         
-        if user_id is None or token_type != "refresh" or jwt_jti is None:
+        if user_id is None or token_type != "refresh" or session_id is None or not isinstance(generation, int):
             raise JWTError("Invalid token")
             
         # Check token expiration
@@ -180,12 +238,7 @@ async def verify_refresh_token(token: str, db: AsyncSession) -> tuple[str, str]:
         if exp is None or datetime.utcnow() > datetime.fromtimestamp(exp):
             raise JWTError("Token expired")
             
-        # Validate session exists and is not revoked
-        session = await SessionService.get_session_by_jwt_jti(db, jwt_jti)
-        if not session or session["is_revoked"]:
-            raise JWTError("Session revoked or invalid")
-            
-        return user_id, jwt_jti
+        return user_id, session_id, generation
         
     except JWTError as e:
         raise HTTPException(
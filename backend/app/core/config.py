@@ -21,12 +21,65 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     DATABASE_POOL_SIZE: int = 20
     DATABASE_MAX_OVERFLOW: int = 30
+    DATABASE_STATEMENT_CACHE_SIZE: int = 256  # prepared statements kept per asyncpg connection
+    DATABASE_POOL_WARM_SIZE: int = 5  # connections opened in parallel at startup (capped at the pool size)
+    
+    # Read replica (optional)
+    DATABASE_READ_URL: str = ""
+    DATABASE_READ_POOL_SIZE: int = 20
+    DATABASE_READ_MAX_OVERFLOW: int = 30
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 2.0
+    DATABASE_READ_STICKY_SECONDS: float = 10.0  # reads pinned to primary after a user's write
+    DATABASE_REPLICA_CHECK_INTERVAL_SECONDS: float = 5.0
+    
+    # Startup
+    STARTUP_WARM_TIMEOUT_SECONDS: float = 10.0
+    # Heavy optional modules (boto3 client, python-magic, user-agent parser): "background" loads them
+    # after the worker reports ready, "blocking" before, "off" leaves them to their first use
+    STARTUP_PRELOAD: str = "background"
+    
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_ASYNC: bool = True  # encode and write logs on a background thread
+    LOG_QUEUE_SIZE: int = 10000  # events beyond this are dropped and counted
+    # Sampling for high-volume routine events, as "event type=rate" pairs (emoji prefix ignored)
+    LOG_SAMPLE_RATES: str = (
+        "File content validated=0.01,Presigned URL generated=0.1,Download URL generated=0.1,"
+        "File uploaded successfully=0.1,File deleted successfully=0.1"
+    )
+    
+    # Metrics
+    METRICS_ENABLED: bool = True
+    METRICS_SLOW_REQUEST_MS: float = 1000.0  # requests slower than this are logged; 0 disables
+    MONITORING_TOKEN: str = ""  # bearer token for /health/db and /metrics; empty disables both
+    
+    # Profiling (off unless enabled; admin endpoints return 404 and no signal handler is installed)
+    PROFILER_ENABLED: bool = False
+    PROFILER_MAX_SECONDS: float = 60.0
+    PROFILER_INTERVAL_MS: float = 5.0
+    PROFILER_SIGNAL_SECONDS: float = 30.0  # window started by SIGUSR2
+    PROFILER_OUTPUT_DIR: str = "/tmp"
+    ADMIN_USER_IDS: str = ""  # comma-separated user IDs allowed to use /admin endpoints
+    
+    # Audit log
+    AUDIT_LOG_ENABLED: bool = True
+    AUDIT_BUFFER_SIZE: int = 65536  # events held in memory before new ones are dropped
+    AUDIT_BATCH_SIZE: int = 2000
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 0.5
+    AUDIT_PARTITION_MONTHS_AHEAD: int = 3
+    AUDIT_ONLINE_MONTHS: int = 12  # older partitions are detached into audit_archive
+    AUDIT_MAINTENANCE_INTERVAL_SECONDS: int = 3600
     
     # JWT
     JWT_SECRET_KEY: str
-    JWT_ALGORITHM: str = "HS256"
+    JWT_ALGORITHM: str = "HS256"  # HS256 (shared secret), ES256 or EdDSA (key ring, see app/core/keys.py)
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    JWT_KEY_DIR: str = "keys/jwt"  # Private signing keys for ES256/EdDSA; share it between workers
+    JWT_KEY_ROTATION_DAYS: float = 30  # 0 disables scheduled rotation
+    JWT_KEY_PUBLISH_AHEAD_SECONDS: int = 3600  # New keys are in JWKS this long before they sign
+    JWT_KEY_CHECK_SECONDS: float = 60.0
+    JWT_ACCEPT_HS256: bool = True  # Keep accepting HS256 tokens after switching to ES256/EdDSA
     
     # DigitalOcean Spaces
     DO_SPACES_ACCESS_KEY: str
@@ -36,10 +89,68 @@ class Settings(BaseSettings):
     DO_SPACES_ENDPOINT: str
     DO_SPACES_CDN_ENDPOINT: str = ""
     
+    # Object transfers (see app/services/transfers.py); the client pool is sized from these
+    STORAGE_MULTIPART_THRESHOLD_MB: int = 16  # smaller objects go in a single request
+    STORAGE_PART_SIZE_MB: int = 8
+    STORAGE_LARGE_OBJECT_MB: int = 512  # larger objects use STORAGE_LARGE_PART_SIZE_MB parts
+    STORAGE_LARGE_PART_SIZE_MB: int = 32
+    STORAGE_MAX_CONCURRENCY: int = 16  # requests in flight for small objects; half that per multipart tier
+    
     # File Upload
     MAX_FILE_SIZE_MB: int = 25
     ALLOWED_FILE_TYPES: str = "pdf,docx,doc,txt"
     UPLOAD_FOLDER: str = "resumes"
+    # Direct uploads: presigned POSTs land in UPLOAD_INCOMING_FOLDER until verified
+    UPLOAD_INCOMING_FOLDER: str = "incoming"
+    UPLOAD_PRESIGN_EXPIRE_SECONDS: int = 300
+    UPLOAD_VERIFY_WORKERS: int = 4
+    UPLOAD_POLL_INTERVAL_SECONDS: float = 30.0  # bucket poll for uploads never reported complete; 0 disables
+    UPLOAD_POLL_MIN_AGE_SECONDS: float = 60.0  # leaves the completion callback time to arrive first
+    
+    # Node-local disk cache for objects read repeatedly (see app/services/object_cache.py)
+    OBJECT_CACHE_DIR: str = "/tmp/skillmatch-object-cache"  # workers on a node can share it
+    OBJECT_CACHE_MAX_MB: int = 2048  # per worker; 0 keeps files only while in use
+    
+    # Page previews rendered at ingest (see app/services/previews.py)
+    PREVIEW_WORKERS: int = 2  # render processes; 0 disables previews
+    PREVIEW_WIDTHS: str = "320,960"  # comma-separated thumbnail widths in pixels
+    PREVIEW_MAX_PAGES: int = 2
+    PREVIEW_FORMAT: str = "webp"  # webp, png or jpeg
+    PREVIEW_QUALITY: int = 80
+    PREVIEW_TASKS_PER_WORKER: int = 50  # render processes are replaced after this many files
+    PREVIEW_KEY_SECRET: str = ""  # HMAC key for preview keys; JWT_SECRET_KEY when empty
+    
+    # Job feed ingestion (see app/services/job_ingest.py and ingest_jobs.py)
+    JOB_INGEST_BATCH_SIZE: int = 5000  # records per COPY + merge transaction
+    
+    # Near-duplicate jobs across feeds (see app/services/job_dedup.py)
+    JOB_DEDUP_ENABLED: bool = True
+    JOB_DEDUP_INDEX_PATH: str = "data/job_dedup.idx"  # rebuilt from jobs when missing
+    JOB_DEDUP_THRESHOLD: float = 0.5  # estimated Jaccard similarity of word shingles; reposts score 0.6+
+    JOB_DEDUP_PERMUTATIONS: int = 128  # signature length; 512 bytes per canonical job
+    JOB_DEDUP_BANDS: int = 32  # more bands find more candidates below the threshold
+    
+    # Faceted job search from in-memory bitmaps (see app/services/job_facets.py)
+    JOB_FACETS_ENABLED: bool = True
+    JOB_FACETS_VALUES: int = 20  # values returned per facet, largest count first
+    JOB_FACETS_SALARY_BAND: int = 50000  # width of the salary facet's ranges
+    JOB_FACETS_RESYNC_SECONDS: float = 30.0  # listener reconnect and expiry sweep
+    JOB_FACETS_REBUILD_SECONDS: float = 3600.0  # full reload; picks up company changes
+    
+    # Full-text job search (see app/services/job_search.py)
+    JOB_SEARCH_CACHE_SECONDS: float = 30.0  # 0 disables; pages are also dropped when a listed job changes
+    JOB_SEARCH_CACHE_SIZE: int = 2000  # cached pages; a query is cached from its second request on
+    
+    # Company and skill autocomplete (see app/services/typeahead.py)
+    TYPEAHEAD_ENABLED: bool = True
+    TYPEAHEAD_LIMIT: int = 10  # most suggestions per kind; also the per-node ranking kept in memory
+    TYPEAHEAD_RESYNC_SECONDS: float = 30.0  # listener reconnect check
+    TYPEAHEAD_REBUILD_SECONDS: float = 900.0  # full reload; refreshes popularity from job counts
+    
+    # Radius job search (see app/services/job_geo.py)
+    JOB_GEO_BACKEND: str = "auto"  # "postgis", "grid", or "auto": PostGIS when locations has its geo column
+    JOB_GEO_CELL_DEGREES: float = 0.5  # grid cell size when not using PostGIS
+    JOB_GEO_REFRESH_SECONDS: float = 300.0  # grid reload from the locations table
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -55,6 +166,9 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str = ""
     EMAIL_FROM: str = ""
     
+    # Trusted Host header values when DEBUG is off
+    ALLOWED_HOSTS: str = "yourdomain.com,*.yourdomain.com"
+    
     # CORS
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:5173,http://localhost:8080,http://40.0.41.39:8000"
     
@@ -65,6 +179,14 @@ class Settings(BaseSettings):
     # Security
     BCRYPT_ROUNDS: int = 12
     SECURE_COOKIES: bool = False
+    DEVICE_UA_CACHE_SIZE: int = 4096  # Parsed User-Agent strings kept in memory per worker
+    
+    # Stateless access-token verification: tokens carry a per-user session epoch and
+    # skip the user_sessions lookup while it matches (see app/services/session_epochs.py)
+    AUTH_SESSION_EPOCHS_ENABLED: bool = False
+    AUTH_EPOCH_RESYNC_SECONDS: float = 30.0  # Listener reconnect / table prune interval
+    AUTH_USER_CACHE_SECONDS: float = 60.0  # How long a worker reuses a user profile on the fast path
+    AUTH_USER_CACHE_SIZE: int = 10000
     
     # Monitoring
     SENTRY_DSN: str = ""
@@ -79,6 +201,16 @@ class Settings(BaseSettings):
         """Get allowed origins as a list"""
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
     
+    @property
+    def admin_user_ids(self) -> List[str]:
+        """Get admin user IDs as a list"""
+        return [user_id.strip() for user_id in self.ADMIN_USER_IDS.split(",") if user_id.strip()]
+    
+    @property
+    def preview_widths_list(self) -> List[int]:
+        """Get preview widths as a list"""
+        return [int(width) for width in self.PREVIEW_WIDTHS.split(",") if width.strip()]
+    
     @property
     def max_file_size_bytes(self) -> int:
         """Get max file size in bytes"""
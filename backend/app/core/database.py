@@ -5,9 +5,15 @@ Database Configuration and Connection Management
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.pool import NullPool
+from sqlalchemy import event
+from typing import Any, Dict, Optional
+import time
 import structlog
 
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.queries import statement_name
+from app.core.replica import replica_router, request_user_id
 
 logger = structlog.get_logger()
 
@@ -18,7 +24,12 @@ engine = create_async_engine(
     max_overflow=settings.DATABASE_MAX_OVERFLOW,
     pool_pre_ping=True,
     echo=settings.DEBUG,
-    poolclass=NullPool if "sqlite" in settings.DATABASE_URL else None
+    poolclass=NullPool if "sqlite" in settings.DATABASE_URL else None,
+    # asyncpg prepares each distinct statement once per connection and keeps it in this LRU
+    connect_args=(
+        {"prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE}
+        if "asyncpg" in settings.DATABASE_URL else {}
+    )
 )
 
 # Create session factory
@@ -30,10 +41,204 @@ AsyncSessionLocal = async_sessionmaker(
     autocommit=False
 )
 
+# Optional read replica engine for read-only endpoints
+read_engine = None
+ReadSessionLocal = None
+if settings.DATABASE_READ_URL:
+    read_engine = create_async_engine(
+        settings.DATABASE_READ_URL,
+        pool_size=settings.DATABASE_READ_POOL_SIZE,
+        max_overflow=settings.DATABASE_READ_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        echo=settings.DEBUG,
+        connect_args=(
+            {"prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE}
+            if "asyncpg" in settings.DATABASE_READ_URL else {}
+        )
+    )
+    ReadSessionLocal = async_sessionmaker(
+        read_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+        autocommit=False
+    )
+
 # Base class for SQLAlchemy models
 Base = declarative_base()
 
 
+class PoolMetrics:
+    """Connection pool checkout, wait-time and saturation counters"""
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.saturated_checkouts = 0
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+    
+    def on_connect(self, *args) -> None:
+        self.connects += 1
+    
+    def on_checkout(self, *args) -> None:
+        self.checkouts += 1
+        self.checked_out += 1
+        if self.checked_out > self.peak_checked_out:
+            self.peak_checked_out = self.checked_out
+        if self.capacity and self.checked_out >= self.capacity:
+            self.saturated_checkouts += 1
+    
+    def on_checkin(self, *args) -> None:
+        self.checkins += 1
+        if self.checked_out > 0:
+            self.checked_out -= 1
+    
+    def record_wait(self, seconds: float) -> None:
+        """Record how long a request waited to get a connection from the pool"""
+        self.wait_count += 1
+        self.wait_seconds_total += seconds
+        if seconds > self.wait_seconds_max:
+            self.wait_seconds_max = seconds
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Get current pool statistics"""
+        return {
+            "capacity": self.capacity,
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "checked_out": self.checked_out,
+            "peak_checked_out": self.peak_checked_out,
+            "saturation": round(self.checked_out / self.capacity, 4) if self.capacity else 0.0,
+            "saturated_checkouts": self.saturated_checkouts,
+            "wait_count": self.wait_count,
+            "wait_seconds_avg": self.wait_seconds_total / self.wait_count if self.wait_count else 0.0,
+            "wait_seconds_max": self.wait_seconds_max,
+        }
+
+
+# Pool metrics fed by SQLAlchemy pool events
+pool_metrics = PoolMetrics(
+    capacity=0 if "sqlite" in settings.DATABASE_URL
+    else settings.DATABASE_POOL_SIZE + settings.DATABASE_MAX_OVERFLOW
+)
+event.listen(engine.sync_engine, "connect", pool_metrics.on_connect)
+event.listen(engine.sync_engine, "checkout", pool_metrics.on_checkout)
+event.listen(engine.sync_engine, "checkin", pool_metrics.on_checkin)
+
+# Statement timings and pool gauges for /metrics
+if settings.METRICS_ENABLED:
+    metrics.instrument_engine(engine, "primary", statement_name)
+    if read_engine is not None:
+        metrics.instrument_engine(read_engine, "replica", statement_name)
+metrics.gauge("db_pool_checked_out", "Connections currently checked out of the primary pool",
+              lambda: pool_metrics.checked_out)
+metrics.gauge("db_pool_capacity", "Primary pool size plus max overflow",
+              lambda: pool_metrics.capacity)
+metrics.gauge("db_pool_saturated_checkouts_total", "Checkouts that left the primary pool fully used",
+              lambda: pool_metrics.saturated_checkouts, kind="counter")
+metrics.gauge("db_pool_wait_seconds_total", "Time spent waiting for a primary pool connection",
+              lambda: pool_metrics.wait_seconds_total, kind="counter")
+metrics.gauge("db_replica_lag_seconds", "Last measured read replica lag",
+              lambda: replica_router.lag_seconds or 0)
+
+
+class LazySession:
+    """
+    Request-scoped database session that only checks out a pooled connection
+    on first use and hands it back as soon as the caller releases it, instead
+    of holding it until the response has been sent.
+    
+    Exposes the subset of AsyncSession used by the services (execute, commit,
+    rollback, close). After commit, rollback or release the next execute
+    transparently checks out a fresh connection.
+    
+    A read-only session is routed to the replica when the replica router
+    allows it for the bound user; commits on a read-write session pin that
+    user's reads to the primary for the sticky window.
+    """
+    
+    __slots__ = ("_factory", "_session", "_read_only", "_user_id")
+    
+    def __init__(self, factory: async_sessionmaker = AsyncSessionLocal, read_only: bool = False):
+        self._factory = factory
+        self._session: Optional[AsyncSession] = None
+        self._read_only = read_only
+        self._user_id: Optional[str] = None
+    
+    @property
+    def in_use(self) -> bool:
+        """True while a pooled connection is checked out"""
+        return self._session is not None
+    
+    def bind_user(self, user_id: str) -> None:
+        """Set the user whose reads and writes this session performs"""
+        self._user_id = str(user_id)
+    
+    @property
+    def user_id(self) -> Optional[str]:
+        return self._user_id or request_user_id.get()
+    
+    async def _connect(self, factory: async_sessionmaker) -> AsyncSession:
+        session = factory()
+        start = time.perf_counter()
+        try:
+            await session.connection()
+        except Exception:
+            await session.close()
+            raise
+        pool_metrics.record_wait(time.perf_counter() - start)
+        return session
+    
+    async def _acquire(self) -> AsyncSession:
+        if self._session is None:
+            if self._read_only and ReadSessionLocal is not None and replica_router.use_replica(self.user_id):
+                try:
+                    self._session = await self._connect(ReadSessionLocal)
+                    return self._session
+                except Exception as e:
+                    replica_router.mark_unhealthy(str(e))
+            self._session = await self._connect(self._factory)
+        return self._session
+    
+    async def execute(self, statement, params=None, **kwargs):
+        session = await self._acquire()
+        return await session.execute(statement, params, **kwargs)
+    
+    async def commit(self) -> None:
+        if self._session is None:
+            return
+        try:
+            await self._session.commit()
+            if not self._read_only:
+                replica_router.mark_write(self.user_id)
+        finally:
+            await self.release()
+    
+    async def rollback(self) -> None:
+        if self._session is None:
+            return
+        try:
+            await self._session.rollback()
+        finally:
+            await self.release()
+    
+    async def release(self) -> None:
+        """Return the connection to the pool; uncommitted work is rolled back"""
+        session, self._session = self._session, None
+        if session is not None:
+            await session.close()
+    
+    async def close(self) -> None:
+        await self.release()
+
+
 async def get_db():
     """
     Dependency function to get database session
@@ -49,9 +254,57 @@ async def get_db():
             await session.close()
 
 
-async def init_db():
+async def get_lazy_db():
+    """
+    Dependency function to get a lazily connected database session.
+    No connection is checked out unless a statement is executed.
+    """
+    session = LazySession()
+    try:
+        yield session
+    except Exception as e:
+        await session.rollback()
+        logger.error("Database session error", error=str(e))
+        raise
+    finally:
+        await session.release()
+
+
+async def get_read_db():
     """
-    Initialize database connection and run health check
+    Dependency function to get a lazily connected read-only session.
+    Reads go to the replica when one is configured, healthy and not lagging,
+    unless the current user wrote recently.
+    """
+    session = LazySession(read_only=True)
+    try:
+        yield session
+    except Exception as e:
+        await session.rollback()
+        logger.error("Database session error", error=str(e))
+        raise
+    finally:
+        await session.release()
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Get connection pool statistics
+    """
+    stats = pool_metrics.snapshot()
+    pool = engine.sync_engine.pool
+    if hasattr(pool, "checkedout"):
+        stats["pool_checked_out"] = pool.checkedout()
+        stats["pool_idle"] = pool.checkedin()
+        stats["pool_overflow"] = pool.overflow()
+    stats["replica"] = replica_router.snapshot()
+    return stats
+
+
+async def init_db() -> bool:
+    """
+    Initialize database connection and run health check.
+    Returns False when development mode carries on without a database.
     """
     import asyncio
     
@@ -73,12 +326,14 @@ async def init_db():
             version_result = version.fetchone()
             if version_result:
                 logger.info(f"📊 Connected to: {version_result[0][:50]}...")
+            return True
             
     except asyncio.TimeoutError:
         logger.error("❌ Database connection timeout", error="Connection took longer than 10 seconds")
         # Don't raise in development - allow server to start without DB
         if settings.ENVIRONMENT == "development":
             logger.warning("⚠️ Starting server without database connection (development mode)")
+            return False
         else:
             raise Exception("Database connection timeout - check firewall and network settings")
     except Exception as e:
@@ -86,15 +341,27 @@ async def init_db():
         # Don't raise in development - allow server to start without DB
         if settings.ENVIRONMENT == "development":
             logger.warning("⚠️ Starting server without database connection (development mode)")
+            return False
         else:
             raise
 
 
+async def start_replica_routing():
+    """
+    Start replica lag monitoring when a read replica is configured
+    """
+    if read_engine is not None:
+        await replica_router.start(read_engine)
+
+
 async def close_db():
     """
     Close database connections
     """
+    await replica_router.stop()
     await engine.dispose()
+    if read_engine is not None:
+        await read_engine.dispose()
     logger.info("Database connections closed")
 
 
@@ -0,0 +1,369 @@
+"""
+JWT Signing Keys
+Key ring for HS256 or asymmetric (ES256/EdDSA) token signing with rotation,
+JWKS publication and parsed-key caching
+"""
+
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import asyncio
+import fcntl
+import os
+import time
+import structlog
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+from jose.exceptions import JWKError
+from jose.utils import base64url_decode, base64url_encode
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+ASYMMETRIC_ALGORITHMS = ("ES256", "EdDSA")
+
+
+class Ed25519Key(Key):
+    """
+    EdDSA (Ed25519) for python-jose, which has no OKP support of its own.
+    Registered below so jwt.encode/jwt.decode accept algorithm "EdDSA".
+    """
+
+    def __init__(self, key, algorithm):
+        if algorithm != "EdDSA":
+            raise JWKError(f"Ed25519 keys only support EdDSA, not {algorithm}")
+        if isinstance(key, dict):
+            key = self._from_dict(key)
+        elif isinstance(key, (str, bytes)):
+            data = key.encode() if isinstance(key, str) else key
+            key = (
+                serialization.load_pem_private_key(data, password=None)
+                if b"PRIVATE" in data else serialization.load_pem_public_key(data)
+            )
+        if not isinstance(key, (Ed25519PrivateKey, Ed25519PublicKey)):
+            raise JWKError("Not an Ed25519 key")
+        self.prepared_key = key
+        self._algorithm = algorithm
+
+    @staticmethod
+    def _from_dict(data: Dict[str, Any]):
+        if data.get("kty") != "OKP" or data.get("crv") != "Ed25519":
+            raise JWKError("Not an Ed25519 JWK")
+        if "d" in data:
+            return Ed25519PrivateKey.from_private_bytes(base64url_decode(data["d"].encode()))
+        return Ed25519PublicKey.from_public_bytes(base64url_decode(data["x"].encode()))
+
+    def is_public(self) -> bool:
+        return isinstance(self.prepared_key, Ed25519PublicKey)
+
+    def sign(self, msg: bytes) -> bytes:
+        return self.prepared_key.sign(msg)
+
+    def verify(self, msg: bytes, sig: bytes) -> bool:
+        public = self.prepared_key if self.is_public() else self.prepared_key.public_key()
+        try:
+            public.verify(sig, msg)
+            return True
+        except InvalidSignature:
+            return False
+
+    def public_key(self) -> "Ed25519Key":
+        if self.is_public():
+            return self
+        return Ed25519Key(self.prepared_key.public_key(), self._algorithm)
+
+    def to_pem(self) -> bytes:
+        if self.is_public():
+            return self.prepared_key.public_bytes(
+                serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+            )
+        return self.prepared_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        public = self.prepared_key if self.is_public() else self.prepared_key.public_key()
+        raw = public.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+        data = {"kty": "OKP", "crv": "Ed25519", "alg": self._algorithm, "x": base64url_encode(raw).decode()}
+        if not self.is_public():
+            private = self.prepared_key.private_bytes(
+                serialization.Encoding.Raw, serialization.PrivateFormat.Raw, serialization.NoEncryption()
+            )
+            data["d"] = base64url_encode(private).decode()
+        return data
+
+
+jwk.register_key("EdDSA", Ed25519Key)
+
+
+class SigningKey:
+    """One key of the ring, parsed once when loaded"""
+
+    __slots__ = ("kid", "activates_at", "path", "private", "public", "jwk")
+
+    def __init__(self, kid: str, activates_at: float, path: Path, private: Key):
+        self.kid = kid
+        self.activates_at = activates_at
+        self.path = path
+        self.private = private
+        self.public = private.public_key()
+        self.jwk = {**self.public.to_dict(), "kid": kid, "use": "sig"}
+
+
+def generate_private_key(algorithm: str):
+    if algorithm == "ES256":
+        return ec.generate_private_key(ec.SECP256R1())
+    if algorithm == "EdDSA":
+        return Ed25519PrivateKey.generate()
+    raise ValueError(f"Unsupported signing algorithm: {algorithm}")
+
+
+def key_id(private_key) -> str:
+    """First 16 hex digits of the SHA-256 of the public key (DER)"""
+    der = private_key.public_key().public_bytes(
+        serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return sha256(der).hexdigest()[:16]
+
+
+class KeyRing:
+    """
+    Signs and verifies every JWT the application issues.
+
+    With HS256 the shared JWT_SECRET_KEY is used as before. With ES256 or
+    EdDSA, private keys live in key_dir as '<activation time>-<kid>.pem'. The
+    newest active key signs (its kid goes into the header). Every key still
+    able to have valid tokens out verifies, and all of them are published as
+    JWKS. Rotation writes a new key that becomes active publish_ahead_seconds
+    later, so JWKS consumers see it before the first token signed with it. A
+    key is deleted once everything it signed has expired. Keys are parsed when
+    the ring loads, never per token.
+
+    Workers sharing key_dir pick up each other's keys on the next check, or
+    immediately when a token arrives with an unknown kid.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret: str,
+        key_dir: str,
+        rotation_days: float,
+        publish_ahead_seconds: float,
+        check_interval_seconds: float,
+        max_token_lifetime_seconds: float,
+        accept_hs256: bool = True
+    ):
+        self.algorithm = algorithm
+        self.asymmetric = algorithm in ASYMMETRIC_ALGORITHMS
+        self.key_dir = Path(key_dir)
+        self.rotation_seconds = rotation_days * 86400
+        self.publish_ahead_seconds = publish_ahead_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.max_token_lifetime_seconds = max_token_lifetime_seconds
+        self.accept_hs256 = accept_hs256
+        self.rotations = 0
+        self.reloads = 0
+        # Parsed once; jose re-parses a raw secret or PEM on every call
+        self._hmac_key = jwk.construct(secret, "HS256") if secret else None
+        self._keys: Dict[str, SigningKey] = {}
+        self._signing: Optional[SigningKey] = None
+        self._files: frozenset = frozenset()
+        self._loaded = False
+        self._last_unknown_kid_reload = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    # -- loading and rotation -------------------------------------------------
+
+    def _scan(self) -> frozenset:
+        return frozenset(self.key_dir.glob("*-*.pem")) if self.key_dir.is_dir() else frozenset()
+
+    def load(self) -> None:
+        """(Re)parse the key files when the set of files has changed"""
+        files = self._scan()
+        if self._loaded and files == self._files:
+            return
+        keys: Dict[str, SigningKey] = {}
+        for path in files:
+            activates, _, kid = path.stem.partition("-")
+            try:
+                private = jwk.construct(
+                    serialization.load_pem_private_key(path.read_bytes(), password=None), self.algorithm
+                )
+                keys[kid] = SigningKey(kid, float(activates), path, private)
+            except Exception as e:
+                logger.error("Skipping unreadable JWT signing key", path=str(path), error=str(e))
+        self._keys = keys
+        self._files = files
+        self._loaded = True
+        self.reloads += 1
+        self._signing = self._select_signing_key()
+
+    def _select_signing_key(self) -> Optional[SigningKey]:
+        now = time.time()
+        active = [key for key in self._keys.values() if key.activates_at <= now]
+        return max(active, key=lambda key: key.activates_at) if active else None
+
+    def _write_key(self, activates_at: float) -> Path:
+        private_key = generate_private_key(self.algorithm)
+        path = self.key_dir / f"{int(activates_at)}-{key_id(private_key)}.pem"
+        pem = private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+        tmp = path.with_suffix(".tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(pem)
+        os.replace(tmp, path)
+        return path
+
+    def rotate_if_due(self, force: bool = False) -> bool:
+        """
+        Create the next key when the newest one is older than the rotation
+        period, and delete keys nothing valid can have been signed with.
+        A lock file keeps workers on the same host from rotating together.
+        """
+        if not self.asymmetric:
+            return False
+        self.key_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
+        with open(self.key_dir / ".rotate.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.load()
+            now = time.time()
+            newest = max(self._keys.values(), key=lambda key: key.activates_at, default=None)
+            rotated = False
+            if newest is None:
+                # First key: nothing to announce ahead of
+                self._write_key(now)
+                rotated = True
+            elif force or (
+                self.rotation_seconds and newest.activates_at <= now - self.rotation_seconds
+            ):
+                self._write_key(max(now, newest.activates_at) + self.publish_ahead_seconds)
+                rotated = True
+
+            # A key is superseded when the next one activates; its tokens outlive that by at most the longest lifetime
+            ordered = sorted(self._keys.values(), key=lambda key: key.activates_at)
+            for key, successor in zip(ordered, ordered[1:]):
+                if successor.activates_at + self.max_token_lifetime_seconds + 300 < now:
+                    key.path.unlink(missing_ok=True)
+                    logger.info("JWT signing key retired", kid=key.kid)
+            self.load()
+
+        if rotated:
+            self.rotations += 1
+            logger.info("🔑 JWT signing key created", algorithm=self.algorithm, keys=len(self._keys))
+        return rotated
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self.load()
+        if self.asymmetric and self._signing is None:
+            self.rotate_if_due()
+
+    async def _maintain(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval_seconds)
+            try:
+                self.rotate_if_due()
+                self._signing = self._select_signing_key()
+            except Exception as e:
+                logger.error("JWT key maintenance failed", error=str(e))
+
+    async def start(self) -> None:
+        """Load (or create) the key ring and start scheduled rotation"""
+        if not self.asymmetric or self._task is not None:
+            return
+        self.rotate_if_due()
+        self._task = asyncio.create_task(self._maintain())
+        logger.info(
+            "✅ JWT key ring loaded",
+            algorithm=self.algorithm,
+            keys=len(self._keys),
+            signing_kid=self._signing.kid if self._signing else None
+        )
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # -- tokens ----------------------------------------------------------------
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        if not self.asymmetric:
+            return jwt.encode(claims, self._hmac_key, algorithm="HS256")
+        self._ensure_loaded()
+        signing = self._signing
+        if signing is None or signing.activates_at > time.time():
+            signing = self._signing = self._select_signing_key()
+        return jwt.encode(claims, signing.private, algorithm=self.algorithm, headers={"kid": signing.kid})
+
+    def _verification_key(self, token: str):
+        header = jwt.get_unverified_header(token)
+        kid = header.get("kid")
+        if kid is None:
+            if self.asymmetric and not self.accept_hs256:
+                raise JWTError("Token has no key id")
+            return self._hmac_key, "HS256"
+        if not self.asymmetric:
+            raise JWTError("Unexpected key id")
+        key = self._keys.get(kid)
+        if key is None:
+            # Possibly rotated by another worker; rescan at most once a second
+            now = time.monotonic()
+            if now - self._last_unknown_kid_reload >= 1.0:
+                self._last_unknown_kid_reload = now
+                self.load()
+                key = self._keys.get(kid)
+            if key is None:
+                raise JWTError("Unknown key id")
+        return key.public, self.algorithm
+
+    def decode(self, token: str, **kwargs) -> Dict[str, Any]:
+        """Verify the signature and standard claims; raises JWTError"""
+        self._ensure_loaded()
+        key, algorithm = self._verification_key(token)
+        if key is None:
+            raise JWTError("No verification key")
+        return jwt.decode(token, key, algorithms=[algorithm], **kwargs)
+
+    def jwks(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Public keys for other services (empty with HS256)"""
+        if not self.asymmetric:
+            return {"keys": []}
+        self._ensure_loaded()
+        return {"keys": [key.jwk for key in sorted(self._keys.values(), key=lambda key: key.activates_at)]}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get key ring state"""
+        return {
+            "algorithm": self.algorithm,
+            "keys": len(self._keys),
+            "signing_kid": self._signing.kid if self._signing else None,
+            "rotations": self.rotations,
+            "reloads": self.reloads,
+        }
+
+
+# Global key ring
+key_ring = KeyRing(
+    algorithm=settings.JWT_ALGORITHM,
+    secret=settings.JWT_SECRET_KEY,
+    key_dir=settings.JWT_KEY_DIR,
+    rotation_days=settings.JWT_KEY_ROTATION_DAYS,
+    publish_ahead_seconds=settings.JWT_KEY_PUBLISH_AHEAD_SECONDS,
+    check_interval_seconds=settings.JWT_KEY_CHECK_SECONDS,
+    max_token_lifetime_seconds=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+    accept_hs256=settings.JWT_ACCEPT_HS256
+)
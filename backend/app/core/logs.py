@@ -0,0 +1,244 @@
+"""
+Logging Pipeline
+structlog configuration that keeps serialization and I/O off the event loop
+"""
+
+from typing import Any, Dict, List, Optional, TextIO
+import atexit
+import json
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import traceback
+import structlog
+
+from app.core.metrics import metrics
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encoding
+    orjson = None
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "warn": 30, "error": 40, "exception": 40, "critical": 50}
+
+# Leading emoji/punctuation is not part of the event type ("📄 Resume uploaded" -> "Resume uploaded")
+_EVENT_PREFIX = re.compile(r"^\W+")
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse 'Event type=0.1,Other event=0.01' into a rate map"""
+    rates = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        name, _, rate = item.rpartition("=")
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+def _encode_json(event_dict: Dict[str, Any]) -> str:
+    if orjson is not None:
+        return orjson.dumps(event_dict, default=str).decode()
+    return json.dumps(event_dict, default=str, ensure_ascii=False, separators=(",", ":"))
+
+
+class LogPipeline:
+    """
+    Runs as the last structlog processor. On the calling thread it only filters
+    by level, applies sampling and puts the event dict on a bounded queue; a
+    daemon thread adds the timestamp, renders exceptions, encodes JSON and
+    writes batches to the stream. When the queue is full the event is dropped
+    and counted instead of blocking the event loop.
+    """
+
+    def __init__(
+        self,
+        level: str = "info",
+        queue_size: int = 10000,
+        sample_rates: Optional[Dict[str, float]] = None,
+        stream: Optional[TextIO] = None
+    ):
+        self.min_level = LEVELS.get(level.lower(), 20)
+        self.sample_rates = sample_rates or {}
+        self.stream = stream or sys.stdout
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._event_types: Dict[str, str] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def event_type(self, event: str) -> str:
+        event_type = self._event_types.get(event)
+        if event_type is None:
+            event_type = _EVENT_PREFIX.sub("", event)
+            if len(self._event_types) < 10000:
+                self._event_types[event] = event_type
+        return event_type
+
+    def __call__(self, logger, method_name: str, event_dict: Dict[str, Any]):
+        level = LEVELS.get(method_name, 20)
+        if level < self.min_level:
+            raise structlog.DropEvent
+
+        # Sample only routine events; warnings and errors are always kept
+        if level <= 20 and self.sample_rates:
+            rate = self.sample_rates.get(self.event_type(str(event_dict.get("event", ""))))
+            if rate is not None and rate < 1.0:
+                if random.random() >= rate:
+                    self.sampled_out += 1
+                    raise structlog.DropEvent
+                event_dict["sample_rate"] = rate
+
+        # The traceback has to be captured here; rendering it can wait
+        if event_dict.get("exc_info") is True or (method_name == "exception" and "exc_info" not in event_dict):
+            event_dict["exc_info"] = sys.exc_info()
+
+        event_dict["level"] = "warning" if method_name == "warn" else method_name
+        event_dict["_ts"] = time.time()
+        try:
+            self._queue.put_nowait(event_dict)
+            self.queued += 1
+        except queue.Full:
+            self.dropped += 1
+        raise structlog.DropEvent
+
+    @staticmethod
+    def render(event_dict: Dict[str, Any]) -> str:
+        timestamp = event_dict.pop("_ts")
+        event_dict["timestamp"] = (
+            time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(timestamp)) + f".{int(timestamp % 1 * 1e6):06d}Z"
+        )
+        exc_info = event_dict.pop("exc_info", None)
+        if isinstance(exc_info, BaseException):
+            exc_info = (type(exc_info), exc_info, exc_info.__traceback__)
+        if exc_info and isinstance(exc_info, tuple) and exc_info[0] is not None:
+            event_dict["exception"] = "".join(traceback.format_exception(*exc_info))
+        return _encode_json(event_dict)
+
+    def _drain(self, first: Dict[str, Any]) -> List[Optional[Dict[str, Any]]]:
+        batch = [first]
+        get = self._queue.get_nowait
+        try:
+            while len(batch) < 512:
+                batch.append(get())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            lines = []
+            stop = False
+            for event_dict in self._drain(first):
+                if event_dict is None:
+                    stop = True
+                    continue
+                try:
+                    lines.append(self.render(event_dict))
+                except Exception as e:
+                    lines.append(_encode_json({"event": "Log rendering failed", "error": str(e)}))
+            try:
+                self.stream.write("\n".join(lines) + "\n")
+                self.stream.flush()
+                self.written += len(lines)
+            except Exception:
+                self.dropped += len(lines)
+            if stop:
+                return
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Write what is queued and stop the writer thread"""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get pipeline statistics"""
+        return {
+            "queued": self.queued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+            "queue_depth": self._queue.qsize(),
+        }
+
+
+# Set by configure_logging()
+log_pipeline: Optional[LogPipeline] = None
+
+
+def configure_logging(
+    level: str = "info",
+    queue_size: int = 10000,
+    sample_rates: str = "",
+    asynchronous: bool = True
+) -> Optional[LogPipeline]:
+    """
+    Configure structlog. With asynchronous=False the previous synchronous
+    JSON rendering is kept (useful when debugging logging itself).
+    """
+    global log_pipeline
+
+    shared = [
+        structlog.contextvars.merge_contextvars,
+        structlog.processors.StackInfoRenderer(),
+    ]
+    if not asynchronous:
+        structlog.configure(
+            processors=shared + [
+                structlog.processors.add_log_level,
+                structlog.processors.TimeStamper(fmt="iso"),
+                structlog.processors.format_exc_info,
+                structlog.processors.UnicodeDecoder(),
+                structlog.processors.JSONRenderer()
+            ],
+            context_class=dict,
+            logger_factory=structlog.PrintLoggerFactory(),
+            wrapper_class=structlog.make_filtering_bound_logger(LEVELS.get(level.lower(), 20)),
+            cache_logger_on_first_use=True,
+        )
+        log_pipeline = None
+        return None
+
+    pipeline = LogPipeline(
+        level=level,
+        queue_size=queue_size,
+        sample_rates=parse_sample_rates(sample_rates)
+    )
+    pipeline.start()
+    structlog.configure(
+        processors=shared + [pipeline],
+        context_class=dict,
+        logger_factory=structlog.ReturnLoggerFactory(),
+        wrapper_class=structlog.make_filtering_bound_logger(pipeline.min_level),
+        cache_logger_on_first_use=True,
+    )
+    log_pipeline = pipeline
+    return pipeline
+
+
+metrics.gauge("log_events_dropped_total", "Log events dropped because the log queue was full",
+              lambda: log_pipeline.dropped if log_pipeline else 0, kind="counter")
+metrics.gauge("log_events_sampled_out_total", "Routine log events skipped by sampling",
+              lambda: log_pipeline.sampled_out if log_pipeline else 0, kind="counter")
+metrics.gauge("log_queue_depth", "Log events waiting for the writer thread",
+              lambda: log_pipeline._queue.qsize() if log_pipeline else 0)
@@ -0,0 +1,303 @@
+"""
+Application Metrics
+Request, database and storage latency histograms with Prometheus text exposition
+"""
+
+from bisect import bisect_left
+from time import perf_counter_ns
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+import structlog
+
+logger = structlog.get_logger()
+
+# Bucket upper bounds in seconds
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+STORAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+GaugeValue = Union[float, Dict[LabelValues, float]]
+
+
+class Histogram:
+    """
+    Cumulative histogram per label set.
+    Observations are in nanoseconds so callers never convert on the hot path.
+    """
+
+    __slots__ = ("name", "help", "label_names", "bounds", "_bounds_ns", "_series")
+
+    def __init__(self, name: str, help: str, label_names: LabelValues, bounds: Iterable[float]):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.bounds = tuple(bounds)
+        self._bounds_ns = [int(b * 1e9) for b in self.bounds]
+        # labels -> [bucket counts..., +Inf count, sum_ns]
+        self._series: Dict[LabelValues, List[int]] = {}
+
+    def observe_ns(self, labels: LabelValues, duration_ns: int) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = [0] * (len(self._bounds_ns) + 2)
+            self._series[labels] = series
+        series[bisect_left(self._bounds_ns, duration_ns)] += 1
+        series[-1] += duration_ns
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            label_text = _labels(self.label_names, labels)
+            prefix = label_text[:-1] + "," if label_text else "{"
+            cumulative = 0
+            for bound, count in zip(self.bounds, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{prefix}le="{bound}"}} {cumulative}')
+            cumulative += series[-2]
+            lines.append(f'{self.name}_bucket{prefix}le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{label_text} {series[-1] / 1e9:.9f}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter per label set"""
+
+    __slots__ = ("name", "help", "label_names", "_values")
+
+    def __init__(self, name: str, help: str, label_names: LabelValues):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._values: Dict[LabelValues, int] = {}
+
+    def inc(self, labels: LabelValues, amount: int = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Gauge:
+    """Value read from a callback when metrics are scraped"""
+
+    __slots__ = ("name", "help", "label_names", "kind", "callback")
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        callback: Callable[[], GaugeValue],
+        label_names: LabelValues = (),
+        kind: str = "gauge"
+    ):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.kind = kind
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        try:
+            value = self.callback()
+        except Exception as e:
+            logger.warning("Metric callback failed", metric=self.name, error=str(e))
+            return []
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        if isinstance(value, dict):
+            for labels, item in sorted(value.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, labels)} {float(item or 0)}")
+        else:
+            lines.append(f"{self.name} {float(value or 0)}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: LabelValues, values: LabelValues) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class MetricsRegistry:
+    """All application metrics, rendered together for /metrics"""
+
+    def __init__(self):
+        self.http_duration = Histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency by route template",
+            ("method", "route"),
+            REQUEST_BUCKETS
+        )
+        self.http_requests = Counter(
+            "http_requests_total",
+            "HTTP requests by route template and status code",
+            ("method", "route", "status")
+        )
+        self.db_duration = Histogram(
+            "db_query_duration_seconds",
+            "Database statement latency by engine and registered query name",
+            ("engine", "query"),
+            QUERY_BUCKETS
+        )
+        self.db_errors = Counter(
+            "db_query_errors_total",
+            "Database statement errors by engine and registered query name",
+            ("engine", "query")
+        )
+        self.storage_duration = Histogram(
+            "storage_operation_duration_seconds",
+            "Object storage API call latency by operation",
+            ("operation",),
+            STORAGE_BUCKETS
+        )
+        self.storage_errors = Counter(
+            "storage_operation_errors_total",
+            "Object storage API call errors by operation",
+            ("operation",)
+        )
+        self._gauges: List[Gauge] = []
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        callback: Callable[[], GaugeValue],
+        label_names: LabelValues = (),
+        kind: str = "gauge"
+    ) -> None:
+        """Register a callback gauge (or a counter read from existing state with kind='counter')"""
+        self._gauges.append(Gauge(name, help, callback, label_names, kind))
+
+    def observe_request(self, method: str, route: str, status: int, duration_ns: int) -> None:
+        labels = (method, route)
+        self.http_duration.observe_ns(labels, duration_ns)
+        self.http_requests.inc((method, route, str(status)))
+
+    def instrument_engine(
+        self,
+        engine,
+        label: str,
+        statement_name: Callable[[Any], Optional[str]]
+    ) -> None:
+        """Time every statement on an (async) engine via cursor execute events"""
+        from sqlalchemy import event
+
+        db_duration = self.db_duration
+        db_errors = self.db_errors
+
+        def query_name(context) -> str:
+            compiled = getattr(context, "compiled", None)
+            if compiled is None:
+                return "adhoc"
+            return statement_name(compiled.statement) or "adhoc"
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                context._metrics_start_ns = perf_counter_ns()
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            start = getattr(context, "_metrics_start_ns", None)
+            if start is not None:
+                db_duration.observe_ns((label, query_name(context)), perf_counter_ns() - start)
+
+        def handle_error(exception_context):
+            context = exception_context.execution_context
+            db_errors.inc((label, query_name(context) if context is not None else "adhoc"))
+
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+        event.listen(sync_engine, "handle_error", handle_error)
+
+    def instrument_boto_client(self, client) -> None:
+        """Time every API call made by a boto3 client, including each part of multipart transfers"""
+        storage_duration = self.storage_duration
+        storage_errors = self.storage_errors
+
+        def before_call(model, context, **kwargs):
+            context["metrics_start_ns"] = perf_counter_ns()
+
+        def after_call(model, context, **kwargs):
+            start = context.pop("metrics_start_ns", None)
+            if start is not None:
+                storage_duration.observe_ns((model.name,), perf_counter_ns() - start)
+
+        def after_call_error(model, context, **kwargs):
+            context.pop("metrics_start_ns", None)
+            storage_errors.inc((model.name,))
+
+        events = client.meta.events
+        events.register("before-call.s3", before_call)
+        events.register("after-call.s3", after_call)
+        events.register("after-call-error.s3", after_call_error)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in (
+            self.http_duration, self.http_requests,
+            self.db_duration, self.db_errors,
+            self.storage_duration, self.storage_errors
+        ):
+            lines.extend(metric.render())
+        for gauge in self._gauges:
+            lines.extend(gauge.render())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware timing each request with perf_counter_ns.
+    Requests are labelled by route template (e.g. /api/v1/files/{file_key}),
+    never by raw URL, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app, registry: "MetricsRegistry", slow_request_ms: float = 0):
+        self.app = app
+        self.registry = registry
+        self.slow_request_ns = int(slow_request_ms * 1e6)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter_ns()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed = (perf_counter_ns() - start) / 1e9
+                headers = list(message.get("headers", ()))
+                headers.append((b"x-process-time", str(elapsed).encode()))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            duration_ns = perf_counter_ns() - start
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            self.registry.observe_request(scope["method"], route_path, status_code, duration_ns)
+            if self.slow_request_ns and duration_ns >= self.slow_request_ns:
+                logger.warning(
+                    "Slow HTTP request",
+                    method=scope["method"],
+                    route=route_path,
+                    status_code=status_code,
+                    process_time=duration_ns / 1e9
+                )
+
+
+# Global metrics registry
+metrics = MetricsRegistry()
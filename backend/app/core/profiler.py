@@ -0,0 +1,221 @@
+"""
+Sampling Profiler
+On-demand statistical profiling of the event loop thread with per-route
+attribution and flamegraph-compatible (collapsed stack) output
+"""
+
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Any, Dict, List, Optional
+import os
+import signal
+import sys
+import sysconfig
+import threading
+import time
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+# Path prefixes trimmed from frame labels to keep flamegraphs readable
+_PATH_MARKERS = ("site-packages" + os.sep, "backend" + os.sep, sysconfig.get_paths()["stdlib"] + os.sep)
+
+IDLE = "<idle>"
+NO_REQUEST = "<no request>"
+
+
+class ProfileResult:
+    """Aggregated samples of one profiling window"""
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.samples = 0
+        self.sampling_seconds = 0.0
+        self.stacks: Counter = Counter()
+        self.routes: Counter = Counter()
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format: 'route;frame;frame count' per line"""
+        # Copy first: the sampler thread may still be adding stacks
+        stacks = Counter(dict(self.stacks))
+        return "\n".join(f"{';'.join(stack)} {count}" for stack, count in stacks.most_common()) + "\n"
+
+    def summary(self, top: int = 20) -> Dict[str, Any]:
+        leaves: Counter = Counter()
+        for stack, count in dict(self.stacks).items():
+            leaves[stack[-1]] += count
+        duration = (self.finished_at or time.time()) - self.started_at
+        return {
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_seconds": round(duration, 3),
+            "interval_ms": self.interval_seconds * 1000,
+            "samples": self.samples,
+            # Time the sampler itself spent walking stacks, while holding the GIL
+            "sampler_overhead_ratio": round(self.sampling_seconds / duration, 5) if duration else 0.0,
+            "routes": {route: count for route, count in Counter(dict(self.routes)).most_common()},
+            "top_frames": [{"frame": frame, "samples": count} for frame, count in leaves.most_common(top)],
+        }
+
+
+class SamplingProfiler:
+    """
+    A daemon thread wakes every interval, reads the event loop thread's current
+    frame via sys._current_frames() and counts the stack. The route is taken
+    from the ASGI `scope` found on the stack (its route template once matched),
+    so samples are attributed without any per-request bookkeeping. When the
+    loop is waiting on I/O the sample is counted as <idle>.
+
+    Nothing is installed while the profiler is not running.
+    """
+
+    def __init__(self, max_seconds: float, max_depth: int = 64):
+        self.max_seconds = max_seconds
+        self.max_depth = max_depth
+        self.last_result: Optional[ProfileResult] = None
+        self._result: Optional[ProfileResult] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._labels: Dict[Any, str] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            for marker in _PATH_MARKERS:
+                index = filename.rfind(marker)
+                if index != -1:
+                    filename = filename[index + len(marker):]
+                    break
+            label = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    @staticmethod
+    def _route(frame: FrameType) -> Optional[str]:
+        """Route of the ASGI scope on this frame, if it holds one"""
+        if "scope" not in frame.f_code.co_varnames:
+            return None
+        scope = frame.f_locals.get("scope")
+        if not isinstance(scope, dict) or scope.get("type") != "http":
+            return None
+        # Frames are walked from the innermost out, so the first scope seen is the routed one
+        path = getattr(scope.get("route"), "path", None) or "<unrouted>"
+        return f"{scope.get('method', '')} {path}"
+
+    def _sample(self, frame: FrameType, result: ProfileResult) -> None:
+        stack: List[str] = []
+        route = None
+        depth = 0
+        while frame is not None and depth < self.max_depth:
+            stack.append(self._label(frame.f_code))
+            if route is None:
+                route = self._route(frame)
+            frame = frame.f_back
+            depth += 1
+        stack.reverse()
+
+        if route is None:
+            # Waiting for I/O in select(); under uvloop the wait is in C and shows as <no request>
+            route = IDLE if any(entry.startswith("select ") for entry in stack[-2:]) else NO_REQUEST
+        result.stacks[(route,) + tuple(stack)] += 1
+        result.routes[route] += 1
+        result.samples += 1
+
+    def _run(self, thread_id: int, interval: float, deadline: float, result: ProfileResult) -> None:
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            start = time.perf_counter()
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                break
+            self._sample(frame, result)
+            del frame
+            elapsed = time.perf_counter() - start
+            result.sampling_seconds += elapsed
+            self._stop.wait(max(0.0, interval - elapsed))
+        result.finished_at = time.time()
+        self.last_result = result
+        self._result = None
+        logger.info("Profiling finished", samples=result.samples)
+
+    def start(self, seconds: float, interval_ms: float = 5.0, thread_id: Optional[int] = None) -> ProfileResult:
+        """Profile the given thread (default: the calling one) for a bounded window"""
+        if self.running:
+            raise RuntimeError("A profiling session is already running")
+        seconds = max(0.1, min(seconds, self.max_seconds))
+        interval = max(0.001, interval_ms / 1000)
+        result = ProfileResult(interval)
+        self._result = result
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(thread_id or threading.get_ident(), interval, time.monotonic() + seconds, result),
+            name="sampling-profiler",
+            daemon=True
+        )
+        self._thread.start()
+        logger.info("Profiling started", seconds=seconds, interval_ms=interval * 1000)
+        return result
+
+    def stop(self) -> Optional[ProfileResult]:
+        """End the current window early"""
+        if self._thread is None:
+            return self.last_result
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+        return self.last_result
+
+    def current(self) -> Optional[ProfileResult]:
+        """The running window's result so far, else the last finished one"""
+        return self._result or self.last_result
+
+
+def install_signal_trigger(
+    loop,
+    profiler: SamplingProfiler,
+    seconds: float,
+    interval_ms: float,
+    output_dir: str,
+    signum: int = getattr(signal, "SIGUSR2", 0)
+) -> bool:
+    """
+    On the signal, profile the loop thread for `seconds` and write the collapsed
+    stacks to output_dir/profile-<pid>-<time>.folded. Returns False where the
+    signal is unavailable (e.g. Windows).
+    """
+    if not signum:
+        return False
+
+    def write_when_done(result: ProfileResult) -> None:
+        if result.finished_at is None:
+            loop.call_later(0.5, write_when_done, result)
+            return
+        path = Path(output_dir) / f"profile-{os.getpid()}-{int(result.started_at)}.folded"
+        path.write_text(result.collapsed())
+        logger.info("Profile written", path=str(path), samples=result.samples)
+
+    def on_signal() -> None:
+        if profiler.running:
+            return
+        result = profiler.start(seconds, interval_ms)
+        loop.call_later(seconds, write_when_done, result)
+
+    try:
+        loop.add_signal_handler(signum, on_signal)
+    except (NotImplementedError, RuntimeError, ValueError):
+        return False
+    return True
+
+
+# Global profiler instance; idle until a session is started
+profiler = SamplingProfiler(max_seconds=settings.PROFILER_MAX_SECONDS)
@@ -0,0 +1,911 @@
+"""
+Query Registry
+Named SQL statements declared once and mapped into lightweight row records
+"""
+
+import textwrap
+from typing import Any, Dict, Generic, List, Optional, Type, TypeVar
+from sqlalchemy import text
+
+
+class Record:
+    """
+    Base class for __slots__ row records.
+    Subclasses list their columns in __slots__ in the same order as the
+    SELECT list of the queries that produce them.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def from_row(cls, row):
+        """Build a record from a result row (positional)"""
+        record = cls.__new__(cls)
+        for name, value in zip(cls.__slots__, row):
+            setattr(record, name, value)
+        return record
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get record as a plain dict"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+R = TypeVar("R", bound=Record)
+
+
+class Query(Generic[R]):
+    """
+    A statement declared once at import time.
+    The TextClause is built a single time, so every execution sends the same
+    SQL string and asyncpg reuses the statement it prepared on that connection.
+    Only indentation is trimmed: line breaks stay, so a -- comment ends at
+    its line instead of swallowing the rest of the statement.
+    """
+
+    __slots__ = ("name", "sql", "statement", "record")
+
+    def __init__(self, name: str, sql: str, record: Optional[Type[R]] = None):
+        self.name = name
+        self.sql = textwrap.dedent(sql).strip()
+        self.statement = text(self.sql)
+        self.record = record
+
+    async def fetch_one(self, db, **params) -> Optional[R]:
+        """Execute and map the first row, or None"""
+        row = (await db.execute(self.statement, params)).fetchone()
+        if row is None:
+            return None
+        return self.record.from_row(row) if self.record else row
+
+    async def fetch_all(self, db, **params) -> List[R]:
+        """Execute and map all rows"""
+        rows = (await db.execute(self.statement, params)).fetchall()
+        if self.record is None:
+            return rows
+        from_row = self.record.from_row
+        return [from_row(row) for row in rows]
+
+    async def execute(self, db, **params) -> int:
+        """Execute a write statement and return the affected row count"""
+        result = await db.execute(self.statement, params)
+        return result.rowcount
+
+    def __repr__(self) -> str:
+        return f"Query({self.name!r})"
+
+
+# Registry of all declared statements, keyed by name
+_registry: Dict[str, Query] = {}
+
+# Query name by id() of its TextClause, for attributing execution metrics
+_statement_names: Dict[int, str] = {}
+
+
+def register(name: str, sql: str, record: Optional[Type[R]] = None) -> Query[R]:
+    """Declare a named statement"""
+    if name in _registry:
+        raise ValueError(f"Query '{name}' is already registered")
+    query = Query(name, sql, record)
+    _registry[name] = query
+    _statement_names[id(query.statement)] = name
+    return query
+
+
+def get_query(name: str) -> Query:
+    """Look up a registered statement by name"""
+    return _registry[name]
+
+
+def statement_name(statement) -> Optional[str]:
+    """Name of the registered query a statement belongs to, if any"""
+    return _statement_names.get(id(statement))
+
+
+def registered_queries() -> Dict[str, Query]:
+    """Get all registered statements"""
+    return dict(_registry)
+
+
+# ================================
+# Row records
+# ================================
+
+class SessionRecord(Record):
+    """user_sessions row"""
+    __slots__ = (
+        "id", "user_id", "token_hash", "jwt_jti", "device_info",
+        "ip_address", "expires_at", "is_revoked", "created_at"
+    )
+
+
+class SessionStatsRecord(Record):
+    """user_session_stats row plus sessions expired since the last sweep"""
+    __slots__ = (
+        "total_sessions", "revoked_sessions", "expired_sessions", "device_types",
+        "most_recent_activity", "ended_sessions", "ended_duration_seconds",
+        "pending_expired", "pending_duration_seconds"
+    )
+
+
+class UserRecord(Record):
+    """users row without credentials"""
+    __slots__ = ("id", "email", "full_name", "is_active", "created_at", "updated_at")
+
+
+class UserCredentialsRecord(Record):
+    """users row with password hash, for login"""
+    __slots__ = (
+        "id", "email", "full_name", "hashed_password", "is_active", "created_at", "updated_at"
+    )
+
+
+class UserSecurityRecord(Record):
+    """users lockout fields"""
+    __slots__ = ("failed_login_attempts", "last_failed_login_at", "locked_until", "last_login_at")
+
+
+# ================================
+# users
+# ================================
+
+USER_ID_BY_EMAIL = register(
+    "users.id_by_email",
+    "SELECT id FROM users WHERE email = :email",
+)
+
+USER_BY_ID = register(
+    "users.by_id",
+    """
+    SELECT id, email, full_name, is_active, created_at, updated_at
+    FROM users WHERE id = :user_id
+    """,
+    UserRecord,
+)
+
+USER_CREDENTIALS_BY_EMAIL = register(
+    "users.credentials_by_email",
+    """
+    SELECT id, email, full_name, hashed_password, is_active, created_at, updated_at
+    FROM users WHERE email = :email
+    """,
+    UserCredentialsRecord,
+)
+
+USER_INSERT = register(
+    "users.insert",
+    """
+    INSERT INTO users (id, email, full_name, hashed_password, is_active, created_at, updated_at)
+    VALUES (:id, :email, :full_name, :hashed_password, :is_active, :created_at, :updated_at)
+    """,
+)
+
+USER_SECURITY = register(
+    "users.security",
+    """
+    SELECT failed_login_attempts, last_failed_login_at, locked_until, last_login_at
+    FROM users WHERE id = :user_id
+    """,
+    UserSecurityRecord,
+)
+
+USER_LOGIN_FAILED = register(
+    "users.login_failed",
+    """
+    UPDATE users
+    SET failed_login_attempts = COALESCE(failed_login_attempts, 0) + 1, last_failed_login_at = NOW()
+    WHERE id = :user_id
+    """,
+)
+
+USER_LOGIN_SUCCEEDED = register(
+    "users.login_succeeded",
+    """
+    UPDATE users SET failed_login_attempts = 0, last_login_at = NOW()
+    WHERE id = :user_id
+    """,
+)
+
+# ================================
+# user_sessions
+# ================================
+
+SESSION_INSERT = register(
+    "sessions.insert",
+    """
+    INSERT INTO user_sessions
+    (id, user_id, token_hash, jwt_jti, device_info, ip_address, expires_at)
+    VALUES (:id, :user_id, :token_hash, :jwt_jti, :device_info, :ip_address, :expires_at)
+    """,
+)
+
+SESSION_BY_TOKEN_HASH = register(
+    "sessions.by_token_hash",
+    """
+    SELECT id, user_id, token_hash, jwt_jti, device_info, ip_address,
+           expires_at, is_revoked, created_at
+    FROM user_sessions
+    WHERE token_hash = :token_hash
+    AND expires_at > NOW()
+    AND is_revoked = FALSE
+    """,
+    SessionRecord,
+)
+
+SESSION_BY_JWT_JTI = register(
+    "sessions.by_jwt_jti",
+    """
+    SELECT id, user_id, token_hash, jwt_jti, device_info, ip_address,
+           expires_at, is_revoked, created_at
+    FROM user_sessions
+    WHERE jwt_jti = :jwt_jti
+    """,
+    SessionRecord,
+)
+
+SESSIONS_ACTIVE_FOR_USER = register(
+    "sessions.active_for_user",
+    """
+    SELECT id, user_id, token_hash, jwt_jti, device_info, ip_address,
+           expires_at, is_revoked, created_at
+    FROM user_sessions
+    WHERE user_id = :user_id
+    AND expires_at > NOW()
+    AND is_revoked = FALSE
+    AND expiry_counted = FALSE
+    ORDER BY created_at DESC
+    """,
+    SessionRecord,
+)
+
+SESSION_REVOKE = register(
+    "sessions.revoke",
+    """
+    UPDATE user_sessions
+    SET is_revoked = TRUE
+    WHERE id = :session_id
+    AND is_revoked = FALSE
+    """,
+)
+
+SESSION_REVOKE_FOR_USER = register(
+    "sessions.revoke_for_user",
+    """
+    UPDATE user_sessions
+    SET is_revoked = TRUE
+    WHERE id = :session_id
+    AND user_id = :user_id
+    AND is_revoked = FALSE
+    """,
+)
+
+# Refresh rotation in place. Exactly one of the two updates can apply: the
+# presented generation is current (rotate), or it is older, meaning the
+# refresh token was already used, possibly by someone else (revoke the session)
+SESSION_ROTATE = register(
+    "sessions.rotate",
+    """
+    WITH rotated AS (
+        UPDATE user_sessions SET
+            jwt_jti = :jwt_jti,
+            refresh_generation = refresh_generation + 1,
+            expires_at = :expires_at,
+            refreshed_at = NOW(),
+            device_info = :device_info,
+            ip_address = :ip_address
+        WHERE id = :session_id
+        AND user_id = :user_id
+        AND refresh_generation = :generation
+        AND is_revoked = FALSE
+        AND expiry_counted = FALSE
+        AND expires_at > NOW()
+        RETURNING refresh_generation
+    ),
+    reused AS (
+        UPDATE user_sessions SET is_revoked = TRUE
+        WHERE id = :session_id
+        AND user_id = :user_id
+        AND refresh_generation > :generation
+        AND is_revoked = FALSE
+        AND NOT EXISTS (SELECT 1 FROM rotated)
+        RETURNING id
+    )
+    SELECT (SELECT refresh_generation FROM rotated), EXISTS (SELECT 1 FROM reused)
+    """,
+)
+
+SESSIONS_REVOKE_BY_JWT_JTI = register(
+    "sessions.revoke_by_jwt_jti",
+    """
+    UPDATE user_sessions
+    SET is_revoked = TRUE
+    WHERE jwt_jti = ANY(:jwt_jtis)
+    AND is_revoked = FALSE
+    """,
+)
+
+SESSIONS_REVOKE_ALL_FOR_USER = register(
+    "sessions.revoke_all_for_user",
+    """
+    UPDATE user_sessions
+    SET is_revoked = TRUE
+    WHERE user_id = :user_id
+    AND is_revoked = FALSE
+    AND id IS DISTINCT FROM CAST(:exclude_session_id AS UUID)
+    """,
+)
+
+SESSIONS_CLEANUP = register(
+    "sessions.cleanup",
+    """
+    DELETE FROM user_sessions
+    WHERE expires_at < NOW() - INTERVAL '30 days'
+    OR (is_revoked = TRUE AND created_at < NOW() - INTERVAL '7 days')
+    """,
+)
+
+SESSIONS_SWEEP_EXPIRED = register(
+    "sessions.sweep_expired",
+    "SELECT sweep_expired_sessions()",
+)
+
+# Single primary-key lookup; the subqueries only touch idx_user_sessions_live
+SESSION_STATS = register(
+    "sessions.stats",
+    """
+    SELECT
+        s.total_sessions,
+        s.revoked_sessions,
+        s.expired_sessions,
+        s.device_types,
+        s.most_recent_activity,
+        s.ended_sessions,
+        s.ended_duration_seconds,
+        pending.expired_count,
+        pending.duration_seconds
+    FROM user_session_stats s
+    CROSS JOIN LATERAL (
+        SELECT
+            COUNT(*) as expired_count,
+            COALESCE(SUM(EXTRACT(EPOCH FROM us.expires_at - us.created_at)), 0) as duration_seconds
+        FROM user_sessions us
+        WHERE us.user_id = s.user_id
+        AND us.is_revoked = FALSE
+        AND us.expiry_counted = FALSE
+        AND us.expires_at <= NOW()
+    ) pending
+    WHERE s.user_id = :user_id
+    """,
+    SessionStatsRecord,
+)
+
+# ================================
+# user_session_epochs
+# ================================
+
+# Bumps an unexpired access token could predate; older ones need not be kept in memory
+SESSION_EPOCHS_RECENT = register(
+    "session_epochs.recent",
+    """
+    SELECT user_id, epoch, CAST(EXTRACT(EPOCH FROM bumped_at) AS DOUBLE PRECISION)
+    FROM user_session_epochs
+    WHERE bumped_at > NOW() - CAST(:retention_seconds AS DOUBLE PRECISION) * INTERVAL '1 second'
+    """,
+)
+
+# ================================
+# notifications
+# ================================
+
+SECURITY_ALERT_INSERT = register(
+    "notifications.security_alert_insert",
+    """
+    INSERT INTO notifications (user_id, type, title, message, data, priority, expires_at)
+    VALUES (:user_id, 'security_alert', :title, :message, CAST(:data AS JSONB), 'high', NOW() + INTERVAL '30 days')
+    """,
+)
+
+SECURITY_ALERTS_RECENT = register(
+    "notifications.security_alerts_recent",
+    """
+    SELECT title, message, data, created_at
+    FROM notifications
+    WHERE user_id = :user_id
+    AND type = 'security_alert'
+    AND created_at >= NOW() - INTERVAL '24 hours'
+    ORDER BY created_at DESC
+    LIMIT 20
+    """,
+)
+
+# ================================
+# audit_logs
+# ================================
+
+AUDIT_LOG_INSERT = register(
+    "audit_logs.insert",
+    """
+    INSERT INTO audit_logs
+    (user_id, entity_type, entity_id, action, old_values, new_values,
+     ip_address, user_agent, system_action, service_account, created_at)
+    VALUES (:user_id, :entity_type, :entity_id, :action,
+            CAST(:old_values AS JSONB), CAST(:new_values AS JSONB),
+            CAST(:ip_address AS INET), :user_agent, :system_action, :service_account, :created_at)
+    """,
+)
+
+AUDIT_PARTITIONS = register(
+    "audit_logs.partitions",
+    """
+    SELECT c.relname
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    JOIN pg_class p ON p.oid = i.inhparent
+    WHERE p.relname = 'audit_logs'
+    """,
+)
+
+# Held until the maintenance transaction ends, so only one worker runs the DDL
+AUDIT_PARTITION_LOCK = register(
+    "audit_logs.partition_lock",
+    "SELECT pg_try_advisory_xact_lock(hashtext('audit_logs_partitions'))",
+)
+
+AUDIT_CREATE_PARTITIONS = register(
+    "audit_logs.create_partitions",
+    "SELECT create_audit_partitions(CAST(:months_ahead AS INTEGER))",
+)
+
+AUDIT_ARCHIVE_PARTITIONS = register(
+    "audit_logs.archive_partitions",
+    "SELECT archive_old_audit_partitions(CAST(:months_online AS INTEGER))",
+)
+
+# ================================
+# jobs (feed ingestion)
+# ================================
+
+JOB_INGEST_COMPANIES = register(
+    "jobs.ingest_companies",
+    "SELECT id, slug, domain FROM companies",
+)
+
+JOB_INGEST_LOCATIONS = register(
+    "jobs.ingest_locations",
+    "SELECT id, country_code, region, city, iso_3166_2 FROM locations",
+)
+
+JOB_INGEST_SKILLS = register(
+    "jobs.ingest_skills",
+    "SELECT id, name, aliases FROM skills_taxonomy WHERE is_active = TRUE",
+)
+
+# Companies first seen in a feed; a slug or domain another row already has is skipped
+JOB_INGEST_CREATE_COMPANIES = register(
+    "jobs.ingest_create_companies",
+    """
+    INSERT INTO companies (name, slug, domain)
+    SELECT name, slug, domain
+    FROM unnest(CAST(:names AS TEXT[]), CAST(:slugs AS TEXT[]), CAST(:domains AS TEXT[])) AS c(name, slug, domain)
+    ON CONFLICT DO NOTHING
+    """,
+)
+
+JOB_INGEST_COMPANIES_BY_KEY = register(
+    "jobs.ingest_companies_by_key",
+    """
+    SELECT id, slug, domain FROM companies
+    WHERE slug = ANY(CAST(:slugs AS TEXT[])) OR domain = ANY(CAST(:domains AS TEXT[]))
+    """,
+)
+
+# Kept for the life of the connection and emptied at every commit. Never dropped:
+# statements prepared against it stay valid on that connection.
+JOB_INGEST_STAGING = register(
+    "jobs.ingest_staging",
+    """
+    CREATE TEMP TABLE IF NOT EXISTS job_ingest_staging (
+        external_source VARCHAR(50) NOT NULL,
+        external_id VARCHAR(255) NOT NULL,
+        company_id UUID NOT NULL,
+        title VARCHAR(255) NOT NULL,
+        description TEXT NOT NULL,
+        requirements TEXT,
+        responsibilities TEXT,
+        benefits TEXT,
+        location_id UUID,
+        remote_type VARCHAR(20),
+        employment_type VARCHAR(50),
+        experience_level VARCHAR(50),
+        salary_min INTEGER,
+        salary_max INTEGER,
+        salary_currency VARCHAR(3),
+        application_url TEXT,
+        posted_at TIMESTAMPTZ,
+        expires_at TIMESTAMPTZ,
+        skill_ids UUID[],
+        skill_levels TEXT[],
+        canonical_source VARCHAR(50),
+        canonical_external_id VARCHAR(255)
+    ) ON COMMIT DELETE ROWS
+    """,
+)
+
+JOB_INGEST_STAGE = register(
+    "jobs.ingest_stage",
+    """
+    INSERT INTO job_ingest_staging
+    (external_source, external_id, company_id, title, description, requirements, responsibilities, benefits,
+     location_id, remote_type, employment_type, experience_level, salary_min, salary_max, salary_currency,
+     application_url, posted_at, expires_at, skill_ids, skill_levels, canonical_source, canonical_external_id)
+    VALUES (:external_source, :external_id, :company_id, :title, :description, :requirements, :responsibilities,
+            :benefits, :location_id, :remote_type, :employment_type, :experience_level, :salary_min, :salary_max,
+            :salary_currency, :application_url, :posted_at, :expires_at,
+            CAST(:skill_ids AS UUID[]), CAST(:skill_levels AS TEXT[]), :canonical_source, :canonical_external_id)
+    """,
+)
+
+# Recorded by capture_job_history() for rows the merge updates
+JOB_INGEST_CHANGE_REASON = register(
+    "jobs.ingest_change_reason",
+    "SELECT set_config('app.change_reason', :reason, true)",
+)
+
+# One statement for the whole batch. Rows whose content did not change are not
+# updated, so re-ingesting a feed writes no history rows or dead tuples for them.
+# canonical_job_id is only rewritten when the run deduplicates (:dedup).
+JOB_INGEST_MERGE = register(
+    "jobs.ingest_merge",
+    """
+    WITH merged AS (
+        INSERT INTO jobs AS j
+        (external_source, external_id, company_id, title, description, requirements, responsibilities, benefits,
+         location_id, remote_type, employment_type, experience_level, salary_min, salary_max, salary_currency,
+         application_url, posted_at, expires_at, is_active, canonical_job_id)
+        SELECT s.external_source, s.external_id, s.company_id, s.title, s.description, s.requirements,
+               s.responsibilities, s.benefits, s.location_id, s.remote_type, s.employment_type, s.experience_level,
+               s.salary_min, s.salary_max, COALESCE(s.salary_currency, 'USD'), s.application_url, s.posted_at,
+               s.expires_at, TRUE, c.id
+        FROM job_ingest_staging s
+        LEFT JOIN jobs c ON c.external_source = s.canonical_source AND c.external_id = s.canonical_external_id
+        ON CONFLICT (external_source, external_id) WHERE external_id IS NOT NULL DO UPDATE SET
+            company_id = EXCLUDED.company_id,
+            title = EXCLUDED.title,
+            description = EXCLUDED.description,
+            requirements = EXCLUDED.requirements,
+            responsibilities = EXCLUDED.responsibilities,
+            benefits = EXCLUDED.benefits,
+            location_id = EXCLUDED.location_id,
+            remote_type = EXCLUDED.remote_type,
+            employment_type = EXCLUDED.employment_type,
+            experience_level = EXCLUDED.experience_level,
+            salary_min = EXCLUDED.salary_min,
+            salary_max = EXCLUDED.salary_max,
+            salary_currency = EXCLUDED.salary_currency,
+            application_url = EXCLUDED.application_url,
+            posted_at = EXCLUDED.posted_at,
+            expires_at = EXCLUDED.expires_at,
+            is_active = TRUE,
+            canonical_job_id = CASE WHEN CAST(:dedup AS BOOLEAN) THEN EXCLUDED.canonical_job_id ELSE j.canonical_job_id END
+        WHERE (j.company_id, j.title, j.description, j.requirements, j.responsibilities, j.benefits,
+               j.location_id, j.remote_type, j.employment_type, j.experience_level, j.salary_min, j.salary_max,
+               j.salary_currency, j.application_url, j.posted_at, j.expires_at, j.is_active, j.canonical_job_id)
+            IS DISTINCT FROM
+              (EXCLUDED.company_id, EXCLUDED.title, EXCLUDED.description, EXCLUDED.requirements,
+               EXCLUDED.responsibilities, EXCLUDED.benefits, EXCLUDED.location_id, EXCLUDED.remote_type,
+               EXCLUDED.employment_type, EXCLUDED.experience_level, EXCLUDED.salary_min, EXCLUDED.salary_max,
+               EXCLUDED.salary_currency, EXCLUDED.application_url, EXCLUDED.posted_at, EXCLUDED.expires_at,
+               EXCLUDED.is_active,
+               CASE WHEN CAST(:dedup AS BOOLEAN) THEN EXCLUDED.canonical_job_id ELSE j.canonical_job_id END)
+        RETURNING (xmax = 0) AS inserted
+    )
+    SELECT COUNT(*) FILTER (WHERE inserted), COUNT(*) FILTER (WHERE NOT inserted) FROM merged
+    """,
+)
+
+# The feed's skill list is authoritative for the jobs in the batch
+JOB_INGEST_SKILLS_DELETE = register(
+    "jobs.ingest_skills_delete",
+    """
+    DELETE FROM job_skills js
+    USING job_ingest_staging s
+    JOIN jobs j ON j.external_source = s.external_source AND j.external_id = s.external_id
+    WHERE js.job_id = j.id AND js.skill_id <> ALL(COALESCE(s.skill_ids, '{}'))
+    """,
+)
+
+JOB_INGEST_SKILLS_UPSERT = register(
+    "jobs.ingest_skills_upsert",
+    """
+    INSERT INTO job_skills (job_id, skill_id, importance_level)
+    SELECT j.id, k.skill_id, k.importance_level
+    FROM job_ingest_staging s
+    JOIN jobs j ON j.external_source = s.external_source AND j.external_id = s.external_id
+    CROSS JOIN LATERAL unnest(s.skill_ids, s.skill_levels) AS k(skill_id, importance_level)
+    ON CONFLICT (job_id, skill_id) DO UPDATE SET importance_level = EXCLUDED.importance_level
+    WHERE job_skills.importance_level IS DISTINCT FROM EXCLUDED.importance_level
+    """,
+)
+
+# Links duplicates whose canonical job the merge inserted in the same batch
+JOB_DEDUP_LINK = register(
+    "jobs.dedup_link",
+    """
+    UPDATE jobs j SET canonical_job_id = c.id
+    FROM job_ingest_staging s
+    JOIN jobs c ON c.external_source = s.canonical_source AND c.external_id = s.canonical_external_id
+    WHERE j.external_source = s.external_source AND j.external_id = s.external_id
+      AND j.canonical_job_id IS DISTINCT FROM c.id
+    """,
+)
+
+# Rebuilds the dedup index, oldest first so the first-seen job stays canonical
+JOB_DEDUP_CANONICALS = register(
+    "jobs.dedup_canonicals",
+    """
+    SELECT j.external_source, j.external_id, j.title, c.name, j.description
+    FROM jobs j
+    JOIN companies c ON c.id = j.company_id
+    WHERE j.canonical_job_id IS NULL AND j.is_active = TRUE AND j.external_id IS NOT NULL
+    ORDER BY j.created_at
+    """,
+)
+
+# ================================
+# jobs (faceted search)
+# ================================
+
+JOB_FACETS_NOW = register(
+    "jobs.facets_now",
+    "SELECT NOW()",
+)
+
+# Full load, oldest first: document numbers follow posting order
+JOB_FACETS_ALL = register(
+    "jobs.facets_all",
+    """
+    SELECT j.id, j.remote_type, j.employment_type, j.experience_level, c.industry, l.country_code,
+           j.location_id, l.city, l.region, j.salary_min, j.salary_max, j.expires_at
+    FROM jobs j
+    JOIN companies c ON c.id = j.company_id
+    LEFT JOIN locations l ON l.id = j.location_id
+    WHERE j.is_active = TRUE AND j.canonical_job_id IS NULL AND (j.expires_at IS NULL OR j.expires_at > NOW())
+    ORDER BY j.posted_at NULLS FIRST, j.created_at
+    """,
+)
+
+# Jobs changed after a (updated_at, id) keyset position, with whether they belong in the index
+JOB_FACETS_CHANGED = register(
+    "jobs.facets_changed",
+    """
+    SELECT j.id, j.remote_type, j.employment_type, j.experience_level, c.industry, l.country_code,
+           j.location_id, l.city, l.region, j.salary_min, j.salary_max, j.expires_at,
+           (j.is_active AND j.canonical_job_id IS NULL AND (j.expires_at IS NULL OR j.expires_at > NOW())),
+           j.updated_at
+    FROM jobs j
+    JOIN companies c ON c.id = j.company_id
+    LEFT JOIN locations l ON l.id = j.location_id
+    WHERE (j.updated_at, j.id) > (:since, CAST(:after_id AS UUID))
+    ORDER BY j.updated_at, j.id
+    LIMIT :limit
+    """,
+)
+
+# One page of results; the caller restores the index's order
+JOB_FACETS_PAGE = register(
+    "jobs.facets_page",
+    """
+    SELECT j.id, j.title, c.name, c.logo_url, c.industry, l.city, l.region, l.country_code, j.remote_type,
+           j.employment_type, j.experience_level, j.salary_min, j.salary_max, j.salary_currency, j.posted_at,
+           j.expires_at, j.application_url
+    FROM jobs j
+    JOIN companies c ON c.id = j.company_id
+    LEFT JOIN locations l ON l.id = j.location_id
+    WHERE j.id = ANY(CAST(:ids AS UUID[]))
+    """,
+)
+
+# ================================
+# jobs (full-text search)
+# ================================
+
+# One page by rank, then headlines for that page only. The keyset is (rank, id)
+# of the last row of the previous page; :limit asks for one row more than shown.
+JOB_SEARCH = register(
+    "jobs.search",
+    """
+    WITH q AS (
+        SELECT websearch_to_tsquery('english', :query) AS query
+    ),
+    page AS (
+        SELECT j.id, j.revision, ts_rank_cd(j.search_vector, q.query, 1) AS rank
+        FROM jobs j, q
+        WHERE j.search_vector @@ q.query
+          AND j.is_active = TRUE AND j.canonical_job_id IS NULL
+          AND (j.expires_at IS NULL OR j.expires_at > NOW())
+          AND (CAST(:after_rank AS REAL) IS NULL
+               OR (ts_rank_cd(j.search_vector, q.query, 1), j.id) < (CAST(:after_rank AS REAL), CAST(:after_id AS UUID)))
+        ORDER BY rank DESC, j.id DESC
+        LIMIT :limit
+    )
+    SELECT p.id, p.revision, p.rank,
+           ts_headline('english', regexp_replace(j.description, '<[^>]*>', ' ', 'g'), q.query,
+                       'MaxFragments=2, MinWords=8, MaxWords=20, FragmentDelimiter=" … ", StartSel=<mark>, StopSel=</mark>')
+    FROM page p
+    JOIN jobs j ON j.id = p.id
+    CROSS JOIN q
+    ORDER BY p.rank DESC, p.id DESC
+    """,
+)
+
+# Checks a cached page: any listed job updated (revision) or deleted since invalidates it
+JOB_SEARCH_REVISIONS = register(
+    "jobs.search_revisions",
+    "SELECT id, revision FROM jobs WHERE id = ANY(CAST(:ids AS UUID[]))",
+)
+
+# ================================
+# typeahead
+# ================================
+
+# Popularity is the number of active canonical jobs for the company or skill
+TYPEAHEAD_COMPANIES = register(
+    "typeahead.companies",
+    """
+    SELECT c.id, c.name, CAST(NULL AS TEXT[]) AS aliases, count(j.id) AS popularity
+    FROM companies c
+    LEFT JOIN jobs j ON j.company_id = c.id AND j.is_active = TRUE AND j.canonical_job_id IS NULL
+    GROUP BY c.id
+    """,
+)
+
+TYPEAHEAD_COMPANIES_BY_ID = register(
+    "typeahead.companies_by_id",
+    """
+    SELECT c.id, c.name, CAST(NULL AS TEXT[]) AS aliases, count(j.id) AS popularity
+    FROM companies c
+    LEFT JOIN jobs j ON j.company_id = c.id AND j.is_active = TRUE AND j.canonical_job_id IS NULL
+    WHERE c.id = ANY(CAST(:ids AS UUID[]))
+    GROUP BY c.id
+    """,
+)
+
+TYPEAHEAD_SKILLS = register(
+    "typeahead.skills",
+    """
+    SELECT s.id, s.name, s.aliases, count(j.id) AS popularity
+    FROM skills_taxonomy s
+    LEFT JOIN job_skills js ON js.skill_id = s.id
+    LEFT JOIN jobs j ON j.id = js.job_id AND j.is_active = TRUE AND j.canonical_job_id IS NULL
+    WHERE s.is_active = TRUE
+    GROUP BY s.id
+    """,
+)
+
+# Inactive skills are not returned, so the index drops them
+TYPEAHEAD_SKILLS_BY_ID = register(
+    "typeahead.skills_by_id",
+    """
+    SELECT s.id, s.name, s.aliases, count(j.id) AS popularity
+    FROM skills_taxonomy s
+    LEFT JOIN job_skills js ON js.skill_id = s.id
+    LEFT JOIN jobs j ON j.id = js.job_id AND j.is_active = TRUE AND j.canonical_job_id IS NULL
+    WHERE s.id = ANY(CAST(:ids AS UUID[])) AND s.is_active = TRUE
+    GROUP BY s.id
+    """,
+)
+
+# ================================
+# jobs (radius search)
+# ================================
+
+# Whether migration.sql created locations with PostGIS (geo) or with latitude/longitude
+JOB_GEO_SCHEMA = register(
+    "jobs.geo_schema",
+    """
+    SELECT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'locations' AND column_name = 'geo'
+    )
+    """,
+)
+
+# Coordinates for the in-memory grid, per locations schema
+JOB_GEO_LOCATIONS = register(
+    "jobs.geo_locations",
+    "SELECT id, latitude, longitude FROM locations WHERE latitude IS NOT NULL AND longitude IS NOT NULL",
+)
+
+JOB_GEO_LOCATIONS_POSTGIS = register(
+    "jobs.geo_locations_postgis",
+    "SELECT id, ST_Y(CAST(geo AS geometry)), ST_X(CAST(geo AS geometry)) FROM locations",
+)
+
+# Locations within :radius_m of the point from the GiST index on locations.geo.
+# Sphere distances (use_spheroid = false) match the grid's great-circle ones.
+# Each location, and the remote list, contributes at most :window jobs.
+JOB_GEO_NEARBY_POSTGIS = register(
+    "jobs.geo_nearby_postgis",
+    """
+    WITH center AS (
+        SELECT CAST(ST_SetSRID(ST_MakePoint(CAST(:lng AS DOUBLE PRECISION), CAST(:lat AS DOUBLE PRECISION)), 4326)
+                    AS geography) AS geo
+    ),
+    near AS (
+        SELECT l.id AS location_id, ST_Distance(l.geo, c.geo, false) / 1000 AS distance_km
+        FROM locations l, center c
+        WHERE ST_DWithin(l.geo, c.geo, CAST(:radius_m AS DOUBLE PRECISION), false)
+    ),
+    matched AS (
+        SELECT p.id, n.distance_km, p.posted_at
+        FROM near n
+        CROSS JOIN LATERAL (
+            SELECT j.id, j.posted_at
+            FROM jobs j
+            WHERE j.location_id = n.location_id
+              AND j.is_active = TRUE AND j.canonical_job_id IS NULL
+              AND (j.expires_at IS NULL OR j.expires_at > NOW())
+            ORDER BY j.posted_at DESC NULLS LAST, j.id DESC
+            LIMIT :window
+        ) p
+        UNION ALL
+        (SELECT j.id, NULL, j.posted_at
+         FROM jobs j
+         WHERE CAST(:include_remote AS BOOLEAN) AND j.remote_type = 'remote'
+           AND j.is_active = TRUE AND j.canonical_job_id IS NULL
+           AND (j.expires_at IS NULL OR j.expires_at > NOW())
+           AND NOT EXISTS (SELECT 1 FROM near n WHERE n.location_id = j.location_id)
+         ORDER BY j.posted_at DESC NULLS LAST, j.id DESC
+         LIMIT :window)
+    )
+    SELECT id, distance_km
+    FROM matched
+    ORDER BY distance_km NULLS LAST, posted_at DESC NULLS LAST, id DESC
+    LIMIT :limit OFFSET :offset
+    """,
+)
+
+# Same ranking with the locations in the radius found by the grid (app/services/job_geo.py)
+JOB_GEO_NEARBY = register(
+    "jobs.geo_nearby",
+    """
+    WITH near AS (
+        SELECT *
+        FROM unnest(CAST(:location_ids AS UUID[]), CAST(:distances AS DOUBLE PRECISION[]))
+            AS n(location_id, distance_km)
+    ),
+    matched AS (
+        SELECT p.id, n.distance_km, p.posted_at
+        FROM near n
+        CROSS JOIN LATERAL (
+            SELECT j.id, j.posted_at
+            FROM jobs j
+            WHERE j.location_id = n.location_id
+              AND j.is_active = TRUE AND j.canonical_job_id IS NULL
+              AND (j.expires_at IS NULL OR j.expires_at > NOW())
+            ORDER BY j.posted_at DESC NULLS LAST, j.id DESC
+            LIMIT :window
+        ) p
+        UNION ALL
+        (SELECT j.id, NULL, j.posted_at
+         FROM jobs j
+         WHERE CAST(:include_remote AS BOOLEAN) AND j.remote_type = 'remote'
+           AND j.is_active = TRUE AND j.canonical_job_id IS NULL
+           AND (j.expires_at IS NULL OR j.expires_at > NOW())
+           AND NOT EXISTS (SELECT 1 FROM near n WHERE n.location_id = j.location_id)
+         ORDER BY j.posted_at DESC NULLS LAST, j.id DESC
+         LIMIT :window)
+    )
+    SELECT id, distance_km
+    FROM matched
+    ORDER BY distance_km NULLS LAST, posted_at DESC NULLS LAST, id DESC
+    LIMIT :limit OFFSET :offset
+    """,
+)
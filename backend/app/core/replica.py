@@ -0,0 +1,178 @@
+"""
+Read Replica Routing
+Decides whether a read-only session may use the replica engine
+"""
+
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+import asyncio
+import time
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+# User of the current request, set once the access token has been decoded
+request_user_id: ContextVar[Optional[str]] = ContextVar("request_user_id", default=None)
+
+# Replication lag in seconds; 0 when the replica has replayed everything it received
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM NOW() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+def bind_request_user(user_id: str) -> None:
+    """Record the authenticated user for read routing of the current request"""
+    request_user_id.set(user_id)
+
+
+class ReplicaRouter:
+    """
+    Lag-aware routing between the primary and the read replica.
+
+    A read goes to the replica only when the replica is healthy, its last
+    measured lag is within DATABASE_REPLICA_MAX_LAG_SECONDS, and the user has
+    not written through this worker within DATABASE_READ_STICKY_SECONDS.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        max_lag_seconds: float,
+        sticky_seconds: float,
+        check_interval_seconds: float
+    ):
+        self.enabled = enabled
+        self.max_lag_seconds = max_lag_seconds
+        self.sticky_seconds = sticky_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+        self.last_check_at: Optional[float] = None
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.sticky_reads = 0
+        self.fallbacks = 0
+        self._recent_writers: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def mark_write(self, user_id: Optional[str]) -> None:
+        """Pin the user's reads to the primary for the sticky window"""
+        if not self.enabled or not user_id:
+            return
+        now = time.monotonic()
+        self._recent_writers[str(user_id)] = now + self.sticky_seconds
+        # Keep the table small without a separate sweeper
+        if len(self._recent_writers) > 10000:
+            self._recent_writers = {
+                uid: until for uid, until in self._recent_writers.items() if until > now
+            }
+
+    def is_sticky(self, user_id: Optional[str]) -> bool:
+        if not user_id:
+            return False
+        until = self._recent_writers.get(str(user_id))
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            self._recent_writers.pop(str(user_id), None)
+            return False
+        return True
+
+    def use_replica(self, user_id: Optional[str]) -> bool:
+        """Decide where a read for this user should go"""
+        if not self.enabled:
+            return False
+        if self.is_sticky(user_id):
+            self.sticky_reads += 1
+            self.primary_reads += 1
+            return False
+        if not self.healthy:
+            self.primary_reads += 1
+            return False
+        self.replica_reads += 1
+        return True
+
+    def mark_unhealthy(self, error: str) -> None:
+        """Take the replica out of rotation until the next successful check"""
+        self.fallbacks += 1
+        if self.healthy:
+            logger.warning("⚠️ Read replica marked unhealthy", error=error)
+        self.healthy = False
+
+    def record_lag(self, lag_seconds: float) -> None:
+        self.lag_seconds = lag_seconds
+        self.last_check_at = time.time()
+        healthy = lag_seconds <= self.max_lag_seconds
+        if healthy != self.healthy:
+            logger.info(
+                "Read replica health changed",
+                healthy=healthy,
+                lag_seconds=lag_seconds
+            )
+        self.healthy = healthy
+
+    async def check(self, read_engine) -> None:
+        """Measure replica lag once"""
+        from sqlalchemy import text
+
+        try:
+            async with read_engine.connect() as conn:
+                result = await asyncio.wait_for(
+                    conn.execute(text(REPLICA_LAG_SQL)),
+                    timeout=self.check_interval_seconds
+                )
+                self.record_lag(float(result.scalar() or 0))
+        except Exception as e:
+            self.last_check_at = time.time()
+            self.mark_unhealthy(str(e))
+
+    async def _monitor(self, read_engine) -> None:
+        while True:
+            await self.check(read_engine)
+            await asyncio.sleep(self.check_interval_seconds)
+
+    async def start(self, read_engine) -> None:
+        """Run the first lag check and start the background monitor"""
+        if not self.enabled or self._task is not None:
+            return
+        await self.check(read_engine)
+        self._task = asyncio.create_task(self._monitor(read_engine))
+        logger.info("✅ Read replica routing enabled", healthy=self.healthy, lag_seconds=self.lag_seconds)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get routing statistics"""
+        return {
+            "enabled": self.enabled,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "last_check_at": self.last_check_at,
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "sticky_reads": self.sticky_reads,
+            "fallbacks": self.fallbacks,
+            "sticky_users": len(self._recent_writers),
+        }
+
+
+# Global router instance
+replica_router = ReplicaRouter(
+    enabled=bool(settings.DATABASE_READ_URL),
+    max_lag_seconds=settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+    sticky_seconds=settings.DATABASE_READ_STICKY_SECONDS,
+    check_interval_seconds=settings.DATABASE_REPLICA_CHECK_INTERVAL_SECONDS
+)
@@ -0,0 +1,155 @@
+"""
+Application Startup
+Per-phase startup timing, database pool warm-up, deferred loading of heavy
+optional modules and the readiness state behind /health/ready
+"""
+
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import time
+import structlog
+
+from app.core.metrics import metrics
+
+logger = structlog.get_logger()
+
+# Import of this module is the first thing main.py does, so this marks the start of app imports
+_IMPORTED_AT = time.perf_counter()
+
+
+class StartupTracker:
+    """
+    Records how long each startup phase took and whether the worker is ready
+    to take traffic. Phases may run concurrently, so their durations can add
+    up to more than total_seconds.
+
+    Readiness is separate from /health (liveness): a worker is ready once the
+    lifespan startup has finished with a reachable database, and stops being
+    ready as soon as shutdown begins so load balancers drain it first.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.ready = False
+        self.database = False
+        self.total_seconds: Optional[float] = None
+        self.warmed_connections = 0
+        self._preloads: List[Tuple[str, Callable[[], Any]]] = []
+        self._preload_task: Optional[asyncio.Task] = None
+
+    @asynccontextmanager
+    async def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+    def mark_imported(self) -> None:
+        """Record the time spent importing the application before the lifespan started"""
+        self.phases.setdefault("imports", time.perf_counter() - _IMPORTED_AT)
+
+    def mark_ready(self, database: bool) -> None:
+        self.database = database
+        self.ready = database
+        self.total_seconds = time.perf_counter() - _IMPORTED_AT
+        logger.info(
+            "✅ Startup complete",
+            ready=self.ready,
+            total_ms=round(self.total_seconds * 1000, 1),
+            phases_ms={name: round(seconds * 1000, 1) for name, seconds in self.phases.items()}
+        )
+
+    def mark_stopping(self) -> None:
+        self.ready = False
+
+    # -- deferred modules ------------------------------------------------------
+
+    def defer(self, name: str, load: Callable[[], Any]) -> None:
+        """
+        Register a heavy import or client construction that normally happens
+        on first use. preload() can run it ahead of that on a worker thread.
+        """
+        self._preloads.append((name, load))
+
+    async def _preload_one(self, name: str, load: Callable[[], Any]) -> None:
+        try:
+            async with self.phase(f"preload:{name}"):
+                await asyncio.to_thread(load)
+        except Exception as e:
+            # Whatever failed here fails again, and is reported, on first use
+            logger.warning("Deferred module preload failed", module=name, error=str(e))
+
+    async def preload(self) -> None:
+        """Load every deferred module concurrently"""
+        await asyncio.gather(*(self._preload_one(name, load) for name, load in self._preloads))
+
+    def preload_in_background(self) -> None:
+        self._preload_task = asyncio.create_task(self.preload())
+
+    async def stop(self) -> None:
+        self.mark_stopping()
+        if self._preload_task is not None:
+            self._preload_task.cancel()
+            try:
+                await self._preload_task
+            except asyncio.CancelledError:
+                pass
+            self._preload_task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get readiness and the per-phase startup breakdown"""
+        return {
+            "ready": self.ready,
+            "database": self.database,
+            "warmed_connections": self.warmed_connections,
+            "total_ms": round(self.total_seconds * 1000, 1) if self.total_seconds is not None else None,
+            "phases_ms": {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()},
+        }
+
+
+async def warm_pool(engine, size: int, timeout: float) -> int:
+    """
+    Open up to `size` pooled connections concurrently and hand them back to
+    the pool, so the first requests after a deploy do not each pay for TCP,
+    TLS and authentication. Capped at the pool size, since connections above
+    it are closed on checkin. Returns the number of connections opened.
+    """
+    pool = engine.sync_engine.pool
+    if size <= 0 or not hasattr(pool, "size"):
+        return 0
+    size = min(size, pool.size())
+    connections = []
+    opened = 0
+
+    async def open_one() -> None:
+        nonlocal opened
+        conn = await engine.connect()
+        connections.append(conn)
+        await conn.exec_driver_sql("SELECT 1")
+        opened += 1
+
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(*(open_one() for _ in range(size)), return_exceptions=True),
+            timeout=timeout
+        )
+        failures = [result for result in results if isinstance(result, BaseException)]
+        if failures:
+            logger.warning("Database pool warm-up incomplete", failed=len(failures), error=str(failures[0]))
+    except asyncio.TimeoutError:
+        logger.warning("Database pool warm-up timed out", opened=opened, target=size)
+    finally:
+        for conn in connections:
+            await conn.close()
+    return opened
+
+
+# Global startup tracker
+startup = StartupTracker()
+
+metrics.gauge("app_ready", "1 while this worker reports ready on /health/ready",
+              lambda: 1 if startup.ready else 0)
+metrics.gauge("app_startup_phase_seconds", "Duration of each startup phase of this worker",
+              lambda: {(name,): seconds for name, seconds in startup.phases.items()}, ("phase",))
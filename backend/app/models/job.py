@@ -0,0 +1,71 @@
+"""
+Job Models
+Pydantic models for job listings and search
+"""
+
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from datetime import datetime
+
+
+class JobSummary(BaseModel):
+    """Job as shown in a result list"""
+    id: str
+    title: str
+    company: str
+    company_logo_url: Optional[str] = None
+    industry: Optional[str] = None
+    location: Optional[str] = None  # "City, Region, CC"
+    remote_type: Optional[str] = None
+    employment_type: Optional[str] = None
+    experience_level: Optional[str] = None
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    salary_currency: Optional[str] = None
+    posted_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    application_url: Optional[str] = None
+
+
+class FacetCount(BaseModel):
+    """Number of matching jobs with one facet value"""
+    value: str
+    label: str
+    count: int
+
+
+class JobListResponse(BaseModel):
+    """One page of filtered jobs with facet counts"""
+    jobs: List[JobSummary]
+    total: int
+    offset: int
+    limit: int
+    facets: Dict[str, List[FacetCount]]
+
+
+class JobSearchHit(BaseModel):
+    """Job matching a full-text search"""
+    job: JobSummary
+    rank: float
+    snippet: Optional[str] = None  # description excerpt, HTML-escaped, matches wrapped in <mark>
+
+
+class JobSearchResponse(BaseModel):
+    """One page of search results, best match first"""
+    query: str
+    hits: List[JobSearchHit]
+    next_cursor: Optional[str] = None  # pass as cursor for the next page; None on the last page
+
+
+class JobNearbyHit(BaseModel):
+    """Job in or, when remote, outside a search radius"""
+    job: JobSummary
+    distance_km: Optional[float] = None  # None for remote jobs outside the radius
+
+
+class JobNearbyResponse(BaseModel):
+    """One page of jobs, nearest first, then remote jobs newest first"""
+    hits: List[JobNearbyHit]
+    offset: int
+    limit: int
+    has_more: bool
@@ -18,6 +18,7 @@ class DeviceInfo(BaseModel):
     user_agent: Optional[str] = None
     screen_resolution: Optional[str] = None
     timezone: Optional[str] = None
+    fingerprint: Optional[str] = None  # Hash of user agent, timezone and IP prefix
 
 
 class SessionCreate(BaseModel):
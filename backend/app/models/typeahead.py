@@ -0,0 +1,21 @@
+"""
+Typeahead Models
+Pydantic models for company and skill autocomplete
+"""
+
+from pydantic import BaseModel
+from typing import List
+
+
+class TypeaheadItem(BaseModel):
+    """Company or skill suggestion"""
+    id: str
+    name: str
+    popularity: int  # active jobs for the company or asking for the skill
+    exact: bool  # False when matched with one typo
+
+
+class TypeaheadResponse(BaseModel):
+    """Suggestions per kind, prefix matches first, then by popularity"""
+    companies: List[TypeaheadItem] = []
+    skills: List[TypeaheadItem] = []
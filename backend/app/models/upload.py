@@ -0,0 +1,19 @@
+"""
+Upload Models
+Pydantic models for direct-to-bucket uploads
+"""
+
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class DirectUploadRequest(BaseModel):
+    """Presigned POST request model"""
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: Optional[str] = None
+    size: Optional[int] = Field(None, gt=0)  # Declared size; the bucket policy enforces the limit
+
+
+class DirectUploadComplete(BaseModel):
+    """Upload completion callback model"""
+    file_key: str
@@ -0,0 +1,367 @@
+"""
+Audit Log Service
+Buffers audit events in memory and writes them to the partitioned audit_logs
+table in batches through COPY
+"""
+
+from collections import deque
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from ipaddress import ip_address
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import asyncio
+import json
+import time
+import uuid
+import structlog
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = structlog.get_logger()
+
+# Column order of buffered events and of the COPY; id comes from the column default
+AUDIT_COLUMNS = (
+    "user_id", "entity_type", "entity_id", "action", "old_values", "new_values",
+    "ip_address", "user_agent", "system_action", "service_account", "created_at"
+)
+
+
+def _month_start(day: date, offset: int) -> date:
+    month = day.month - 1 + offset
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+@lru_cache(maxsize=4096)
+def _valid_ip(value: str) -> Optional[str]:
+    """The address if inet accepts it, else None (so one bad value cannot fail a whole COPY)"""
+    try:
+        ip_address(value)
+        return value
+    except ValueError:
+        return None
+
+
+def _row_error(error: BaseException) -> bool:
+    """
+    Whether the database rejected the batch for the contents of some rows
+    (SQLSTATE classes 22 and 23, or input the driver could not encode), as
+    opposed to a connection failure. A missing partition is handled apart.
+    """
+    if "no partition" in str(error):
+        return False
+    current: Optional[BaseException] = error
+    while current is not None:
+        if isinstance(current, ValueError):
+            return True
+        sqlstate = getattr(current, "sqlstate", None) or getattr(current, "pgcode", None)
+        if isinstance(sqlstate, str) and sqlstate[:2] in ("22", "23"):
+            return True
+        current = getattr(current, "orig", None) or current.__cause__
+    return False
+
+
+def entity_uuid(key: str) -> uuid.UUID:
+    """Stable entity_id for entities identified by a string key, such as storage keys"""
+    return uuid.uuid5(uuid.NAMESPACE_URL, key)
+
+
+def partition_name(day: date) -> str:
+    """Name of the audit_logs partition holding the given day"""
+    return f"audit_logs_{day.year:04d}_{day.month:02d}"
+
+
+class AuditPartitionManager:
+    """
+    Keeps audit_logs partitions ahead of the clock and moves old ones out.
+    Runs at startup and periodically; an advisory lock keeps workers from
+    running the DDL concurrently.
+    """
+
+    def __init__(self, months_ahead: int, online_months: int):
+        self.months_ahead = months_ahead
+        self.online_months = online_months
+        self.partitions_created = 0
+        self.partitions_archived = 0
+        self.last_run_at: Optional[float] = None
+
+    def required_partitions(self, today: Optional[date] = None) -> List[str]:
+        today = today or datetime.now(timezone.utc).date()
+        return [partition_name(_month_start(today, i)) for i in range(self.months_ahead + 1)]
+
+    async def ensure_partitions(self, db) -> int:
+        """Create missing partitions for the current month and months ahead"""
+        from app.core import queries
+
+        existing = {row[0] for row in await queries.AUDIT_PARTITIONS.fetch_all(db)}
+        missing = [name for name in self.required_partitions() if name not in existing]
+        if missing:
+            await queries.AUDIT_CREATE_PARTITIONS.fetch_one(db, months_ahead=self.months_ahead)
+            self.partitions_created += len(missing)
+            logger.info("✅ Audit partitions created", partitions=missing)
+        return len(missing)
+
+    async def archive_partitions(self, db) -> int:
+        """Detach partitions past the online window into audit_archive"""
+        from app.core import queries
+
+        row = await queries.AUDIT_ARCHIVE_PARTITIONS.fetch_one(db, months_online=self.online_months)
+        archived = row[0] if row else 0
+        if archived:
+            self.partitions_archived += archived
+            logger.info("📦 Audit partitions archived", count=archived)
+        return archived
+
+    async def run(self) -> None:
+        """One maintenance pass"""
+        from app.core import queries
+        from app.core.database import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            row = await queries.AUDIT_PARTITION_LOCK.fetch_one(db)
+            if not row or not row[0]:
+                return
+            await self.ensure_partitions(db)
+            await self.archive_partitions(db)
+            await db.commit()
+        self.last_run_at = time.time()
+
+
+class AuditLogWriter:
+    """
+    Request handlers call record(), which only appends a tuple to a bounded
+    in-memory buffer. A background task drains the buffer every flush interval,
+    or as soon as a full batch is waiting, and writes each batch with a single
+    COPY. When the buffer is full new events are dropped and counted rather
+    than blocking the request.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        batch_size: int,
+        flush_interval_seconds: float,
+        partition_manager: AuditPartitionManager,
+        maintenance_interval_seconds: int,
+        enabled: bool = True
+    ):
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.partition_manager = partition_manager
+        self.maintenance_interval_seconds = maintenance_interval_seconds
+        self.enabled = enabled
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.flush_seconds_total = 0.0
+        self._buffer: Deque[Tuple] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._engine = None
+
+    def record(
+        self,
+        action: str,
+        entity_type: str,
+        entity_id: Any,
+        user_id: Any = None,
+        new_values: Optional[Dict[str, Any]] = None,
+        old_values: Optional[Dict[str, Any]] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        system_action: bool = False,
+        service_account: Optional[str] = None
+    ) -> None:
+        """Queue an audit event; never blocks and never touches the database"""
+        if not self.enabled:
+            return
+        buffer = self._buffer
+        if len(buffer) >= self.capacity:
+            self.dropped += 1
+            return
+        buffer.append((
+            user_id, entity_type, entity_id, action, old_values, new_values,
+            ip_address, user_agent, system_action, service_account, time.time()
+        ))
+        self.recorded += 1
+        if len(buffer) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    @staticmethod
+    def _encode(event: Tuple) -> Tuple:
+        """Convert a buffered event into a COPY record"""
+        (user_id, entity_type, entity_id, action, old_values, new_values,
+         ip, user_agent, system_action, service_account, created_at) = event
+        return (
+            str(user_id) if user_id is not None else None,
+            entity_type,
+            str(entity_id),
+            action,
+            json.dumps(old_values, default=str) if old_values is not None else None,
+            json.dumps(new_values, default=str) if new_values is not None else None,
+            _valid_ip(ip) if ip is not None else None,
+            user_agent,
+            system_action,
+            service_account,
+            datetime.fromtimestamp(created_at, timezone.utc)
+        )
+
+    def _take_batch(self) -> List[Tuple]:
+        buffer = self._buffer
+        popleft = buffer.popleft
+        return [popleft() for _ in range(min(len(buffer), self.batch_size))]
+
+    async def _write(self, records: List[Tuple]) -> None:
+        from app.core import queries
+
+        async with self._engine.connect() as conn:
+            if self._engine.dialect.driver == "asyncpg":
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    "audit_logs", records=records, columns=AUDIT_COLUMNS
+                )
+            else:
+                await conn.execute(
+                    queries.AUDIT_LOG_INSERT.statement,
+                    [dict(zip(AUDIT_COLUMNS, record)) for record in records]
+                )
+                await conn.commit()
+
+    async def _write_rows(self, records: List[Tuple]) -> int:
+        """
+        Write records, halving the batch on row errors until only the bad
+        rows are left out; returns how many were left out. A failed COPY or
+        INSERT writes nothing, so the halves can be retried safely.
+        """
+        try:
+            await self._write(records)
+            return 0
+        except Exception as e:
+            if not _row_error(e):
+                raise
+            if len(records) == 1:
+                user_id, entity_type, entity_id, action = records[0][:4]
+                logger.error("Failed to write audit event", error=str(e), entity_type=entity_type,
+                             entity_id=entity_id, action=action, user_id=user_id)
+                return 1
+        middle = len(records) // 2
+        return await self._write_rows(records[:middle]) + await self._write_rows(records[middle:])
+
+    async def flush(self) -> int:
+        """Write everything currently buffered; returns the number of events written"""
+        written = 0
+        while self._buffer:
+            batch = self._take_batch()
+            records = [self._encode(event) for event in batch]
+            start = time.perf_counter()
+            try:
+                failed = await self._write_rows(records)
+            except Exception as e:
+                if "no partition" not in str(e):
+                    self.failed += len(records)
+                    logger.error("Failed to write audit batch", error=str(e), events=len(records))
+                    continue
+                # An event landed in a month without a partition; create it and retry once
+                try:
+                    await self.partition_manager.run()
+                    failed = await self._write_rows(records)
+                except Exception as retry_error:
+                    self.failed += len(records)
+                    logger.error("Failed to write audit batch", error=str(retry_error), events=len(records))
+                    continue
+            self.flush_seconds_total += time.perf_counter() - start
+            self.batches += 1
+            self.failed += failed
+            self.written += len(records) - failed
+            written += len(records) - failed
+        return written
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def _maintenance_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.maintenance_interval_seconds)
+            try:
+                await self.partition_manager.run()
+            except Exception as e:
+                logger.error("Audit partition maintenance failed", error=str(e))
+
+    async def start(self, engine=None) -> None:
+        """Run partition maintenance once and start the background tasks"""
+        if not self.enabled or self._tasks:
+            return
+        if engine is None:
+            from app.core.database import engine
+        self._engine = engine
+        try:
+            await self.partition_manager.run()
+        except Exception as e:
+            logger.error("Audit partition maintenance failed", error=str(e))
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._flush_loop()),
+            asyncio.create_task(self._maintenance_loop())
+        ]
+        logger.info("✅ Audit log writer started", batch_size=self.batch_size)
+
+    async def stop(self) -> None:
+        """Stop the background tasks and write what is left in the buffer"""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._wakeup = None
+        if self._engine is not None:
+            await self.flush()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get writer statistics"""
+        return {
+            "enabled": self.enabled,
+            "buffered": len(self._buffer),
+            "capacity": self.capacity,
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+            "avg_batch_ms": (
+                round(self.flush_seconds_total / self.batches * 1000, 3) if self.batches else 0.0
+            ),
+            "partitions_created": self.partition_manager.partitions_created,
+            "partitions_archived": self.partition_manager.partitions_archived,
+        }
+
+
+# Global audit log writer
+audit_log = AuditLogWriter(
+    capacity=settings.AUDIT_BUFFER_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval_seconds=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    partition_manager=AuditPartitionManager(
+        months_ahead=settings.AUDIT_PARTITION_MONTHS_AHEAD,
+        online_months=settings.AUDIT_ONLINE_MONTHS
+    ),
+    maintenance_interval_seconds=settings.AUDIT_MAINTENANCE_INTERVAL_SECONDS,
+    enabled=settings.AUDIT_LOG_ENABLED
+)
+
+metrics.gauge("audit_buffer_events", "Audit events waiting to be written", lambda: len(audit_log._buffer))
+metrics.gauge("audit_events_written_total", "Audit events written to audit_logs",
+              lambda: audit_log.written, kind="counter")
+metrics.gauge("audit_events_dropped_total", "Audit events dropped because the buffer was full",
+              lambda: audit_log.dropped, kind="counter")
@@ -0,0 +1,82 @@
+"""
+Device Classification
+User-agent parsing with a bounded cache, and device fingerprints for sessions
+"""
+
+from functools import lru_cache
+from hashlib import blake2b
+from ipaddress import ip_network
+from typing import Dict, NamedTuple, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.startup import startup
+
+# User-Agent headers longer than this are cut before parsing and fingerprinting
+MAX_USER_AGENT_LENGTH = 512
+
+
+class DeviceClass(NamedTuple):
+    """The parts of a parsed user agent kept with a session"""
+    device_type: str
+    os: str
+    browser: str
+    browser_version: str
+
+
+@lru_cache(maxsize=settings.DEVICE_UA_CACHE_SIZE)
+def classify_user_agent(user_agent: str) -> DeviceClass:
+    """
+    Parse a User-Agent header. user_agents.parse runs a long regex cascade,
+    while a handful of distinct strings make up most logins, so results are
+    kept in an LRU keyed by the raw string. The parser (and its compiled
+    regexes) is imported on the first miss rather than at startup.
+    """
+    import user_agents
+    
+    parsed = user_agents.parse(user_agent)
+    return DeviceClass(
+        device_type="mobile" if parsed.is_mobile else "tablet" if parsed.is_tablet else "desktop",
+        os=f"{parsed.os.family} {parsed.os.version_string}",
+        browser=f"{parsed.browser.family}",
+        browser_version=parsed.browser.version_string
+    )
+
+
+def ip_prefix(ip: Optional[str]) -> str:
+    """The /24 (IPv4) or /48 (IPv6) network of an address, so a fingerprint survives DHCP churn"""
+    if not ip:
+        return ""
+    try:
+        prefix = 24 if ":" not in ip else 48
+        return str(ip_network(f"{ip}/{prefix}", strict=False))
+    except ValueError:
+        return ""
+
+
+def device_fingerprint(user_agent: str, timezone: Optional[str], ip: Optional[str]) -> str:
+    """Stable identifier of a device: hash of user agent, timezone and IP prefix"""
+    material = "\x1f".join((user_agent, timezone or "", ip_prefix(ip)))
+    return blake2b(material.encode(), digest_size=16).hexdigest()
+
+
+def cache_stats() -> Dict[str, int]:
+    """Get user-agent cache statistics"""
+    info = classify_user_agent.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "capacity": info.maxsize}
+
+
+metrics.gauge("device_ua_cache_hits_total", "User-agent classifications served from cache",
+              lambda: classify_user_agent.cache_info().hits, kind="counter")
+metrics.gauge("device_ua_cache_misses_total", "User-agent classifications that ran the parser",
+              lambda: classify_user_agent.cache_info().misses, kind="counter")
+
+
+def _load_parser() -> None:
+    """Import the parser and run it once, outside the cache so hit/miss counts stay untouched"""
+    import user_agents
+    
+    user_agents.parse("Mozilla/5.0")
+
+
+startup.defer("user_agents", _load_parser)
@@ -0,0 +1,306 @@
+"""
+Job Deduplication
+Finds postings that several feeds carry under different IDs. Each job gets a
+MinHash signature of its normalized title, company and description; an LSH
+index over the canonical jobs finds candidates without comparing against
+every job, and a job similar enough to a candidate is linked to it
+"""
+
+from array import array
+from hashlib import blake2b
+from operator import eq
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import json
+import os
+import random
+import re
+import sys
+import time
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+# Part of the index file; bump it when tokens or shingles change so old files are rebuilt
+SIGNATURE_VERSION = 1
+SHINGLE_WORDS = 3
+
+_TAGS = re.compile(r"<[^>]+>")
+_WORDS = re.compile(r"[a-z0-9]+")
+# Legal forms feeds add or drop from the same employer's name
+COMPANY_SUFFIXES = frozenset({
+    "inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation", "co", "company",
+    "plc", "gmbh", "ag", "sa", "sas", "bv", "nv", "pty", "srl",
+})
+
+_EMPTY = 1 << 64
+_MASK = 0xFFFFFFFF
+
+
+def job_tokens(title: str, company: str, description: str) -> List[str]:
+    """Lower-case words of a posting; markup and company legal forms are dropped"""
+    company_words = [word for word in _WORDS.findall(company.lower()) if word not in COMPANY_SUFFIXES]
+    return (
+        _WORDS.findall(title.lower())
+        + company_words
+        + _WORDS.findall(_TAGS.sub(" ", description.lower()))
+    )
+
+
+class JobDedupIndex:
+    """
+    MinHash signatures and an LSH index of canonical jobs.
+
+    Signatures use one-permutation hashing: every shingle is hashed once into
+    one of `permutations` bins and each bin keeps its minimum, with empty
+    bins filled from other bins in a fixed per-bin order (optimal
+    densification). Signatures are split into `bands`; jobs sharing any band
+    are candidates, and a candidate whose estimated Jaccard similarity reaches
+    `threshold` is a match. Only canonical jobs are indexed, keyed by
+    "source:external_id", so duplicates never crowd the buckets.
+
+    Not thread-safe: one ingestion at a time uses it.
+    """
+
+    def __init__(self, permutations: int, bands: int, threshold: float, path: Optional[str] = None, seed: int = 1):
+        if permutations % bands:
+            raise ValueError("permutations must be a multiple of bands")
+        self.permutations = permutations
+        self.bands = bands
+        self.rows = permutations // bands
+        self.threshold = threshold
+        self.path = path
+        self.seed = seed
+        self.loaded = False
+        rng = random.Random(seed)
+        self._probes = [rng.sample(range(permutations), permutations) for _ in range(permutations)]
+        self._keys: List[Optional[str]] = []
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._signatures = array("I")
+        # Per band: band hash -> slot, or a list of slots when several jobs share it
+        self._buckets: List[Dict[int, Any]] = [{} for _ in range(bands)]
+        self.queries = 0
+        self.candidates = 0
+        self.duplicates = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def signature(self, tokens: List[str]) -> Optional[array]:
+        """MinHash signature of word shingles, or None for an empty text"""
+        if not tokens:
+            return None
+        k = self.permutations
+        bins = [_EMPTY] * k
+        width = min(SHINGLE_WORDS, len(tokens))
+        for start in range(len(tokens) - width + 1):
+            shingle = " ".join(tokens[start:start + width]).encode()
+            h = int.from_bytes(blake2b(shingle, digest_size=8).digest(), "little")
+            slot, value = h % k, h // k
+            if value < bins[slot]:
+                bins[slot] = value
+        if _EMPTY in bins:
+            filled = list(bins)
+            for slot, value in enumerate(bins):
+                if value == _EMPTY:
+                    for probe in self._probes[slot]:
+                        if bins[probe] != _EMPTY:
+                            filled[slot] = bins[probe]
+                            break
+            bins = filled
+        return array("I", [value & _MASK for value in bins])
+
+    def _band_keys(self, signature: array) -> List[int]:
+        raw = signature.tobytes()
+        size = self.rows * signature.itemsize
+        return [hash(raw[start:start + size]) for start in range(0, len(raw), size)]
+
+    def _stored(self, slot: int) -> array:
+        return self._signatures[slot * self.permutations:(slot + 1) * self.permutations]
+
+    def similarity(self, first: array, second: array) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return sum(map(eq, first, second)) / self.permutations
+
+    def query(self, signature: array) -> Optional[Tuple[str, float]]:
+        """Most similar canonical job at or above the threshold, as (key, similarity)"""
+        self.queries += 1
+        slots = set()
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            entry = bucket.get(band_key)
+            if entry is None:
+                continue
+            if isinstance(entry, int):
+                slots.add(entry)
+            else:
+                slots.update(entry)
+        self.candidates += len(slots)
+        best = None
+        for slot in slots:
+            similarity = self.similarity(signature, self._stored(slot))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (self._keys[slot], similarity)
+        return best
+
+    def add(self, key: str, signature: array) -> None:
+        """Index a canonical job, replacing its previous signature"""
+        if key in self._slots:
+            self.remove(key)
+        if self._free:
+            slot = self._free.pop()
+            self._keys[slot] = key
+            self._signatures[slot * self.permutations:(slot + 1) * self.permutations] = signature
+        else:
+            slot = len(self._keys)
+            self._keys.append(key)
+            self._signatures.extend(signature)
+        self._slots[key] = slot
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            entry = bucket.get(band_key)
+            if entry is None:
+                bucket[band_key] = slot
+            elif isinstance(entry, int):
+                bucket[band_key] = [entry, slot]
+            else:
+                entry.append(slot)
+
+    def remove(self, key: str) -> bool:
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return False
+        for bucket, band_key in zip(self._buckets, self._band_keys(self._stored(slot))):
+            entry = bucket.get(band_key)
+            if entry == slot:
+                del bucket[band_key]
+            elif isinstance(entry, list):
+                entry.remove(slot)
+                if len(entry) == 1:
+                    bucket[band_key] = entry[0]
+        self._keys[slot] = None
+        self._free.append(slot)
+        return True
+
+    def assign(self, key: str, title: str, company: str, description: str) -> Optional[str]:
+        """
+        Key of the canonical job a posting duplicates, or None when it is
+        canonical itself, in which case it is indexed. A canonical job seen
+        again stays canonical with its signature refreshed.
+        """
+        signature = self.signature(job_tokens(title, company, description))
+        if signature is None:
+            return None
+        slot = self._slots.get(key)
+        if slot is not None:
+            if self._stored(slot) != signature:
+                self.add(key, signature)
+            return None
+        match = self.query(signature)
+        if match is not None:
+            self.duplicates += 1
+            return match[0]
+        self.add(key, signature)
+        return None
+
+    def add_jobs(self, jobs: Iterable[Tuple[str, str, str, str]]) -> None:
+        """Index (key, title, company, description) of known canonical jobs"""
+        for key, title, company, description in jobs:
+            signature = self.signature(job_tokens(title, company, description))
+            if signature is not None:
+                self.add(key, signature)
+
+    def _header(self) -> Dict[str, Any]:
+        return {
+            "version": SIGNATURE_VERSION, "permutations": self.permutations, "bands": self.bands,
+            "seed": self.seed, "byteorder": sys.byteorder,
+        }
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Write the index: a JSON header line with the keys, then the signatures"""
+        path = path or self.path
+        live = list(self._slots.items())
+        signatures = array("I")
+        for _, slot in live:
+            signatures.extend(self._stored(slot))
+        header = dict(self._header(), keys=[key for key, _ in live])
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "wb") as index_file:
+            index_file.write(json.dumps(header).encode() + b"\n")
+            signatures.tofile(index_file)
+            index_file.flush()
+            os.fsync(index_file.fileno())
+        os.replace(temp, path)
+
+    def load(self, path: Optional[str] = None) -> bool:
+        """Replace the index with a saved one; False when the file is missing or was written with other parameters"""
+        path = path or self.path
+        try:
+            with open(path, "rb") as index_file:
+                header = json.loads(index_file.readline())
+                signatures = array("I")
+                signatures.frombytes(index_file.read())
+        except FileNotFoundError:
+            return False
+        keys = header.pop("keys")
+        byteorder = header.pop("byteorder")
+        expected = self._header()
+        expected.pop("byteorder")
+        if header != expected or len(signatures) != len(keys) * self.permutations:
+            logger.warning("Job dedup index ignored", path=path, header=header)
+            return False
+        if byteorder != sys.byteorder:
+            signatures.byteswap()
+
+        self.clear()
+        k = self.permutations
+        for number, key in enumerate(keys):
+            self.add(key, signatures[number * k:(number + 1) * k])
+        return True
+
+    async def ensure_loaded(self, conn) -> None:
+        """Load the saved index, or build it from the active canonical jobs"""
+        if self.loaded:
+            return
+        start = time.perf_counter()
+        if self.path and self.load():
+            source = "file"
+        else:
+            from app.core import queries
+
+            self.clear()
+            result = await conn.stream(queries.JOB_DEDUP_CANONICALS.statement)
+            async for rows in result.partitions(1000):
+                self.add_jobs((f"{row[0]}:{row[1]}", row[2], row[3], row[4]) for row in rows)
+            source = "database"
+        self.loaded = True
+        logger.info("🧬 Job dedup index loaded", source=source, jobs=len(self),
+                    seconds=round(time.perf_counter() - start, 3))
+
+    def clear(self) -> None:
+        self._keys = []
+        self._slots = {}
+        self._free = []
+        self._signatures = array("I")
+        self._buckets = [{} for _ in range(self.bands)]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get index statistics"""
+        return {
+            "canonical_jobs": len(self),
+            "queries": self.queries,
+            "duplicates": self.duplicates,
+            "avg_candidates": round(self.candidates / self.queries, 2) if self.queries else None,
+            "signature_bytes": len(self._signatures) * self._signatures.itemsize,
+        }
+
+
+# Global dedup index (loaded by the first ingestion that uses it)
+job_dedup_index = JobDedupIndex(
+    permutations=settings.JOB_DEDUP_PERMUTATIONS,
+    bands=settings.JOB_DEDUP_BANDS,
+    threshold=settings.JOB_DEDUP_THRESHOLD,
+    path=settings.JOB_DEDUP_INDEX_PATH
+)
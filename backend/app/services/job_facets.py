@@ -0,0 +1,601 @@
+"""
+Job Facets
+Compressed bitmaps over the active jobs for filtered job listings with facet
+counts, kept current from job changes
+"""
+
+from datetime import datetime, timedelta
+from collections import Counter
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+import asyncio
+import bisect
+import heapq
+import math
+import time
+import structlog
+
+from pyroaring import BitMap
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = structlog.get_logger()
+
+# NOTIFY channel written by notify_job_changes() and notify_job_deletes() in migration.sql
+JOB_CHANNEL = "job_changes"
+
+FACETS = ("remote_type", "employment_type", "experience_level", "industry", "country", "location", "salary")
+
+# Salary range filters compare salaries in steps of SALARY_STEP; higher ones count as SALARY_LIMIT
+SALARY_STEP = 1_000
+SALARY_LIMIT = 1_000_000
+_SALARY_BITS = (SALARY_LIMIT // SALARY_STEP).bit_length()
+
+# Facets with more values than listed: up to DIRECT_COUNT_LIMIT matches the values of the
+# matching jobs are tallied; above it values are first ranked on every SAMPLE_STRIDE-th block
+# of 65,536 documents and at most the SAMPLE_CANDIDATES x facet_values best are counted
+# exactly, best first. Counting stops at the first value whose sampled count, scaled up and
+# raised by SAMPLE_MARGIN standard deviations, cannot enter the listed values.
+# Sampling looks at the SAMPLE_RANKED x facet_values largest values at most.
+DIRECT_COUNT_LIMIT = 2000
+SAMPLE_STRIDE = 4
+SAMPLE_CANDIDATES = 3
+SAMPLE_MARGIN = 3.0
+SAMPLE_RANKED = 10
+
+# updated_at is the transaction start, so a poll also re-reads rows this much older than the last one seen
+CHANGE_OVERLAP_SECONDS = 60.0
+CHANGE_PAGE_SIZE = 5000
+_NO_ID = "00000000-0000-0000-0000-000000000000"
+
+
+def _salary_step(value: int) -> int:
+    return min(max(value, 0), SALARY_LIMIT) // SALARY_STEP
+
+
+class FacetState:
+    """
+    Bitmaps of one build. Jobs get dense document numbers in arrival order
+    (posted_at order for a full load), so iterating a bitmap backwards lists
+    the newest jobs first.
+    """
+
+    def __init__(self, salary_band: int):
+        self.salary_band = salary_band
+        self.active = BitMap()
+        self.values: Dict[str, Dict[str, BitMap]] = {facet: {} for facet in FACETS}
+        self.labels: Dict[str, str] = {}  # location_id -> "City, Region, CC"
+        self.location_country: Dict[str, str] = {}
+        # Bit-sliced salaries: slice i holds the jobs whose salary step has bit i set
+        self.salaried = BitMap()
+        self.salary_slices = {"top": [BitMap() for _ in range(_SALARY_BITS)],
+                              "bottom": [BitMap() for _ in range(_SALARY_BITS)]}
+        self.docs: Dict[int, Tuple] = {}
+        self.doc_ids: Dict[str, int] = {}
+        self.job_ids: Dict[int, str] = {}
+        self.expiring: List[Tuple[float, int]] = []
+        self.next_doc = 0
+        self.version = 0
+        self.watermark: Optional[datetime] = None
+        self._ranges: Dict[Tuple[str, int, bool], Tuple[int, BitMap]] = {}
+        self._ranked: Dict[Tuple[str, Optional[FrozenSet[str]]], Tuple[int, float, List[Tuple[str, BitMap]]]] = {}
+        self._sample: Tuple[int, BitMap] = (0, BitMap())
+
+    def _entry(self, row: Sequence) -> Tuple:
+        (_, remote_type, employment_type, experience_level, industry, country_code, location_id, city, region,
+         salary_min, salary_max, expires_at) = row[:12]
+        location = str(location_id) if location_id else None
+        country = country_code.upper() if country_code else None
+        if location and location not in self.labels:
+            self.labels[location] = ", ".join(part for part in (city, region, country) if part)
+            if country:
+                self.location_country[location] = country
+        top = salary_max if salary_max is not None else salary_min
+        bottom = salary_min if salary_min is not None else salary_max
+        band = None
+        if top is not None:
+            start = min(top, SALARY_LIMIT) // self.salary_band * self.salary_band
+            band = f"{start}+" if start + self.salary_band > SALARY_LIMIT else f"{start}-{start + self.salary_band}"
+        values = (
+            remote_type, employment_type, experience_level, industry.strip() if industry else None,
+            country, location, band,
+        )
+        return (
+            values,
+            _salary_step(top) if top is not None else None,
+            _salary_step(bottom) if bottom is not None else None,
+            expires_at.timestamp() if expires_at else None,
+        )
+
+    def _slice_salary(self, doc: int, top: int, bottom: int, add: bool) -> None:
+        for family, step in (("top", top), ("bottom", bottom)):
+            slices = self.salary_slices[family]
+            for bit in range(_SALARY_BITS):
+                if step >> bit & 1:
+                    if add:
+                        slices[bit].add(doc)
+                    else:
+                        slices[bit].discard(doc)
+        if add:
+            self.salaried.add(doc)
+        else:
+            self.salaried.discard(doc)
+
+    def _unindex(self, doc: int, entry: Tuple) -> None:
+        values, top, bottom, _ = entry
+        for facet, value in zip(FACETS, values):
+            if value is not None:
+                bitmap = self.values[facet].get(value)
+                if bitmap is not None:
+                    bitmap.discard(doc)
+        if top is not None:
+            self._slice_salary(doc, top, bottom, False)
+
+    def apply(self, row: Sequence, visible: bool) -> bool:
+        """Add, update or remove one job; returns whether anything changed"""
+        job_id = str(row[0])
+        doc = self.doc_ids.get(job_id)
+        if not visible:
+            return self.remove(job_id)
+        entry = self._entry(row)
+        if doc is not None:
+            previous = self.docs[doc]
+            if previous == entry:
+                return False
+            self._unindex(doc, previous)
+        else:
+            doc = self.next_doc
+            self.next_doc += 1
+            self.doc_ids[job_id] = doc
+            self.job_ids[doc] = job_id
+
+        values, top, bottom, expires = entry
+        for facet, value in zip(FACETS, values):
+            if value is not None:
+                bitmap = self.values[facet].get(value)
+                if bitmap is None:
+                    bitmap = self.values[facet][value] = BitMap()
+                bitmap.add(doc)
+        if top is not None:
+            self._slice_salary(doc, top, bottom, True)
+        if expires is not None:
+            heapq.heappush(self.expiring, (expires, doc))
+        self.docs[doc] = entry
+        self.active.add(doc)
+        self.version += 1
+        return True
+
+    def remove(self, job_id: str) -> bool:
+        doc = self.doc_ids.pop(job_id, None)
+        if doc is None:
+            return False
+        self._unindex(doc, self.docs.pop(doc))
+        del self.job_ids[doc]
+        self.active.discard(doc)
+        self.version += 1
+        return True
+
+    def expire(self, now: float) -> int:
+        """Remove jobs whose expires_at has passed"""
+        expired = 0
+        while self.expiring and self.expiring[0][0] <= now:
+            expires, doc = heapq.heappop(self.expiring)
+            entry = self.docs.get(doc)
+            # Heap entries of updated or removed jobs are stale
+            if entry is not None and entry[3] == expires:
+                expired += self.remove(self.job_ids[doc])
+        return expired
+
+    def _salary_range(self, family: str, step: int, at_least: bool) -> BitMap:
+        """
+        Jobs whose salary step is >= (at_least) or <= step, from the bit
+        slices high bit first; cached until the next change
+        """
+        key = (family, step, at_least)
+        cached = self._ranges.get(key)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        slices = self.salary_slices[family]
+        beyond = BitMap()
+        equal = self.salaried
+        for bit in reversed(range(_SALARY_BITS)):
+            if step >> bit & 1:
+                if not at_least:
+                    beyond |= equal - slices[bit]
+                equal = equal & slices[bit]
+            else:
+                if at_least:
+                    beyond |= equal & slices[bit]
+                equal = equal - slices[bit]
+        result = beyond | equal
+        if len(self._ranges) > 256:
+            self._ranges.clear()
+        self._ranges[key] = (self.version, result)
+        return result
+
+    def _ranked_values(self, facet: str, countries: Optional[FrozenSet[str]] = None) -> List[Tuple[str, BitMap]]:
+        """
+        Values of a facet, largest first, only those in countries if given
+        (locations). Re-sorted after changes at most once a second, so under
+        a stream of changes the order can be a second old.
+        """
+        key = (facet, countries)
+        cached = self._ranked.get(key)
+        now = time.monotonic()
+        if cached is None or (cached[0] != self.version and now - cached[1] >= 1.0):
+            if countries:
+                ranked = [item for item in self._ranked_values(facet)
+                          if self.location_country.get(item[0]) in countries]
+            else:
+                ranked = sorted(((v, b) for v, b in self.values[facet].items() if b), key=lambda item: -len(item[1]))
+            if len(self._ranked) > 256:
+                self._ranked.clear()
+            cached = self._ranked[key] = (self.version, now, ranked)
+        return cached[2]
+
+    def _sample_blocks(self) -> BitMap:
+        """Every SAMPLE_STRIDE-th block of 65,536 document numbers issued so far"""
+        blocks = (self.next_doc >> 16) + 1
+        if self._sample[0] != blocks:
+            sample = BitMap()
+            for block in range(0, blocks, SAMPLE_STRIDE):
+                sample.add_range(block << 16, (block + 1) << 16)
+            self._sample = (blocks, sample)
+        return self._sample[1]
+
+    @staticmethod
+    def _candidates(base: BitMap, sampled: BitMap, ranked: List[Tuple[str, BitMap]], count: int,
+                    limit: int) -> List[Tuple[str, BitMap, float, int]]:
+        """
+        The count values with the most matches in the sample, most first, each
+        with an upper bound on its matches in base and its sampled matches.
+        Intersecting with the sampled blocks only reads part of each bitmap.
+        """
+        estimates = [sampled.intersection_cardinality(bitmap) for _, bitmap in ranked[:count]]
+        if len(ranked) > count:
+            # Smaller values cannot have more sampled matches than they have jobs
+            end = bisect.bisect_left(ranked, -min(estimates), count, min(len(ranked), limit),
+                                     key=lambda item: -len(item[1]))
+            estimates += [sampled.intersection_cardinality(bitmap) for _, bitmap in ranked[count:end]]
+        scale = len(base) / max(1, len(sampled))
+        best = heapq.nlargest(count, range(len(estimates)), key=estimates.__getitem__)
+        return [
+            (ranked[index][0], ranked[index][1],
+             (estimates[index] + SAMPLE_MARGIN * math.sqrt(estimates[index]) + 1) * scale, estimates[index])
+            for index in best
+        ]
+
+    def search(
+        self,
+        filters: Dict[str, List[str]],
+        salary_min: Optional[int],
+        salary_max: Optional[int],
+        offset: int,
+        limit: int,
+        facet_values: int
+    ) -> Dict[str, Any]:
+        """
+        Matching job IDs (newest first) and facet counts. Values selected
+        within a facet are ORed, facets are ANDed. Each facet's counts apply
+        every filter except its own, so the other values of a selected facet
+        keep their counts.
+        """
+        selected: Dict[str, BitMap] = {}
+        for facet, wanted in filters.items():
+            if wanted:
+                bitmaps = [self.values[facet][value] for value in wanted if value in self.values[facet]]
+                selected[facet] = BitMap.union(*bitmaps) if bitmaps else BitMap()
+        if salary_min is not None:
+            # "Pays at least": the top of the range reaches salary_min
+            selected["_salary_min"] = self._salary_range("top", _salary_step(salary_min), True)
+        if salary_max is not None:
+            # "Starts at most": the bottom of the range is within salary_max
+            selected["_salary_max"] = self._salary_range("bottom", _salary_step(salary_max), False)
+
+        def intersect(excluded: Optional[str]) -> BitMap:
+            result = self.active
+            for name, bitmap in sorted(selected.items(), key=lambda item: len(item[1])):
+                if name != excluded:
+                    result = result & bitmap
+            return result
+
+        matches = intersect(None)
+        total = len(matches)
+        page = [self.job_ids[matches[total - 1 - n]] for n in range(offset, min(total, offset + limit))]
+
+        facets: Dict[str, List[Dict[str, Any]]] = {}
+        for facet in FACETS:
+            base = intersect(facet) if facet in selected else matches
+            unfiltered = base is self.active
+            countries = frozenset(filters["country"]) if facet == "location" and filters.get("country") else None
+            ranked = self._ranked_values(facet, countries)
+            top: List[Tuple[int, str]] = []
+            candidates = None
+            if not unfiltered and len(ranked) > facet_values:
+                # Exact counts for every value would read each value's bitmap in full
+                if len(base) <= DIRECT_COUNT_LIMIT:
+                    position = FACETS.index(facet)
+                    tally = Counter(self.docs[doc][0][position] for doc in base)
+                    tally.pop(None, None)
+                    top = [(count, value) for value, count in tally.items()
+                           if not countries or self.location_country.get(value) in countries]
+                    top = heapq.nlargest(facet_values, top)
+                    candidates = []
+                else:
+                    # Near the cut-off a value can be left out for one with a slightly lower count
+                    sample = self._sample_blocks()
+                    candidates = self._candidates(base, base & sample, ranked,
+                                                  facet_values * SAMPLE_CANDIDATES, facet_values * SAMPLE_RANKED)
+                    # Exact counts only need the blocks outside the sample
+                    counted = base - sample
+            if candidates is None:
+                # Largest first; a count cannot exceed the value's size
+                candidates = ((value, bitmap, len(bitmap), 0) for value, bitmap in ranked)
+                counted = base
+            # Values come by decreasing bound on their count, so the scan stops
+            # once no remaining value can enter the top facet_values
+            for value, bitmap, bound, sampled in candidates:
+                if len(top) == facet_values and bound <= top[0][0]:
+                    break
+                count = len(bitmap) if unfiltered else sampled + counted.intersection_cardinality(bitmap)
+                if not count:
+                    continue
+                if len(top) < facet_values:
+                    heapq.heappush(top, (count, value))
+                elif count > top[0][0]:
+                    heapq.heapreplace(top, (count, value))
+            facets[facet] = [
+                {"value": value, "label": self.labels.get(value, value) if facet == "location" else value,
+                 "count": count}
+                for count, value in sorted(top, key=lambda item: -item[0])
+            ]
+            # Selected values are always listed so the UI can show them checked
+            for value in filters.get(facet) or ():
+                if value not in {entry["value"] for entry in facets[facet]}:
+                    facets[facet].append({
+                        "value": value, "label": self.labels.get(value, value) if facet == "location" else value,
+                        "count": base.intersection_cardinality(self.values[facet][value])
+                        if value in self.values[facet] else 0,
+                    })
+        return {"total": total, "job_ids": page, "facets": facets}
+
+
+class JobFacetIndex:
+    """
+    Serves filtered job listings and facet counts from memory.
+
+    At startup the active canonical jobs are loaded into a FacetState in a
+    worker thread; until then search() returns None. Statements that insert
+    or update jobs send NOTIFY job_changes (once per transaction), deletes
+    send the job ID. On a notification the rows changed since the last
+    updated_at seen are re-read and applied. Expired jobs are dropped every
+    resync interval, and a full rebuild every JOB_FACETS_REBUILD_SECONDS
+    picks up company industry changes and anything missed while the listener
+    was down.
+    """
+
+    def __init__(self, enabled: bool, facet_values: int, salary_band: int,
+                 resync_interval_seconds: float, rebuild_interval_seconds: float):
+        self.enabled = enabled
+        self.facet_values = facet_values
+        self.salary_band = salary_band
+        self.resync_interval_seconds = resync_interval_seconds
+        self.rebuild_interval_seconds = rebuild_interval_seconds
+        self.listening = False
+        self.searches = 0
+        self.search_seconds = 0.0
+        self.changes = 0
+        self.notifications = 0
+        self.rebuilds = 0
+        self.last_build_seconds: Optional[float] = None
+        self._state: Optional[FacetState] = None
+        # Jobs deleted while a rebuild runs; its rows may predate the delete
+        self._deleted_during: Optional[Set[str]] = None
+        self._engine = None
+        self._conn = None
+        self._changed = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def ready(self) -> bool:
+        return self._state is not None
+
+    def search(
+        self,
+        filters: Dict[str, List[str]],
+        salary_min: Optional[int] = None,
+        salary_max: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 20
+    ) -> Optional[Dict[str, Any]]:
+        """Job IDs of one page, total and facet counts; None until the first load completes"""
+        state = self._state
+        if state is None:
+            return None
+        start = time.perf_counter()
+        result = state.search(filters, salary_min, salary_max, offset, limit, self.facet_values)
+        self.searches += 1
+        self.search_seconds += time.perf_counter() - start
+        return result
+
+    def apply_rows(self, rows: Iterable[Sequence]) -> int:
+        """Apply changed rows (JOB_FACETS_CHANGED columns); returns the number that changed the index"""
+        state = self._state
+        changed = 0
+        for row in rows:
+            changed += state.apply(row, row[12])
+            if state.watermark is None or row[13] > state.watermark:
+                state.watermark = row[13]
+        self.changes += changed
+        return changed
+
+    async def _build(self) -> FacetState:
+        from app.core import queries
+
+        start = time.perf_counter()
+        state = FacetState(self.salary_band)
+        async with self._engine.connect() as conn:
+            state.watermark = (await conn.execute(queries.JOB_FACETS_NOW.statement)).scalar()
+            result = await conn.stream(queries.JOB_FACETS_ALL.statement)
+            async for rows in result.partitions(CHANGE_PAGE_SIZE):
+                await asyncio.to_thread(lambda chunk: [state.apply(row, True) for row in chunk], rows)
+        self.last_build_seconds = round(time.perf_counter() - start, 3)
+        return state
+
+    async def rebuild(self) -> None:
+        """Build a new state and swap it in, then replay what changed during the build"""
+        deleted_during = self._deleted_during = set()
+        try:
+            state = await self._build()
+        finally:
+            self._deleted_during = None
+        for job_id in deleted_during:
+            state.remove(job_id)
+        self._state = state
+        self.rebuilds += 1
+        await self.poll()
+        logger.info("🧮 Job facets loaded", jobs=len(state.active), seconds=self.last_build_seconds)
+
+    async def poll(self) -> int:
+        """Apply jobs changed since the last updated_at seen"""
+        from app.core import queries
+
+        if self._state is None:
+            return 0
+        changed = 0
+        # Keyset over (updated_at, id): one transaction stamps all its rows with the same updated_at
+        since, after_id = self._state.watermark - timedelta(seconds=CHANGE_OVERLAP_SECONDS), _NO_ID
+        async with self._engine.connect() as conn:
+            while True:
+                rows = await queries.JOB_FACETS_CHANGED.fetch_all(
+                    conn, since=since, after_id=after_id, limit=CHANGE_PAGE_SIZE
+                )
+                changed += self.apply_rows(rows)
+                if len(rows) < CHANGE_PAGE_SIZE:
+                    break
+                since, after_id = rows[-1][13], rows[-1][0]
+        return changed
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        self.notifications += 1
+        if payload:
+            if self._deleted_during is not None:
+                self._deleted_during.add(payload)
+            if self._state is not None:
+                self.changes += self._state.remove(payload)
+        else:
+            self._changed.set()
+
+    def _on_terminate(self, connection) -> None:
+        if self.listening:
+            logger.warning("⚠️ Job change listener disconnected; facets may lag until it reconnects")
+        self.listening = False
+
+    async def _close_listener(self) -> None:
+        if self._conn is not None:
+            try:
+                # Discard rather than return to the pool, where the LISTEN would linger
+                await self._conn.invalidate()
+                await self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+    async def _listen(self) -> None:
+        await self._close_listener()
+        self._conn = await self._engine.connect()
+        raw = await self._conn.get_raw_connection()
+        driver = raw.driver_connection
+        await driver.add_listener(JOB_CHANNEL, self._on_notify)
+        driver.add_termination_listener(self._on_terminate)
+        self.listening = True
+        # Catch up on anything changed while not listening
+        self._changed.set()
+
+    async def _apply_loop(self) -> None:
+        while True:
+            await self._changed.wait()
+            self._changed.clear()
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.error("Job facet update failed", error=str(e))
+                await asyncio.sleep(self.resync_interval_seconds)
+                self._changed.set()
+
+    async def _maintenance_loop(self) -> None:
+        next_rebuild = time.monotonic() + self.rebuild_interval_seconds
+        while True:
+            if self._state is None or time.monotonic() >= next_rebuild:
+                try:
+                    await self.rebuild()
+                    next_rebuild = time.monotonic() + self.rebuild_interval_seconds
+                except Exception as e:
+                    logger.error("Job facet build failed", error=str(e))
+            if not self.listening:
+                try:
+                    await self._listen()
+                    logger.info("✅ Job change listener connected")
+                except Exception as e:
+                    logger.error("Job change listener failed to connect", error=str(e))
+            if self._state is not None:
+                self.changes += self._state.expire(time.time())
+            await asyncio.sleep(self.resync_interval_seconds)
+
+    async def start(self, engine=None) -> None:
+        """Load in the background; searches answer once the first load completes"""
+        if not self.enabled or self._tasks:
+            return
+        if engine is None:
+            from app.core.database import engine
+        if engine.dialect.driver != "asyncpg":
+            logger.warning("Job facets need asyncpg LISTEN; faceted search disabled")
+            return
+        self._engine = engine
+        self._tasks = [asyncio.create_task(self._maintenance_loop()), asyncio.create_task(self._apply_loop())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self.listening = False
+        await self._close_listener()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get index statistics"""
+        state = self._state
+        return {
+            "enabled": self.enabled,
+            "ready": state is not None,
+            "listening": self.listening,
+            "jobs": len(state.active) if state is not None else 0,
+            "facet_values": sum(len(values) for values in state.values.values()) if state is not None else 0,
+            "searches": self.searches,
+            "avg_search_ms": round(self.search_seconds / self.searches * 1000, 3) if self.searches else None,
+            "changes": self.changes,
+            "notifications": self.notifications,
+            "rebuilds": self.rebuilds,
+            "last_build_seconds": self.last_build_seconds,
+        }
+
+
+# Global job facet index
+job_facets = JobFacetIndex(
+    enabled=settings.JOB_FACETS_ENABLED,
+    facet_values=settings.JOB_FACETS_VALUES,
+    salary_band=settings.JOB_FACETS_SALARY_BAND,
+    resync_interval_seconds=settings.JOB_FACETS_RESYNC_SECONDS,
+    rebuild_interval_seconds=settings.JOB_FACETS_REBUILD_SECONDS
+)
+
+metrics.gauge("job_facets_jobs", "Active jobs in the facet index",
+              lambda: len(job_facets._state.active) if job_facets._state is not None else 0)
+metrics.gauge("job_facets_searches_total", "Faceted job searches served from memory",
+              lambda: job_facets.searches, kind="counter")
+metrics.gauge("job_facets_search_seconds_total", "Time spent in faceted job searches",
+              lambda: job_facets.search_seconds, kind="counter")
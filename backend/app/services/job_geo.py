@@ -0,0 +1,199 @@
+"""
+Job Geo Search
+Jobs within a radius of a point, nearest first, with remote jobs always
+included. Locations within the radius come from PostGIS when the locations
+table has its geography column, otherwise from an in-memory grid.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import math
+import time
+import structlog
+
+from app.core import queries
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = structlog.get_logger()
+
+# Mean Earth radius, as PostGIS uses for sphere (use_spheroid = false) distances
+EARTH_RADIUS_KM = 6371.0088
+
+BACKENDS = ("auto", "postgis", "grid")
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points in degrees"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class LocationGrid:
+    """
+    Location coordinates bucketed into cells of cell_degrees latitude by
+    about cell_degrees longitude (the width is rounded so cells tile 360°).
+
+    A radius query visits the cells overlapping the bounding box of the
+    circle and checks each location in them by great-circle distance. The
+    box is exact on the sphere: its latitude half-height is the radius in
+    degrees and its longitude half-width asin(sin(r) / cos(lat)), widening
+    to every column when the circle reaches a pole.
+    """
+
+    def __init__(self, cell_degrees: float):
+        self.columns = max(1, round(360 / cell_degrees))
+        self.width = 360 / self.columns
+        self.height = cell_degrees
+        self.rows = math.ceil(180 / cell_degrees)
+        self.cells: Dict[Tuple[int, int], List[Tuple[str, float, float]]] = {}
+        self.size = 0
+
+    def _row(self, lat: float) -> int:
+        return min(self.rows - 1, max(0, int((lat + 90) // self.height)))
+
+    def _column(self, lng: float) -> int:
+        return int((lng + 180) // self.width) % self.columns
+
+    def add(self, location_id: str, lat: float, lng: float) -> None:
+        self.cells.setdefault((self._row(lat), self._column(lng)), []).append((location_id, lat, lng))
+        self.size += 1
+
+    def within(self, lat: float, lng: float, radius_km: float) -> List[Tuple[str, float]]:
+        """(location ID, distance in km) within radius_km of the point, nearest first"""
+        angle = radius_km / EARTH_RADIUS_KM
+        half_height = math.degrees(angle)
+        south, north = lat - half_height, lat + half_height
+        spread = math.sin(angle) / math.cos(math.radians(lat)) if south > -90 and north < 90 else 1.0
+        if spread >= 1.0:
+            columns = range(self.columns)
+        else:
+            half_width = math.degrees(math.asin(spread))
+            first = int((lng - half_width + 180) // self.width)
+            last = int((lng + half_width + 180) // self.width)
+            columns = range(first, first + self.columns) if last - first >= self.columns else range(first, last + 1)
+        found = []
+        for row in range(self._row(south), self._row(north) + 1):
+            for column in columns:
+                for location_id, location_lat, location_lng in self.cells.get((row, column % self.columns), ()):
+                    distance = haversine_km(lat, lng, location_lat, location_lng)
+                    if distance <= radius_km:
+                        found.append((location_id, distance))
+        found.sort(key=lambda item: item[1])
+        return found
+
+
+class JobGeoSearch:
+    """
+    Runs JOB_GEO_NEARBY_POSTGIS or JOB_GEO_NEARBY.
+
+    Both rank jobs in the radius by the distance of their location, newest
+    first within a location, followed by remote jobs located elsewhere (or
+    nowhere), newest first. Each location and the remote list contribute at
+    most offset + limit + 1 jobs from an index scan, so a page never sorts
+    every job in the radius.
+
+    Whether PostGIS is used is decided on the first search. The grid is
+    loaded on first use and reloaded every refresh_seconds; locations
+    change rarely and are only added by migrations and admins.
+    """
+
+    def __init__(self, backend: str, cell_degrees: float, refresh_seconds: float):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown geo search backend: {backend}")
+        self.backend = backend
+        self.cell_degrees = cell_degrees
+        self.refresh_seconds = refresh_seconds
+        self.postgis: Optional[bool] = None  # locations has the geography column
+        self.searches = 0
+        self.search_seconds = 0.0
+        self.grid_loads = 0
+        self._grid: Optional[LocationGrid] = None
+        self._grid_expires = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _mode(self, db) -> str:
+        if self.postgis is None:
+            rows = await queries.JOB_GEO_SCHEMA.fetch_all(db)
+            self.postgis = bool(rows[0][0])
+            if self.backend == "postgis" and not self.postgis:
+                logger.warning("PostGIS geo search requested but locations has no geo column; using the grid")
+        return "postgis" if self.postgis and self.backend != "grid" else "grid"
+
+    async def _locations(self, db) -> LocationGrid:
+        if self._grid is None or self._grid_expires <= time.monotonic():
+            async with self._lock:
+                if self._grid is None or self._grid_expires <= time.monotonic():
+                    query = queries.JOB_GEO_LOCATIONS_POSTGIS if self.postgis else queries.JOB_GEO_LOCATIONS
+                    grid = LocationGrid(self.cell_degrees)
+                    for location_id, lat, lng in await query.fetch_all(db):
+                        grid.add(str(location_id), float(lat), float(lng))
+                    self._grid = grid
+                    self._grid_expires = time.monotonic() + self.refresh_seconds
+                    self.grid_loads += 1
+                    logger.info("🌍 Location grid loaded", locations=grid.size, cells=len(grid.cells))
+        return self._grid
+
+    async def nearby(
+        self,
+        db,
+        lat: float,
+        lng: float,
+        radius_km: float,
+        include_remote: bool = True,
+        offset: int = 0,
+        limit: int = 20
+    ) -> Dict[str, Any]:
+        """
+        One page of jobs: {"hits": [{"id", "distance_km"}], "has_more",
+        "backend"}. distance_km is None for remote jobs outside the radius.
+        """
+        start = time.perf_counter()
+        mode = await self._mode(db)
+        params = {"include_remote": include_remote, "window": offset + limit + 1, "limit": limit + 1,
+                  "offset": offset}
+        if mode == "postgis":
+            rows = await queries.JOB_GEO_NEARBY_POSTGIS.fetch_all(
+                db, lat=lat, lng=lng, radius_m=radius_km * 1000, **params
+            )
+        else:
+            near = (await self._locations(db)).within(lat, lng, radius_km)
+            rows = await queries.JOB_GEO_NEARBY.fetch_all(
+                db, location_ids=[location_id for location_id, _ in near],
+                distances=[distance for _, distance in near], **params
+            )
+        self.searches += 1
+        self.search_seconds += time.perf_counter() - start
+        return {
+            "hits": [
+                {"id": str(job_id), "distance_km": round(distance, 2) if distance is not None else None}
+                for job_id, distance in rows[:limit]
+            ],
+            "has_more": len(rows) > limit,
+            "backend": mode,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get search statistics"""
+        return {
+            "backend": self.backend,
+            "postgis": self.postgis,
+            "grid_locations": self._grid.size if self._grid is not None else None,
+            "grid_loads": self.grid_loads,
+            "searches": self.searches,
+            "avg_search_ms": round(self.search_seconds / self.searches * 1000, 2) if self.searches else None,
+        }
+
+
+# Global geo search
+job_geo = JobGeoSearch(
+    backend=settings.JOB_GEO_BACKEND,
+    cell_degrees=settings.JOB_GEO_CELL_DEGREES,
+    refresh_seconds=settings.JOB_GEO_REFRESH_SECONDS
+)
+
+metrics.gauge("job_geo_searches_total", "Radius job searches", lambda: job_geo.searches, kind="counter")
+metrics.gauge("job_geo_search_seconds_total", "Time spent in radius job searches",
+              lambda: job_geo.search_seconds, kind="counter")
@@ -0,0 +1,472 @@
+"""
+Job Feed Ingestion
+Streams job feeds (JSON Lines or CSV, optionally gzipped), normalizes them
+against in-memory company, location and skill maps, and merges them into
+jobs, job_skills and companies a batch at a time: COPY into a staging
+table, then set-based statements
+"""
+
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import asyncio
+import csv
+import gzip
+import io
+import json
+import re
+import time
+import structlog
+
+from slugify import slugify
+
+from app.core.config import settings
+from app.services.job_dedup import JobDedupIndex, job_dedup_index
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - optional dependency
+    _loads = json.loads
+
+logger = structlog.get_logger()
+
+STAGING_COLUMNS = (
+    "external_source", "external_id", "company_id", "title", "description", "requirements",
+    "responsibilities", "benefits", "location_id", "remote_type", "employment_type", "experience_level",
+    "salary_min", "salary_max", "salary_currency", "application_url", "posted_at", "expires_at",
+    "skill_ids", "skill_levels", "canonical_source", "canonical_external_id",
+)
+COMPANY_ID = STAGING_COLUMNS.index("company_id")
+CANONICAL = STAGING_COLUMNS.index("canonical_source")
+
+# Feed spellings of the jobs CHECK constraint values
+REMOTE_TYPES = {
+    "onsite": "onsite", "on site": "onsite", "office": "onsite", "in office": "onsite",
+    "remote": "remote", "fully remote": "remote", "work from home": "remote",
+    "hybrid": "hybrid",
+}
+EMPLOYMENT_TYPES = {
+    "full time": "full_time", "fulltime": "full_time", "permanent": "full_time",
+    "part time": "part_time", "parttime": "part_time",
+    "contract": "contract", "contractor": "contract", "freelance": "contract",
+    "temporary": "temporary", "temp": "temporary", "seasonal": "temporary",
+    "internship": "internship", "intern": "internship",
+}
+EXPERIENCE_LEVELS = {
+    "entry": "entry", "entry level": "entry", "junior": "entry", "graduate": "entry",
+    "mid": "mid", "mid level": "mid", "intermediate": "mid", "associate": "mid",
+    "senior": "senior", "sr": "senior",
+    "lead": "lead", "staff": "lead", "principal": "lead",
+    "executive": "executive", "director": "executive", "vp": "executive",
+}
+
+_SOURCE = re.compile(r"^[a-z0-9_]{1,50}$")
+_SPLIT = re.compile(r"[;,|]")
+_SALARY = re.compile(r"[^0-9.k]")
+INT_MAX = 2 ** 31 - 1
+
+
+def _key(value: Any) -> str:
+    """Case, separator and whitespace-insensitive lookup key"""
+    return " ".join(str(value).lower().replace("-", " ").replace("_", " ").split())
+
+
+def _text(value: Any, limit: Optional[int] = None) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+    return value[:limit] if limit else value
+
+
+def _salary(value: Any) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        amount = float(value)
+    else:
+        cleaned = _SALARY.sub("", str(value).lower())
+        try:
+            amount = float(cleaned.rstrip("k")) * (1000 if cleaned.endswith("k") else 1)
+        except ValueError:
+            return None
+    return int(amount) if 0 <= amount <= INT_MAX else None
+
+
+def _timestamp(value: Any) -> Optional[datetime]:
+    if value is None or value == "":
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            return datetime.fromtimestamp(value, timezone.utc)
+        parsed = datetime.fromisoformat(str(value).strip())
+    except (ValueError, OverflowError, OSError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _names(value: Any) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = _SPLIT.split(value)
+    return [name for name in (_key(item) for item in value) if name]
+
+
+def read_feed(path: str, feed_format: Optional[str] = None) -> Iterator[Optional[Dict[str, Any]]]:
+    """
+    Stream the records of a feed file without loading it. The format comes
+    from the extension (.jsonl/.ndjson or .csv, optionally .gz) unless given.
+    Yields None for a line that is not valid JSON.
+    """
+    name = path[:-3] if path.endswith(".gz") else path
+    feed_format = feed_format or ("csv" if name.endswith(".csv") else "jsonl")
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as raw:
+        if feed_format == "csv":
+            yield from csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+            return
+        for line in raw:
+            if not line.strip():
+                continue
+            try:
+                record = _loads(line)
+            except ValueError:
+                yield None
+                continue
+            yield record if isinstance(record, dict) else None
+
+
+class ReferenceMaps:
+    """
+    Companies, locations and skills held in memory, so normalizing a record
+    needs no queries. Companies created during ingestion are added as they
+    are resolved.
+    """
+
+    def __init__(self):
+        self.companies_by_slug: Dict[str, Any] = {}
+        self.companies_by_domain: Dict[str, Any] = {}
+        # (country code, city) and (region or subdivision code, city); country codes are upper case
+        self.locations: Dict[Tuple[str, str], Any] = {}
+        self.locations_by_city: Dict[str, Any] = {}  # None when the city name is ambiguous
+        self.skills: Dict[str, Any] = {}
+
+    def add_company(self, company_id, slug: Optional[str], domain: Optional[str]) -> None:
+        if slug:
+            self.companies_by_slug[slug] = company_id
+        if domain:
+            self.companies_by_domain[domain.lower()] = company_id
+
+    async def load(self, conn) -> None:
+        from app.core import queries
+
+        for row in await queries.JOB_INGEST_COMPANIES.fetch_all(conn):
+            self.add_company(row[0], row[1], row[2])
+        for location_id, country_code, region, city, subdivision in await queries.JOB_INGEST_LOCATIONS.fetch_all(conn):
+            city = _key(city)
+            self.locations[(country_code.upper(), city)] = location_id
+            if region:
+                self.locations[(_key(region), city)] = location_id
+            if subdivision:
+                # "US-CA" also matches "San Francisco, CA"
+                self.locations[(_key(subdivision.rsplit("-", 1)[-1]), city)] = location_id
+            self.locations_by_city[city] = None if city in self.locations_by_city else location_id
+        skills = await queries.JOB_INGEST_SKILLS.fetch_all(conn)
+        for skill_id, _, aliases in skills:
+            for alias in aliases or ():
+                self.skills.setdefault(_key(alias), skill_id)
+        # Canonical names win over another skill's alias
+        for skill_id, name, _ in skills:
+            self.skills[_key(name)] = skill_id
+
+    def company(self, slug: str, domain: Optional[str]):
+        if domain:
+            company_id = self.companies_by_domain.get(domain)
+            if company_id is not None:
+                return company_id
+        return self.companies_by_slug.get(slug)
+
+    def location(self, record: Dict[str, Any]):
+        city = record.get("city")
+        region = record.get("region")
+        country = record.get("country") or record.get("country_code")
+        if not city and record.get("location"):
+            # "City, Region, CC" / "City, CC" / "City"
+            parts = [part.strip() for part in str(record["location"]).split(",") if part.strip()]
+            if parts:
+                city = parts[0]
+                if len(parts) > 1:
+                    # A two-letter last part is a country or a state/province code
+                    if len(parts[-1]) == 2:
+                        country = parts[-1]
+                    region = parts[1] if len(parts) > 2 or len(parts[-1]) != 2 else parts[-1]
+        if not city:
+            return None
+        city = _key(city)
+        if country and len(str(country).strip()) == 2:
+            found = self.locations.get((str(country).strip().upper(), city))
+            if found is not None:
+                return found
+        if region:
+            found = self.locations.get((_key(region), city))
+            if found is not None:
+                return found
+        return self.locations_by_city.get(city)
+
+
+class JobNormalizer:
+    """Turns feed records into staging rows and counts what it drops"""
+
+    def __init__(self, maps: ReferenceMaps, source: str, dedup: Optional[JobDedupIndex] = None):
+        self.maps = maps
+        self.source = source
+        self.dedup = dedup
+        self.rejected: Dict[str, int] = {}
+        self.unresolved_locations = 0
+        self.unknown_skills = 0
+        self.near_duplicates = 0
+        self._slugs: Dict[str, str] = {}  # feeds repeat a few thousand company names
+
+    def _reject(self, reason: str) -> None:
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+
+    def normalize(self, record: Optional[Dict[str, Any]]) -> Optional[Tuple[list, Optional[Tuple[str, str, Optional[str]]]]]:
+        """
+        Staging row (company_id filled in when the company is known) and the
+        (slug, name, domain) of a company still to be resolved, or None for a
+        record that cannot be ingested.
+        """
+        if record is None:
+            self._reject("malformed")
+            return None
+        external_id = _text(record.get("external_id") or record.get("id"))
+        title = _text(record.get("title"), 255)
+        description = _text(record.get("description"))
+        company_name = _text(record.get("company") or record.get("company_name"), 255)
+        if not external_id or len(external_id) > 255:
+            self._reject("external_id")
+            return None
+        if not title or not description:
+            self._reject("title_or_description")
+            return None
+        company_slug = self._slugs.get(company_name) if company_name else ""
+        if company_slug is None:
+            company_slug = self._slugs[company_name] = slugify(company_name, max_length=255)
+        if not company_slug:
+            self._reject("company")
+            return None
+        domain = _text(record.get("company_domain"), 255)
+        domain = domain.lower() if domain else None
+
+        remote_type = REMOTE_TYPES.get(_key(record.get("remote_type") or ""))
+        if remote_type is None and "remote" in _key(record.get("location") or ""):
+            remote_type = "remote"
+
+        location_id = self.maps.location(record)
+        if location_id is None and (record.get("city") or (record.get("location") and remote_type != "remote")):
+            self.unresolved_locations += 1
+
+        salary_min = _salary(record.get("salary_min"))
+        salary_max = _salary(record.get("salary_max"))
+        if salary_min is not None and salary_max is not None and salary_min > salary_max:
+            salary_min, salary_max = salary_max, salary_min
+        posted_at = _timestamp(record.get("posted_at"))
+        expires_at = _timestamp(record.get("expires_at"))
+        if posted_at is not None and expires_at is not None and expires_at <= posted_at:
+            expires_at = None
+        currency = _text(record.get("salary_currency"), 3)
+
+        # Required wins when a skill is listed as both; one row per skill for the upsert
+        levels: Dict[Any, str] = {}
+        for field, level in (("preferred_skills", "preferred"), ("skills", "required")):
+            for name in _names(record.get(field)):
+                skill_id = self.maps.skills.get(name)
+                if skill_id is None:
+                    self.unknown_skills += 1
+                else:
+                    levels[skill_id] = level
+
+        row = [
+            self.source, external_id, self.maps.company(company_slug, domain), title, description,
+            _text(record.get("requirements")), _text(record.get("responsibilities")), _text(record.get("benefits")),
+            location_id, remote_type,
+            EMPLOYMENT_TYPES.get(_key(record.get("employment_type") or "")),
+            EXPERIENCE_LEVELS.get(_key(record.get("experience_level") or "")),
+            salary_min, salary_max, currency.upper() if currency else None,
+            _text(record.get("application_url") or record.get("url")), posted_at, expires_at,
+            list(levels), list(levels.values()), None, None,
+        ]
+        if self.dedup is not None:
+            canonical = self.dedup.assign(f"{self.source}:{external_id}", title, company_name, description)
+            if canonical is not None:
+                self.near_duplicates += 1
+                row[CANONICAL], row[CANONICAL + 1] = canonical.split(":", 1)
+        company = (company_slug, company_name, domain) if row[COMPANY_ID] is None else None
+        return row, company
+
+
+class JobIngestor:
+    """
+    Ingests feed records in batches of JOB_INGEST_BATCH_SIZE.
+
+    Reading and normalizing a batch runs on a worker thread while the
+    previous batch is merged. Each batch is one transaction: missing
+    companies are created with one INSERT, the rows are COPYed into the
+    job_ingest_staging temp table, then merged with JOB_INGEST_MERGE (an
+    upsert on (external_source, external_id) that skips unchanged rows) and
+    the two job_skills statements. Within a batch the last record for an
+    external_id wins.
+
+    With a dedup index, normalizing also links each job to the canonical job
+    it near-duplicates (canonical_job_id); the index is saved after a run
+    that completes.
+    """
+
+    def __init__(self, batch_size: int, engine=None, dedup: Optional[JobDedupIndex] = None):
+        self.batch_size = batch_size
+        self.dedup = dedup
+        self._engine = engine
+
+    def _take_batch(self, records: Iterator, normalizer: JobNormalizer) -> Tuple[int, int, Dict[str, Tuple[list, Any]]]:
+        """Read and normalize up to batch_size records; runs on a worker thread"""
+        read = rejected = 0
+        batch: Dict[str, Tuple[list, Any]] = {}
+        for record in islice(records, self.batch_size):
+            read += 1
+            normalized = normalizer.normalize(record)
+            if normalized is None:
+                rejected += 1
+            else:
+                batch[normalized[0][1]] = normalized
+        return read, rejected, batch
+
+    async def _resolve_companies(self, conn, maps: ReferenceMaps, batch: Dict[str, Tuple[list, Any]]) -> int:
+        """Create the batch's unknown companies and fill in their IDs; returns the number created"""
+        from app.core import queries
+
+        missing: Dict[str, Tuple[str, Optional[str]]] = {}
+        for row, company in batch.values():
+            if company is not None and row[COMPANY_ID] is None:
+                slug, name, domain = company
+                row[COMPANY_ID] = maps.company(slug, domain)
+                if row[COMPANY_ID] is None:
+                    missing.setdefault(slug, (name, domain))
+        if not missing:
+            return 0
+
+        slugs = list(missing)
+        domains = [domain for _, domain in missing.values()]
+        created = await queries.JOB_INGEST_CREATE_COMPANIES.execute(
+            conn, names=[name for name, _ in missing.values()], slugs=slugs, domains=domains
+        )
+        for row in await queries.JOB_INGEST_COMPANIES_BY_KEY.fetch_all(
+            conn, slugs=slugs, domains=[domain for domain in domains if domain]
+        ):
+            maps.add_company(row[0], row[1], row[2])
+        for row, company in batch.values():
+            if row[COMPANY_ID] is None:
+                row[COMPANY_ID] = maps.company(company[0], company[2])
+        return created
+
+    async def _stage(self, conn, rows: List[list]) -> None:
+        from app.core import queries
+
+        await conn.execute(queries.JOB_INGEST_STAGING.statement)
+        if self._engine.dialect.driver == "asyncpg":
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                "job_ingest_staging", records=[tuple(row) for row in rows], columns=STAGING_COLUMNS
+            )
+        else:
+            await conn.execute(
+                queries.JOB_INGEST_STAGE.statement, [dict(zip(STAGING_COLUMNS, row)) for row in rows]
+            )
+
+    async def _merge(self, maps: ReferenceMaps, batch: Dict[str, Tuple[list, Any]], result: Dict[str, Any]) -> None:
+        from app.core import queries
+
+        async with self._engine.connect() as conn:
+            result["companies_created"] += await self._resolve_companies(conn, maps, batch)
+            rows = [row for row, _ in batch.values() if row[COMPANY_ID] is not None]
+            result["unresolved_companies"] += len(batch) - len(rows)
+            if rows:
+                await queries.JOB_INGEST_CHANGE_REASON.fetch_one(conn, reason=f"feed:{rows[0][0]}")
+                await self._stage(conn, rows)
+                inserted, updated = await queries.JOB_INGEST_MERGE.fetch_one(conn, dedup=self.dedup is not None)
+                if self.dedup is not None:
+                    # Canonical jobs inserted by this same merge were not visible to it
+                    await queries.JOB_DEDUP_LINK.execute(conn)
+                await queries.JOB_INGEST_SKILLS_DELETE.execute(conn)
+                await queries.JOB_INGEST_SKILLS_UPSERT.execute(conn)
+                result["inserted"] += inserted
+                result["updated"] += updated
+                result["unchanged"] += len(rows) - inserted - updated
+            await conn.commit()
+
+    async def ingest(self, records: Iterable[Optional[Dict[str, Any]]], source: str) -> Dict[str, Any]:
+        """Ingest feed records for one external_source; returns counts for the run"""
+        source = source.strip().lower()
+        if not _SOURCE.match(source):
+            raise ValueError(f"Invalid feed source '{source}'")
+
+        if self._engine is None:
+            from app.core.database import engine
+            self._engine = engine
+
+        start = time.perf_counter()
+        maps = ReferenceMaps()
+        async with self._engine.connect() as conn:
+            await maps.load(conn)
+            if self.dedup is not None:
+                await self.dedup.ensure_loaded(conn)
+        normalizer = JobNormalizer(maps, source, self.dedup)
+        result: Dict[str, Any] = {
+            "source": source, "read": 0, "inserted": 0, "updated": 0, "unchanged": 0, "duplicates": 0,
+            "companies_created": 0, "unresolved_companies": 0, "batches": 0,
+        }
+
+        records = iter(records)
+        pending = asyncio.create_task(asyncio.to_thread(self._take_batch, records, normalizer))
+        while True:
+            read, rejected, batch = await pending
+            if not read:
+                break
+            # Normalize the next batch while this one is merged
+            pending = asyncio.create_task(asyncio.to_thread(self._take_batch, records, normalizer))
+            result["read"] += read
+            result["duplicates"] += read - rejected - len(batch)
+            if batch:
+                try:
+                    await self._merge(maps, batch, result)
+                except BaseException:
+                    pending.cancel()
+                    if self.dedup is not None:
+                        # It indexed jobs that were not written; reload it on the next run
+                        self.dedup.loaded = False
+                    raise
+            result["batches"] += 1
+            logger.debug("Job batch merged", source=source, batch=result["batches"], rows=len(batch))
+
+        result["rejected"] = dict(normalizer.rejected)
+        result["unresolved_locations"] = normalizer.unresolved_locations
+        result["unknown_skills"] = normalizer.unknown_skills
+        result["near_duplicates"] = normalizer.near_duplicates
+        if self.dedup is not None and self.dedup.path:
+            await asyncio.to_thread(self.dedup.save)
+        result["seconds"] = round(time.perf_counter() - start, 3)
+        result["jobs_per_hour"] = round(result["read"] / result["seconds"] * 3600) if result["seconds"] else None
+        logger.info("📥 Job feed ingested", **result)
+        return result
+
+    async def ingest_file(self, path: str, source: str, feed_format: Optional[str] = None) -> Dict[str, Any]:
+        return await self.ingest(read_feed(path, feed_format), source)
+
+
+# Global job ingestor (uses the application's engine)
+job_ingestor = JobIngestor(
+    settings.JOB_INGEST_BATCH_SIZE,
+    dedup=job_dedup_index if settings.JOB_DEDUP_ENABLED else None
+)
@@ -0,0 +1,160 @@
+"""
+Job Search
+Ranked full-text search over the active jobs with keyset pagination and a
+short-lived cache for repeated queries
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import base64
+import html
+import time
+import uuid
+import structlog
+
+from app.core import queries
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = structlog.get_logger()
+
+CacheKey = Tuple[str, Optional[str], int]
+
+
+def normalize_query(query: str) -> str:
+    """Case and whitespace do not change a search, so they do not get their own cache entries"""
+    return " ".join(query.casefold().split())
+
+
+def encode_cursor(rank: float, job_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{rank!r}|{job_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """(rank, job ID) of the last result of the previous page; ValueError when malformed"""
+    try:
+        rank, job_id = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split("|")
+        return float(rank), str(uuid.UUID(job_id))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _snippet(headline: Optional[str]) -> Optional[str]:
+    """HTML-escaped headline; only the <mark> tags around matches are kept"""
+    if not headline:
+        return None
+    return html.escape(headline).replace("&lt;mark&gt;", "<mark>").replace("&lt;/mark&gt;", "</mark>")
+
+
+class JobSearch:
+    """
+    Runs JOB_SEARCH and caches result pages.
+
+    A page is cached from the second time its query (normalized), cursor and
+    limit are asked for within cache_seconds, so one-off queries do not push
+    out popular ones. A cached page stores the revision of every job on it;
+    a hit re-reads those revisions by primary key, and the page is discarded
+    when any job was updated or deleted. Jobs added since are picked up when
+    the entry expires.
+    """
+
+    def __init__(self, cache_seconds: float, cache_size: int):
+        self.cache_seconds = cache_seconds
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.search_seconds = 0.0
+        self._cache: "OrderedDict[CacheKey, Tuple[float, Dict[str, Any], Dict[str, int]]]" = OrderedDict()
+        self._seen: "OrderedDict[CacheKey, float]" = OrderedDict()
+
+    async def _cached(self, db, key: CacheKey) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires, result, revisions = entry
+        if expires <= time.monotonic():
+            del self._cache[key]
+            return None
+        if revisions:
+            rows = await queries.JOB_SEARCH_REVISIONS.fetch_all(db, ids=list(revisions))
+            if len(rows) != len(revisions) or any(revisions[str(job_id)] != revision for job_id, revision in rows):
+                del self._cache[key]
+                self.invalidations += 1
+                return None
+        self._cache.move_to_end(key)
+        return result
+
+    def _store(self, key: CacheKey, result: Dict[str, Any], revisions: Dict[str, int]) -> None:
+        now = time.monotonic()
+        seen = self._seen.pop(key, None)
+        if seen is None or seen <= now:
+            self._seen[key] = now + self.cache_seconds
+            if len(self._seen) > self.cache_size * 4:
+                self._seen.popitem(last=False)
+            return
+        self._cache[key] = (now + self.cache_seconds, result, revisions)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def search(self, db, query: str, cursor: Optional[str] = None, limit: int = 20) -> Dict[str, Any]:
+        """
+        One page of jobs matching a web-search style query ("quoted phrases",
+        -excluded, or), best match first: {"query", "hits": [{"id", "rank",
+        "snippet"}], "next_cursor"}. Raises ValueError for a malformed cursor.
+        """
+        normalized = normalize_query(query)
+        after_rank, after_id = decode_cursor(cursor) if cursor else (None, None)
+        key = (normalized, cursor, limit)
+        if self.cache_seconds > 0:
+            cached = await self._cached(db, key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+        self.misses += 1
+
+        start = time.perf_counter()
+        rows = await queries.JOB_SEARCH.fetch_all(
+            db, query=normalized, after_rank=after_rank, after_id=after_id, limit=limit + 1
+        )
+        self.search_seconds += time.perf_counter() - start
+        hits: List[Dict[str, Any]] = [
+            {"id": str(job_id), "rank": rank, "snippet": _snippet(headline)}
+            for job_id, _, rank, headline in rows[:limit]
+        ]
+        result = {
+            "query": normalized,
+            "hits": hits,
+            "next_cursor": encode_cursor(hits[-1]["rank"], hits[-1]["id"]) if len(rows) > limit else None,
+        }
+        if self.cache_seconds > 0:
+            self._store(key, result, {str(job_id): revision for job_id, revision, _, _ in rows[:limit]})
+        return result
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._seen.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get search and cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "cached_pages": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "avg_search_ms": round(self.search_seconds / self.misses * 1000, 2) if self.misses else None,
+        }
+
+
+# Global job search
+job_search = JobSearch(settings.JOB_SEARCH_CACHE_SECONDS, settings.JOB_SEARCH_CACHE_SIZE)
+
+metrics.gauge("job_search_requests_total", "Job searches by cache result",
+              lambda: {("hit",): job_search.hits, ("miss",): job_search.misses},
+              ("result",), kind="counter")
+metrics.gauge("job_search_invalidations_total", "Cached search pages dropped because a listed job changed",
+              lambda: job_search.invalidations, kind="counter")
+metrics.gauge("job_search_seconds_total", "Time spent in full-text search queries",
+              lambda: job_search.search_seconds, kind="counter")
@@ -0,0 +1,306 @@
+"""
+Object Cache
+Node-local disk cache for bucket objects that are read again and again
+(resume originals for extraction, scoring and previews), bounded by size
+with least-recently-used eviction
+"""
+
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Tuple, Union
+import asyncio
+import functools
+import hashlib
+import mmap
+import os
+import re
+import uuid
+import structlog
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.storage import storage_service
+
+logger = structlog.get_logger()
+
+MB = 1024 * 1024
+CHUNK_SIZE = MB
+
+_ETAG_UNSAFE = re.compile(r"[^0-9A-Za-z-]")
+
+
+class CachedObject:
+    """A cached object file. Valid while the get() block that returned it is open."""
+
+    def __init__(self, file_key: str, etag: str, path: Path, size: int):
+        self.file_key = file_key
+        self.etag = etag
+        self.path = path
+        self.size = size
+        self.readers = 0
+        self.evicted = False
+
+    @contextmanager
+    def open(self) -> Iterator[Union[mmap.mmap, bytes]]:
+        """Map the file read-only; parsers read it like bytes without copying it into memory"""
+        if self.size == 0:
+            yield b""
+            return
+        with open(self.path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+    def read_bytes(self) -> bytes:
+        return self.path.read_bytes()
+
+
+class ObjectCache:
+    """
+    Files live under {directory}/{hh}/{rest of sha256(file_key)}.{etag}, so
+    an entry is keyed by the object key and its content hash (the ETag).
+    Downloads go to a temporary file that is fsynced and renamed into place;
+    a file with its final name is always complete.
+
+    The index (LRU order and total size) lives on the event loop. Concurrent
+    misses for the same key share one GET. Entries in use by a get() block
+    are not evicted until the block exits. The index is rebuilt from the
+    directory by start(), ordered by file modification time.
+
+    Workers on one node can share the directory: a miss first looks for a
+    file another worker wrote. The size limit is enforced by each worker
+    over the files it knows about.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, client_factory: Callable[[], Any], bucket: str):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._client_factory = client_factory
+        self.bucket = bucket
+        self._entries: "OrderedDict[str, CachedObject]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.shared = 0
+        self.evictions = 0
+        self.saved_bytes = 0
+        self.downloaded_bytes = 0
+
+    @staticmethod
+    def _name(file_key: str) -> str:
+        return hashlib.sha256(file_key.encode()).hexdigest()
+
+    def _path(self, name: str, etag: str) -> Path:
+        return self.directory / name[:2] / f"{name[2:]}.{etag}"
+
+    def _scan(self) -> list:
+        """Remove leftover temporary files and list cached files, oldest first"""
+        found = []
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for shard in self.directory.iterdir():
+            if not shard.is_dir():
+                continue
+            for path in shard.iterdir():
+                if path.name.endswith(".tmp"):
+                    path.unlink(missing_ok=True)
+                    continue
+                rest, _, etag = path.name.partition(".")
+                if not etag:
+                    continue
+                stat = path.stat()
+                found.append((stat.st_mtime, shard.name + rest, etag, path, stat.st_size))
+        found.sort()
+        return found
+
+    async def start(self) -> None:
+        """Load the files already on disk into the index"""
+        found = await asyncio.to_thread(self._scan)
+        for _, name, etag, path, size in found:
+            previous = self._entries.pop(name, None)
+            if previous is not None:
+                # An older content version of the same key
+                self.bytes -= previous.size
+                previous.path.unlink(missing_ok=True)
+            # The key itself is not recoverable from the file name, only its hash
+            self._entries[name] = CachedObject(name, etag, path, size)
+            self.bytes += size
+        self._evict()
+        logger.info("🗄️ Object cache loaded", directory=str(self.directory), files=len(self._entries),
+                    bytes=self.bytes)
+
+    def _remove(self, name: str) -> None:
+        entry = self._entries.pop(name)
+        self.bytes -= entry.size
+        entry.evicted = True
+        if entry.readers == 0:
+            entry.path.unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        excess = self.bytes - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        for name, entry in self._entries.items():
+            if entry.readers == 0:
+                victims.append(name)
+                excess -= entry.size
+                if excess <= 0:
+                    break
+        for name in victims:
+            self._remove(name)
+        self.evictions += len(victims)
+
+    def _fetch(self, name: str, file_key: str, etag: Optional[str]) -> Tuple[str, Path, int, bool]:
+        """Find the file written by another worker or download it; runs on a worker thread"""
+        shard = self.directory / name[:2]
+        shard.mkdir(parents=True, exist_ok=True)
+        if etag is not None:
+            path = self._path(name, etag)
+            if path.exists():
+                return etag, path, path.stat().st_size, True
+        else:
+            for path in shard.glob(f"{name[2:]}.*"):
+                if not path.name.endswith(".tmp"):
+                    return path.name.partition(".")[2], path, path.stat().st_size, True
+
+        temporary = shard / f"{name[2:]}.{uuid.uuid4().hex}.tmp"
+        try:
+            response = self._client_factory().get_object(Bucket=self.bucket, Key=file_key)
+            size = 0
+            with open(temporary, "wb") as f:
+                for chunk in response['Body'].iter_chunks(CHUNK_SIZE):
+                    f.write(chunk)
+                    size += len(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            fetched_etag = _ETAG_UNSAFE.sub("", response.get('ETag', "")) or hashlib.md5(
+                temporary.read_bytes()
+            ).hexdigest()
+            path = self._path(name, fetched_etag)
+            os.replace(temporary, path)
+        except BaseException:
+            temporary.unlink(missing_ok=True)
+            raise
+        return fetched_etag, path, size, False
+
+    async def _load(self, name: str, file_key: str, etag: Optional[str]) -> CachedObject:
+        fetched_etag, path, size, shared = await asyncio.to_thread(self._fetch, name, file_key, etag)
+        previous = self._entries.get(name)
+        if previous is not None and previous.path == path:
+            # Asked for another ETag, but the bucket still has the cached version
+            self._entries.move_to_end(name)
+            return previous
+        if previous is not None:
+            self._remove(name)
+        entry = self._entries[name] = CachedObject(file_key, fetched_etag, path, size)
+        self.bytes += size
+        if shared:
+            self.shared += 1
+            self.saved_bytes += size
+        else:
+            self.downloaded_bytes += size
+        return entry
+
+    def _loaded(self, name: str, task: asyncio.Task) -> None:
+        if self._inflight.get(name) is task:
+            del self._inflight[name]
+        if not task.cancelled():
+            # Retrieved so a failure every waiter stopped waiting for is not reported as unhandled
+            task.exception()
+
+    async def _lookup(self, file_key: str, etag: Optional[str]) -> CachedObject:
+        name = self._name(file_key)
+        entry = self._entries.get(name)
+        if entry is not None and (etag is None or entry.etag == etag):
+            if entry.path.exists():
+                self._entries.move_to_end(name)
+                entry.file_key = file_key
+                self.hits += 1
+                self.saved_bytes += entry.size
+                return entry
+            # Evicted by another worker sharing the directory
+            self._remove(name)
+
+        task = self._inflight.get(name)
+        if task is not None:
+            entry = await asyncio.shield(task)
+            if etag is None or entry.etag == etag:
+                self.coalesced += 1
+                self.saved_bytes += entry.size
+                return entry
+            task = self._inflight.get(name)
+
+        if task is None:
+            self.misses += 1
+            # A task, so a cancelled caller does not cancel the download the others wait for
+            task = self._inflight[name] = asyncio.create_task(self._load(name, file_key, etag))
+            task.add_done_callback(functools.partial(self._loaded, name))
+        return await asyncio.shield(task)
+
+    @asynccontextmanager
+    async def get(self, file_key: str, etag: Optional[str] = None) -> AsyncIterator[CachedObject]:
+        """
+        Cached copy of an object, downloaded on a miss. Pass the ETag when
+        known (from a listing or the database) to refetch a changed object.
+        The file is not evicted until the block exits.
+        """
+        if etag is not None:
+            etag = _ETAG_UNSAFE.sub("", etag)
+        entry = await self._lookup(file_key, etag)
+        entry.readers += 1
+        try:
+            yield entry
+        finally:
+            entry.readers -= 1
+            if entry.evicted and entry.readers == 0:
+                entry.path.unlink(missing_ok=True)
+            self._evict()
+
+    def invalidate(self, file_key: str) -> None:
+        """Drop a deleted or replaced object"""
+        name = self._name(file_key)
+        if name in self._entries:
+            self._remove(name)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        requests = self.hits + self.misses + self.coalesced
+        return {
+            "files": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "shared": self.shared,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.coalesced) / requests, 4) if requests else None,
+            "gets_saved": self.hits + self.coalesced + self.shared,
+            "bytes_saved": self.saved_bytes,
+            "bytes_downloaded": self.downloaded_bytes,
+        }
+
+
+# Global object cache
+object_cache = ObjectCache(
+    settings.OBJECT_CACHE_DIR,
+    settings.OBJECT_CACHE_MAX_MB * MB,
+    lambda: storage_service.client,
+    storage_service.bucket
+)
+
+metrics.gauge("object_cache_requests_total", "Object cache lookups by result",
+              lambda: {("hit",): object_cache.hits, ("miss",): object_cache.misses,
+                       ("coalesced",): object_cache.coalesced},
+              ("result",), kind="counter")
+metrics.gauge("object_cache_saved_bytes_total", "Bytes served from the object cache instead of a bucket GET",
+              lambda: object_cache.saved_bytes, kind="counter")
+metrics.gauge("object_cache_evictions_total", "Files evicted from the object cache",
+              lambda: object_cache.evictions, kind="counter")
+metrics.gauge("object_cache_bytes", "Size of the files in the object cache",
+              lambda: object_cache.bytes)
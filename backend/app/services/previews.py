@@ -0,0 +1,243 @@
+"""
+Resume Previews
+Page thumbnails rendered once at ingest in a process pool, stored under their
+own top-level prefix and served through the CDN with immutable cache headers
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+import asyncio
+import hashlib
+import hmac
+import multiprocessing
+import structlog
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.object_cache import object_cache
+from app.services.rendering import IMAGE_TYPES, RENDERABLE, render_pages
+from app.services.storage import storage_service
+
+logger = structlog.get_logger()
+
+# Part of every preview key; bump it to render all previews again under new keys
+PREVIEW_VERSION = 1
+
+# Preview keys never change content, so CDN and browsers may keep them for good
+PREVIEW_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+# Top-level prefix of all previews, kept apart from the user folders so file
+# listings and quotas only see originals
+PREVIEW_FOLDER = "previews"
+
+
+def preview_root(file_key: str) -> str:
+    """
+    Previews of an object, all versions: previews/{token}/. The token is an
+    HMAC of the key, so public preview URLs cannot be derived from
+    guessable original keys.
+    """
+    secret = (settings.PREVIEW_KEY_SECRET or settings.JWT_SECRET_KEY).encode()
+    token = hmac.new(secret, file_key.encode(), hashlib.sha256).hexdigest()[:24]
+    return f"{PREVIEW_FOLDER}/{token}/"
+
+
+def preview_prefix(file_key: str) -> str:
+    """Previews of an object at the current version: previews/{token}/v{version}/"""
+    return f"{preview_root(file_key)}v{PREVIEW_VERSION}/"
+
+
+def preview_key(file_key: str, page: int, width: int) -> str:
+    return f"{preview_prefix(file_key)}p{page}-w{width}.{settings.PREVIEW_FORMAT}"
+
+
+def preview_url(key: str) -> str:
+    if settings.DO_SPACES_CDN_ENDPOINT:
+        return f"{settings.DO_SPACES_CDN_ENDPOINT}/{key}"
+    return f"{settings.DO_SPACES_ENDPOINT}/{storage_service.bucket}/{key}"
+
+
+class PreviewRenderer:
+    """
+    Renders page previews of newly ingested files.
+
+    Keys are queued by the upload endpoints. Each is read through the object
+    cache and rendered in a process pool (a PDF page is CPU-bound and the
+    imaging libraries hold native memory), then the images are uploaded as
+    public objects with PREVIEW_CACHE_CONTROL. Pool processes are replaced
+    after PREVIEW_TASKS_PER_WORKER files to hand native memory back.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        widths: List[int],
+        max_pages: int,
+        image_format: str,
+        quality: int,
+        tasks_per_worker: int,
+        max_pending: int = 1000
+    ):
+        self.workers = workers
+        self.widths = widths
+        self.max_pages = max_pages
+        self.image_format = image_format
+        self.quality = quality
+        self.tasks_per_worker = tasks_per_worker
+        self.max_pending = max_pending
+        self.rendered = 0
+        self.pages = 0
+        self.failed = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.render_seconds = 0.0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: Set[str] = set()
+        self._tasks = []
+
+    def enqueue(self, file_key: str, filename: str) -> bool:
+        """Queue a file for rendering; False when it is not renderable, the queue is full or stopped"""
+        if self._queue is None:
+            return False
+        if Path(filename).suffix.lower().lstrip('.') not in RENDERABLE:
+            self.skipped += 1
+            return False
+        if file_key in self._pending:
+            return True
+        try:
+            self._queue.put_nowait((file_key, filename))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self._pending.add(file_key)
+        return True
+
+    def is_pending(self, file_key: str) -> bool:
+        return file_key in self._pending
+
+    def _upload(self, key: str, image: bytes) -> None:
+        storage_service.client.put_object(
+            Bucket=storage_service.bucket,
+            Key=key,
+            Body=image,
+            ContentType=IMAGE_TYPES[self.image_format],
+            CacheControl=PREVIEW_CACHE_CONTROL,
+            ACL='public-read'
+        )
+
+    async def render(self, file_key: str, filename: str) -> Dict[str, Any]:
+        """Render and upload previews of one file"""
+        extension = Path(filename).suffix.lower().lstrip('.')
+        async with object_cache.get(file_key) as cached:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self._pool, render_pages, str(cached.path), extension,
+                self.widths, self.max_pages, self.image_format, self.quality
+            )
+        await asyncio.gather(*(
+            asyncio.to_thread(self._upload, preview_key(file_key, page, width), image)
+            for page, width, image in result["images"]
+        ))
+        return result
+
+    async def _run(self) -> None:
+        while True:
+            file_key, filename = await self._queue.get()
+            try:
+                result = await self.render(file_key, filename)
+            except Exception as e:
+                self.failed += 1
+                logger.error("Preview rendering failed", file_key=file_key, error=str(e))
+                continue
+            finally:
+                self._pending.discard(file_key)
+
+            self.rendered += 1
+            self.pages += min(result["pages"], self.max_pages)
+            self.render_seconds += result["seconds"]
+            logger.info("🖼️ Previews rendered", file_key=file_key, pages=result["pages"],
+                        images=len(result["images"]), render_ms=round(result["seconds"] * 1000, 1))
+
+    async def list_previews(self, file_key: str) -> List[Dict[str, Any]]:
+        """Previews of a file as {page, width, url}, ordered by page and width"""
+        previews = []
+        for key, _, _ in await asyncio.to_thread(storage_service.list_objects, preview_prefix(file_key)):
+            page, _, width = Path(key).stem.partition("-")
+            previews.append({"page": int(page[1:]), "width": int(width[1:]), "url": preview_url(key)})
+        return sorted(previews, key=lambda preview: (preview["page"], preview["width"]))
+
+    async def delete(self, file_key: str) -> int:
+        """
+        Delete every preview (all versions) of a file, including any still
+        stored beside the original; returns the number deleted
+        """
+        def delete_all():
+            keys = [key for prefix in (preview_root(file_key), f"{file_key}.previews/")
+                    for key, _, _ in storage_service.list_objects(prefix)]
+            for start in range(0, len(keys), 1000):
+                storage_service.client.delete_objects(
+                    Bucket=storage_service.bucket,
+                    Delete={'Objects': [{'Key': key} for key in keys[start:start + 1000]], 'Quiet': True}
+                )
+            return len(keys)
+
+        return await asyncio.to_thread(delete_all)
+
+    def start(self) -> None:
+        if self._tasks or self.workers <= 0:
+            return
+        # Spawned, not forked: the app's threads and connections stay out of the workers
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=self.tasks_per_worker
+        )
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._queue = None
+        self._pending.clear()
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.to_thread(pool.shutdown, True, cancel_futures=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get rendering statistics"""
+        return {
+            "pending": len(self._pending),
+            "rendered": self.rendered,
+            "pages": self.pages,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "dropped": self.dropped,
+            "avg_render_ms": round(self.render_seconds / self.rendered * 1000, 1) if self.rendered else None,
+        }
+
+
+# Global preview renderer
+preview_renderer = PreviewRenderer(
+    workers=settings.PREVIEW_WORKERS,
+    widths=settings.preview_widths_list,
+    max_pages=settings.PREVIEW_MAX_PAGES,
+    image_format=settings.PREVIEW_FORMAT,
+    quality=settings.PREVIEW_QUALITY,
+    tasks_per_worker=settings.PREVIEW_TASKS_PER_WORKER
+)
+
+metrics.gauge("preview_pending", "Files waiting for preview rendering",
+              lambda: len(preview_renderer._pending))
+metrics.gauge("preview_rendered_total", "Files with rendered previews",
+              lambda: preview_renderer.rendered, kind="counter")
+metrics.gauge("preview_render_seconds_total", "Time spent rendering previews in the process pool",
+              lambda: preview_renderer.render_seconds, kind="counter")
@@ -0,0 +1,117 @@
+"""
+Page Rendering
+Thumbnail rendering for PDF, DOCX and TXT resumes. Runs in the preview
+process pool, so it imports nothing from the app and loads the imaging
+libraries only when a file is rendered.
+"""
+
+from typing import Any, Dict, Iterable, List, Tuple
+import io
+import textwrap
+import time
+
+# Letter-size page for text documents, in points
+TEXT_PAGE_SIZE = (612, 792)
+TEXT_MARGIN = 54
+TEXT_FONT_SIZE = 10
+TEXT_LINE_HEIGHT = 13
+
+# Pages taller than this many times their width are cropped
+MAX_ASPECT = 2
+
+IMAGE_TYPES = {"webp": "image/webp", "png": "image/png", "jpeg": "image/jpeg"}
+RENDERABLE = ("pdf", "docx", "txt")
+
+
+def _pdf_pages(path: str, width: int, max_pages: int) -> Tuple[int, List[Any]]:
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(path)
+    try:
+        images = []
+        for index in range(min(len(pdf), max_pages)):
+            page = pdf[index]
+            try:
+                page_width, page_height = page.get_size()
+                scale = width / page_width
+                crop = (0, max(0, page_height - page_width * MAX_ASPECT), 0, 0)
+                bitmap = page.render(scale=scale, crop=crop)
+                images.append(bitmap.to_pil())
+                bitmap.close()
+            finally:
+                page.close()
+        return len(pdf), images
+    finally:
+        pdf.close()
+
+
+def _document_text(path: str, extension: str) -> str:
+    if extension == "docx":
+        import docx
+
+        return "\n".join(paragraph.text for paragraph in docx.Document(path).paragraphs)
+    with open(path, "rb") as f:
+        return f.read().decode("utf-8", errors="replace")
+
+
+def _text_pages(path: str, extension: str, width: int, max_pages: int) -> Tuple[int, List[Any]]:
+    """Lay the text out on letter-size pages with the default font"""
+    from PIL import Image, ImageDraw, ImageFont
+
+    scale = width / TEXT_PAGE_SIZE[0]
+    size = (width, round(TEXT_PAGE_SIZE[1] * scale))
+    font = ImageFont.load_default(size=max(1, round(TEXT_FONT_SIZE * scale)))
+    columns = int((TEXT_PAGE_SIZE[0] - 2 * TEXT_MARGIN) / (TEXT_FONT_SIZE * 0.55))
+    rows = int((TEXT_PAGE_SIZE[1] - 2 * TEXT_MARGIN) / TEXT_LINE_HEIGHT)
+
+    lines = []
+    for paragraph in _document_text(path, extension).splitlines():
+        lines.extend(textwrap.wrap(paragraph, columns) or [""])
+    total = max(1, -(-len(lines) // rows))
+
+    images = []
+    for page in range(min(total, max_pages)):
+        image = Image.new("RGB", size, "white")
+        draw = ImageDraw.Draw(image)
+        for row, line in enumerate(lines[page * rows:(page + 1) * rows]):
+            draw.text(
+                (TEXT_MARGIN * scale, (TEXT_MARGIN + row * TEXT_LINE_HEIGHT) * scale), line, fill="black", font=font
+            )
+        images.append(image)
+    return total, images
+
+
+def render_pages(
+    path: str,
+    extension: str,
+    widths: Iterable[int],
+    max_pages: int,
+    image_format: str = "webp",
+    quality: int = 80
+) -> Dict[str, Any]:
+    """
+    Render the first max_pages pages of a file at each width (pixels).
+    Pages are rasterised once at the largest width and scaled down for
+    the others.
+
+    Returns {"pages": page count of the document, "images": [(page number,
+    width, encoded image)], "seconds": render time}.
+    """
+    from PIL import Image
+
+    start = time.perf_counter()
+    widths = sorted(set(widths), reverse=True)
+    if extension == "pdf":
+        total, pages = _pdf_pages(path, widths[0], max_pages)
+    else:
+        total, pages = _text_pages(path, extension, widths[0], max_pages)
+
+    images = []
+    for number, page in enumerate(pages, start=1):
+        for width in widths:
+            if page.width != width:
+                page = page.resize((width, round(page.height * width / page.width)), Image.Resampling.LANCZOS)
+            encoded = io.BytesIO()
+            page.convert("RGB").save(encoded, format=image_format.upper(), quality=quality)
+            images.append((number, width, encoded.getvalue()))
+    return {"pages": total, "images": images, "seconds": time.perf_counter() - start}
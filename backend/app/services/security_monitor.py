@@ -0,0 +1,335 @@
+"""
+Security Monitor
+Online detection of suspicious session activity from login and refresh events
+"""
+
+from collections import deque, OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import asyncio
+import json
+import time
+import structlog
+
+from app.core.metrics import metrics
+
+logger = structlog.get_logger()
+
+# Event kinds fed by the auth routes
+LOGIN = "login"
+REFRESH = "refresh"
+FAILED_LOGIN = "failed_login"
+
+
+class UserActivityWindow:
+    """
+    Sliding-window state for one user.
+    Events older than the window are evicted lazily when new ones arrive;
+    the event deque and the known IP/device sets are bounded.
+    """
+
+    __slots__ = (
+        "events", "ip_counts", "device_counts", "pair_counts", "failures",
+        "known_ips", "known_devices", "alerts", "alert_keys", "last_failed_at"
+    )
+
+    def __init__(self, max_alerts: int):
+        # (timestamp, kind, ip, device)
+        self.events: Deque[Tuple[float, str, str, str]] = deque()
+        self.ip_counts: Dict[str, int] = {}
+        self.device_counts: Dict[str, int] = {}
+        self.pair_counts: Dict[Tuple[str, str], int] = {}
+        self.failures: Deque[float] = deque()
+        self.known_ips: "OrderedDict[str, None]" = OrderedDict()
+        self.known_devices: "OrderedDict[str, None]" = OrderedDict()
+        self.alerts: Deque[Dict[str, Any]] = deque(maxlen=max_alerts)
+        self.alert_keys: Dict[Tuple[str, str], float] = {}
+        self.last_failed_at: Optional[float] = None
+
+    def evict(self, cutoff: float) -> None:
+        events = self.events
+        while events and events[0][0] < cutoff:
+            _, _, ip, device = events.popleft()
+            self._decrement(self.ip_counts, ip)
+            self._decrement(self.device_counts, device)
+            self._decrement(self.pair_counts, (ip, device))
+
+    @staticmethod
+    def _decrement(counts: Dict, key) -> None:
+        remaining = counts[key] - 1
+        if remaining:
+            counts[key] = remaining
+        else:
+            del counts[key]
+
+
+class SecurityMonitor:
+    """
+    Streaming detector keeping per-user activity windows in memory.
+
+    Rules (each alert is raised at most once per user and key per window):
+    - multiple_logins: more than `max_logins_per_pair` logins from the same IP and device
+    - many_ips: `max_distinct_ips` or more distinct IPs
+    - failed_logins: `max_failures` or more failed logins within the failure window
+    - new_device: a login from a device never seen for this user
+    """
+
+    def __init__(
+        self,
+        window_seconds: int = 3600,
+        failure_window_seconds: int = 900,
+        max_logins_per_pair: int = 3,
+        max_distinct_ips: int = 5,
+        max_failures: int = 5,
+        max_events_per_user: int = 256,
+        max_known_per_user: int = 32,
+        max_alerts_per_user: int = 20,
+        max_users: int = 100_000,
+        alert_sink: Optional[Callable[[str, Dict[str, Any]], None]] = None
+    ):
+        self.window_seconds = window_seconds
+        self.failure_window_seconds = failure_window_seconds
+        self.max_logins_per_pair = max_logins_per_pair
+        self.max_distinct_ips = max_distinct_ips
+        self.max_failures = max_failures
+        self.max_events_per_user = max_events_per_user
+        self.max_known_per_user = max_known_per_user
+        self.max_alerts_per_user = max_alerts_per_user
+        self.max_users = max_users
+        self.alert_sink = alert_sink
+        self.events_processed = 0
+        self.alerts_raised = 0
+        self._users: "OrderedDict[str, UserActivityWindow]" = OrderedDict()
+
+    def _window(self, user_id: str) -> UserActivityWindow:
+        users = self._users
+        window = users.get(user_id)
+        if window is None:
+            window = UserActivityWindow(self.max_alerts_per_user)
+            users[user_id] = window
+            if len(users) > self.max_users:
+                users.popitem(last=False)
+        else:
+            users.move_to_end(user_id)
+        return window
+
+    def record(self, user_id: str, kind: str, ip: Optional[str], device: Optional[str], now: Optional[float] = None) -> None:
+        """Feed one event; cheap enough to call inline on the request path"""
+        now = time.time() if now is None else now
+        ip = ip or "unknown"
+        device = device or "unknown"
+        window = self._window(str(user_id))
+        self.events_processed += 1
+
+        if kind == FAILED_LOGIN:
+            failures = window.failures
+            failures.append(now)
+            cutoff = now - self.failure_window_seconds
+            while failures and failures[0] < cutoff:
+                failures.popleft()
+            window.last_failed_at = now
+            if len(failures) >= self.max_failures:
+                self._alert(user_id, window, now, "failed_logins", ip,
+                            f"{len(failures)} failed login attempts",
+                            {"ip_address": ip, "failed_count": len(failures)})
+            return
+
+        window.evict(now - self.window_seconds)
+        if len(window.events) >= self.max_events_per_user:
+            window.evict(window.events[0][0] + 1e-9)
+
+        window.events.append((now, kind, ip, device))
+        window.ip_counts[ip] = window.ip_counts.get(ip, 0) + 1
+        window.device_counts[device] = window.device_counts.get(device, 0) + 1
+        pair = (ip, device)
+        pair_count = window.pair_counts.get(pair, 0) + 1
+        window.pair_counts[pair] = pair_count
+
+        if kind == LOGIN:
+            if pair_count > self.max_logins_per_pair:
+                self._alert(user_id, window, now, "multiple_logins", f"{ip}|{device}",
+                            f"Multiple logins from IP {ip}",
+                            {"ip_address": ip, "login_count": pair_count, "device": device})
+            if window.known_devices and device not in window.known_devices:
+                self._alert(user_id, window, now, "new_device", device,
+                            f"Login from a new device ({device})",
+                            {"ip_address": ip, "device": device})
+
+        if len(window.ip_counts) >= self.max_distinct_ips:
+            self._alert(user_id, window, now, "many_ips", "ips",
+                        f"Activity from {len(window.ip_counts)} different IPs",
+                        {"distinct_ips": len(window.ip_counts)})
+
+        self._remember(window.known_ips, ip)
+        self._remember(window.known_devices, device)
+
+    def _remember(self, known: "OrderedDict[str, None]", key: str) -> None:
+        if key in known:
+            known.move_to_end(key)
+            return
+        known[key] = None
+        if len(known) > self.max_known_per_user:
+            known.popitem(last=False)
+
+    def _alert(
+        self,
+        user_id: str,
+        window: UserActivityWindow,
+        now: float,
+        alert_type: str,
+        key: str,
+        description: str,
+        metadata: Dict[str, Any]
+    ) -> None:
+        alert_key = (alert_type, key)
+        last = window.alert_keys.get(alert_key)
+        if last is not None and now - last < self.window_seconds:
+            return
+        window.alert_keys[alert_key] = now
+        if len(window.alert_keys) > self.max_alerts_per_user * 4:
+            cutoff = now - self.window_seconds
+            window.alert_keys = {k: t for k, t in window.alert_keys.items() if t >= cutoff}
+
+        alert = {
+            "type": alert_type,
+            "description": description,
+            "timestamp": datetime.utcfromtimestamp(now).isoformat(),
+            "metadata": metadata
+        }
+        window.alerts.appendleft(alert)
+        self.alerts_raised += 1
+        if self.alert_sink is not None:
+            self.alert_sink(str(user_id), alert)
+
+    def has_state(self, user_id: str) -> bool:
+        return str(user_id) in self._users
+
+    def get_alerts(self, user_id: str, since_seconds: int = 86400) -> List[Dict[str, Any]]:
+        """Recent alerts for a user, newest first"""
+        window = self._users.get(str(user_id))
+        if window is None:
+            return []
+        cutoff = datetime.utcnow() - timedelta(seconds=since_seconds)
+        return [a for a in window.alerts if datetime.fromisoformat(a["timestamp"]) >= cutoff]
+
+    def get_last_failed_login(self, user_id: str) -> Optional[datetime]:
+        window = self._users.get(str(user_id))
+        if window is None or window.last_failed_at is None:
+            return None
+        return datetime.utcfromtimestamp(window.last_failed_at)
+
+    def get_recent_failures(self, user_id: str) -> int:
+        window = self._users.get(str(user_id))
+        if window is None:
+            return 0
+        cutoff = time.time() - self.failure_window_seconds
+        return sum(1 for t in window.failures if t >= cutoff)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get detector statistics"""
+        return {
+            "tracked_users": len(self._users),
+            "events_processed": self.events_processed,
+            "alerts_raised": self.alerts_raised
+        }
+
+
+class NotificationAlertSink:
+    """Persists alerts to the notifications table from a background task"""
+
+    def __init__(self, max_pending: int = 1000):
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __call__(self, user_id: str, alert: Dict[str, Any]) -> None:
+        if self._queue is None:
+            return
+        try:
+            self._queue.put_nowait((user_id, alert))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _run(self) -> None:
+        from app.core import queries
+        from app.core.database import AsyncSessionLocal
+
+        while True:
+            user_id, alert = await self._queue.get()
+            try:
+                async with AsyncSessionLocal() as db:
+                    await queries.SECURITY_ALERT_INSERT.execute(
+                        db,
+                        user_id=user_id,
+                        title=alert["type"].replace("_", " ").capitalize(),
+                        message=alert["description"],
+                        data=json.dumps(
+                            {"type": alert["type"], "timestamp": alert["timestamp"], "metadata": alert["metadata"]},
+                            default=str
+                        )
+                    )
+                    await db.commit()
+            except Exception as e:
+                logger.error("Failed to persist security alert", error=str(e), user_id=user_id)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._queue = None
+
+
+def persisted_alert(row) -> Dict[str, Any]:
+    """An alert as raised, from its SECURITY_ALERTS_RECENT row"""
+    data = row.data
+    if isinstance(data, str):
+        data = json.loads(data)
+    if not data:
+        # Stored before the alert itself was kept; the title is the type, capitalized
+        data = {"type": row.title.lower().replace(" ", "_"), "metadata": {"title": row.title}}
+    return {
+        "type": data["type"],
+        "description": row.message,
+        "timestamp": data.get("timestamp") or row.created_at.replace(tzinfo=None).isoformat(),
+        "metadata": data.get("metadata") or {}
+    }
+
+
+def merge_alerts(*sources: List[Dict[str, Any]], limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Alerts from several sources, newest first and without duplicates. An
+    alert raised here shows up both locally and, once persisted, in the
+    database; alerts raised by other workers only in the database.
+    """
+    merged = {}
+    for alerts in sources:
+        for alert in alerts:
+            merged.setdefault((alert["type"], alert["timestamp"], alert["description"]), alert)
+    return sorted(merged.values(), key=lambda alert: alert["timestamp"], reverse=True)[:limit]
+
+
+def device_key(device_info) -> str:
+    """Compact device identity used by the detector"""
+    if device_info is None:
+        return "unknown"
+    return f"{device_info.device_type}|{device_info.os}|{device_info.browser}"
+
+
+# Global monitor instance
+alert_sink = NotificationAlertSink()
+security_monitor = SecurityMonitor(alert_sink=alert_sink)
+
+metrics.gauge("security_alert_queue", "Security alerts waiting to be persisted",
+              lambda: alert_sink._queue.qsize() if alert_sink._queue is not None else 0)
+metrics.gauge("security_monitor_tracked_users", "Users with activity windows in memory",
+              lambda: len(security_monitor._users))
@@ -4,15 +4,17 @@ Database operations for user session management
 """
 
 import hashlib
+import json
 import secrets
 import uuid
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text, and_, or_
 from sqlalchemy.exc import IntegrityError
 
+from app.core import queries
 from app.core.config import settings
+from app.core.queries import SessionRecord
 from app.models.session import (
     SessionCreate, SessionResponse, ActiveSessionsResponse, 
     SessionStats, DeviceInfo
@@ -39,34 +41,28 @@ class SessionService:
         jwt_jti: str,
         token: str,
         session_data: SessionCreate,
-        expires_at: datetime
+        expires_at: datetime,
+        session_id: Optional[str] = None
     ) -> str:
         """Create a new user session"""
-        session_id = str(uuid.uuid4())
+        session_id = session_id or str(uuid.uuid4())
         token_hash = SessionService.generate_token_hash(token)
         
         # Convert device info to JSONB if provided
         device_info_json = None
         if session_data.device_info:
-            import json
             device_info_json = json.dumps(session_data.device_info.model_dump())
         
         try:
-            await db.execute(
-                text("""
-                    INSERT INTO user_sessions 
-                    (id, user_id, token_hash, jwt_jti, device_info, ip_address, expires_at)
-                    VALUES (:id, :user_id, :token_hash, :jwt_jti, :device_info, :ip_address, :expires_at)
-                """),
-                {
-                    "id": session_id,
-                    "user_id": user_id,
-                    "token_hash": token_hash,
-                    "jwt_jti": jwt_jti,
-                    "device_info": device_info_json,
-                    "ip_address": str(session_data.ip_address) if session_data.ip_address else None,
-                    "expires_at": expires_at
-                }
+            await queries.SESSION_INSERT.execute(
+                db,
+                id=session_id,
+                user_id=user_id,
+                token_hash=token_hash,
+                jwt_jti=jwt_jti,
+                device_info=device_info_json,
+                ip_address=str(session_data.ip_address) if session_data.ip_address else None,
+                expires_at=expires_at
             )
             await db.commit()
             return session_id
@@ -76,62 +72,47 @@ class SessionService:
             raise ValueError("Failed to create session - token already exists")
     
     @staticmethod
-    async def get_session_by_token(db: AsyncSession, token: str) -> Optional[Dict]:
-        """Get session by token hash"""
-        token_hash = SessionService.generate_token_hash(token)
+    async def rotate_session(
+        db: AsyncSession,
+        session_id: str,
+        user_id: str,
+        generation: int,
+        jwt_jti: str,
+        session_data: SessionCreate,
+        expires_at: datetime
+    ) -> Tuple[Optional[int], bool]:
+        """
+        Rotate a session's refresh token in place.
+        Returns (new generation, reuse detected); the generation is None when
+        the session is revoked, expired or unknown, or the token was reused.
+        """
+        device_info_json = None
+        if session_data.device_info:
+            device_info_json = json.dumps(session_data.device_info.model_dump())
         
-        result = await db.execute(
-            text("""
-                SELECT id, user_id, jwt_jti, device_info, ip_address, 
-                       expires_at, is_revoked, created_at
-                FROM user_sessions 
-                WHERE token_hash = :token_hash 
-                AND expires_at > NOW() 
-                AND is_revoked = FALSE
-            """),
-            {"token_hash": token_hash}
+        row = await queries.SESSION_ROTATE.fetch_one(
+            db,
+            session_id=session_id,
+            user_id=user_id,
+            generation=generation,
+            jwt_jti=jwt_jti,
+            device_info=device_info_json,
+            ip_address=str(session_data.ip_address) if session_data.ip_address else None,
+            expires_at=expires_at
         )
-        
-        row = result.fetchone()
-        if row:
-            return {
-                "id": str(row.id),
-                "user_id": str(row.user_id),
-                "jwt_jti": row.jwt_jti,
-                "device_info": row.device_info,
-                "ip_address": str(row.ip_address) if row.ip_address else None,
-                "expires_at": row.expires_at,
-                "is_revoked": row.is_revoked,
-                "created_at": row.created_at
-            }
-        return None
+        await db.commit()
+        return row[0], bool(row[1])
+    
+    @staticmethod
+    async def get_session_by_token(db: AsyncSession, token: str) -> Optional[SessionRecord]:
+        """Get active session by token hash"""
+        token_hash = SessionService.generate_token_hash(token)
+        return await queries.SESSION_BY_TOKEN_HASH.fetch_one(db, token_hash=token_hash)
     
     @staticmethod
-    async def get_session_by_jwt_jti(db: AsyncSession, jwt_jti: str) -> Optional[Dict]:
+    async def get_session_by_jwt_jti(db: AsyncSession, jwt_jti: str) -> Optional[SessionRecord]:
         """Get session by JWT JTI"""
-        result = await db.execute(
-            text("""
-                SELECT id, user_id, token_hash, device_info, ip_address,
-                       expires_at, is_revoked, created_at
-                FROM user_sessions 
-                WHERE jwt_jti = :jwt_jti
-            """),
-            {"jwt_jti": jwt_jti}
-        )
-        
-        row = result.fetchone()
-        if row:
-            return {
-                "id": str(row.id),
-                "user_id": str(row.user_id),
-                "token_hash": row.token_hash,
-                "device_info": row.device_info,
-                "ip_address": str(row.ip_address) if row.ip_address else None,
-                "expires_at": row.expires_at,
-                "is_revoked": row.is_revoked,
-                "created_at": row.created_at
-            }
-        return None
+        return await queries.SESSION_BY_JWT_JTI.fetch_one(db, jwt_jti=jwt_jti)
     
     @staticmethod
     async def get_user_active_sessions(
@@ -141,40 +122,26 @@ class SessionService:
     ) -> ActiveSessionsResponse:
         """Get all active sessions for a user"""
         try:
-            result = await db.execute(
-                text("""
-                    SELECT id, device_info, ip_address, expires_at, 
-                           is_revoked, created_at
-                    FROM user_sessions 
-                    WHERE user_id = :user_id 
-                    AND expires_at > NOW() 
-                    AND is_revoked = FALSE
-                    ORDER BY created_at DESC
-                """),
-                {"user_id": user_id}
-            )
-            
-            rows = result.fetchall()
+            records = await queries.SESSIONS_ACTIVE_FOR_USER.fetch_all(db, user_id=user_id)
             
             sessions = []
-            for row in rows:
+            for record in records:
                 # Parse device_info JSON if present
                 device_info = None
-                if row.device_info:
-                    import json
+                if record.device_info:
                     try:
-                        device_info = json.loads(row.device_info) if isinstance(row.device_info, str) else row.device_info
+                        device_info = json.loads(record.device_info) if isinstance(record.device_info, str) else record.device_info
                     except (json.JSONDecodeError, TypeError):
-                        device_info = row.device_info
+                        device_info = record.device_info
                 
                 sessions.append(SessionResponse(
-                    id=str(row.id),
+                    id=str(record.id),
                     user_id=user_id,
                     device_info=device_info,
-                    ip_address=str(row.ip_address) if row.ip_address else None,
-                    expires_at=row.expires_at,
-                    is_revoked=row.is_revoked,
-                    created_at=row.created_at
+                    ip_address=str(record.ip_address) if record.ip_address else None,
+                    expires_at=record.expires_at,
+                    is_revoked=record.is_revoked,
+                    created_at=record.created_at
                 ))
 
             return ActiveSessionsResponse(
@@ -193,25 +160,15 @@ class SessionService:
         user_id: Optional[str] = None
     ) -> bool:
         """Revoke a specific session"""
-        conditions = ["id = :session_id"]
-        params = {"session_id": session_id}
-        
         if user_id:
-            conditions.append("user_id = :user_id")
-            params["user_id"] = user_id
-        
-        result = await db.execute(
-            text(f"""
-                UPDATE user_sessions 
-                SET is_revoked = TRUE, updated_at = NOW()
-                WHERE {' AND '.join(conditions)}
-                AND is_revoked = FALSE
-            """),
-            params
-        )
+            rowcount = await queries.SESSION_REVOKE_FOR_USER.execute(
+                db, session_id=session_id, user_id=user_id
+            )
+        else:
+            rowcount = await queries.SESSION_REVOKE.execute(db, session_id=session_id)
         
         await db.commit()
-        return result.rowcount > 0
+        return rowcount > 0
     
     @staticmethod
     async def revoke_sessions_by_jwt_jti(
@@ -221,22 +178,11 @@ class SessionService:
         """Revoke sessions by JWT JTI list"""
         if not jwt_jtis:
             return 0
-            
-        placeholders = ",".join([f":jti_{i}" for i in range(len(jwt_jtis))])
-        params = {f"jti_{i}": jti for i, jti in enumerate(jwt_jtis)}
         
-        result = await db.execute(
-            text(f"""
-                UPDATE user_sessions 
-                SET is_revoked = TRUE
-                WHERE jwt_jti IN ({placeholders})
-                AND is_revoked = FALSE
-            """),
-            params
-        )
+        rowcount = await queries.SESSIONS_REVOKE_BY_JWT_JTI.execute(db, jwt_jtis=list(jwt_jtis))
         
         await db.commit()
-        return result.rowcount
+        return rowcount
     
     @staticmethod
     async def revoke_all_user_sessions(
@@ -245,81 +191,58 @@ class SessionService:
         exclude_session_id: Optional[str] = None
     ) -> int:
         """Revoke all sessions for a user except optionally one"""
-        conditions = ["user_id = :user_id", "is_revoked = FALSE"]
-        params = {"user_id": user_id}
-        
-        if exclude_session_id:
-            conditions.append("id != :exclude_session_id")
-            params["exclude_session_id"] = exclude_session_id
-        
-        result = await db.execute(
-            text(f"""
-                UPDATE user_sessions 
-                SET is_revoked = TRUE
-                WHERE {' AND '.join(conditions)}
-            """),
-            params
+        rowcount = await queries.SESSIONS_REVOKE_ALL_FOR_USER.execute(
+            db, user_id=user_id, exclude_session_id=exclude_session_id
         )
         
         await db.commit()
-        return result.rowcount
+        return rowcount
+    
+    @staticmethod
+    async def expire_sessions(db: AsyncSession) -> int:
+        """Fold newly expired sessions into the per-user stats counters"""
+        result = await db.execute(queries.SESSIONS_SWEEP_EXPIRED.statement)
+        swept = result.scalar() or 0
+        
+        await db.commit()
+        return swept
     
     @staticmethod
     async def cleanup_expired_sessions(db: AsyncSession) -> int:
         """Clean up expired sessions"""
-        result = await db.execute(
-            text("""
-                DELETE FROM user_sessions 
-                WHERE expires_at < NOW() - INTERVAL '30 days'
-                OR (is_revoked = TRUE AND created_at < NOW() - INTERVAL '7 days')
-            """)
-        )
+        # Count expirations before the rows disappear
+        await db.execute(queries.SESSIONS_SWEEP_EXPIRED.statement)
+        rowcount = await queries.SESSIONS_CLEANUP.execute(db)
         
         await db.commit()
-        return result.rowcount
+        return rowcount
     
     @staticmethod
     async def get_session_stats(db: AsyncSession, user_id: str) -> SessionStats:
-        """Get session statistics for a user"""
-        result = await db.execute(
-            text("""
-                SELECT 
-                    COUNT(*) as total_sessions,
-                    COUNT(*) FILTER (WHERE expires_at > NOW() AND is_revoked = FALSE) as active_sessions,
-                    COUNT(*) FILTER (WHERE is_revoked = TRUE) as revoked_sessions,
-                    COUNT(*) FILTER (WHERE expires_at <= NOW()) as expired_sessions,
-                    COUNT(DISTINCT device_info->>'device_type') as unique_devices,
-                    MAX(created_at) as most_recent_activity
-                FROM user_sessions 
-                WHERE user_id = :user_id
-            """),
-            {"user_id": user_id}
-        )
-        
-        row = result.fetchone()
-        
-        # Calculate average session duration
-        duration_result = await db.execute(
-            text("""
-                SELECT AVG(
-                    EXTRACT(EPOCH FROM LEAST(expires_at, COALESCE(updated_at, NOW())) - created_at) / 3600
-                ) as avg_duration_hours
-                FROM user_sessions 
-                WHERE user_id = :user_id 
-                AND created_at >= NOW() - INTERVAL '30 days'
-            """),
-            {"user_id": user_id}
-        )
+        """
+        Get session statistics for a user from the maintained counters.
+        Sessions that expired since the last sweep are counted on the fly.
+        """
+        stats = await queries.SESSION_STATS.fetch_one(db, user_id=user_id)
+        if stats is None:
+            return SessionStats(
+                total_sessions=0,
+                active_sessions=0,
+                revoked_sessions=0,
+                expired_sessions=0,
+                unique_devices=0
+            )
         
-        duration_row = duration_result.fetchone()
-        avg_duration = duration_row.avg_duration_hours if duration_row else None
+        expired = stats.expired_sessions + stats.pending_expired
+        ended = stats.ended_sessions + stats.pending_expired
+        ended_seconds = float(stats.ended_duration_seconds) + float(stats.pending_duration_seconds)
         
         return SessionStats(
-            total_sessions=row.total_sessions or 0,
-            active_sessions=row.active_sessions or 0,
-            revoked_sessions=row.revoked_sessions or 0,
-            expired_sessions=row.expired_sessions or 0,
-            unique_devices=row.unique_devices or 0,
-            most_recent_activity=row.most_recent_activity,
-            average_session_duration=float(avg_duration) if avg_duration else None
+            total_sessions=stats.total_sessions,
+            active_sessions=max(stats.total_sessions - stats.revoked_sessions - expired, 0),
+            revoked_sessions=stats.revoked_sessions,
+            expired_sessions=expired,
+            unique_devices=len(stats.device_types or []),
+            most_recent_activity=stats.most_recent_activity,
+            average_session_duration=ended_seconds / ended / 3600 if ended else None
         )
@@ -0,0 +1,227 @@
+"""
+Session Epochs
+Per-user revocation counters that let access tokens be verified without a
+database lookup
+"""
+
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import time
+import structlog
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = structlog.get_logger()
+
+# NOTIFY channel written by bump_session_epochs() in migration.sql
+EPOCH_CHANNEL = "session_epochs"
+
+
+class SessionEpochTable:
+    """
+    Every revocation of a user's sessions (and deactivation, password or email
+    change, or deletion of the user) increments the user's epoch in
+    user_session_epochs, which also sends NOTIFY session_epochs 'user_id:epoch'.
+    Each worker LISTENs and keeps the epochs bumped within the last access-token
+    lifetime in memory. Access tokens carry the epoch at issuance ("sep").
+
+    A token whose epoch matches is accepted after the signature check alone.
+    A user absent from the table had nothing revoked while any unexpired token
+    could have been issued, so epoch 0 matches too. Any mismatch, a token
+    without "sep", or a lost LISTEN connection sends the request down the
+    user_sessions lookup, so the fast path can only ever be skipped, not
+    wrongly taken, apart from the NOTIFY delivery delay.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        retention_seconds: float,
+        resync_interval_seconds: float,
+        user_cache_seconds: float,
+        user_cache_size: int
+    ):
+        self.enabled = enabled
+        self.retention_seconds = retention_seconds
+        self.resync_interval_seconds = resync_interval_seconds
+        self.user_cache_seconds = user_cache_seconds
+        self.user_cache_size = user_cache_size
+        self.ready = False
+        self.fast_path = 0
+        self.fallbacks = 0
+        self.notifications = 0
+        self.reconnects = 0
+        self._epochs: Dict[str, Tuple[int, float]] = {}
+        self._users: Dict[str, Tuple[float, int, Any]] = {}
+        self._engine = None
+        self._conn = None
+        self._task: Optional[asyncio.Task] = None
+
+    def current(self, user_id: str) -> int:
+        """Epoch to put into a new access token"""
+        entry = self._epochs.get(user_id)
+        return entry[0] if entry is not None else 0
+
+    def verify(self, user_id: str, epoch: Optional[int]) -> bool:
+        """True when the token needs no user_sessions lookup"""
+        if not self.ready or epoch is None:
+            self.fallbacks += 1
+            return False
+        entry = self._epochs.get(user_id)
+        if (entry[0] if entry is not None else 0) != epoch:
+            self.fallbacks += 1
+            return False
+        self.fast_path += 1
+        return True
+
+    def apply(self, user_id: str, epoch: int, bumped_at: Optional[float] = None) -> None:
+        """Record a bump; epochs only move forward"""
+        entry = self._epochs.get(user_id)
+        if entry is None or epoch > entry[0]:
+            self._epochs[user_id] = (epoch, bumped_at or time.time())
+        self._users.pop(user_id, None)
+
+    def cached_user(self, user_id: str):
+        """The cached profile, if it was read under the user's current epoch"""
+        entry = self._users.get(user_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic() or entry[1] != self.current(user_id):
+            self._users.pop(user_id, None)
+            return None
+        return entry[2]
+
+    def cache_user(self, user, epoch: int) -> None:
+        """
+        Keep the user profile for the fast path. epoch is current() from
+        before the profile was read: a deactivation bumps the epoch, so a
+        profile read before it is never cached after it, even when the
+        notification lands in between.
+        """
+        if not self.enabled or epoch != self.current(str(user.id)):
+            return
+        if len(self._users) >= self.user_cache_size:
+            self._users.pop(next(iter(self._users)), None)
+        self._users[str(user.id)] = (time.monotonic() + self.user_cache_seconds, epoch, user)
+
+    def prune(self) -> None:
+        """Forget bumps older than any access token that could still carry the old epoch"""
+        cutoff = time.time() - self.retention_seconds
+        self._epochs = {uid: entry for uid, entry in self._epochs.items() if entry[1] > cutoff}
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        user_id, _, epoch = payload.rpartition(":")
+        try:
+            self.apply(user_id, int(epoch))
+            self.notifications += 1
+        except ValueError:
+            logger.warning("Malformed session epoch notification", payload=payload)
+
+    def _on_terminate(self, connection) -> None:
+        if self.ready:
+            logger.warning("⚠️ Session epoch listener disconnected; verifying against user_sessions")
+        self.ready = False
+
+    async def _close_listener(self) -> None:
+        if self._conn is not None:
+            try:
+                # Discard rather than return to the pool, where the LISTEN would linger
+                await self._conn.invalidate()
+                await self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+    async def _connect(self) -> None:
+        """LISTEN first, then load recent bumps, so no notification falls in between"""
+        from app.core import queries
+
+        self.ready = False
+        await self._close_listener()
+        self._conn = await self._engine.connect()
+        raw = await self._conn.get_raw_connection()
+        driver = raw.driver_connection
+        await driver.add_listener(EPOCH_CHANNEL, self._on_notify)
+        driver.add_termination_listener(self._on_terminate)
+
+        rows = await queries.SESSION_EPOCHS_RECENT.fetch_all(
+            self._conn, retention_seconds=self.retention_seconds
+        )
+        # Do not leave the listening connection idle in transaction
+        await self._conn.commit()
+        for row in rows:
+            self.apply(str(row[0]), row[1], row[2])
+        self.ready = True
+
+    async def _resync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.resync_interval_seconds)
+            self.prune()
+            if self.ready:
+                continue
+            try:
+                await self._connect()
+                self.reconnects += 1
+                logger.info("✅ Session epoch listener reconnected", epochs=len(self._epochs))
+            except Exception as e:
+                logger.error("Session epoch listener reconnect failed", error=str(e))
+
+    async def start(self, engine=None) -> None:
+        """Start listening; until this succeeds every request takes the user_sessions path"""
+        if not self.enabled or self._task is not None:
+            return
+        if engine is None:
+            from app.core.database import engine
+        if engine.dialect.driver != "asyncpg":
+            logger.warning("Session epochs need asyncpg LISTEN; verifying against user_sessions")
+            return
+        self._engine = engine
+        try:
+            await self._connect()
+        except Exception as e:
+            logger.error("Session epoch listener failed to start", error=str(e))
+        self._task = asyncio.create_task(self._resync_loop())
+        logger.info("✅ Session epochs enabled", ready=self.ready, epochs=len(self._epochs))
+
+    async def stop(self) -> None:
+        self.ready = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._close_listener()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get verification statistics"""
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "epochs": len(self._epochs),
+            "cached_users": len(self._users),
+            "fast_path": self.fast_path,
+            "fallbacks": self.fallbacks,
+            "notifications": self.notifications,
+            "reconnects": self.reconnects,
+        }
+
+
+# Global session epoch table
+session_epochs = SessionEpochTable(
+    enabled=settings.AUTH_SESSION_EPOCHS_ENABLED,
+    # An access token can carry an old epoch for at most its lifetime; the margin covers clock skew
+    retention_seconds=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60 + 300,
+    resync_interval_seconds=settings.AUTH_EPOCH_RESYNC_SECONDS,
+    user_cache_seconds=settings.AUTH_USER_CACHE_SECONDS,
+    user_cache_size=settings.AUTH_USER_CACHE_SIZE
+)
+
+metrics.gauge("auth_epoch_fast_path_total", "Access tokens verified by session epoch alone",
+              lambda: session_epochs.fast_path, kind="counter")
+metrics.gauge("auth_epoch_fallbacks_total", "Access tokens verified against user_sessions",
+              lambda: session_epochs.fallbacks, kind="counter")
+metrics.gauge("auth_epoch_listener_ready", "1 while the session epoch listener is connected",
+              lambda: 1 if session_epochs.ready else 0)
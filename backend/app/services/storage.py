@@ -3,9 +3,10 @@ DigitalOcean Spaces Storage Service
 Handles file upload, download, and management
 """
 
-import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
-from typing import BinaryIO, Optional, Dict, Any
+from typing import BinaryIO, Optional, Dict, Any, List, Tuple
+import asyncio
+import threading
 import uuid
 from datetime import datetime, timedelta
 import structlog
@@ -13,6 +14,9 @@ from pathlib import Path
 
 from app.core.config import settings
 from app.core.exceptions import FileUploadError, ExternalServiceError
+from app.core.metrics import metrics
+from app.core.startup import startup
+from app.services.transfers import ObjectTransfers, transfer_policy
 
 logger = structlog.get_logger()
 
@@ -21,19 +25,42 @@ class SpacesStorageService:
     """DigitalOcean Spaces storage service using S3-compatible API"""
     
     def __init__(self):
+        """The client is built on first use; importing boto3 and loading the S3 model is slow"""
+        self.bucket = settings.DO_SPACES_BUCKET_NAME
+        self._client = None
+        self._client_lock = threading.Lock()
+        self.transfers = ObjectTransfers(lambda: self.client, transfer_policy)
+    
+    @property
+    def client(self):
+        """DigitalOcean Spaces client, created on first access"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+    
+    def _create_client(self):
         """Initialize DigitalOcean Spaces client"""
         try:
+            import boto3
+            from botocore.config import Config
+            
             # Configure DigitalOcean Spaces client
             session = boto3.session.Session()
-            self.client = session.client(
+            client = session.client(
                 's3',
                 region_name=settings.DO_SPACES_REGION,
                 endpoint_url=settings.DO_SPACES_ENDPOINT,
                 aws_access_key_id=settings.DO_SPACES_ACCESS_KEY,
-                aws_secret_access_key=settings.DO_SPACES_SECRET_KEY
+                aws_secret_access_key=settings.DO_SPACES_SECRET_KEY,
+                # One pool shared by every call and transfer tier, large enough for all of them at once
+                config=Config(max_pool_connections=transfer_policy.pool_size, tcp_keepalive=True)
             )
-            self.bucket = settings.DO_SPACES_BUCKET_NAME
+            if settings.METRICS_ENABLED:
+                metrics.instrument_boto_client(client)
             logger.info("✅ DigitalOcean Spaces client initialized successfully")
+            return client
             
         except NoCredentialsError:
             logger.error("❌ DigitalOcean Spaces credentials not found")
@@ -72,7 +99,8 @@ class SpacesStorageService:
         user_id: str,
         content_type: str,
         folder: str = None,
-        metadata: Optional[Dict[str, str]] = None
+        metadata: Optional[Dict[str, str]] = None,
+        size: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Upload file to DigitalOcean Spaces
@@ -84,6 +112,7 @@ class SpacesStorageService:
             content_type: MIME content type
             folder: Custom folder (optional)
             metadata: Additional metadata (optional)
+            size: Size in bytes, if known; picks the part size and concurrency
         
         Returns:
             Dict with file information
@@ -101,11 +130,12 @@ class SpacesStorageService:
             }
             
             # Upload to Spaces
-            self.client.upload_fileobj(
+            self.transfers.upload(
                 file_content,
                 self.bucket,
                 file_key,
-                ExtraArgs={
+                size=size,
+                extra_args={
                     'ContentType': content_type,
                     'Metadata': upload_metadata,
                     'ACL': 'private'  # Keep files private
@@ -121,7 +151,7 @@ class SpacesStorageService:
                 'file_url': file_url,
                 'cdn_url': cdn_url,
                 'bucket': self.bucket,
-                'size': file_content.tell() if hasattr(file_content, 'tell') else None,
+                'size': size if size is not None else file_content.tell() if hasattr(file_content, 'tell') else None,
                 'content_type': content_type,
                 'metadata': upload_metadata
             }
@@ -188,6 +218,74 @@ class SpacesStorageService:
                 service="digitalocean_spaces"
             )
     
+    async def generate_presigned_post(
+        self,
+        user_id: str,
+        filename: str,
+        content_type: str,
+        max_size: int,
+        folder: str,
+        expiration: int = 300,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate a presigned POST for uploading straight to the bucket
+        
+        The policy pins the key, content type, ACL and metadata and limits
+        the size to 1..max_size bytes, so the bucket rejects anything else.
+        
+        Args:
+            user_id: User ID for organizing files
+            filename: Original filename
+            content_type: MIME content type the upload must declare
+            max_size: Largest accepted object in bytes
+            folder: Folder the object is uploaded to
+            expiration: Policy expiration time in seconds
+            metadata: Additional metadata (optional)
+        
+        Returns:
+            Dict with the form URL, form fields and file key
+        """
+        try:
+            file_key = self._generate_file_key(user_id, filename, folder)
+            fields = {
+                'acl': 'private',
+                'Content-Type': content_type,
+                'x-amz-meta-user-id': user_id,
+                'x-amz-meta-original-filename': filename,
+                **{f'x-amz-meta-{name}': value for name, value in (metadata or {}).items()}
+            }
+            conditions = [
+                {name: value} for name, value in fields.items()
+            ] + [['content-length-range', 1, max_size]]
+            
+            post = self.client.generate_presigned_post(
+                Bucket=self.bucket,
+                Key=file_key,
+                Fields=fields,
+                Conditions=conditions,
+                ExpiresIn=expiration
+            )
+            
+            logger.info(
+                "🔗 Presigned POST generated",
+                file_key=file_key,
+                expiration=expiration
+            )
+            
+            return {
+                'file_key': file_key,
+                'url': post['url'],
+                'fields': post['fields']
+            }
+        
+        except ClientError as e:
+            logger.error("❌ Failed to generate presigned POST", error=str(e))
+            raise ExternalServiceError(
+                "Failed to generate upload URL",
+                service="digitalocean_spaces"
+            )
+    
     async def delete_file(self, file_key: str) -> bool:
         """
         Delete file from DigitalOcean Spaces
@@ -265,6 +363,9 @@ class SpacesStorageService:
             
             files = []
             for obj in response.get('Contents', []):
+                # Previews rendered before they moved to their own prefix
+                if '.previews/' in obj['Key']:
+                    continue
                 files.append({
                     'key': obj['Key'],
                     'size': obj['Size'],
@@ -278,6 +379,89 @@ class SpacesStorageService:
             logger.error("❌ Failed to list user files", user_id=user_id, error=str(e))
             return []
 
+    
+    def list_objects(self, prefix: str, bucket: str = None) -> List[Tuple[str, int, str]]:
+        """(key, size, etag) of every object under a prefix, across all listing pages"""
+        paginator = self.client.get_paginator('list_objects_v2')
+        objects = []
+        for page in paginator.paginate(Bucket=bucket or self.bucket, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                objects.append((obj['Key'], obj['Size'], obj.get('ETag')))
+        return objects
+    
+    async def copy_prefix(
+        self,
+        source_prefix: str,
+        dest_prefix: str,
+        source_bucket: str = None,
+        dest_bucket: str = None
+    ) -> Dict[str, Optional[str]]:
+        """
+        Copy every object under a prefix, in parallel and server-side
+        
+        Args:
+            source_prefix: Prefix to copy from
+            dest_prefix: Prefix replacing source_prefix in the copied keys
+            source_bucket: Bucket to copy from (default: this bucket)
+            dest_bucket: Bucket to copy to (default: this bucket)
+        
+        Returns:
+            Dict of destination key to None, or the error for failed copies
+        """
+        source_bucket = source_bucket or self.bucket
+        dest_bucket = dest_bucket or self.bucket
+        
+        def copy_all():
+            objects = self.list_objects(source_prefix, source_bucket)
+            items = [
+                (key, dest_prefix + key[len(source_prefix):], size, etag)
+                for key, size, etag in objects
+            ]
+            return self.transfers.copy_many(items, source_bucket, dest_bucket, extra_args={'ACL': 'private'})
+        
+        results = await asyncio.to_thread(copy_all)
+        logger.info(
+            "📦 Prefix copied",
+            source_prefix=source_prefix,
+            dest_prefix=dest_prefix,
+            objects=len(results),
+            failed=sum(1 for error in results.values() if error is not None)
+        )
+        return results
+    
+    async def download_prefix(self, prefix: str, directory: str) -> Dict[str, Optional[str]]:
+        """
+        Download every object under a prefix into a local directory, in parallel
+        
+        Args:
+            prefix: Prefix to download
+            directory: Local directory; keys keep their path below the prefix
+        
+        Returns:
+            Dict of key to None, or the error for failed downloads
+        """
+        target = Path(directory)
+        
+        def download_all():
+            items = []
+            for key, size, etag in self.list_objects(prefix):
+                path = (target / key[len(prefix):].lstrip('/')).resolve()
+                if target.resolve() not in path.parents:
+                    continue  # Keys with '..' would escape the directory
+                path.parent.mkdir(parents=True, exist_ok=True)
+                items.append((key, str(path), size, etag))
+            return self.transfers.download_many(items, self.bucket)
+        
+        return await asyncio.to_thread(download_all)
+
 
 # Global storage service instance
 storage_service = SpacesStorageService()
+startup.defer("storage_client", lambda: storage_service.client)
+
+metrics.gauge("storage_transfers_total", "Managed transfers completed by size tier",
+              lambda: {(tier,): count for tier, count in storage_service.transfers.completed.items()},
+              ("tier",), kind="counter")
+metrics.gauge("storage_transfer_bytes_total", "Bytes moved by managed transfers by size tier",
+              lambda: {(tier,): count for tier, count in storage_service.transfers.bytes.items()},
+              ("tier",), kind="counter")
@@ -0,0 +1,273 @@
+"""
+Object Transfers
+Part size and concurrency chosen by object size, long-lived transfer
+managers sharing one client connection pool, and batched parallel
+copy/download of many keys
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import threading
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+MB = 1024 * 1024
+
+
+class TransferTier(NamedTuple):
+    """Transfer settings for a range of object sizes"""
+    name: str
+    max_size: Optional[int]  # largest object in this tier; None for no limit
+    multipart_threshold: int
+    part_size: int
+    concurrency: int
+
+
+class TransferPolicy:
+    """
+    Picks part size and concurrency from object size.
+
+    small: below the multipart threshold, one request per object. The tier's
+      concurrency is how many objects of a batch move at once.
+    medium: multipart with STORAGE_PART_SIZE_MB parts. Also used when the
+      size is unknown (streams).
+    large: above STORAGE_LARGE_OBJECT_MB, with larger parts so a transfer
+      needs fewer requests and stays under the 10,000 part limit
+      (s3transfer raises the part size further if it would not).
+    """
+
+    def __init__(
+        self,
+        multipart_threshold: int,
+        part_size: int,
+        large_object_size: int,
+        large_part_size: int,
+        concurrency: int
+    ):
+        half = max(1, concurrency // 2)
+        self.tiers = (
+            TransferTier("small", multipart_threshold - 1, multipart_threshold, part_size, concurrency),
+            TransferTier("medium", large_object_size, multipart_threshold, part_size, half),
+            TransferTier("large", None, multipart_threshold, large_part_size, half),
+        )
+
+    @property
+    def pool_size(self) -> int:
+        """HTTP connections needed for every tier to run at full concurrency at once"""
+        return sum(tier.concurrency for tier in self.tiers)
+
+    def tier_for(self, size: Optional[int]) -> TransferTier:
+        if size is None:
+            return self.tiers[1]
+        for tier in self.tiers:
+            if tier.max_size is None or size <= tier.max_size:
+                return tier
+        return self.tiers[-1]
+
+
+_KnownObject = None
+
+
+def _known_object(size: Optional[int], etag: Optional[str]):
+    """Subscriber handing s3transfer the size (and ETag) from a listing so it skips its HeadObject"""
+    global _KnownObject
+    if _KnownObject is None:
+        from s3transfer.subscribers import BaseSubscriber
+
+        class KnownObject(BaseSubscriber):
+            def __init__(self, size: Optional[int], etag: Optional[str]):
+                self.size = size
+                self.etag = etag
+
+            def on_queued(self, future, **kwargs):
+                future.meta.provide_transfer_size(self.size)
+                if self.etag is not None and hasattr(future.meta, "provide_object_etag"):
+                    future.meta.provide_object_etag(self.etag)
+
+        _KnownObject = KnownObject
+    return _KnownObject(size, etag)
+
+
+class ObjectTransfers:
+    """
+    One s3transfer TransferManager per size tier, created on first use and
+    kept for the life of the process. boto3's upload_fileobj builds (and
+    tears down) a manager and thread pool per call; these are reused, and
+    all of them share the client's connection pool, which is sized by
+    TransferPolicy.pool_size.
+
+    Methods block until the transfer finishes and are meant to run on a
+    worker thread. Batch methods submit every key before waiting, so the
+    tiers' concurrency limits decide how many requests are in flight.
+    """
+
+    def __init__(self, client_factory: Callable[[], Any], policy: TransferPolicy):
+        self._client_factory = client_factory
+        self.policy = policy
+        self._managers: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.completed = {tier.name: 0 for tier in policy.tiers}
+        self.failed = {tier.name: 0 for tier in policy.tiers}
+        self.bytes = {tier.name: 0 for tier in policy.tiers}
+
+    def _manager(self, tier: TransferTier):
+        manager = self._managers.get(tier.name)
+        if manager is None:
+            with self._lock:
+                manager = self._managers.get(tier.name)
+                if manager is None:
+                    from s3transfer.manager import TransferConfig, TransferManager
+
+                    config = TransferConfig(
+                        multipart_threshold=tier.multipart_threshold,
+                        multipart_chunksize=tier.part_size,
+                        max_request_concurrency=tier.concurrency,
+                        # Parts buffered from non-seekable streams
+                        max_in_memory_upload_chunks=tier.concurrency,
+                        max_in_memory_download_chunks=tier.concurrency
+                    )
+                    manager = self._managers[tier.name] = TransferManager(self._client_factory(), config)
+        return manager
+
+    def _wait(self, tier: TransferTier, future, size: Optional[int]) -> None:
+        try:
+            future.result()
+        except Exception:
+            self.failed[tier.name] += 1
+            raise
+        self.completed[tier.name] += 1
+        self.bytes[tier.name] += future.meta.size or size or 0
+
+    def upload(
+        self,
+        fileobj,
+        bucket: str,
+        key: str,
+        size: Optional[int] = None,
+        extra_args: Optional[Dict[str, Any]] = None
+    ) -> None:
+        tier = self.policy.tier_for(size)
+        subscribers = [_known_object(size, None)] if size is not None else None
+        future = self._manager(tier).upload(fileobj, bucket, key, extra_args=extra_args, subscribers=subscribers)
+        self._wait(tier, future, size)
+
+    def download(self, bucket: str, key: str, fileobj, size: Optional[int] = None, etag: Optional[str] = None) -> None:
+        tier = self.policy.tier_for(size)
+        subscribers = [_known_object(size, etag)] if size is not None else None
+        future = self._manager(tier).download(bucket, key, fileobj, subscribers=subscribers)
+        self._wait(tier, future, size)
+
+    def _submit_copy(
+        self,
+        source_bucket: str,
+        source_key: str,
+        bucket: str,
+        key: str,
+        size: Optional[int],
+        etag: Optional[str],
+        extra_args: Optional[Dict[str, Any]]
+    ):
+        tier = self.policy.tier_for(size)
+        # A single CopyObject keeps the source metadata server-side; a multipart
+        # copy needs the HeadObject to carry it over, so only small copies skip it
+        subscribers = None
+        if size is not None and size < tier.multipart_threshold:
+            subscribers = [_known_object(size, etag)]
+        future = self._manager(tier).copy(
+            {'Bucket': source_bucket, 'Key': source_key}, bucket, key,
+            extra_args=extra_args, subscribers=subscribers
+        )
+        return tier, future
+
+    def copy(
+        self,
+        source_bucket: str,
+        source_key: str,
+        bucket: str,
+        key: str,
+        size: Optional[int] = None,
+        etag: Optional[str] = None,
+        extra_args: Optional[Dict[str, Any]] = None
+    ) -> None:
+        tier, future = self._submit_copy(source_bucket, source_key, bucket, key, size, etag, extra_args)
+        self._wait(tier, future, size)
+
+    def _collect(self, submitted: List[Tuple[str, TransferTier, Any, Optional[int]]]) -> Dict[str, Optional[str]]:
+        errors: Dict[str, Optional[str]] = {}
+        for name, tier, future, size in submitted:
+            try:
+                self._wait(tier, future, size)
+                errors[name] = None
+            except Exception as e:
+                errors[name] = str(e)
+        failed = sum(1 for error in errors.values() if error is not None)
+        if failed:
+            logger.warning("Batch transfer finished with errors", total=len(errors), failed=failed)
+        return errors
+
+    def copy_many(
+        self,
+        items: Iterable[Tuple[str, str, Optional[int], Optional[str]]],
+        source_bucket: str,
+        bucket: str,
+        extra_args: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Optional[str]]:
+        """
+        Copy (source_key, key, size, etag) items in parallel, such as rows
+        from list_objects_v2. Returns {key: None on success, else the error}.
+        """
+        submitted = []
+        for source_key, key, size, etag in items:
+            tier, future = self._submit_copy(source_bucket, source_key, bucket, key, size, etag, extra_args)
+            submitted.append((key, tier, future, size))
+        return self._collect(submitted)
+
+    def download_many(
+        self,
+        items: Iterable[Tuple[str, str, Optional[int], Optional[str]]],
+        bucket: str
+    ) -> Dict[str, Optional[str]]:
+        """
+        Download (key, path, size, etag) items in parallel. With the size
+        and ETag from a listing no HeadObject is sent. Returns
+        {key: None on success, else the error}.
+        """
+        submitted = []
+        for key, path, size, etag in items:
+            tier = self.policy.tier_for(size)
+            subscribers = [_known_object(size, etag)] if size is not None else None
+            future = self._manager(tier).download(bucket, key, path, subscribers=subscribers)
+            submitted.append((key, tier, future, size))
+        return self._collect(submitted)
+
+    def shutdown(self) -> None:
+        """Wait for in-flight transfers and stop the managers' threads"""
+        with self._lock:
+            managers, self._managers = list(self._managers.values()), {}
+        for manager in managers:
+            manager.shutdown()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get transfer statistics per tier"""
+        return {
+            tier.name: {
+                "part_size": tier.part_size,
+                "concurrency": tier.concurrency,
+                "completed": self.completed[tier.name],
+                "failed": self.failed[tier.name],
+                "bytes": self.bytes[tier.name],
+            }
+            for tier in self.policy.tiers
+        }
+
+
+# Policy shared by the storage service's transfers and its client pool size
+transfer_policy = TransferPolicy(
+    multipart_threshold=settings.STORAGE_MULTIPART_THRESHOLD_MB * MB,
+    part_size=settings.STORAGE_PART_SIZE_MB * MB,
+    large_object_size=settings.STORAGE_LARGE_OBJECT_MB * MB,
+    large_part_size=settings.STORAGE_LARGE_PART_SIZE_MB * MB,
+    concurrency=settings.STORAGE_MAX_CONCURRENCY
+)
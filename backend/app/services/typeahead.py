@@ -0,0 +1,513 @@
+"""
+Typeahead
+In-memory prefix index of company and skill names for autocomplete, kept
+current from changes to companies and skills_taxonomy
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import asyncio
+import heapq
+import re
+import time
+import unicodedata
+import structlog
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = structlog.get_logger()
+
+# NOTIFY channel written by notify_typeahead() in migration.sql
+TYPEAHEAD_CHANNEL = "typeahead"
+
+KINDS = ("companies", "skills")
+_TABLES = {"companies": "companies", "skills_taxonomy": "skills"}
+
+# Shorter queries only get prefix matches; one typo in two letters matches nearly anything
+TYPO_MIN_LENGTH = 3
+
+# Characters that carry meaning in names such as C++, C#, Node.js or AT&T
+_SEPARATORS = re.compile(r"[^\w+#.&]+")
+
+
+def normalize(text: str) -> str:
+    """Casefolded, accents removed, punctuation other than + # . & turned into single spaces"""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(_SEPARATORS.sub(" ", stripped).replace("_", " ").split())
+
+
+def index_keys(names: Iterable[str]) -> Set[str]:
+    """Each normalized name and alias from every word on, so "web ser" finds Amazon Web Services"""
+    keys = set()
+    for name in names:
+        normalized = normalize(name)
+        keys.update(normalized[i + 1:] if i >= 0 else normalized
+                    for i in [-1] + [i for i, ch in enumerate(normalized) if ch == " "])
+    keys.discard("")
+    return keys
+
+
+class _Node:
+    """
+    Radix trie node: `label` is the edge from the parent, `own` the best
+    entities whose key ends here, `top` the best entities below
+    """
+
+    __slots__ = ("label", "edges", "terminals", "own", "top")
+
+    def __init__(self, label: str):
+        self.label = label
+        self.edges: Dict[str, "_Node"] = {}
+        self.terminals: Set[str] = set()
+        self.own: List[str] = []
+        self.top: List[str] = []
+
+
+# A position in the trie: a node and how many characters of its label were consumed
+_Position = Tuple[_Node, int]
+
+
+class PrefixIndex:
+    """
+    Compressed prefix trie over the keys of one kind of entity.
+
+    Every node keeps the top_size most popular entities of its subtree, so a
+    prefix lookup is a walk down the trie plus a slice. Typos are matched by
+    walking each single-edit variant of the query (a letter dropped, added,
+    replaced or two swapped), trying only the letters the trie has at that
+    point; that covers the same distance-1 neighbourhood as a SymSpell delete
+    dictionary without storing one.
+    """
+
+    def __init__(self, top_size: int):
+        self.top_size = top_size
+        self.root = _Node("")
+        self.names: Dict[str, str] = {}
+        self.popularity: Dict[str, int] = {}
+        # Sort key per entity: most popular, then shortest, then alphabetical
+        self.ranks: Dict[str, Tuple[int, int, str, str]] = {}
+        self.keys: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _set(self, entity: str, name: str, popularity: int) -> None:
+        self.names[entity] = name
+        self.popularity[entity] = popularity
+        self.ranks[entity] = (-popularity, len(name), name, entity)
+
+    def _place(self, node: _Node, entity: str) -> None:
+        """Update node.own after entity was added to, removed from or re-ranked in node.terminals"""
+        if entity in node.own and len(node.terminals) >= self.top_size:
+            # It may have dropped below, or left room for, a terminal that is
+            # not in own; words such as "inc" or "labs" end thousands of keys,
+            # so this stays rare
+            node.own = heapq.nsmallest(self.top_size, node.terminals, key=self.ranks.__getitem__)
+            return
+        own = [other for other in node.own if other != entity]
+        if entity in node.terminals:
+            own.append(entity)
+            own.sort(key=self.ranks.__getitem__)
+        node.own = own[:self.top_size]
+
+    def _best(self, node: _Node) -> List[str]:
+        candidates = set(node.own)
+        for child in node.edges.values():
+            candidates.update(child.top)
+        return heapq.nsmallest(self.top_size, candidates, key=self.ranks.__getitem__)
+
+    def _insert(self, key: str, entity: str) -> List[_Node]:
+        """Add a key; returns the nodes from the root to the key's node"""
+        node = self.root
+        path = [node]
+        i = 0
+        while i < len(key):
+            child = node.edges.get(key[i])
+            if child is None:
+                child = node.edges[key[i]] = _Node(key[i:])
+                path.append(child)
+                node = child
+                break
+            label = child.label
+            common = 1
+            while common < len(label) and i + common < len(key) and label[common] == key[i + common]:
+                common += 1
+            if common < len(label):
+                # Split the edge: the shared part becomes a node of its own
+                middle = node.edges[key[i]] = _Node(label[:common])
+                child.label = label[common:]
+                middle.edges[child.label[0]] = child
+                middle.top = list(child.top)
+                child = middle
+            path.append(child)
+            node = child
+            i += common
+        node.terminals.add(entity)
+        self._place(node, entity)
+        return path
+
+    def _remove(self, key: str, entity: str) -> List[_Node]:
+        """Drop a key, pruning and re-merging emptied nodes; returns the path still in the trie"""
+        path = [self.root]
+        i = 0
+        while i < len(key):
+            child = path[-1].edges.get(key[i])
+            if child is None or not key.startswith(child.label, i):
+                return path
+            path.append(child)
+            i += len(child.label)
+        node = path[-1]
+        node.terminals.discard(entity)
+        self._place(node, entity)
+        while len(path) > 1 and not node.terminals and len(node.edges) <= 1:
+            parent = path[-2]
+            if node.edges:
+                (only,) = node.edges.values()
+                only.label = node.label + only.label
+                parent.edges[node.label[0]] = only
+            else:
+                del parent.edges[node.label[0]]
+            path.pop()
+            node = parent
+        return path
+
+    def _refresh(self, path: Sequence[_Node], entity: str) -> None:
+        for node in reversed(path):
+            top = self._best(node)
+            if top == node.top and entity not in top:
+                # Nothing the ancestors rank on changed
+                return
+            node.top = top
+
+    def put(self, entity: str, name: str, aliases: Iterable[str], popularity: int) -> None:
+        """Add or update an entity"""
+        keys = index_keys([name, *aliases])
+        old = self.keys.get(entity, set())
+        for key in old - keys:
+            self._refresh(self._remove(key, entity), entity)
+        self._set(entity, name, popularity)
+        self.keys[entity] = keys
+        # Keys that stayed are refreshed too, since the name or popularity may have changed
+        for key in keys:
+            self._refresh(self._insert(key, entity), entity)
+
+    def delete(self, entity: str) -> bool:
+        keys = self.keys.pop(entity, None)
+        if keys is None:
+            return False
+        for key in keys:
+            self._refresh(self._remove(key, entity), entity)
+        del self.names[entity]
+        del self.popularity[entity]
+        del self.ranks[entity]
+        return True
+
+    @classmethod
+    def build(cls, rows: Iterable[Sequence], top_size: int) -> "PrefixIndex":
+        """Bulk load (id, name, aliases, popularity) rows, then compute the top lists in one pass"""
+        index = cls(top_size)
+        for entity, name, aliases, popularity in rows:
+            entity = str(entity)
+            keys = index_keys([name, *(aliases or ())])
+            index._set(entity, name, popularity or 0)
+            index.keys[entity] = keys
+            for key in keys:
+                index._insert(key, entity)
+        # Children before parents
+        order = [index.root]
+        for node in order:
+            order.extend(node.edges.values())
+        for node in reversed(order):
+            node.top = index._best(node)
+        return index
+
+    @staticmethod
+    def _step(position: Optional[_Position], ch: str) -> Optional[_Position]:
+        if position is None:
+            return None
+        node, offset = position
+        if offset < len(node.label):
+            return (node, offset + 1) if node.label[offset] == ch else None
+        child = node.edges.get(ch)
+        return (child, 1) if child is not None else None
+
+    def _walk(self, position: Optional[_Position], text: str) -> Optional[_Position]:
+        for ch in text:
+            position = self._step(position, ch)
+            if position is None:
+                return None
+        return position
+
+    @staticmethod
+    def _next_chars(position: _Position) -> Iterable[str]:
+        node, offset = position
+        return node.label[offset] if offset < len(node.label) else node.edges.keys()
+
+    def _typo_matches(self, query: str) -> Set[str]:
+        """Entities under every single-edit variant of the query"""
+        found: Set[str] = set()
+
+        def collect(position: Optional[_Position]) -> None:
+            if position is not None:
+                found.update(position[0].top)
+
+        position: Optional[_Position] = (self.root, 0)
+        for i, ch in enumerate(query):
+            rest = query[i + 1:]
+            collect(self._walk(position, rest))  # extra letter
+            if rest:
+                collect(self._walk(position, rest[0] + ch + rest[1:]))  # swapped letters
+            for other in list(self._next_chars(position)):
+                step = self._step(position, other)
+                collect(self._walk(step, query[i:]))  # missing letter
+                if other != ch:
+                    collect(self._walk(step, rest))  # wrong letter
+            position = self._step(position, ch)
+            if position is None:
+                break
+        return found
+
+    def lookup(self, query: str, limit: int) -> List[Tuple[str, bool]]:
+        """(entity, exact) pairs: prefix matches by popularity, then typo matches by popularity"""
+        query = normalize(query)
+        if not query:
+            return []
+        position = self._walk((self.root, 0), query)
+        results = [(entity, True) for entity in (position[0].top[:limit] if position is not None else [])]
+        if len(results) < limit and len(query) >= TYPO_MIN_LENGTH:
+            seen = {entity for entity, _ in results}
+            typos = heapq.nsmallest(limit - len(results), self._typo_matches(query) - seen,
+                                    key=self.ranks.__getitem__)
+            results.extend((entity, False) for entity in typos)
+        return results
+
+
+class TypeaheadService:
+    """
+    Serves autocomplete for company and skill names from memory.
+
+    Both indexes are loaded at startup with popularity (active canonical jobs
+    per company or skill); until then lookup() returns None. Inserts, renames
+    and deletes on companies and skills_taxonomy send NOTIFY typeahead
+    'table:id', and the rows named are re-read and applied. Popularity moves
+    with every job change, so it is refreshed by a full rebuild every
+    rebuild_interval_seconds rather than per notification.
+    """
+
+    def __init__(self, enabled: bool, limit: int, resync_interval_seconds: float, rebuild_interval_seconds: float):
+        self.enabled = enabled
+        self.limit = limit
+        self.resync_interval_seconds = resync_interval_seconds
+        self.rebuild_interval_seconds = rebuild_interval_seconds
+        self.listening = False
+        self.lookups = 0
+        self.lookup_seconds = 0.0
+        self.changes = 0
+        self.notifications = 0
+        self.rebuilds = 0
+        self.last_build_seconds: Optional[float] = None
+        self._indexes: Optional[Dict[str, PrefixIndex]] = None
+        self._pending: Dict[str, Set[str]] = {kind: set() for kind in KINDS}
+        # IDs notified while a rebuild runs; its rows may predate the change
+        self._changed_during: Optional[Dict[str, Set[str]]] = None
+        self._changed = asyncio.Event()
+        self._engine = None
+        self._conn = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def ready(self) -> bool:
+        return self._indexes is not None
+
+    def lookup(self, query: str, kinds: Sequence[str] = KINDS,
+               limit: Optional[int] = None) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """Matches per kind, best first; None until the first load completes"""
+        indexes = self._indexes
+        if indexes is None:
+            return None
+        start = time.perf_counter()
+        limit = min(limit or self.limit, self.limit)
+        result = {}
+        for kind in kinds:
+            index = indexes[kind]
+            result[kind] = [
+                {"id": entity, "name": index.names[entity], "popularity": index.popularity[entity], "exact": exact}
+                for entity, exact in index.lookup(query, limit)
+            ]
+        self.lookups += 1
+        self.lookup_seconds += time.perf_counter() - start
+        return result
+
+    async def _fetch(self, kind: str, ids: Optional[List[str]] = None) -> List[Sequence]:
+        from app.core import queries
+
+        async with self._engine.connect() as conn:
+            if kind == "companies":
+                if ids is None:
+                    return await queries.TYPEAHEAD_COMPANIES.fetch_all(conn)
+                return await queries.TYPEAHEAD_COMPANIES_BY_ID.fetch_all(conn, ids=ids)
+            if ids is None:
+                return await queries.TYPEAHEAD_SKILLS.fetch_all(conn)
+            return await queries.TYPEAHEAD_SKILLS_BY_ID.fetch_all(conn, ids=ids)
+
+    async def rebuild(self) -> None:
+        """Load both indexes and swap them in, then re-apply what changed during the load"""
+        start = time.perf_counter()
+        for pending in self._pending.values():
+            pending.clear()
+        changed_during = self._changed_during = {kind: set() for kind in KINDS}
+        indexes = {}
+        for kind in KINDS:
+            rows = await self._fetch(kind)
+            indexes[kind] = await asyncio.to_thread(PrefixIndex.build, rows, self.limit)
+        self._indexes = indexes
+        self._changed_during = None
+        for kind in KINDS:
+            self._pending[kind] |= changed_during[kind]
+        if any(self._pending.values()):
+            self._changed.set()
+        self.rebuilds += 1
+        self.last_build_seconds = round(time.perf_counter() - start, 3)
+        logger.info("🔤 Typeahead loaded", companies=len(indexes["companies"]), skills=len(indexes["skills"]),
+                    seconds=self.last_build_seconds)
+
+    async def apply_pending(self) -> int:
+        """Re-read the companies and skills named by notifications"""
+        changed = 0
+        for kind in KINDS:
+            ids = list(self._pending[kind])
+            self._pending[kind].clear()
+            if not ids or self._indexes is None:
+                continue
+            rows = await self._fetch(kind, ids)
+            index = self._indexes[kind]
+            found = set()
+            for entity, name, aliases, popularity in rows:
+                found.add(str(entity))
+                index.put(str(entity), name, aliases or (), popularity or 0)
+                changed += 1
+            for entity in set(ids) - found:
+                changed += index.delete(entity)
+        self.changes += changed
+        return changed
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        self.notifications += 1
+        table, _, entity = payload.partition(":")
+        kind = _TABLES.get(table)
+        if kind is None or not entity:
+            return
+        self._pending[kind].add(entity)
+        if self._changed_during is not None:
+            self._changed_during[kind].add(entity)
+        self._changed.set()
+
+    def _on_terminate(self, connection) -> None:
+        if self.listening:
+            logger.warning("⚠️ Typeahead listener disconnected; names may lag until it reconnects")
+        self.listening = False
+
+    async def _close_listener(self) -> None:
+        if self._conn is not None:
+            try:
+                # Discard rather than return to the pool, where the LISTEN would linger
+                await self._conn.invalidate()
+                await self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+    async def _listen(self) -> None:
+        await self._close_listener()
+        self._conn = await self._engine.connect()
+        raw = await self._conn.get_raw_connection()
+        driver = raw.driver_connection
+        await driver.add_listener(TYPEAHEAD_CHANNEL, self._on_notify)
+        driver.add_termination_listener(self._on_terminate)
+        self.listening = True
+
+    async def _apply_loop(self) -> None:
+        while True:
+            await self._changed.wait()
+            self._changed.clear()
+            try:
+                await self.apply_pending()
+            except Exception as e:
+                logger.error("Typeahead update failed", error=str(e))
+
+    async def _maintenance_loop(self) -> None:
+        next_rebuild = time.monotonic() + self.rebuild_interval_seconds
+        while True:
+            if not self.listening:
+                try:
+                    await self._listen()
+                    logger.info("✅ Typeahead listener connected")
+                    # Changes missed while not listening are picked up by a rebuild
+                    if self._indexes is not None:
+                        next_rebuild = 0.0
+                except Exception as e:
+                    logger.error("Typeahead listener failed to connect", error=str(e))
+            if self._indexes is None or time.monotonic() >= next_rebuild:
+                try:
+                    await self.rebuild()
+                    next_rebuild = time.monotonic() + self.rebuild_interval_seconds
+                except Exception as e:
+                    logger.error("Typeahead build failed", error=str(e))
+            await asyncio.sleep(self.resync_interval_seconds)
+
+    async def start(self, engine=None) -> None:
+        """Load in the background; lookups answer once the first load completes"""
+        if not self.enabled or self._tasks:
+            return
+        if engine is None:
+            from app.core.database import engine
+        if engine.dialect.driver != "asyncpg":
+            logger.warning("Typeahead needs asyncpg LISTEN; autocomplete disabled")
+            return
+        self._engine = engine
+        self._tasks = [asyncio.create_task(self._maintenance_loop()), asyncio.create_task(self._apply_loop())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self.listening = False
+        await self._close_listener()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get index statistics"""
+        indexes = self._indexes
+        return {
+            "enabled": self.enabled,
+            "ready": indexes is not None,
+            "listening": self.listening,
+            **{kind: len(indexes[kind]) if indexes is not None else 0 for kind in KINDS},
+            "lookups": self.lookups,
+            "avg_lookup_ms": round(self.lookup_seconds / self.lookups * 1000, 3) if self.lookups else None,
+            "changes": self.changes,
+            "notifications": self.notifications,
+            "rebuilds": self.rebuilds,
+            "last_build_seconds": self.last_build_seconds,
+        }
+
+
+# Global typeahead service
+typeahead = TypeaheadService(
+    enabled=settings.TYPEAHEAD_ENABLED,
+    limit=settings.TYPEAHEAD_LIMIT,
+    resync_interval_seconds=settings.TYPEAHEAD_RESYNC_SECONDS,
+    rebuild_interval_seconds=settings.TYPEAHEAD_REBUILD_SECONDS
+)
+
+metrics.gauge("typeahead_lookups_total", "Typeahead lookups", lambda: typeahead.lookups, kind="counter")
+metrics.gauge("typeahead_lookup_seconds_total", "Time spent in typeahead lookups",
+              lambda: typeahead.lookup_seconds, kind="counter")
+metrics.gauge("typeahead_entries", "Names in the typeahead indexes",
+              lambda: {(kind,): len(typeahead._indexes[kind]) if typeahead._indexes else 0 for kind in KINDS},
+              ("kind",))
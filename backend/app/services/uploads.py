@@ -0,0 +1,276 @@
+"""
+Direct Upload Verification
+Content checks for uploaded files and the background worker that verifies
+objects clients uploaded straight to the bucket with a presigned POST
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Tuple
+import asyncio
+import structlog
+
+from botocore.exceptions import ClientError
+
+from app.core.config import settings
+from app.core.exceptions import ValidationError
+from app.core.metrics import metrics
+from app.core.startup import startup
+from app.services.audit import audit_log, entity_uuid
+from app.services.previews import preview_renderer
+from app.services.storage import storage_service
+
+logger = structlog.get_logger()
+
+# Bytes read from the start of a file for magic number detection
+CONTENT_SAMPLE_SIZE = 2048
+
+# Map extensions to expected MIME types
+EXPECTED_CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'doc': 'application/msword',
+    'txt': 'text/plain'
+}
+
+
+def _load_magic():
+    """python-magic loads libmagic and its database on import, so it waits for the first upload"""
+    import magic
+
+    return magic
+
+
+# Detecting once also loads the magic database, which python-magic otherwise reads on first use
+startup.defer("magic", lambda: _load_magic().from_buffer(b"%PDF-1.4", mime=True))
+
+
+def check_file_content(filename: str, content_sample: bytes) -> str:
+    """
+    Detect the MIME type of the first bytes of a file and check it against
+    the file's extension. Returns the detected type; raises ValidationError
+    on a mismatch.
+    """
+    detected_type = _load_magic().from_buffer(content_sample, mime=True)
+    file_extension = Path(filename).suffix.lower().lstrip('.')
+
+    expected_type = EXPECTED_CONTENT_TYPES.get(file_extension)
+    if expected_type and detected_type != expected_type:
+        # Some flexibility for text files and Office docs
+        if not (
+            (file_extension == 'txt' and detected_type.startswith('text/')) or
+            (file_extension in ['doc', 'docx'] and 'officedocument' in detected_type)
+        ):
+            raise ValidationError(
+                f"File content doesn't match extension. "
+                f"Expected: {expected_type}, Detected: {detected_type}"
+            )
+    return detected_type
+
+
+def verified_key(incoming_key: str) -> str:
+    """Key a verified upload is moved to: the same path under the upload folder"""
+    return f"{settings.UPLOAD_FOLDER}/{incoming_key.split('/', 1)[1]}"
+
+
+def incoming_owner(incoming_key: str) -> Optional[str]:
+    """User ID of an incoming key ({incoming folder}/{user_id}/{file}), or None for other keys"""
+    parts = incoming_key.split("/")
+    if len(parts) != 3 or parts[0] != settings.UPLOAD_INCOMING_FOLDER or not parts[1] or not parts[2]:
+        return None
+    return parts[1]
+
+
+class UploadVerifier:
+    """
+    Verifies files uploaded straight to the bucket.
+
+    Presigned POSTs put objects under the incoming folder. A key is queued
+    when the client reports the upload complete, and the bucket poller queues
+    any incoming object older than UPLOAD_POLL_MIN_AGE_SECONDS, so uploads
+    whose client never called back are verified too.
+
+    Verification reads only the first CONTENT_SAMPLE_SIZE bytes (a ranged
+    GET) for the magic number check. An accepted file is copied server-side
+    to the upload folder and the incoming object deleted; a rejected one is
+    deleted. Transient errors leave the object in place for the next poll.
+    Every step is idempotent, so workers may pick up the same key.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        poll_interval_seconds: float,
+        poll_min_age_seconds: float,
+        max_pending: int = 1000
+    ):
+        self.workers = workers
+        self.poll_interval_seconds = poll_interval_seconds
+        self.poll_min_age_seconds = poll_min_age_seconds
+        self.max_pending = max_pending
+        self.verified = 0
+        self.rejected = 0
+        self.failed = 0
+        self.polled = 0
+        self.dropped = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: Set[str] = set()
+        self._tasks = []
+
+    def enqueue(self, file_key: str) -> bool:
+        """Queue an incoming key for verification; False when the queue is full or stopped"""
+        if self._queue is None:
+            return False
+        if file_key in self._pending:
+            return True
+        try:
+            self._queue.put_nowait(file_key)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self._pending.add(file_key)
+        return True
+
+    def _verify(self, file_key: str) -> Tuple[str, Dict[str, Any]]:
+        """Check one incoming object; runs on a worker thread"""
+        client = storage_service.client
+        bucket = storage_service.bucket
+        try:
+            head = client.head_object(Bucket=bucket, Key=file_key)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                return "missing", {}
+            raise
+
+        metadata = head.get('Metadata', {})
+        filename = metadata.get('original-filename', file_key)
+        info = {
+            "file_key": verified_key(file_key),
+            "filename": filename,
+            "size": head.get('ContentLength'),
+            "content_type": head.get('ContentType'),
+            "user_id": metadata.get('user-id') or incoming_owner(file_key),
+        }
+
+        try:
+            if not info["size"] or info["size"] > settings.max_file_size_bytes:
+                raise ValidationError(f"File size {info['size']} outside the accepted range")
+            sample = client.get_object(
+                Bucket=bucket, Key=file_key, Range=f"bytes=0-{CONTENT_SAMPLE_SIZE - 1}"
+            )['Body'].read()
+            info["detected_type"] = check_file_content(filename, sample)
+        except ValidationError as e:
+            client.delete_object(Bucket=bucket, Key=file_key)
+            info["reason"] = e.message
+            return "rejected", info
+
+        client.copy_object(
+            Bucket=bucket,
+            Key=info["file_key"],
+            CopySource={'Bucket': bucket, 'Key': file_key},
+            MetadataDirective='COPY',
+            ACL='private'
+        )
+        client.delete_object(Bucket=bucket, Key=file_key)
+        return "verified", info
+
+    async def _run(self) -> None:
+        while True:
+            file_key = await self._queue.get()
+            try:
+                outcome, info = await asyncio.to_thread(self._verify, file_key)
+            except Exception as e:
+                self.failed += 1
+                logger.error("Upload verification failed", file_key=file_key, error=str(e))
+                continue
+            finally:
+                self._pending.discard(file_key)
+
+            if outcome == "verified":
+                self.verified += 1
+                logger.info("📄 Direct upload verified", **info)
+                audit_log.record(
+                    "upload", "file", entity_uuid(info["file_key"]),
+                    user_id=info["user_id"],
+                    new_values={
+                        "file_key": info["file_key"],
+                        "filename": info["filename"],
+                        "size": info["size"],
+                        "content_type": info["content_type"]
+                    }
+                )
+                preview_renderer.enqueue(info["file_key"], info["filename"])
+            elif outcome == "rejected":
+                self.rejected += 1
+                logger.warning("Direct upload rejected", **info)
+
+    async def _poll_once(self) -> None:
+        def list_incoming():
+            paginator = storage_service.client.get_paginator('list_objects_v2')
+            cutoff = datetime.now(timezone.utc).timestamp() - self.poll_min_age_seconds
+            keys = []
+            for page in paginator.paginate(
+                Bucket=storage_service.bucket, Prefix=f"{settings.UPLOAD_INCOMING_FOLDER}/"
+            ):
+                for obj in page.get('Contents', []):
+                    if obj['LastModified'].timestamp() <= cutoff:
+                        keys.append(obj['Key'])
+            return keys
+
+        for file_key in await asyncio.to_thread(list_incoming):
+            if self.enqueue(file_key):
+                self.polled += 1
+
+    async def _poll_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval_seconds)
+            try:
+                await self._poll_once()
+            except Exception as e:
+                logger.error("Incoming upload poll failed", error=str(e))
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+        if self.poll_interval_seconds > 0:
+            self._tasks.append(asyncio.create_task(self._poll_loop()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._queue = None
+        self._pending.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get verification statistics"""
+        return {
+            "pending": len(self._pending),
+            "verified": self.verified,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "polled": self.polled,
+            "dropped": self.dropped,
+        }
+
+
+# Global upload verifier
+upload_verifier = UploadVerifier(
+    workers=settings.UPLOAD_VERIFY_WORKERS,
+    poll_interval_seconds=settings.UPLOAD_POLL_INTERVAL_SECONDS,
+    poll_min_age_seconds=settings.UPLOAD_POLL_MIN_AGE_SECONDS
+)
+
+metrics.gauge("upload_verify_pending", "Direct uploads waiting for verification",
+              lambda: len(upload_verifier._pending))
+metrics.gauge("upload_verified_total", "Direct uploads that passed verification",
+              lambda: upload_verifier.verified, kind="counter")
+metrics.gauge("upload_rejected_total", "Direct uploads deleted by verification",
+              lambda: upload_verifier.rejected, kind="counter")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Audit Log Writer Benchmark
+1. Request-path cost of audit_log.record() (no database involved).
+2. Sustained load: events are produced at a fixed rate for a number of seconds
+   while the background writer flushes them with COPY; reports events written
+   per second, buffer high-water mark and drops. For comparison the same
+   number of events is written with one INSERT per event.
+
+Requires the schema from migration.sql (audit_logs with current partitions;
+the writer creates missing ones). Benchmark rows use entity_type 'benchmark'
+and are deleted afterwards.
+
+Usage: python benchmarks/bench_audit_log.py [rate] [seconds]
+"""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+from sqlalchemy import text
+
+from app.core import queries
+from app.core.config import settings
+from app.core.database import engine
+from app.services.audit import AuditLogWriter, AuditPartitionManager, AUDIT_COLUMNS
+
+
+def make_writer():
+    return AuditLogWriter(
+        capacity=settings.AUDIT_BUFFER_SIZE,
+        batch_size=settings.AUDIT_BATCH_SIZE,
+        flush_interval_seconds=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+        partition_manager=AuditPartitionManager(
+            months_ahead=settings.AUDIT_PARTITION_MONTHS_AHEAD,
+            online_months=settings.AUDIT_ONLINE_MONTHS
+        ),
+        maintenance_interval_seconds=settings.AUDIT_MAINTENANCE_INTERVAL_SECONDS
+    )
+
+
+def bench_record(count=200_000):
+    writer = make_writer()
+    writer.capacity = count
+    user_id = uuid.uuid4()
+    entity_id = uuid.uuid4()
+    record = writer.record
+    start = time.perf_counter()
+    for _ in range(count):
+        record(
+            "login", "benchmark", entity_id,
+            user_id=user_id,
+            ip_address="10.0.0.1",
+            user_agent="Mozilla/5.0 (bench)"
+        )
+    elapsed = time.perf_counter() - start
+    print(f"  record()          {elapsed / count * 1e6:>8.3f} µs/event")
+
+    start = time.perf_counter()
+    encoded = [writer._encode(event) for event in writer._buffer]
+    elapsed = time.perf_counter() - start
+    print(f"  encode (flush)    {elapsed / len(encoded) * 1e6:>8.3f} µs/event")
+
+
+async def bench_sustained(rate, seconds):
+    writer = make_writer()
+    await writer.start(engine)
+    entity_id = uuid.uuid4()
+    total = int(rate * seconds)
+    tick = 0.01
+    per_tick = max(1, int(rate * tick))
+    high_water = 0
+
+    start = time.perf_counter()
+    produced = 0
+    while produced < total:
+        for _ in range(min(per_tick, total - produced)):
+            writer.record("login", "benchmark", entity_id, ip_address="10.0.0.1")
+        produced += per_tick
+        high_water = max(high_water, len(writer._buffer))
+        # Sleep until the next tick so the event loop can run the flusher
+        next_tick = start + produced / rate
+        await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+    await writer.stop()
+    elapsed = time.perf_counter() - start
+
+    stats = writer.snapshot()
+    print(
+        f"  COPY writer       {stats['written'] / elapsed:>9.0f} events/s   "
+        f"batches {stats['batches']}   avg batch {stats['avg_batch_ms']} ms   "
+        f"buffer high-water {high_water}   dropped {stats['dropped']}   failed {stats['failed']}"
+    )
+    return stats["written"]
+
+
+async def bench_insert(count):
+    writer = make_writer()
+    entity_id = uuid.uuid4()
+    for _ in range(count):
+        writer.record("login", "benchmark", entity_id, ip_address="10.0.0.1")
+    records = [writer._encode(event) for event in writer._buffer]
+
+    start = time.perf_counter()
+    async with engine.connect() as conn:
+        for record in records:
+            await conn.execute(queries.AUDIT_LOG_INSERT.statement, dict(zip(AUDIT_COLUMNS, record)))
+            await conn.commit()
+    elapsed = time.perf_counter() - start
+    print(f"  INSERT per event  {count / elapsed:>9.0f} events/s")
+
+
+async def main():
+    rate = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    print("🔍 Request path")
+    bench_record()
+
+    print(f"🔍 Sustained {rate} events/s for {seconds:.0f}s")
+    try:
+        await bench_sustained(rate, seconds)
+        await bench_insert(min(rate, 5_000))
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text("DELETE FROM audit_logs WHERE entity_type = 'benchmark'"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Connection Pool Concurrency Benchmark
+Compares holding a session for the whole request (get_db) with the lazy,
+early-released session (get_lazy_db) under a small pool.
+
+Each simulated request does the auth lookup and then spends WORK_MS on
+non-database work (JWT encoding, S3 calls, response serialization).
+
+Usage: python benchmarks/bench_db_pool.py [requests] [concurrency] [pool_size] [work_ms]
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.core.config import settings
+from app.core.database import LazySession
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of floats"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def eager_request(factory, work_seconds):
+    """Current behaviour: the session is held until the response completes"""
+    async with factory() as session:
+        await session.execute(text("SELECT 1"))
+        await asyncio.sleep(work_seconds)
+
+
+async def lazy_request(factory, work_seconds):
+    """Lazy session released right after the last statement"""
+    session = LazySession(factory)
+    try:
+        await session.execute(text("SELECT 1"))
+        await session.release()
+        await asyncio.sleep(work_seconds)
+    finally:
+        await session.release()
+
+
+async def run_mode(name, handler, factory, total, concurrency, work_seconds):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await handler(factory, work_seconds)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{name:<6} {total / elapsed:>10.1f} req/s   "
+        f"p50 {percentile(latencies, 50) * 1000:>8.2f} ms   "
+        f"p99 {percentile(latencies, 99) * 1000:>8.2f} ms"
+    )
+
+
+async def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    pool_size = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    work_ms = float(sys.argv[4]) if len(sys.argv) > 4 else 20.0
+
+    engine = create_async_engine(settings.DATABASE_URL, pool_size=pool_size, max_overflow=0)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    print(f"🔍 {total} requests, concurrency {concurrency}, pool {pool_size}, {work_ms} ms non-DB work")
+    try:
+        # Warm the pool so both modes start from the same state
+        await asyncio.gather(*(eager_request(factory, 0) for _ in range(pool_size)))
+        await run_mode("eager", eager_request, factory, total, concurrency, work_ms / 1000)
+        await run_mode("lazy", lazy_request, factory, total, concurrency, work_ms / 1000)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
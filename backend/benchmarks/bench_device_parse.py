@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+User-Agent Parsing Benchmark
+Per-login cost of building device information: the previous uncached
+user_agents.parse call against the cached classify_user_agent plus device
+fingerprint, over a skewed mix of real browser strings (a few very common,
+a long tail of rare ones and some never-repeated bot strings).
+
+Imports settings (so the usual .env is needed) but no database.
+
+Usage: python benchmarks/bench_device_parse.py [logins]
+"""
+
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+import user_agents
+
+from app.services.devices import classify_user_agent, device_fingerprint, cache_stats
+
+COMMON = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_2 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.6099.144 Mobile Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0",
+    "Mozilla/5.0 (iPad; CPU OS 17_2 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Linux; Android 13; SM-S918B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Mobile Safari/537.36",
+]
+
+
+def build_mix(count, seed=7):
+    rng = random.Random(seed)
+    # Long tail: older browser builds seen occasionally
+    tail = [
+        f"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{major}.0.{build}.0 Safari/537.36"
+        for major in range(100, 120) for build in range(5000, 5010)
+    ]
+    weights = [1 / (rank + 1) for rank in range(len(COMMON))]
+    mix = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.90:
+            mix.append(rng.choices(COMMON, weights)[0])
+        elif roll < 0.98:
+            mix.append(rng.choice(tail))
+        else:
+            mix.append(f"bench-bot/{i}")
+    return mix
+
+
+def previous(user_agent_string):
+    user_agent = user_agents.parse(user_agent_string)
+    return (
+        "mobile" if user_agent.is_mobile else "tablet" if user_agent.is_tablet else "desktop",
+        f"{user_agent.os.family} {user_agent.os.version_string}",
+        f"{user_agent.browser.family}",
+        user_agent.browser.version_string,
+    )
+
+
+def current(user_agent_string):
+    device = classify_user_agent(user_agent_string)
+    return device, device_fingerprint(user_agent_string, "Europe/Berlin", "203.0.113.57")
+
+
+def timed(func, mix):
+    start = time.perf_counter_ns()
+    for user_agent in mix:
+        func(user_agent)
+    return (time.perf_counter_ns() - start) / len(mix)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    mix = build_mix(count)
+    print(f"🔍 {count} logins, {len(set(mix))} distinct user agents")
+
+    before = timed(previous, mix)
+    after = timed(current, mix)
+    stats = cache_stats()
+    print(f"  user_agents.parse            {before / 1000:>8.2f} µs/login")
+    print(f"  cached parse + fingerprint   {after / 1000:>8.2f} µs/login   ({before / after:.1f}x)")
+    print(f"📊 cache hits {stats['hits']}, misses {stats['misses']}, "
+          f"hit rate {stats['hits'] / max(stats['hits'] + stats['misses'], 1) * 100:.1f}%, "
+          f"size {stats['size']}/{stats['capacity']}")
+
+    start = time.perf_counter_ns()
+    for _ in range(count):
+        device_fingerprint(COMMON[0], "Europe/Berlin", "203.0.113.57")
+    print(f"  device_fingerprint alone     {(time.perf_counter_ns() - start) / count / 1000:>8.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
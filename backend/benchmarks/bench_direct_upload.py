@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Direct Upload Benchmark
+Compares the API-side cost of a resume upload proxied through the API
+(multipart POST /files/upload/resume) with a direct upload: presigned POST,
+the client uploading straight to the bucket, the completion callback and the
+background verification (ranged GET, server-side copy).
+
+Reports API process CPU time and bytes received by the API per upload. The
+client-to-bucket POST of the direct flow runs in this process too, but is
+kept outside the CPU measurement.
+
+Drives the files router directly through ASGI (no server). Needs the
+DO_SPACES_* settings; objects are written to the configured bucket and
+deleted afterwards.
+
+Usage: python benchmarks/bench_direct_upload.py [uploads_per_size]
+"""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.v1.files import router as files_router
+from app.core.auth import create_access_token
+from app.services.storage import storage_service
+from app.services.uploads import upload_verifier, verified_key
+
+SIZES = (256 * 1024, 2 * 1024 * 1024, 10 * 1024 * 1024)
+
+
+def build_app():
+    app = FastAPI()
+    app.include_router(files_router, prefix="/api/v1")
+    return app
+
+
+def make_pdf(size):
+    """Bytes that python-magic detects as a PDF"""
+    header = b"%PDF-1.4\n"
+    trailer = b"\n%%EOF\n"
+    return header + os.urandom(size - len(header) - len(trailer)) + trailer
+
+
+def build_request(method, path, token, **kwargs):
+    """Encode the request once so its encoding is not part of the measurement"""
+    request = httpx.Request(method, f"http://bench{path}", headers={"authorization": f"Bearer {token}"}, **kwargs)
+    body = request.read()
+    headers = [(name.lower().encode(), value.encode()) for name, value in request.headers.items()]
+    return method, request.url.raw_path, headers, body
+
+
+async def call(app, prepared):
+    method, raw_path, headers, body = prepared
+    path, _, query = raw_path.partition(b"?")
+    response = {"body": b""}
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path.decode(), "raw_path": path,
+        "query_string": query, "root_path": "", "headers": headers,
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    if response.get("status", 500) >= 400:
+        raise RuntimeError(f"{method} {path.decode()} failed with {response.get('status')}: {response['body'][:200]}")
+    return httpx.Response(response["status"], content=response["body"]).json(), len(body)
+
+
+async def proxied_upload(app, token, content):
+    prepared = build_request(
+        "POST", "/api/v1/files/upload/resume", token,
+        files={"file": ("resume.pdf", content, "application/pdf")}
+    )
+    cpu = time.process_time()
+    result, received = await call(app, prepared)
+    return time.process_time() - cpu, received, result["file_id"]
+
+
+async def direct_upload(app, token, content, bucket_client):
+    settled = upload_verifier.verified + upload_verifier.rejected + upload_verifier.failed
+
+    prepared = build_request(
+        "POST", "/api/v1/files/upload/resume/presign", token,
+        json={"filename": "resume.pdf", "size": len(content)}
+    )
+    cpu = time.process_time()
+    post, received = await call(app, prepared)
+    api_cpu = time.process_time() - cpu
+
+    # The client's part: straight to the bucket
+    response = await bucket_client.post(
+        post["upload_url"], data=post["fields"], files={"file": ("resume.pdf", content, "application/pdf")}
+    )
+    response.raise_for_status()
+
+    prepared = build_request(
+        "POST", "/api/v1/files/upload/resume/complete", token, json={"file_key": post["file_key"]}
+    )
+    cpu = time.process_time()
+    _, complete_received = await call(app, prepared)
+    while upload_verifier.verified + upload_verifier.rejected + upload_verifier.failed == settled:
+        await asyncio.sleep(0.005)
+    api_cpu += time.process_time() - cpu
+    if upload_verifier.verified + upload_verifier.rejected + upload_verifier.failed != settled + 1 \
+            or upload_verifier.rejected or upload_verifier.failed:
+        raise RuntimeError(f"Verification did not accept the upload: {upload_verifier.snapshot()}")
+
+    # Request bodies plus the ranged GET the verifier reads
+    return api_cpu, received + complete_received + 2048, verified_key(post["file_key"])
+
+
+async def main():
+    uploads = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    app = build_app()
+    token, _ = create_access_token(data={"sub": str(uuid.uuid4()), "email": "bench@example.com"})
+    upload_verifier.poll_interval_seconds = 0
+    upload_verifier.start()
+    created = []
+
+    try:
+        # Client creation, magic database and connection setup are not part of the comparison
+        created.append((await proxied_upload(app, token, make_pdf(64 * 1024)))[2])
+        async with httpx.AsyncClient(timeout=60) as bucket_client:
+            created.append((await direct_upload(app, token, make_pdf(64 * 1024), bucket_client))[2])
+
+            print(f"🔍 {uploads} uploads per size")
+            for size in SIZES:
+                content = make_pdf(size)
+                results = {}
+                for label, upload in (
+                    ("proxied", lambda: proxied_upload(app, token, content)),
+                    ("direct", lambda: direct_upload(app, token, content, bucket_client)),
+                ):
+                    cpu_total = received_total = 0
+                    start = time.perf_counter()
+                    for _ in range(uploads):
+                        cpu, received, file_key = await upload()
+                        created.append(file_key)
+                        cpu_total += cpu
+                        received_total += received
+                    results[label] = (
+                        cpu_total / uploads, received_total / uploads, (time.perf_counter() - start) / uploads
+                    )
+
+                print(f"📊 {size / 1024:>6.0f} KB")
+                for label, (cpu, received, wall) in results.items():
+                    print(f"  {label:<8} API CPU {cpu * 1000:>8.2f} ms/upload   API bytes in {received / 1024:>9.1f} KB/upload"
+                          f"   wall {wall * 1000:>8.1f} ms/upload")
+                proxied_cpu, direct_cpu = results["proxied"][0], results["direct"][0]
+                print(f"  API CPU per upload {proxied_cpu / direct_cpu:.1f}x lower, "
+                      f"bytes {results['proxied'][1] / results['direct'][1]:.0f}x lower")
+    finally:
+        await upload_verifier.stop()
+        for file_key in created:
+            await storage_service.delete_file(file_key)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
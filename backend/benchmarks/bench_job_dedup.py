@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Job Deduplication Benchmark
+Runs app/services/job_dedup.py over a synthetic, duplicate-heavy feed (no
+database involved). Each original posting is reposted by 0-3 other sources
+with the edits feeds make: markup, casing, company legal forms, abbreviated
+titles, an appended source footer, a few changed words and a truncated
+description. Postings of the same company share boilerplate, so near misses
+are part of the feed.
+
+1. Precision and recall of duplicate links against the known clusters, and
+   throughput, for the configured bands and for other band counts.
+2. Query time of the LSH index vs comparing against every canonical job.
+3. Index save and load time and file size.
+
+Usage: python benchmarks/bench_job_dedup.py [originals]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+from app.core.config import settings
+from app.services.job_dedup import JobDedupIndex, job_tokens
+
+TITLES = ["Software Engineer", "Data Scientist", "Product Manager", "DevOps Engineer", "Frontend Developer",
+          "Backend Developer", "QA Engineer", "Data Engineer", "Engineering Manager", "Product Designer"]
+LEVELS = ["Senior", "Junior", "Lead", "Principal", ""]
+ABBREVIATIONS = {"Senior": "Sr.", "Junior": "Jr.", "Engineer": "Eng.", "Developer": "Dev"}
+SUFFIXES = ["", " Inc.", " LLC", " Ltd", " Corporation"]
+
+
+def make_feed(originals, seed=11):
+    """Records as (key, title, company, description, cluster), in arrival order"""
+    rng = random.Random(seed)
+    vocabulary = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9)))
+                  for _ in range(6000)]
+    companies = []
+    for number in range(max(20, originals // 10)):
+        name = f"{rng.choice(vocabulary).title()} {rng.choice(['Labs', 'Systems', 'Health', 'Bank', 'Works'])} {number}"
+        companies.append((name, rng.choices(vocabulary, k=rng.randint(40, 80))))
+    footers = [rng.choices(vocabulary, k=25) for _ in range(8)]
+
+    postings = []
+    for cluster in range(originals):
+        name, boilerplate = rng.choice(companies)
+        title = f"{rng.choice(LEVELS)} {rng.choice(TITLES)}".strip()
+        words = rng.choices(vocabulary, k=rng.randint(120, 320))
+        # Same company, same boilerplate: only the role text tells postings apart
+        postings.append((f"origin:{cluster}", title, name, " ".join(words + boilerplate), cluster))
+        for copy in range(rng.choice([0, 1, 1, 2, 2, 3])):
+            edited = list(words)
+            for _ in range(int(len(edited) * 0.03)):
+                edited[rng.randrange(len(edited))] = rng.choice(vocabulary)
+            edited = edited[:int(len(edited) * rng.uniform(0.9, 1.0))] + boilerplate
+            if rng.random() < 0.5:
+                edited += rng.choice(footers)
+            text = " ".join(edited)
+            if rng.random() < 0.5:
+                text = "<p>" + text.replace(" ", " <b>", 3).upper() + "</p>"
+            repost_title = title
+            for word, short in ABBREVIATIONS.items():
+                if rng.random() < 0.5:
+                    repost_title = repost_title.replace(word, short)
+            postings.append((f"feed{copy}:{cluster}", repost_title, name + rng.choice(SUFFIXES), text, cluster))
+    rng.shuffle(postings)
+    return postings
+
+
+def run(feed, permutations, bands, threshold):
+    index = JobDedupIndex(permutations, bands, threshold)
+    cluster_of = {}
+    seen = set()
+    true_positives = false_positives = duplicates = 0
+    start = time.perf_counter()
+    for key, title, company, description, cluster in feed:
+        cluster_of[key] = cluster
+        canonical = index.assign(key, title, company, description)
+        if cluster in seen:
+            duplicates += 1
+        seen.add(cluster)
+        if canonical is not None:
+            if cluster_of[canonical] == cluster:
+                true_positives += 1
+            else:
+                false_positives += 1
+    elapsed = time.perf_counter() - start
+    stats = index.snapshot()
+    precision = true_positives / (true_positives + false_positives) if true_positives + false_positives else 1.0
+    recall = true_positives / duplicates if duplicates else 1.0
+    print(f"  {permutations:>3} x {bands:>2} bands   precision {precision:.4f}   recall {recall:.4f}   "
+          f"{len(feed) / elapsed:>7.0f} jobs/s   {elapsed / len(feed) * 1e6:>6.0f} µs/job   "
+          f"candidates/job {stats['avg_candidates']}   canonical {stats['canonical_jobs']}")
+    return index
+
+
+def main():
+    originals = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    feed = make_feed(originals)
+    clusters = len({record[4] for record in feed})
+    print(f"🔍 {len(feed)} postings of {clusters} jobs ({len(feed) - clusters} duplicates), "
+          f"threshold {settings.JOB_DEDUP_THRESHOLD}")
+
+    print("📊 Links vs known clusters")
+    configured = (settings.JOB_DEDUP_PERMUTATIONS, settings.JOB_DEDUP_BANDS)
+    index = None
+    for permutations, bands in sorted({configured, (128, 16), (128, 32), (64, 16)}):
+        result = run(feed, permutations, bands, settings.JOB_DEDUP_THRESHOLD)
+        if (permutations, bands) == configured:
+            index = result
+
+    print(f"📊 Query time over {len(index)} canonical jobs")
+    sample = feed[:500]
+    signatures = [index.signature(job_tokens(title, company, description))
+                  for _, title, company, description, _ in sample]
+    start = time.perf_counter()
+    for signature in signatures:
+        index.query(signature)
+    lsh = (time.perf_counter() - start) / len(sample)
+    stored = [index._stored(slot) for slot in index._slots.values()]
+    start = time.perf_counter()
+    for signature in signatures[:50]:
+        max(index.similarity(signature, other) for other in stored)
+    scan = (time.perf_counter() - start) / 50
+    print(f"  LSH query      {lsh * 1e6:>10.0f} µs")
+    print(f"  full scan      {scan * 1e6:>10.0f} µs   ({scan / lsh:.0f}x)")
+
+    print("📊 Persistence")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "job_dedup.idx")
+        start = time.perf_counter()
+        index.save(path)
+        saved = time.perf_counter() - start
+        loaded_index = JobDedupIndex(*configured, settings.JOB_DEDUP_THRESHOLD)
+        start = time.perf_counter()
+        loaded_index.load(path)
+        loaded = time.perf_counter() - start
+        print(f"  save {saved * 1000:.0f} ms   load {loaded * 1000:.0f} ms   "
+              f"{os.path.getsize(path) / 1024 / 1024:.1f} MB for {len(loaded_index)} jobs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Job Facets Benchmark
+Loads synthetic active jobs into the facet bitmaps (app/services/job_facets.py,
+no database involved) and measures:
+
+1. Build time and memory added (peak RSS).
+2. Search latency (p50/p95/p99/max) for a mix of requests: no filters, one
+   facet, several facets with multi-select, salary ranges and deep pages,
+   each with counts for every facet.
+3. Update throughput while searching: jobs changed, added and removed.
+
+Target: p99 under 10 ms at 1M active jobs.
+
+Usage: python benchmarks/bench_job_facets.py [jobs] [searches]
+"""
+
+import os
+import random
+import resource
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+from app.core.config import settings
+from app.services.job_facets import FacetState
+
+REMOTE = ["onsite", "remote", "hybrid"]
+EMPLOYMENT = ["full_time", "part_time", "contract", "temporary", "internship"]
+EXPERIENCE = ["entry", "mid", "senior", "lead", "executive"]
+
+
+def make_world(seed=3):
+    rng = random.Random(seed)
+    countries = [f"C{n:02d}" for n in range(60)]
+    # Skewed like real postings: a few hubs hold most jobs
+    locations = [(str(uuid.UUID(int=rng.getrandbits(128))), f"City {n}", f"Region {n % 40}",
+                  countries[min(int(rng.expovariate(0.15)), 59)]) for n in range(4000)]
+    industries = [f"Industry {n}" for n in range(150)]
+    return rng, locations, industries
+
+
+def make_row(rng, locations, industries, now):
+    location = locations[min(int(rng.expovariate(0.004)), len(locations) - 1)]
+    salary = rng.randrange(30, 300) * 1000 if rng.random() < 0.7 else None
+    return (
+        uuid.uuid4(), rng.choice(REMOTE), rng.choice(EMPLOYMENT), rng.choice(EXPERIENCE),
+        industries[min(int(rng.expovariate(0.05)), len(industries) - 1)], location[3],
+        location[0] if rng.random() < 0.9 else None, location[1], location[2],
+        salary, salary + rng.randrange(0, 60) * 1000 if salary else None,
+        now + timedelta(days=rng.randrange(1, 90)) if rng.random() < 0.5 else None,
+    )
+
+
+def make_request(rng, state, locations, industries):
+    kind = rng.random()
+    filters = {}
+    salary_min = salary_max = None
+    if kind < 0.1:
+        pass
+    elif kind < 0.4:
+        filters[rng.choice(["remote_type", "employment_type", "experience_level"])] = [
+            rng.choice(REMOTE + EMPLOYMENT + EXPERIENCE)
+        ]
+    else:
+        filters["remote_type"] = rng.sample(REMOTE, rng.randint(1, 2))
+        filters["experience_level"] = rng.sample(EXPERIENCE, rng.randint(1, 3))
+        if rng.random() < 0.5:
+            filters["industry"] = rng.sample(industries[:30], rng.randint(1, 3))
+        if rng.random() < 0.5:
+            filters["country"] = [rng.choice(locations[:200])[3]]
+        if rng.random() < 0.3:
+            filters["location"] = [rng.choice(locations[:500])[0]]
+        if rng.random() < 0.4:
+            salary_min = rng.randrange(40, 200) * 1000
+        if rng.random() < 0.2:
+            salary_max = rng.randrange(150, 400) * 1000
+    offset = rng.choice([0, 0, 0, 20, 200, 2000])
+    return filters, salary_min, salary_max, offset
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    searches = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    rng, locations, industries = make_world()
+    now = datetime.now(timezone.utc)
+    facet_values = settings.JOB_FACETS_VALUES
+
+    print(f"🔍 {count} active jobs, {len(locations)} locations, {len(industries)} industries")
+    rows = [make_row(rng, locations, industries, now) for _ in range(count)]
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    state = FacetState(settings.JOB_FACETS_SALARY_BAND)
+    start = time.perf_counter()
+    for row in rows:
+        state.apply(row, True)
+    elapsed = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"📊 Build   {elapsed:.1f} s ({count / elapsed:,.0f} jobs/s)   "
+          f"+{(rss_after - rss_before) / 1024:.0f} MB peak RSS")
+
+    requests = [make_request(rng, state, locations, industries) for _ in range(searches)]
+    for request in requests[:50]:
+        state.search(*request[:3], request[3], 20, facet_values)
+    timings = []
+    for filters, salary_min, salary_max, offset in requests:
+        start = time.perf_counter()
+        state.search(filters, salary_min, salary_max, offset, 20, facet_values)
+        timings.append(time.perf_counter() - start)
+    print(f"📊 Search ({searches} requests, page + counts for {len(state.values)} facets)")
+    print(f"  p50 {percentile(timings, 0.5) * 1000:.2f} ms   p95 {percentile(timings, 0.95) * 1000:.2f} ms   "
+          f"p99 {percentile(timings, 0.99) * 1000:.2f} ms   max {max(timings) * 1000:.2f} ms")
+
+    # One ingest batch: 5% changed, 1% new, 1% removed, then the same searches
+    batch = count // 20
+    start = time.perf_counter()
+    for row in rng.sample(rows, batch):
+        state.apply((row[0],) + make_row(rng, locations, industries, now)[1:], True)
+    for _ in range(count // 100):
+        state.apply(make_row(rng, locations, industries, now), True)
+    for row in rng.sample(rows, count // 100):
+        state.remove(str(row[0]))
+    changes = batch + 2 * (count // 100)
+    elapsed = time.perf_counter() - start
+    print(f"📊 Updates {changes / elapsed:,.0f} changes/s")
+    timings = []
+    for filters, salary_min, salary_max, offset in requests[:500]:
+        state.apply(make_row(rng, locations, industries, now), True)
+        start = time.perf_counter()
+        state.search(filters, salary_min, salary_max, offset, 20, facet_values)
+        timings.append(time.perf_counter() - start)
+    print(f"  searches interleaved with changes: p50 {percentile(timings, 0.5) * 1000:.2f} ms   "
+          f"p99 {percentile(timings, 0.99) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
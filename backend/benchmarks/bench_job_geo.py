@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Job Geo Search Benchmark
+Inserts synthetic locations clustered around a few metro areas, loads jobs
+at those locations (a quarter of them remote) through the feed ingestion
+path, then measures app/services/job_geo.py:
+
+1. Radius query latency (p50/p95/p99) for 10, 50 and 200 km, first page
+   and offset 200, with the PostGIS backend (when the locations table has
+   its geo column) and the in-memory grid.
+2. Whether both backends return the same pages.
+3. The existing find_nearby_jobs() function for comparison.
+
+Requires the schema from migration.sql. Benchmark jobs use a throwaway
+external_source and are deleted afterwards with the companies and
+locations created.
+
+Usage: python benchmarks/bench_job_geo.py [jobs] [locations] [queries per radius]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+from sqlalchemy import text
+
+from app.core import queries
+from app.core.config import settings
+from app.core.database import engine
+from app.services.job_geo import JobGeoSearch
+from app.services.job_ingest import JobIngestor
+
+# (lat, lng) of metro areas most locations cluster around
+HUBS = [(37.77, -122.42), (40.71, -74.01), (47.61, -122.33), (30.27, -97.74), (42.36, -71.06), (43.65, -79.38),
+        (51.51, -0.13), (52.52, 13.41), (12.97, 77.59), (1.35, 103.82), (-33.87, 151.21), (35.69, 139.69)]
+RADII = (10, 50, 200)
+
+INSERT_LOCATION = ("INSERT INTO locations (country_code, city, timezone, latitude, longitude) "
+                   "VALUES ('US', :city, 'UTC', :lat, :lng)")
+INSERT_LOCATION_POSTGIS = ("INSERT INTO locations (country_code, city, timezone, geo) VALUES ('US', :city, 'UTC', "
+                           "CAST(ST_SetSRID(ST_MakePoint(:lng, :lat), 4326) AS geography))")
+FIND_NEARBY = "SELECT job_id FROM find_nearby_jobs(CAST(:lat AS DECIMAL), CAST(:lng AS DECIMAL), :radius, 20)"
+FIND_NEARBY_POSTGIS = ("SELECT job_id FROM find_nearby_jobs(CAST(ST_SetSRID(ST_MakePoint(:lng, :lat), 4326) "
+                       "AS geography), :radius, 20)")
+
+
+def make_locations(count, tag, seed=9):
+    rng = random.Random(seed)
+    for number in range(count):
+        if rng.random() < 0.8:
+            lat, lng = rng.choice(HUBS)
+            lat, lng = lat + rng.gauss(0, 1.0), lng + rng.gauss(0, 1.0)
+        else:
+            lat, lng = rng.uniform(-50, 60), rng.uniform(-180, 180)
+        yield {"city": f"Bench {tag} {number}", "lat": max(-89.9, min(89.9, lat)), "lng": (lng + 180) % 360 - 180}
+
+
+def records(count, tag, locations, seed=5):
+    rng = random.Random(seed)
+    companies = max(50, count // 200)
+    for number in range(count):
+        remote = rng.random() < 0.25
+        yield {
+            "external_id": f"{tag}-{number}",
+            "title": "Software Engineer",
+            "description": "Benchmark job.",
+            "company": f"Bench Co {tag} {number % companies}",
+            "company_domain": f"bench-{tag}-{number % companies}.example.com",
+            "remote_type": "Remote" if remote else rng.choice(["Hybrid", "On-site"]),
+            # Half of the remote jobs name a location as well
+            "city": None if remote and rng.random() < 0.5 else rng.choice(locations)["city"],
+            "country": "US",
+            "posted_at": f"2026-01-{rng.randint(1, 28):02d}T09:00:00Z",
+        }
+
+
+def centers(rng, count):
+    return [(lat + rng.gauss(0, 0.5), lng + rng.gauss(0, 0.5)) for lat, lng in (rng.choice(HUBS) for _ in range(count))]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def report(label, timings, note=""):
+    print(f"  {label:<22} p50 {percentile(timings, 0.5) * 1000:7.2f} ms   p95 {percentile(timings, 0.95) * 1000:7.2f} ms"
+          f"   p99 {percentile(timings, 0.99) * 1000:7.2f} ms{note}")
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    location_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    searches = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    tag = uuid.uuid4().hex[:8]
+    source = f"bench_{tag}"
+    rng = random.Random(3)
+
+    async with engine.connect() as conn:
+        postgis = bool((await queries.JOB_GEO_SCHEMA.fetch_all(conn))[0][0])
+    print(f"🔍 {location_count} locations ({'PostGIS' if postgis else 'latitude/longitude'}), {count} jobs")
+    try:
+        locations = list(make_locations(location_count, tag))
+        async with engine.begin() as conn:
+            await conn.execute(text(INSERT_LOCATION_POSTGIS if postgis else INSERT_LOCATION), locations)
+        result = await JobIngestor(settings.JOB_INGEST_BATCH_SIZE, engine).ingest(
+            records(count, tag, locations), source
+        )
+        print(f"  {result['inserted']} inserted in {result['seconds']:.0f} s")
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("VACUUM ANALYZE locations"))
+            await conn.execute(text("VACUUM ANALYZE jobs"))
+
+        points = centers(rng, searches)
+        pages = {}
+        async with engine.connect() as conn:
+            for backend in (("postgis", "grid") if postgis else ("grid",)):
+                search = JobGeoSearch(backend, settings.JOB_GEO_CELL_DEGREES, 3600)
+                await search.nearby(conn, *points[0], RADII[0])
+                print(f"📊 {backend}")
+                for radius in RADII:
+                    first, deep, hits = [], [], 0
+                    for lat, lng in points:
+                        start = time.perf_counter()
+                        page = await search.nearby(conn, lat, lng, radius, limit=20)
+                        first.append(time.perf_counter() - start)
+                        hits += sum(hit["distance_km"] is not None for hit in page["hits"])
+                        pages.setdefault((backend, radius), []).append([hit["id"] for hit in page["hits"]])
+                        start = time.perf_counter()
+                        await search.nearby(conn, lat, lng, radius, offset=200, limit=20)
+                        deep.append(time.perf_counter() - start)
+                    report(f"{radius} km", first, f"   ({hits / len(points):.1f} of 20 in radius)")
+                    report(f"{radius} km, offset 200", deep)
+
+            if postgis:
+                differing = sum(
+                    a != b for radius in RADII for a, b in zip(pages[("postgis", radius)], pages[("grid", radius)])
+                )
+                print(f"  {differing} of {len(points) * len(RADII)} first pages differ between backends")
+
+            print("📊 find_nearby_jobs() (existing function), 50 km")
+            timings = []
+            for lat, lng in points[:10]:
+                start = time.perf_counter()
+                await conn.execute(text(FIND_NEARBY_POSTGIS if postgis else FIND_NEARBY),
+                                   {"lat": lat, "lng": lng, "radius": 50})
+                timings.append(time.perf_counter() - start)
+            report("50 km", timings)
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text("DELETE FROM jobs WHERE external_source = :source"), {"source": source})
+            await conn.execute(text("DELETE FROM companies WHERE slug LIKE :slug"), {"slug": f"bench-co-{tag}-%"})
+            await conn.execute(text("DELETE FROM locations WHERE city LIKE :city"), {"city": f"Bench {tag} %"})
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Job Feed Ingestion Benchmark
+Generates a JSON Lines feed (a few thousand companies, skills and locations
+taken from the database, ~1% duplicate external IDs and ~0.1% malformed
+lines) and ingests it with app/services/job_ingest.py:
+
+1. First load: every job is inserted, companies are created.
+2. Re-ingest of the same feed: nothing changed, nothing written.
+3. Re-ingest with ~10% of the jobs changed: updates and job_history rows.
+
+Each run reports jobs/hour against the 1M/hour target. For comparison a
+sample is ingested one job per transaction (batch size 1).
+
+Requires the schema from migration.sql. Benchmark jobs use a throwaway
+external_source and are deleted afterwards with the companies created.
+
+Usage: python benchmarks/bench_job_ingest.py [jobs] [batch size]
+"""
+
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import engine
+from app.services.job_ingest import JobIngestor, read_feed
+
+TARGET_PER_HOUR = 1_000_000
+TITLES = ["Software Engineer", "Data Scientist", "Product Manager", "DevOps Engineer", "Frontend Developer",
+          "Backend Developer", "QA Engineer", "Data Engineer", "Engineering Manager", "Designer"]
+LEVELS = ["Junior", "Mid Level", "Senior", "Staff", "Director"]
+EMPLOYMENT = ["Full-time", "Part time", "Contract", "Internship"]
+REMOTE = ["On-site", "Remote", "Hybrid"]
+
+
+async def reference_data():
+    async with engine.connect() as conn:
+        skills = [row[0] for row in await conn.execute(
+            text("SELECT name FROM skills_taxonomy WHERE is_active = TRUE LIMIT 500")
+        )]
+        locations = [f"{row[0]}, {row[1]}" for row in await conn.execute(
+            text("SELECT city, country_code FROM locations LIMIT 500")
+        )]
+    return skills or ["Python", "SQL"], locations or ["Berlin, DE"]
+
+
+def write_feed(path, count, tag, skills, locations, changed=0.0, seed=7):
+    """One job per line; `changed` is the share of jobs whose salary and title differ"""
+    rng = random.Random(seed)
+    change = random.Random(seed + 1)
+    companies = max(50, count // 200)
+    with open(path, "w") as feed:
+        for number in range(count):
+            if rng.random() < 0.001:
+                feed.write("{not json\n")
+            company = rng.randrange(companies)
+            title = f"{rng.choice(LEVELS)} {rng.choice(TITLES)}"
+            salary = rng.randrange(40, 200) * 1000
+            if change.random() < changed:
+                title += " II"
+                salary += 5000
+            record = {
+                "external_id": f"{tag}-{number}",
+                "title": title,
+                "description": f"{title} at company {company}. " * 20,
+                "company": f"Bench Co {tag} {company}",
+                "company_domain": f"bench-{tag}-{company}.example.com",
+                "location": rng.choice(locations),
+                "remote_type": rng.choice(REMOTE),
+                "employment_type": rng.choice(EMPLOYMENT),
+                "experience_level": title.split(" ")[0],
+                "salary_min": salary,
+                "salary_max": f"{salary // 1000 + 30}k",
+                "skills": rng.sample(skills, min(5, len(skills))),
+                "preferred_skills": rng.sample(skills, min(3, len(skills))),
+                "posted_at": "2026-01-15T09:00:00Z",
+            }
+            line = json.dumps(record) + "\n"
+            feed.write(line)
+            if rng.random() < 0.01:
+                feed.write(line)
+
+
+async def run(label, ingestor, records, source):
+    result = await ingestor.ingest(records, source)
+    per_hour = result["jobs_per_hour"] or 0
+    print(f"  {label:<22} {result['read']:>8} read   {result['seconds']:>7.2f} s   {per_hour:>11,} jobs/h "
+          f"({per_hour / TARGET_PER_HOUR:.1f}x target)   inserted {result['inserted']}   "
+          f"updated {result['updated']}   unchanged {result['unchanged']}   duplicates {result['duplicates']}   "
+          f"companies +{result['companies_created']}   rejected {sum(result['rejected'].values())}")
+    return result
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else settings.JOB_INGEST_BATCH_SIZE
+    tag = uuid.uuid4().hex[:8]
+    source = f"bench_{tag}"
+    ingestor = JobIngestor(batch_size, engine)
+
+    skills, locations = await reference_data()
+    print(f"🔍 {count} jobs, batches of {batch_size}, {len(skills)} skills, {len(locations)} locations")
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            feed = os.path.join(directory, "feed.jsonl")
+            write_feed(feed, count, tag, skills, locations)
+            print("📊 Batched COPY + merge")
+            await run("first load", ingestor, read_feed(feed), source)
+            await run("re-ingest, unchanged", ingestor, read_feed(feed), source)
+            write_feed(feed, count, tag, skills, locations, changed=0.1)
+            await run("re-ingest, 10% changed", ingestor, read_feed(feed), source)
+
+            sample = min(count, 2_000)
+            write_feed(feed, sample, f"{tag}-single", skills, locations)
+            print(f"📊 One job per transaction ({sample} jobs)")
+            await run("first load", JobIngestor(1, engine), read_feed(feed), source)
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text("DELETE FROM jobs WHERE external_source = :source"), {"source": source})
+            await conn.execute(text("DELETE FROM companies WHERE slug LIKE :slug"), {"slug": f"bench-co-{tag}-%"})
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
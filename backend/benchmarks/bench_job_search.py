@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Job Search Benchmark
+Loads a synthetic corpus (titles from a fixed list, descriptions drawn from a
+Zipf-distributed vocabulary plus a set of skill terms) through the feed
+ingestion path, then measures app/services/job_search.py:
+
+1. Query latency (p50/p95/p99) without the cache, by query class: rare
+   terms, a skill, a common word, a phrase and an exclusion, first page and
+   third page through the cursor.
+2. Ranking the same matches on a tsvector recomputed per row instead of the
+   stored search_vector column.
+3. Cache hits for repeated popular queries (includes the revision check).
+
+Requires the schema from migration.sql. Benchmark jobs use a throwaway
+external_source and are deleted afterwards with the companies created.
+
+Usage: python benchmarks/bench_job_search.py [jobs] [searches per class]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import engine
+from app.services.job_ingest import JobIngestor
+from app.services.job_search import JobSearch
+
+TITLES = ["Software Engineer", "Data Scientist", "Product Manager", "DevOps Engineer", "Frontend Developer",
+          "Backend Developer", "QA Engineer", "Data Engineer", "Engineering Manager", "Designer"]
+LEVELS = ["Junior", "Mid Level", "Senior", "Staff", "Director"]
+SKILLS = ["python", "java", "kubernetes", "terraform", "react", "postgresql", "kafka", "spark", "golang", "rust",
+          "typescript", "graphql", "airflow", "snowflake", "pytorch", "tableau", "figma", "selenium", "ansible",
+          "elixir", "haskell", "fortran", "cobol", "erlang"]
+SYLLABLES = ["ba", "ko", "ri", "te", "mu", "sa", "lo", "ne", "vi", "da", "pe", "zu", "fa", "gi", "ho", "ya"]
+
+RECOMPUTED = text(" ".join("""
+    WITH q AS (SELECT websearch_to_tsquery('english', :query) AS query)
+    SELECT j.id, ts_rank_cd(
+        setweight(to_tsvector('english', coalesce(j.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(j.requirements, '') || ' ' || coalesce(j.responsibilities, '')), 'B') ||
+        setweight(to_tsvector('english', j.description), 'C'), q.query, 1) AS rank
+    FROM jobs j, q
+    WHERE j.search_vector @@ q.query AND j.is_active = TRUE AND j.canonical_job_id IS NULL
+    ORDER BY rank DESC, j.id DESC
+    LIMIT 21
+""".split()))
+
+
+def vocabulary(size=3000, seed=11):
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    words = sorted(words)
+    # Zipf-like weights: the first words are in most descriptions
+    return words, [1 / (rank + 1) for rank in range(size)]
+
+
+def records(count, tag, seed=5):
+    rng = random.Random(seed)
+    words, weights = vocabulary()
+    companies = max(50, count // 200)
+    for number in range(count):
+        title = f"{rng.choice(LEVELS)} {rng.choice(TITLES)}"
+        skills = rng.sample(SKILLS[:18], 3) + ([rng.choice(SKILLS[18:])] if rng.random() < 0.002 else [])
+        body = rng.choices(words, weights, k=120)
+        for skill in skills:
+            body.insert(rng.randrange(len(body)), skill)
+        yield {
+            "external_id": f"{tag}-{number}",
+            "title": title,
+            "description": " ".join(body),
+            "requirements": f"Experience with {', '.join(skills[:2])}.",
+            "company": f"Bench Co {tag} {number % companies}",
+            "company_domain": f"bench-{tag}-{number % companies}.example.com",
+            "remote_type": rng.choice(["Remote", "Hybrid", "On-site"]),
+            "posted_at": "2026-01-15T09:00:00Z",
+        }
+
+
+def query_classes(rng, searches):
+    words, _ = vocabulary()
+    return {
+        "rare term": [rng.choice(SKILLS[18:]) for _ in range(searches)],
+        "skill": [f"{rng.choice(SKILLS[:18])} {rng.choice(LEVELS).split()[0].lower()}" for _ in range(searches)],
+        "common word": [rng.choice(words[:20]) for _ in range(searches)],
+        "phrase": [f'"{rng.choice(TITLES).lower()}"' for _ in range(searches)],
+        "exclusion": [f"{rng.choice(SKILLS[:18])} -{rng.choice(SKILLS[:18])}" for _ in range(searches)],
+    }
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def report(label, timings, note=""):
+    print(f"  {label:<22} p50 {percentile(timings, 0.5) * 1000:7.2f} ms   p95 {percentile(timings, 0.95) * 1000:7.2f} ms"
+          f"   p99 {percentile(timings, 0.99) * 1000:7.2f} ms{note}")
+
+
+async def timed(coro):
+    start = time.perf_counter()
+    result = await coro
+    return time.perf_counter() - start, result
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    searches = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    tag = uuid.uuid4().hex[:8]
+    source = f"bench_{tag}"
+    rng = random.Random(3)
+
+    print(f"🔍 Loading {count} jobs")
+    try:
+        result = await JobIngestor(settings.JOB_INGEST_BATCH_SIZE, engine).ingest(records(count, tag), source)
+        print(f"  {result['inserted']} inserted in {result['seconds']:.0f} s")
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("VACUUM ANALYZE jobs"))
+
+        classes = query_classes(rng, searches)
+        uncached = JobSearch(0, 0)
+        async with engine.connect() as conn:
+            print("📊 Stored search_vector, no cache")
+            for label, queries in classes.items():
+                first, third, matches = [], [], 0
+                for query in queries:
+                    elapsed, page = await timed(uncached.search(conn, query, limit=20))
+                    first.append(elapsed)
+                    matches += len(page["hits"])
+                    pages = 1
+                    while page["next_cursor"] and pages < 3:
+                        elapsed, page = await timed(uncached.search(conn, query, page["next_cursor"], limit=20))
+                        pages += 1
+                    if pages == 3:
+                        third.append(elapsed)
+                report(label, first, f"   ({matches / len(queries):.0f} hits/page)")
+                if third:
+                    report(f"{label}, page 3", third)
+
+            print("📊 Ranking on a recomputed tsvector")
+            for label in ("rare term", "skill"):
+                timings = []
+                for query in classes[label][:10]:
+                    elapsed, _ = await timed(conn.execute(RECOMPUTED, {"query": query}))
+                    timings.append(elapsed)
+                report(label, timings)
+
+            print("📊 Cache (20 popular queries, repeated)")
+            # Entries must outlive the warm-up passes, which take minutes for broad queries on a slow database
+            cache = JobSearch(3600.0, settings.JOB_SEARCH_CACHE_SIZE)
+            popular = classes["skill"][:10] + classes["common word"][:10]
+            for query in popular * 2:
+                await cache.search(conn, query, limit=20)
+            timings = []
+            for _ in range(5):
+                for query in popular:
+                    elapsed, _ = await timed(cache.search(conn, query, limit=20))
+                    timings.append(elapsed)
+            report("cache hit", timings, f"   hit rate {cache.snapshot()['hit_rate']}")
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text("DELETE FROM jobs WHERE external_source = :source"), {"source": source})
+            await conn.execute(text("DELETE FROM companies WHERE slug LIKE :slug"), {"slug": f"bench-co-{tag}-%"})
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
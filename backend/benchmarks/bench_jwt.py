@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+JWT Signing Benchmark
+Per-token signing and verification cost of HS256 against ES256 and EdDSA
+through the key ring (keys parsed once), plus ES256 with the PEM handed to
+python-jose on every call as a naive implementation would. Also reports
+token sizes.
+
+Imports settings (so the usual .env is needed) but no database. Keys are
+generated in a temporary directory.
+
+Usage: python benchmarks/bench_jwt.py [tokens]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+from jose import jwt
+
+from app.core.keys import KeyRing
+
+
+def claims():
+    now = int(time.time())
+    return {
+        "sub": "5f0c6a56-1d5e-4a7e-9c0b-2d1f0e8b7a11",
+        "jti": "0b4e7c1a-3f2d-4c5b-8a9e-6d7f1e2c3b4a",
+        "exp": now + 1800,
+        "iat": now,
+        "type": "access",
+    }
+
+
+def timed(func, count):
+    start = time.perf_counter_ns()
+    for _ in range(count):
+        func()
+    return (time.perf_counter_ns() - start) / count / 1000
+
+
+def report(label, sign_us, verify_us, token):
+    print(f"  {label:<24} sign {sign_us:>8.1f} µs   verify {verify_us:>8.1f} µs   {len(token):>4} bytes")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    payload = claims()
+    print(f"🔍 {count} tokens per variant")
+
+    secret = "bench-" + "x" * 58
+    token = jwt.encode(payload, secret, algorithm="HS256")
+    report(
+        "HS256 (jose, raw secret)",
+        timed(lambda: jwt.encode(payload, secret, algorithm="HS256"), count),
+        timed(lambda: jwt.decode(token, secret, algorithms=["HS256"]), count),
+        token
+    )
+
+    with tempfile.TemporaryDirectory() as key_dir:
+        rings = {}
+        for algorithm in ("HS256", "ES256", "EdDSA"):
+            ring = KeyRing(
+                algorithm=algorithm,
+                secret=secret,
+                key_dir=os.path.join(key_dir, algorithm),
+                rotation_days=0,
+                publish_ahead_seconds=0,
+                check_interval_seconds=60,
+                max_token_lifetime_seconds=7 * 86400
+            )
+            token = ring.encode(payload)
+            report(
+                f"{algorithm} (key ring)",
+                timed(lambda: ring.encode(payload), count),
+                timed(lambda: ring.decode(token), count),
+                token
+            )
+            rings[algorithm] = ring
+
+        # What the key ring avoids: parsing the PEM for every signature and verification
+        signing = rings["ES256"]._signing
+        private_pem = signing.private.to_pem()
+        public_pem = signing.public.to_pem()
+        token = jwt.encode(payload, private_pem, algorithm="ES256")
+        report(
+            "ES256 (PEM per call)",
+            timed(lambda: jwt.encode(payload, private_pem, algorithm="ES256"), count // 5 or 1),
+            timed(lambda: jwt.decode(token, public_pem, algorithms=["ES256"]), count // 5 or 1),
+            token
+        )
+
+    print("📊 ES256/EdDSA verification needs only the public keys at /.well-known/jwks.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Logging Pipeline Benchmark
+Request throughput of a minimal FastAPI app driven through ASGI, where each
+request emits one routine info event and one sampled info event, with:
+  off   - logging filtered out entirely
+  sync  - the previous synchronous JSON rendering on the event loop
+  async - the queued pipeline with background serialization and sampling
+
+Output goes to /dev/null so terminal speed does not skew the numbers.
+
+Usage: python benchmarks/bench_logging.py [requests]
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+import structlog
+from fastapi import FastAPI
+
+from app.core.logs import LogPipeline, configure_logging
+
+DEVNULL = open(os.devnull, "w")
+
+
+def build_app():
+    app = FastAPI()
+    logger = structlog.get_logger()
+
+    @app.get("/files/{file_key}")
+    async def get_file(file_key: str):
+        logger.info("🔗 Download URL generated", user_id="b3f1c2d4", file_key=file_key)
+        logger.info("Request handled", route="/files/{file_key}", status_code=200)
+        return {"file_key": file_key}
+
+    return app
+
+
+async def drive(app, count):
+    scope_template = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/files/abc", "raw_path": b"/files/abc",
+        "query_string": b"", "root_path": "", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(200):
+        await app(dict(scope_template), receive, send)
+    start = time.perf_counter()
+    for _ in range(count):
+        await app(dict(scope_template), receive, send)
+    return count / (time.perf_counter() - start)
+
+
+def configure(mode):
+    structlog.reset_defaults()
+    if mode == "off":
+        configure_logging(level="critical", asynchronous=False)
+    elif mode == "sync":
+        configure_logging(level="info", asynchronous=False)
+        structlog.configure(logger_factory=structlog.PrintLoggerFactory(file=DEVNULL))
+    else:
+        pipeline = LogPipeline(
+            level="info",
+            sample_rates={"Download URL generated": 0.1},
+            stream=DEVNULL
+        )
+        pipeline.start()
+        structlog.configure(
+            processors=[pipeline],
+            logger_factory=structlog.ReturnLoggerFactory(),
+            wrapper_class=structlog.make_filtering_bound_logger(pipeline.min_level),
+            cache_logger_on_first_use=True,
+        )
+        return pipeline
+    return None
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    print(f"🔍 {count} requests per mode, 2 info events per request")
+    baseline = None
+    for mode in ("off", "sync", "async"):
+        pipeline = configure(mode)
+        rate = asyncio.run(drive(build_app(), count))
+        baseline = baseline or rate
+        line = f"  {mode:<6} {rate:>10.0f} req/s   ({rate / baseline:.2f}x of off)"
+        if pipeline is not None:
+            pipeline.stop()
+            stats = pipeline.snapshot()
+            line += f"   written {stats['written']}   sampled out {stats['sampled_out']}   dropped {stats['dropped']}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Request Metrics Overhead Benchmark
+Drives a minimal FastAPI app directly through ASGI (no server, no network)
+with and without MetricsMiddleware, plus the previous BaseHTTPMiddleware
+timing/logging middleware, and reports the added cost per request.
+
+No database or environment settings needed.
+
+Usage: python benchmarks/bench_metrics.py [requests]
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+import structlog
+from fastapi import FastAPI, Request
+
+from app.core.metrics import MetricsRegistry, MetricsMiddleware
+
+
+def build_app(mode):
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    if mode == "metrics":
+        app.add_middleware(MetricsMiddleware, registry=MetricsRegistry(), slow_request_ms=0)
+    elif mode == "previous":
+        logger = structlog.get_logger()
+
+        @app.middleware("http")
+        async def add_process_time_header(request: Request, call_next):
+            start_time = time.time()
+            response = await call_next(request)
+            process_time = time.time() - start_time
+            response.headers["X-Process-Time"] = str(process_time)
+            logger.info(
+                "HTTP Request",
+                method=request.method,
+                url=str(request.url),
+                status_code=response.status_code,
+                process_time=process_time
+            )
+            return response
+    return app
+
+
+async def drive(app, count):
+    scope_template = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/items/42", "raw_path": b"/items/42",
+        "query_string": b"", "root_path": "", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    # Warm up route matching and middleware stack construction
+    for _ in range(200):
+        await app(dict(scope_template), receive, send)
+
+    start = time.perf_counter_ns()
+    for _ in range(count):
+        await app(dict(scope_template), receive, send)
+    return (time.perf_counter_ns() - start) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    # Keep the previous middleware's log line off the terminal without skipping its work
+    structlog.configure(
+        processors=[structlog.processors.TimeStamper(fmt="iso"), structlog.processors.JSONRenderer()],
+        logger_factory=structlog.PrintLoggerFactory(file=open(os.devnull, "w"))
+    )
+
+    results = {}
+    for mode in ("none", "metrics", "previous"):
+        results[mode] = asyncio.run(drive(build_app(mode), count))
+
+    base = results["none"]
+    print(f"🔍 {count} requests per mode")
+    print(f"  no middleware        {base / 1000:>8.2f} µs/request")
+    print(f"  MetricsMiddleware    {results['metrics'] / 1000:>8.2f} µs/request   (+{(results['metrics'] - base) / 1000:.2f} µs)")
+    print(f"  previous middleware  {results['previous'] / 1000:>8.2f} µs/request   (+{(results['previous'] - base) / 1000:.2f} µs)")
+
+    registry = MetricsRegistry()
+    observe = registry.observe_request
+    start = time.perf_counter_ns()
+    for i in range(count):
+        observe("GET", "/items/{item_id}", 200, 1_500_000 + i)
+    print(f"  observe_request      {(time.perf_counter_ns() - start) / count / 1000:>8.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
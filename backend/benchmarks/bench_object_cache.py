@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Object Cache Benchmark
+Replays reads of resume originals with a skewed (Zipf) key popularity, as
+extraction, re-scoring and previews produce, against the local S3 stand-in
+from bench_transfers.py (per-request latency, per-connection bandwidth):
+
+1. A bucket GET for every read (today's behaviour).
+2. The object cache: disk hits read through mmap, misses downloaded once.
+
+Each read hashes the whole file, standing in for a parser. Reports latency
+percentiles, bucket GETs and bytes, hit rate, and a burst of concurrent
+reads of one uncached key (single-flight: one GET).
+
+Usage: python benchmarks/bench_object_cache.py [reads] [objects] [cache_mb] [latency_ms]
+"""
+
+import asyncio
+import hashlib
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+from benchmarks.bench_transfers import S3StandIn, make_client
+from app.services.object_cache import MB, ObjectCache
+
+CONCURRENCY = 32
+
+
+def zipf_keys(keys, reads, s=1.1, seed=42):
+    weights = [1 / (rank + 1) ** s for rank in range(len(keys))]
+    return random.Random(seed).choices(keys, weights=weights, k=reads)
+
+
+async def replay(workload, read):
+    latencies = []
+    queue = list(reversed(workload))
+
+    async def worker():
+        while queue:
+            key = queue.pop()
+            start = time.perf_counter()
+            await read(key)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    return time.perf_counter() - start, latencies
+
+
+def report(label, elapsed, latencies, server):
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"  {label:<12} {elapsed:>7.2f} s   p50 {statistics.median(latencies) * 1000:>7.1f} ms"
+          f"   p99 {p99 * 1000:>7.1f} ms   {server.requests.get('GetObject', 0):>6} GETs")
+
+
+async def main():
+    reads = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    objects = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    cache_mb = int(sys.argv[3]) if len(sys.argv) > 3 else 64
+    latency_ms = float(sys.argv[4]) if len(sys.argv) > 4 else 30
+
+    server = S3StandIn(latency_ms / 1000, 50 * MB)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = make_client(f"http://127.0.0.1:{server.server_address[1]}", CONCURRENCY)
+
+    rng = random.Random(7)
+    keys = [f"resumes/user-{i % 50}/resume-{i:04d}.pdf" for i in range(objects)]
+    for key in keys:
+        client.put_object(Bucket="bench", Key=key, Body=os.urandom(rng.randint(100, 900) * 1024))
+    total = sum(len(obj["data"]) for obj in server.objects.values())
+    workload = zipf_keys(keys, reads)
+    print(f"🔍 {reads} reads over {objects} objects ({total / MB:.0f} MB), {len(set(workload))} distinct, "
+          f"{CONCURRENCY} concurrent; {latency_ms:.0f} ms per request; cache {cache_mb} MB")
+
+    def get_and_parse(key):
+        body = client.get_object(Bucket="bench", Key=key)['Body'].read()
+        return hashlib.sha256(body).digest()
+
+    async def direct_read(key):
+        await asyncio.to_thread(get_and_parse, key)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ObjectCache(directory, cache_mb * MB, lambda: client, "bench")
+        await cache.start()
+
+        def parse(cached):
+            with cached.open() as data:
+                return hashlib.sha256(data).digest()
+
+        async def cached_read(key):
+            async with cache.get(key) as cached:
+                await asyncio.to_thread(parse, cached)
+
+        print("📊 Replay")
+        server.requests.clear()
+        elapsed, latencies = await replay(workload, direct_read)
+        report("bucket GET", elapsed, latencies, server)
+        server.requests.clear()
+        elapsed, latencies = await replay(workload, cached_read)
+        report("cache", elapsed, latencies, server)
+        stats = cache.snapshot()
+        print(f"  hit rate {stats['hit_rate']:.1%}, {stats['gets_saved']} GETs and "
+              f"{stats['bytes_saved'] / MB:.0f} MB saved, {stats['bytes_downloaded'] / MB:.0f} MB downloaded, "
+              f"{stats['evictions']} evictions, {stats['bytes'] / MB:.0f} MB on disk")
+
+        print("📊 Burst of 64 concurrent reads of one uncached key")
+        client.put_object(Bucket="bench", Key="resumes/burst.pdf", Body=os.urandom(512 * 1024))
+        server.requests.clear()
+        start = time.perf_counter()
+        await asyncio.gather(*(cached_read("resumes/burst.pdf") for _ in range(64)))
+        print(f"  {(time.perf_counter() - start) * 1000:.1f} ms, {server.requests.get('GetObject', 0)} GET "
+              f"({cache.coalesced} reads coalesced in total)")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Preview Rendering Benchmark
+Measures page preview rendering (app/services/rendering.py) as the preview
+process pool runs it:
+
+1. Per file: cold render in a fresh process (imports included), warm render
+   time per page, peak memory added per page (ru_maxrss in a fresh process)
+   and encoded image size per width.
+2. Throughput of a batch rendered by 1 process vs PREVIEW_WORKERS processes.
+
+Without arguments it renders generated samples: a text PDF (built by hand,
+Helvetica text like an exported resume), a DOCX and a TXT. Pass real
+resumes for representative numbers.
+
+Usage: python benchmarks/bench_previews.py [file ...]
+"""
+
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+from app.core.config import settings
+from app.services.rendering import render_pages
+
+LINE = "Led a team of five engineers building resume parsing and job matching services"
+
+
+def make_pdf(path, pages=3, lines=55):
+    """A text-only PDF: one Helvetica content stream per page"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        text = "".join(f"BT /F1 10 Tf 54 {740 - row * 13} Td ({LINE} {page}.{row}) Tj ET\n" for row in range(lines))
+        stream = text.encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+            b"/Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids), len(kids)
+    )
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    Path(path).write_bytes(bytes(output))
+
+
+def make_samples(directory):
+    import docx
+
+    pdf = os.path.join(directory, "sample.pdf")
+    make_pdf(pdf)
+    document = docx.Document()
+    for _ in range(90):
+        document.add_paragraph(LINE + ". " + LINE.lower() + ".")
+    docx_path = os.path.join(directory, "sample.docx")
+    document.save(docx_path)
+    txt = os.path.join(directory, "sample.txt")
+    Path(txt).write_text("\n".join(f"{LINE} {row}" for row in range(150)))
+    return [pdf, docx_path, txt]
+
+
+def measure(path, extension, widths, max_pages, image_format, quality):
+    """Runs in a fresh process: cold render, then a warm one, with the peak RSS each adds"""
+    peak = lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    before = peak()
+    start = time.perf_counter()
+    render_pages(path, extension, widths, max_pages, image_format, quality)
+    cold = time.perf_counter() - start
+    after_cold = peak()
+    result = render_pages(path, extension, widths, max_pages, image_format, quality)
+    return {
+        "cold": cold,
+        "warm": result["seconds"],
+        "pages": min(result["pages"], max_pages),
+        "cold_kb": after_cold - before,
+        "warm_kb": peak() - after_cold,
+        "images": [(width, len(image)) for _, width, image in result["images"]],
+    }
+
+
+def main():
+    widths = settings.preview_widths_list
+    options = (widths, settings.PREVIEW_MAX_PAGES, settings.PREVIEW_FORMAT, settings.PREVIEW_QUALITY)
+    spawn = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = sys.argv[1:] or make_samples(directory)
+        print(f"🔍 widths {widths}, up to {settings.PREVIEW_MAX_PAGES} pages, {settings.PREVIEW_FORMAT} "
+              f"q{settings.PREVIEW_QUALITY}")
+        print("📊 Per file (fresh process each)")
+        for path in files:
+            extension = Path(path).suffix.lower().lstrip('.')
+            with ProcessPoolExecutor(1, mp_context=spawn) as pool:
+                stats = pool.submit(measure, path, extension, *options).result()
+            pages = stats["pages"]
+            sizes = {}
+            for width, size in stats["images"]:
+                sizes.setdefault(width, []).append(size)
+            image_sizes = ", ".join(
+                f"w{width} {sum(s) / len(s) / 1024:.0f} KB" for width, s in sorted(sizes.items())
+            )
+            print(f"  {Path(path).name:<16} {pages} pages   cold {stats['cold'] * 1000:>6.0f} ms   "
+                  f"warm {stats['warm'] * 1000 / pages:>6.1f} ms/page   "
+                  f"peak +{stats['cold_kb'] / 1024:.1f} MB cold, +{stats['warm_kb'] / 1024 / pages:.1f} MB/page warm   "
+                  f"{image_sizes}")
+
+        batch = files * 8
+        print(f"📊 Batch of {len(batch)} files")
+        baseline = None
+        for workers in sorted({1, max(1, settings.PREVIEW_WORKERS), os.cpu_count() or 1}):
+            with ProcessPoolExecutor(workers, mp_context=spawn) as pool:
+                # Start the processes and load the imaging libraries before timing
+                list(pool.map(render_pages, files[:1] * workers, [files[0].rsplit(".", 1)[1]] * workers,
+                              *([option] * workers for option in options)))
+                start = time.perf_counter()
+                list(pool.map(
+                    render_pages, batch, [path.rsplit(".", 1)[1].lower() for path in batch],
+                    *([option] * len(batch) for option in options)
+                ))
+                elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"  {workers:>2} processes   {elapsed:>6.2f} s   {len(batch) / elapsed:>6.1f} files/s"
+                  f"   ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
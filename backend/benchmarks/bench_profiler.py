@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Sampling Profiler Overhead Benchmark
+Drives a minimal FastAPI app directly through ASGI (no server, no network)
+with the profiler off and sampling the loop thread at 5 ms and 1 ms, and
+reports the throughput cost and how samples were attributed to routes.
+
+Imports settings (so the usual .env is needed) but no database.
+
+Usage: python benchmarks/bench_profiler.py [requests]
+"""
+
+import asyncio
+import hashlib
+import os
+import sys
+import time
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+from fastapi import FastAPI
+
+from app.core.profiler import SamplingProfiler
+
+
+def build_app():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/hash/{rounds}")
+    async def hash_rounds(rounds: int):
+        digest = b""
+        for _ in range(rounds):
+            digest = hashlib.sha256(digest).digest()
+        return {"digest": digest.hex()}
+
+    return app
+
+
+async def drive(app, count):
+    def scope(path):
+        return {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+            "query_string": b"", "root_path": "", "headers": [(b"host", b"bench")],
+            "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+        }
+
+    paths = ["/items/42", "/items/42", "/items/42", "/hash/2000"]
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(200):
+        await app(scope(paths[0]), receive, send)
+
+    start = time.perf_counter_ns()
+    for i in range(count):
+        await app(scope(paths[i % len(paths)]), receive, send)
+    return (time.perf_counter_ns() - start) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    app = build_app()
+
+    print(f"🔍 {count} requests per mode (3 of 4 trivial, 1 of 4 hashing)")
+    base = asyncio.run(drive(app, count))
+    print(f"  profiler off         {base / 1000:>8.2f} µs/request")
+
+    for interval_ms in (5.0, 1.0):
+        profiler = SamplingProfiler(max_seconds=600)
+        profiler.start(seconds=600, interval_ms=interval_ms)
+        took = asyncio.run(drive(app, count))
+        result = profiler.stop()
+        summary = result.summary(top=3)
+        print(
+            f"  sampling @ {interval_ms:>3.0f} ms     {took / 1000:>8.2f} µs/request   "
+            f"({(took - base) / base * 100:+.1f}%, {summary['samples']} samples, "
+            f"sampler {summary['sampler_overhead_ratio'] * 100:.2f}% of wall time)"
+        )
+
+    print("📊 Samples by route (1 ms run)")
+    for route, samples in summary["routes"].items():
+        print(f"  {route:<24} {samples:>6} ({samples / summary['samples'] * 100:.1f}%)")
+    print("📊 Top frames")
+    for frame in summary["top_frames"]:
+        print(f"  {frame['samples']:>6}  {frame['frame']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Query Registry Micro-Benchmark
+Compares the previous per-call text() construction and dict row mapping
+with the registered statements and __slots__ records.
+
+The client-side section needs no database. The live section runs when
+DATABASE_URL is configured and the schema from migration.sql is loaded.
+
+Usage: python benchmarks/bench_queries.py [iterations]
+"""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import asyncpg as pg_asyncpg
+
+from app.core import queries
+from app.core.queries import SessionRecord
+
+
+SESSION_COLUMNS = SessionRecord.__slots__
+FakeRow = namedtuple("FakeRow", SESSION_COLUMNS)
+
+OLD_BY_JTI_SQL = """
+                SELECT id, user_id, token_hash, device_info, ip_address,
+                       expires_at, is_revoked, created_at
+                FROM user_sessions
+                WHERE jwt_jti = :jwt_jti
+            """
+
+
+def timed(label, iterations, fn):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<44} {elapsed / iterations * 1e6:>9.2f} µs/op")
+
+
+def old_revoke_by_jti_statement(jwt_jtis):
+    placeholders = ",".join([f":jti_{i}" for i in range(len(jwt_jtis))])
+    params = {f"jti_{i}": jti for i, jti in enumerate(jwt_jtis)}
+    return text(f"""
+                UPDATE user_sessions
+                SET is_revoked = TRUE
+                WHERE jwt_jti IN ({placeholders})
+                AND is_revoked = FALSE
+            """), params
+
+
+def old_row_to_dict(row):
+    return {
+        "id": str(row.id),
+        "user_id": str(row.user_id),
+        "token_hash": row.token_hash,
+        "device_info": row.device_info,
+        "ip_address": str(row.ip_address) if row.ip_address else None,
+        "expires_at": row.expires_at,
+        "is_revoked": row.is_revoked,
+        "created_at": row.created_at
+    }
+
+
+def client_side(iterations):
+    print("🔍 Client-side cost (no database)")
+    dialect = pg_asyncpg.dialect()
+    jtis = [str(uuid.uuid4()) for _ in range(3)]
+
+    timed("old: build + compile text() per call", iterations,
+          lambda: text(OLD_BY_JTI_SQL).compile(dialect=dialect))
+    timed("registry: compile cached statement", iterations,
+          lambda: queries.SESSION_BY_JWT_JTI.statement.compile(dialect=dialect))
+    timed("old: f-string IN (...) revoke, 3 jtis", iterations,
+          lambda: old_revoke_by_jti_statement(jtis)[0].compile(dialect=dialect))
+    timed("registry: ANY(:jwt_jtis) revoke", iterations,
+          lambda: queries.SESSIONS_REVOKE_BY_JWT_JTI.statement.compile(dialect=dialect))
+
+    now = datetime.utcnow()
+    row = FakeRow(uuid.uuid4(), uuid.uuid4(), "hash", "jti", {"device_type": "desktop"},
+                  "127.0.0.1", now, False, now)
+    timed("old: row -> dict", iterations, lambda: old_row_to_dict(row))
+    timed("registry: row -> SessionRecord", iterations, lambda: SessionRecord.from_row(row))
+
+    distinct = {old_revoke_by_jti_statement(jtis[:n])[0].text for n in range(1, 4)}
+    print(f"  distinct server statements for 1..3 jtis: old={len(distinct)} registry=1")
+
+
+async def live(iterations):
+    from app.core.database import AsyncSessionLocal, engine
+
+    print("🔍 Live round trips (PostgreSQL)")
+    jti = str(uuid.uuid4())
+    async with AsyncSessionLocal() as db:
+        for label, run in (
+            ("old: text() per call, by jwt_jti", lambda: db.execute(text(OLD_BY_JTI_SQL), {"jwt_jti": jti})),
+            ("registry: SESSION_BY_JWT_JTI", lambda: queries.SESSION_BY_JWT_JTI.fetch_one(db, jwt_jti=jti)),
+        ):
+            await run()
+            start = time.perf_counter()
+            for _ in range(iterations):
+                await run()
+            elapsed = time.perf_counter() - start
+            print(f"  {label:<44} {elapsed / iterations * 1e6:>9.2f} µs/op")
+
+        for n in (1, 2, 5, 10):
+            jtis = [str(uuid.uuid4()) for _ in range(n)]
+            statement, params = old_revoke_by_jti_statement(jtis)
+            start = time.perf_counter()
+            for _ in range(iterations):
+                await db.execute(statement, params)
+            old = (time.perf_counter() - start) / iterations
+            start = time.perf_counter()
+            for _ in range(iterations):
+                await queries.SESSIONS_REVOKE_BY_JWT_JTI.execute(db, jwt_jtis=jtis)
+            new = (time.perf_counter() - start) / iterations
+            print(f"  revoke by {n:>2} jtis: old {old * 1e6:>9.2f} µs/op   registry {new * 1e6:>9.2f} µs/op")
+        await db.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    client_side(iterations * 10)
+    if os.environ.get("DATABASE_URL") or (backend_dir / ".env").exists():
+        asyncio.run(live(iterations))
+    else:
+        print("⚠️ DATABASE_URL not configured, skipping live round trips")
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Refresh Rotation Benchmark
+1. Throughput: refreshes per second with the previous scheme (insert a new
+   user_sessions row, then revoke the old one) against in-place rotation
+   (SESSION_ROTATE, one statement), at several concurrency levels.
+2. Growth: a simulated month of refreshes for a group of users (one refresh
+   per access-token lifetime during active hours) under both schemes; reports
+   rows per user, table size and /sessions/active query latency afterwards.
+3. Reuse: replays an already-rotated refresh token and checks that the
+   session is revoked.
+
+Requires the schema from migration.sql. Benchmark users are created and
+deleted afterwards (their sessions go with them).
+
+Usage: python benchmarks/bench_refresh_rotation.py [users] [active_hours_per_day]
+"""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+from sqlalchemy import text
+
+from app.core import queries
+from app.core.config import settings
+from app.core.database import engine, AsyncSessionLocal
+from app.models.session import SessionCreate
+from app.services.session import SessionService
+
+SESSION_DATA = SessionCreate(ip_address="203.0.113.10")
+
+
+async def create_users(count):
+    user_ids = [str(uuid.uuid4()) for _ in range(count)]
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        for user_id in user_ids:
+            await queries.USER_INSERT.execute(
+                db, id=user_id, email=f"bench-{user_id[:8]}@example.com", full_name="Bench User",
+                hashed_password="x", is_active=True, created_at=now, updated_at=now
+            )
+        await db.commit()
+    return user_ids
+
+
+async def login(db, user_id):
+    session_id = str(uuid.uuid4())
+    jti = str(uuid.uuid4())
+    await SessionService.create_session(
+        db=db, user_id=user_id, jwt_jti=jti, token=uuid.uuid4().hex,
+        session_data=SESSION_DATA,
+        expires_at=datetime.utcnow() + timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS),
+        session_id=session_id
+    )
+    return {"session_id": session_id, "jti": jti, "generation": 0}
+
+
+async def refresh_previous(db, user_id, state):
+    """What /auth/refresh did before: a new row per refresh, then revoke the old JTI"""
+    jti = str(uuid.uuid4())
+    await SessionService.create_session(
+        db=db, user_id=user_id, jwt_jti=jti, token=uuid.uuid4().hex,
+        session_data=SESSION_DATA,
+        expires_at=datetime.utcnow() + timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    await SessionService.revoke_sessions_by_jwt_jti(db, [state["jti"]])
+    state["jti"] = jti
+
+
+async def refresh_rotate(db, user_id, state):
+    generation, reused = await SessionService.rotate_session(
+        db=db, session_id=state["session_id"], user_id=user_id, generation=state["generation"],
+        jwt_jti=str(uuid.uuid4()), session_data=SESSION_DATA,
+        expires_at=datetime.utcnow() + timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS)
+    )
+    if generation is None:
+        raise RuntimeError(f"Rotation failed (reused={reused})")
+    state["generation"] = generation
+
+
+async def throughput(user_ids, refresh, concurrency, per_worker):
+    async def worker(user_id):
+        async with AsyncSessionLocal() as db:
+            state = await login(db, user_id)
+            for _ in range(per_worker):
+                await refresh(db, user_id, state)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(user_ids[i % len(user_ids)]) for i in range(concurrency)))
+    return concurrency * per_worker / (time.perf_counter() - start)
+
+
+async def table_size():
+    async with engine.connect() as conn:
+        result = await conn.execute(text("SELECT pg_total_relation_size('user_sessions')"))
+        return result.scalar()
+
+
+async def active_sessions_ms(user_ids):
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        for user_id in user_ids:
+            await queries.SESSIONS_ACTIVE_FOR_USER.fetch_all(db, user_id=user_id)
+        return (time.perf_counter() - start) / len(user_ids) * 1000
+
+
+async def simulate_month(user_ids, refresh, refreshes_per_user):
+    size_before = await table_size()
+
+    async def user_month(user_id):
+        async with AsyncSessionLocal() as db:
+            state = await login(db, user_id)
+            for _ in range(refreshes_per_user):
+                await refresh(db, user_id, state)
+
+    for start in range(0, len(user_ids), 20):
+        await asyncio.gather(*(user_month(user_id) for user_id in user_ids[start:start + 20]))
+
+    async with engine.connect() as conn:
+        rows = (await conn.execute(
+            text("SELECT COUNT(*) FROM user_sessions WHERE user_id = ANY(CAST(:ids AS UUID[]))"),
+            {"ids": user_ids}
+        )).scalar()
+    return rows / len(user_ids), await table_size() - size_before, await active_sessions_ms(user_ids)
+
+
+async def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    active_hours = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    refreshes_per_user = 30 * active_hours * 60 // settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES
+
+    previous_users = await create_users(users)
+    rotate_users = await create_users(users)
+    try:
+        print("🔍 Refresh throughput")
+        for concurrency in (1, 10, 50):
+            per_worker = max(20, 1000 // concurrency)
+            before = await throughput(previous_users, refresh_previous, concurrency, per_worker)
+            after = await throughput(rotate_users, refresh_rotate, concurrency, per_worker)
+            print(f"  concurrency {concurrency:>3}   insert+revoke {before:>8.0f}/s   rotate in place {after:>8.0f}/s   ({after / before:.1f}x)")
+
+        # Start the month from a clean slate
+        async with engine.begin() as conn:
+            await conn.execute(
+                text("DELETE FROM user_sessions WHERE user_id = ANY(CAST(:ids AS UUID[]))"),
+                {"ids": previous_users + rotate_users}
+            )
+
+        print(f"🔍 Simulated month: {users} users x {refreshes_per_user} refreshes "
+              f"({active_hours} active hours/day, {settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES} min tokens)")
+        for label, user_ids, refresh in (
+            ("insert+revoke", previous_users, refresh_previous),
+            ("rotate in place", rotate_users, refresh_rotate),
+        ):
+            rows_per_user, growth, active_ms = await simulate_month(user_ids, refresh, refreshes_per_user)
+            print(f"  {label:<16} {rows_per_user:>8.0f} rows/user   +{growth / 1024 / 1024:>7.1f} MB   "
+                  f"/sessions/active query {active_ms:>6.2f} ms")
+
+        print("📊 Reuse detection")
+        async with AsyncSessionLocal() as db:
+            state = await login(db, rotate_users[0])
+            await refresh_rotate(db, rotate_users[0], state)
+            stale = dict(state, generation=state["generation"] - 1)
+            generation, reused = await SessionService.rotate_session(
+                db=db, session_id=stale["session_id"], user_id=rotate_users[0], generation=stale["generation"],
+                jwt_jti=str(uuid.uuid4()), session_data=SESSION_DATA,
+                expires_at=datetime.utcnow() + timedelta(days=1)
+            )
+            print(f"  replayed generation {stale['generation']}   rotated={generation is not None}   reuse detected={reused}")
+            generation, _ = await SessionService.rotate_session(
+                db=db, session_id=state["session_id"], user_id=rotate_users[0], generation=state["generation"],
+                jwt_jti=str(uuid.uuid4()), session_data=SESSION_DATA,
+                expires_at=datetime.utcnow() + timedelta(days=1)
+            )
+            print(f"  current token afterwards   rotated={generation is not None}")
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(
+                text("DELETE FROM users WHERE id = ANY(CAST(:ids AS UUID[]))"),
+                {"ids": previous_users + rotate_users}
+            )
+            await conn.execute(
+                text("DELETE FROM user_session_epochs WHERE user_id = ANY(CAST(:ids AS UUID[]))"),
+                {"ids": previous_users + rotate_users}
+            )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Read Replica Mixed Workload Benchmark
+Measures write-path throughput and latency on the primary while a read-heavy
+load runs either on the primary or on the replica.
+
+Requires DATABASE_URL (primary) and DATABASE_READ_URL (replica), e.g. two
+local PostgreSQL instances as described in README.md ("Read replica routing").
+The read query is a CPU-bound aggregate standing in for /sessions/stats and
+/sessions/security, so it also works against two independent instances.
+
+Usage: python benchmarks/bench_replica.py [seconds] [readers] [writers]
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+
+
+READ_SQL = text("SELECT COUNT(*), AVG(g) FROM generate_series(1, 200000) AS g")
+WRITE_SQL = text("INSERT INTO bench_replica_writes (payload) VALUES (:payload)")
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of floats"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_mix(label, primary, reader_engine, seconds, readers, writers):
+    deadline = time.perf_counter() + seconds
+    write_latencies = []
+    reads = 0
+
+    async def reader():
+        nonlocal reads
+        while time.perf_counter() < deadline:
+            async with reader_engine.connect() as conn:
+                await conn.execute(READ_SQL)
+            reads += 1
+
+    async def writer():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            async with primary.begin() as conn:
+                await conn.execute(WRITE_SQL, {"payload": "x" * 64})
+            write_latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(
+        *(reader() for _ in range(readers)),
+        *(writer() for _ in range(writers))
+    )
+    writes_per_second = len(write_latencies) / seconds
+    print(
+        f"{label:<16} writes {writes_per_second:>9.1f}/s   "
+        f"write p50 {percentile(write_latencies, 50) * 1000:>7.2f} ms   "
+        f"write p99 {percentile(write_latencies, 99) * 1000:>7.2f} ms   "
+        f"reads {reads / seconds:>7.1f}/s"
+    )
+    return writes_per_second
+
+
+async def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 15
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    writers = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+
+    if not settings.DATABASE_READ_URL:
+        print("❌ DATABASE_READ_URL is not set")
+        return False
+
+    primary = create_async_engine(settings.DATABASE_URL, pool_size=readers + writers, max_overflow=0)
+    replica = create_async_engine(settings.DATABASE_READ_URL, pool_size=readers, max_overflow=0)
+    try:
+        async with primary.begin() as conn:
+            await conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS bench_replica_writes (id BIGSERIAL PRIMARY KEY, payload TEXT)"
+            ))
+
+        print(f"🔍 {seconds:.0f}s per mix, {readers} readers, {writers} writers")
+        baseline = await run_mix("reads->primary", primary, primary, seconds, readers, writers)
+        routed = await run_mix("reads->replica", primary, replica, seconds, readers, writers)
+        if baseline:
+            print(f"📊 Write-path headroom: {routed / baseline:.2f}x")
+
+        async with primary.begin() as conn:
+            await conn.execute(text("DROP TABLE IF EXISTS bench_replica_writes"))
+        return True
+    finally:
+        await primary.dispose()
+        await replica.dispose()
+
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    sys.exit(0 if success else 1)
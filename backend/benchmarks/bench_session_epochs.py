@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Session Epoch Verification Benchmark
+Drives an authenticated endpoint directly through ASGI (no server) and
+compares the per-request cost and database statements of the user_sessions
+lookup against the session epoch fast path. Then revokes the session and
+measures how long the epoch bump takes to arrive over LISTEN/NOTIFY and
+whether the revoked token is rejected.
+
+Requires the schema from migration.sql (user_session_epochs and its
+triggers). A benchmark user is created and deleted afterwards.
+
+Usage: python benchmarks/bench_session_epochs.py [requests]
+"""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+from fastapi import Depends, FastAPI
+from sqlalchemy import event, text
+
+from app.core import queries
+from app.core.auth import create_access_token, get_current_active_user, generate_session_token
+from app.core.config import settings
+from app.core.database import engine, AsyncSessionLocal
+from app.models.auth import UserResponse
+from app.models.session import SessionCreate
+from app.services.session import SessionService
+from app.services.session_epochs import session_epochs
+
+
+def build_app():
+    app = FastAPI()
+
+    @app.get("/me")
+    async def me(current_user: UserResponse = Depends(get_current_active_user)):
+        return {"id": current_user.id}
+
+    return app
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+async def request(app, token):
+    status = {}
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/me", "raw_path": b"/me",
+        "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    await app(scope, receive, send)
+    return status.get("code")
+
+
+async def create_user_session(user_id):
+    """Session row plus access token, as the login endpoint creates them"""
+    access_token, access_jti = create_access_token(data={"sub": user_id})
+    async with AsyncSessionLocal() as db:
+        await SessionService.create_session(
+            db=db,
+            user_id=user_id,
+            jwt_jti=access_jti,
+            token=generate_session_token(),
+            session_data=SessionCreate(),
+            expires_at=datetime.utcnow() + timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
+        )
+    return access_token, access_jti
+
+
+async def run_mode(app, user_id, count, counter):
+    token, jti = await create_user_session(user_id)
+    for _ in range(50):
+        await request(app, token)
+
+    counter.count = 0
+    start = time.perf_counter_ns()
+    for _ in range(count):
+        status = await request(app, token)
+    elapsed = time.perf_counter_ns() - start
+    if status != 200:
+        raise RuntimeError(f"Benchmark request failed with {status}")
+    return elapsed / count, counter.count / count, token, jti
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    app = build_app()
+    counter = StatementCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+
+    user_id = str(uuid.uuid4())
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        await queries.USER_INSERT.execute(
+            db, id=user_id, email=f"bench-{user_id[:8]}@example.com", full_name="Bench User",
+            hashed_password="x", is_active=True, created_at=now, updated_at=now
+        )
+        await db.commit()
+
+    try:
+        print(f"🔍 {count} authenticated requests per mode")
+        session_epochs.enabled = False
+        lookup_ns, lookup_statements, _, _ = await run_mode(app, user_id, count, counter)
+        print(f"  user_sessions lookup   {lookup_ns / 1000:>8.1f} µs/request   {lookup_statements:.2f} statements/request")
+
+        session_epochs.enabled = True
+        await session_epochs.start(engine)
+        if not session_epochs.ready:
+            raise RuntimeError("Session epoch listener did not start")
+        epoch_ns, epoch_statements, token, jti = await run_mode(app, user_id, count, counter)
+        print(f"  session epoch          {epoch_ns / 1000:>8.1f} µs/request   {epoch_statements:.2f} statements/request"
+              f"   ({lookup_ns / epoch_ns:.1f}x)")
+
+        # Revocation: time from commit until this worker has seen the bump
+        before = session_epochs.current(user_id)
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            await SessionService.revoke_sessions_by_jwt_jti(db, [jti])
+            committed = time.perf_counter()
+        while session_epochs.current(user_id) == before and time.perf_counter() - committed < 5:
+            await asyncio.sleep(0.0005)
+        propagated = time.perf_counter()
+        status = await request(app, token)
+        print("📊 Revocation")
+        print(f"  revoke + commit        {(committed - start) * 1000:>8.2f} ms")
+        print(f"  epoch bump received    {(propagated - committed) * 1000:>8.2f} ms after commit")
+        print(f"  revoked token          HTTP {status}")
+        print(f"  {session_epochs.snapshot()}")
+    finally:
+        await session_epochs.stop()
+        async with engine.begin() as conn:
+            await conn.execute(text("DELETE FROM users WHERE id = CAST(:user_id AS UUID)"), {"user_id": user_id})
+            await conn.execute(
+                text("DELETE FROM user_session_epochs WHERE user_id = CAST(:user_id AS UUID)"), {"user_id": user_id}
+            )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Session Statistics Benchmark
+Times the previous two aggregate scans over user_sessions against the
+maintained user_session_stats lookup as a user's session history grows.
+
+Requires the schema from migration.sql. A throwaway user is created and
+removed (its sessions and stats cascade).
+
+Usage: python benchmarks/bench_session_stats.py [iterations]
+"""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+from sqlalchemy import text
+
+from app.core.database import AsyncSessionLocal, engine
+from app.services.session import SessionService
+
+
+HISTORY_SIZES = (100, 1_000, 10_000, 100_000)
+
+OLD_STATS_SQL = text("""
+    SELECT
+        COUNT(*) as total_sessions,
+        COUNT(*) FILTER (WHERE expires_at > NOW() AND is_revoked = FALSE) as active_sessions,
+        COUNT(*) FILTER (WHERE is_revoked = TRUE) as revoked_sessions,
+        COUNT(*) FILTER (WHERE expires_at <= NOW()) as expired_sessions,
+        COUNT(DISTINCT device_info->>'device_type') as unique_devices,
+        MAX(created_at) as most_recent_activity
+    FROM user_sessions
+    WHERE user_id = :user_id
+""")
+
+OLD_DURATION_SQL = text("""
+    SELECT AVG(
+        EXTRACT(EPOCH FROM LEAST(expires_at, NOW()) - created_at) / 3600
+    ) as avg_duration_hours
+    FROM user_sessions
+    WHERE user_id = :user_id
+    AND created_at >= NOW() - INTERVAL '30 days'
+""")
+
+# Mostly ended sessions, as for a long-lived user: a third revoked, the rest expired, a few live
+ADD_SESSIONS_SQL = text("""
+    INSERT INTO user_sessions (user_id, token_hash, jwt_jti, device_info, ip_address, expires_at, is_revoked, created_at)
+    SELECT
+        :user_id,
+        md5(random()::text || g::text),
+        md5(random()::text || g::text),
+        jsonb_build_object('device_type', (ARRAY['desktop', 'mobile', 'tablet'])[1 + g % 3]),
+        '10.0.0.1',
+        CASE WHEN g % 50 = 0 THEN NOW() + INTERVAL '30 minutes' ELSE NOW() - (g || ' minutes')::INTERVAL END,
+        g % 3 = 0 AND g % 50 <> 0,
+        NOW() - (g || ' minutes')::INTERVAL - INTERVAL '30 minutes'
+    FROM generate_series(1, CAST(:count AS INTEGER)) AS g
+""")
+
+
+async def time_it(iterations, fn):
+    await fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await fn()
+    return (time.perf_counter() - start) / iterations
+
+
+async def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    user_id = str(uuid.uuid4())
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            text("""
+                INSERT INTO users (id, email, password_hash, first_name, last_name)
+                VALUES (:id, :email, 'x', 'Bench', 'User')
+            """),
+            {"id": user_id, "email": f"bench-{user_id[:8]}@example.com"}
+        )
+        await db.commit()
+
+        try:
+            print(f"🔍 {iterations} iterations per size")
+            created = 0
+            for size in HISTORY_SIZES:
+                await db.execute(ADD_SESSIONS_SQL, {"user_id": user_id, "count": size - created})
+                await db.commit()
+                created = size
+                await SessionService.expire_sessions(db)
+
+                async def old():
+                    await db.execute(OLD_STATS_SQL, {"user_id": user_id})
+                    await db.execute(OLD_DURATION_SQL, {"user_id": user_id})
+
+                async def new():
+                    await SessionService.get_session_stats(db, user_id)
+
+                old_seconds = await time_it(iterations, old)
+                new_seconds = await time_it(iterations, new)
+                print(
+                    f"  {size:>7} sessions: aggregate scans {old_seconds * 1000:>8.3f} ms   "
+                    f"user_session_stats {new_seconds * 1000:>8.3f} ms"
+                )
+        finally:
+            await db.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+            await db.commit()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Object Transfer Benchmark
+Runs a local S3 stand-in (in-memory, path-style) that adds a fixed latency
+to every request and caps each connection's throughput, like a remote
+object store does, and compares boto3's defaults with the tiered transfer
+policy in app/services/transfers.py:
+
+1. Single uploads of small, medium and large objects: upload_fileobj with
+   the default TransferConfig against ObjectTransfers.upload.
+2. Many small uploads: a transfer manager per call against shared ones.
+3. Batch copy of many keys (a bucket migration): copy_object in a loop,
+   boto3's managed copy per key (HeadObject + copy), and copy_many (parallel,
+   sizes from the listing, no HeadObject).
+4. Batch download of many keys: download_fileobj per key against
+   download_many.
+
+Usage: python benchmarks/bench_transfers.py [latency_ms] [connection_mb_per_s] [keys]
+"""
+
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlparse
+from xml.sax.saxutils import escape
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+import boto3
+from botocore.config import Config
+
+from app.services.transfers import MB, ObjectTransfers, transfer_policy
+
+KB = 1024
+
+
+class S3StandIn(ThreadingHTTPServer):
+    """The subset of the S3 API that uploads, copies, downloads and listings use"""
+
+    daemon_threads = True
+
+    def __init__(self, latency: float, bandwidth: float):
+        super().__init__(("127.0.0.1", 0), S3Handler)
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.objects = {}
+        self.uploads = {}
+        self.requests = {}
+        self.lock = threading.Lock()
+
+    def count(self, operation):
+        with self.lock:
+            self.requests[operation] = self.requests.get(operation, 0) + 1
+
+
+class S3Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _transfer_delay(self, size):
+        if self.server.bandwidth:
+            time.sleep(size / self.server.bandwidth)
+
+    def _target(self):
+        url = urlparse(self.path)
+        bucket, _, key = url.path.lstrip("/").partition("/")
+        query = {name: values[0] for name, values in parse_qs(url.query, keep_blank_values=True).items()}
+        return bucket, unquote(key), query
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        self._transfer_delay(len(body))
+        return body
+
+    def _reply(self, status, body=b"", headers=None):
+        time.sleep(self.server.latency)
+        self._transfer_delay(len(body) if self.command == "GET" else 0)
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _xml(self, body):
+        self._reply(200, f'<?xml version="1.0" encoding="UTF-8"?>{body}'.encode(), {"Content-Type": "application/xml"})
+
+    def _object_headers(self, obj):
+        headers = {
+            "ETag": obj["etag"],
+            "Content-Type": obj["content_type"],
+            "Last-Modified": formatdate(obj["modified"], usegmt=True),
+        }
+        headers.update({f"x-amz-meta-{name}": value for name, value in obj["metadata"].items()})
+        return headers
+
+    def _new_object(self, data, content_type=None, metadata=None):
+        return {
+            "data": data,
+            "etag": f'"{hashlib.md5(data).hexdigest()}"',
+            "content_type": content_type or "binary/octet-stream",
+            "metadata": metadata or {},
+            "modified": time.time(),
+        }
+
+    def _copy_source(self):
+        source = unquote(self.headers["x-amz-copy-source"]).lstrip("/")
+        bucket, _, key = source.partition("/")
+        return self.server.objects.get((bucket, key.split("?")[0]))
+
+    def do_PUT(self):
+        bucket, key, query = self._target()
+        body = self._body()
+        if "uploadId" in query:
+            if "x-amz-copy-source" in self.headers:
+                self.server.count("UploadPartCopy")
+                source = self._copy_source()
+                start, end = map(int, self.headers["x-amz-copy-source-range"].split("=")[1].split("-"))
+                data = source["data"][start:end + 1]
+                self.server.uploads[query["uploadId"]]["parts"][int(query["partNumber"])] = data
+                etag = f'"{hashlib.md5(data).hexdigest()}"'
+                return self._xml(f"<CopyPartResult><ETag>{escape(etag)}</ETag>"
+                                 f"<LastModified>2025-01-01T00:00:00.000Z</LastModified></CopyPartResult>")
+            self.server.count("UploadPart")
+            self.server.uploads[query["uploadId"]]["parts"][int(query["partNumber"])] = body
+            return self._reply(200, headers={"ETag": f'"{hashlib.md5(body).hexdigest()}"'})
+        if "x-amz-copy-source" in self.headers:
+            self.server.count("CopyObject")
+            source = self._copy_source()
+            if source is None:
+                return self._reply(404)
+            obj = dict(source, modified=time.time())
+            if self.headers.get("x-amz-metadata-directive") == "REPLACE":
+                obj["metadata"] = self._metadata()
+            self.server.objects[(bucket, key)] = obj
+            return self._xml(f"<CopyObjectResult><ETag>{escape(obj['etag'])}</ETag>"
+                             f"<LastModified>2025-01-01T00:00:00.000Z</LastModified></CopyObjectResult>")
+        self.server.count("PutObject")
+        obj = self._new_object(body, self.headers.get("Content-Type"), self._metadata())
+        self.server.objects[(bucket, key)] = obj
+        self._reply(200, headers={"ETag": obj["etag"]})
+
+    def _metadata(self):
+        return {
+            name[len("x-amz-meta-"):]: value
+            for name, value in self.headers.items() if name.lower().startswith("x-amz-meta-")
+        }
+
+    def do_POST(self):
+        bucket, key, query = self._target()
+        body = self._body()
+        if "uploads" in query:
+            self.server.count("CreateMultipartUpload")
+            upload_id = uuid.uuid4().hex
+            self.server.uploads[upload_id] = {
+                "parts": {}, "content_type": self.headers.get("Content-Type"), "metadata": self._metadata()
+            }
+            return self._xml(f"<InitiateMultipartUploadResult><Bucket>{bucket}</Bucket><Key>{escape(key)}</Key>"
+                             f"<UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>")
+        self.server.count("CompleteMultipartUpload")
+        upload = self.server.uploads.pop(query["uploadId"])
+        data = b"".join(upload["parts"][number] for number in sorted(upload["parts"]))
+        obj = self._new_object(data, upload["content_type"], upload["metadata"])
+        self.server.objects[(bucket, key)] = obj
+        self._xml(f"<CompleteMultipartUploadResult><Bucket>{bucket}</Bucket><Key>{escape(key)}</Key>"
+                  f"<ETag>{escape(obj['etag'])}</ETag></CompleteMultipartUploadResult>")
+
+    def do_HEAD(self):
+        bucket, key, _ = self._target()
+        self.server.count("HeadObject")
+        obj = self.server.objects.get((bucket, key))
+        if obj is None:
+            return self._reply(404)
+        headers = self._object_headers(obj)
+        time.sleep(self.server.latency)
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(obj["data"])))
+        self.end_headers()
+
+    def do_GET(self):
+        bucket, key, query = self._target()
+        if not key:
+            self.server.count("ListObjectsV2")
+            prefix = query.get("prefix", "")
+            contents = "".join(
+                f"<Contents><Key>{escape(k)}</Key><Size>{len(obj['data'])}</Size>"
+                f"<ETag>{escape(obj['etag'])}</ETag><LastModified>2025-01-01T00:00:00.000Z</LastModified></Contents>"
+                for (b, k), obj in sorted(self.server.objects.items()) if b == bucket and k.startswith(prefix)
+            )
+            return self._xml(f"<ListBucketResult><Name>{bucket}</Name><Prefix>{escape(prefix)}</Prefix>"
+                             f"<IsTruncated>false</IsTruncated>{contents}</ListBucketResult>")
+        self.server.count("GetObject")
+        obj = self.server.objects.get((bucket, key))
+        if obj is None:
+            return self._reply(404)
+        headers = self._object_headers(obj)
+        data = obj["data"]
+        if "Range" in self.headers:
+            start, _, end = self.headers["Range"].split("=")[1].partition("-")
+            start, end = int(start), min(int(end) if end else len(data) - 1, len(data) - 1)
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+            return self._reply(206, data[start:end + 1], headers)
+        self._reply(200, data, headers)
+
+    def do_DELETE(self):
+        bucket, key, query = self._target()
+        if "uploadId" in query:
+            self.server.uploads.pop(query["uploadId"], None)
+        else:
+            self.server.objects.pop((bucket, key), None)
+        self._reply(204)
+
+
+def make_client(endpoint, pool_size=None):
+    options = {"s3": {"addressing_style": "path"}, "retries": {"max_attempts": 1}}
+    if pool_size:
+        options["max_pool_connections"] = pool_size
+    try:
+        # Plain request bodies; the stand-in does not decode aws-chunked payloads
+        config = Config(request_checksum_calculation="when_required", **options)
+    except TypeError:
+        config = Config(**options)
+    return boto3.client(
+        "s3", endpoint_url=endpoint, region_name="us-east-1",
+        aws_access_key_id="bench", aws_secret_access_key="bench", config=config
+    )
+
+
+def timed(label, fn, server, baseline=None):
+    server.requests.clear()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    requests = sum(server.requests.values())
+    speedup = f"   ({baseline / elapsed:.1f}x)" if baseline else ""
+    print(f"  {label:<34} {elapsed * 1000:>9.1f} ms   {requests:>5} requests{speedup}")
+    return elapsed
+
+
+def main():
+    latency_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 20
+    mb_per_s = float(sys.argv[2]) if len(sys.argv) > 2 else 100
+    keys = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    server = S3StandIn(latency_ms / 1000, mb_per_s * MB)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+
+    default_client = make_client(endpoint)
+    tiered_client = make_client(endpoint, transfer_policy.pool_size)
+    transfers = ObjectTransfers(lambda: tiered_client, transfer_policy)
+    print(f"🔍 S3 stand-in: {latency_ms:.0f} ms per request, {mb_per_s:.0f} MB/s per connection")
+    print("   tiers: " + ", ".join(
+        f"{tier.name} {tier.part_size // MB} MB parts x{tier.concurrency}" for tier in transfer_policy.tiers
+    ) + f"; pool {transfer_policy.pool_size}")
+
+    try:
+        print("📊 Single upload")
+        for size in (4 * MB, 64 * MB, 640 * MB):
+            data = os.urandom(min(size, 16 * MB)) * (size // min(size, 16 * MB))
+            print(f"  {size // MB} MB ({transfer_policy.tier_for(size).name} tier)")
+            baseline = timed(
+                "upload_fileobj, default config",
+                lambda: default_client.upload_fileobj(io.BytesIO(data), "bench", f"single/{size}-default"),
+                server
+            )
+            server.objects.clear()
+            timed(
+                "ObjectTransfers.upload",
+                lambda: transfers.upload(io.BytesIO(data), "bench", f"single/{size}-tiered", size=size),
+                server, baseline
+            )
+            server.objects.clear()
+            del data
+
+        print(f"📊 {keys} sequential 64 KB uploads (transfer manager per call vs shared)")
+        small = os.urandom(64 * KB)
+        baseline = timed(
+            "upload_fileobj per call",
+            lambda: [default_client.upload_fileobj(io.BytesIO(small), "bench", f"src/{i:05d}") for i in range(keys)],
+            server
+        )
+        timed(
+            "ObjectTransfers.upload",
+            lambda: [transfers.upload(io.BytesIO(small), "bench", f"src/{i:05d}", size=len(small)) for i in range(keys)],
+            server, baseline
+        )
+
+        print(f"📊 Copy {keys} objects to another bucket")
+        listing = [(k, len(obj["data"]), obj["etag"]) for (b, k), obj in sorted(server.objects.items())]
+        baseline = timed(
+            "copy_object loop",
+            lambda: [default_client.copy_object(Bucket="dest", Key=f"a/{k}", CopySource={"Bucket": "bench", "Key": k})
+                     for k, _, _ in listing],
+            server
+        )
+        timed(
+            "managed copy per key",
+            lambda: [default_client.copy({"Bucket": "bench", "Key": k}, "dest", f"b/{k}") for k, _, _ in listing],
+            server, baseline
+        )
+        timed(
+            "ObjectTransfers.copy_many",
+            lambda: transfers.copy_many([(k, f"c/{k}", size, etag) for k, size, etag in listing], "bench", "dest"),
+            server, baseline
+        )
+
+        print(f"📊 Download {keys} objects")
+        with tempfile.TemporaryDirectory() as directory:
+            def download_each():
+                for k, _, _ in listing:
+                    with open(os.path.join(directory, k.replace("/", "_") + ".a"), "wb") as f:
+                        default_client.download_fileobj("bench", k, f)
+
+            baseline = timed("download_fileobj per key", download_each, server)
+            timed(
+                "ObjectTransfers.download_many",
+                lambda: transfers.download_many(
+                    [(k, os.path.join(directory, k.replace("/", "_") + ".b"), size, etag) for k, size, etag in listing],
+                    "bench"
+                ),
+                server, baseline
+            )
+        print(f"  {transfers.snapshot()}")
+    finally:
+        transfers.shutdown()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
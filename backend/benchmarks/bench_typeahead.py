@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Typeahead Benchmark
+Loads synthetic company names (Pareto-distributed popularity) into the prefix
+index of app/services/typeahead.py, no database involved, and measures:
+
+1. Build time and memory added (peak RSS).
+2. Lookup latency (p50/p95/p99/max) by query class: short prefixes, longer
+   prefixes, a later word of the name, one typo, and no match.
+3. Updates: renames, popularity changes and deletes per second, and whether
+   the index still answers like a fresh build afterwards.
+4. Randomized puts and deletes on a small index whose names share a few
+   words, checked against a fresh build after every step, so short top
+   lists at nodes with few keys are covered too.
+
+Target: p99 under 1 ms.
+
+Usage: python benchmarks/bench_typeahead.py [names] [lookups per class]
+"""
+
+import os
+import random
+import resource
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+from app.core.config import settings
+from app.services.typeahead import PrefixIndex, normalize
+
+SYLLABLES = ["ba", "ko", "ri", "te", "mu", "sa", "lo", "ne", "vi", "da", "pe", "zu", "fa", "gi", "ho", "ya",
+             "tor", "lex", "ion", "ar"]
+SUFFIXES = ["Inc.", "Labs", "Technologies", "Systems", "GmbH", "Group", "Software", "Health", "Capital", ""]
+
+
+def make_name(rng):
+    words = ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+             for _ in range(rng.randint(1, 2))]
+    return " ".join(words + [rng.choice(SUFFIXES)]).strip()
+
+
+def make_typo(rng, word):
+    at = rng.randrange(len(word))
+    edit = rng.choice(["drop", "swap", "replace", "insert"])
+    if edit == "drop":
+        return word[:at] + word[at + 1:]
+    if edit == "swap" and at < len(word) - 1:
+        return word[:at] + word[at + 1] + word[at] + word[at + 2:]
+    letter = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    return word[:at] + letter + word[at + (edit == "replace"):]
+
+
+def query_classes(rng, rows, lookups):
+    names = [normalize(rows[rng.randrange(len(rows))][1]) for _ in range(lookups)]
+    return {
+        "1-2 letters": [name[:rng.randint(1, 2)] for name in names],
+        "3-8 letters": [name[:rng.randint(3, 8)] for name in names],
+        "later word": [name.split()[-1][:4] for name in names],
+        "one typo": [make_typo(rng, name[:rng.randint(4, 8)]) for name in names],
+        "no match": ["q" + "".join(rng.choice("wxyz") for _ in range(rng.randint(2, 7))) for _ in names],
+    }
+
+
+def churn(rng, steps, top_size=2):
+    """Lookups differing from a fresh build over steps random puts and deletes"""
+    words = ["abc", "cab", "b", "ab", "bca"]
+    index = PrefixIndex(top_size)
+    queries = ["a", "ab", "abc", "b", "c", "ca", "cab", "bc"]
+    differing = 0
+    for _ in range(steps):
+        entity = str(rng.randrange(12))
+        if rng.random() < 0.25:
+            index.delete(entity)
+        else:
+            name = " ".join(rng.choice(words) for _ in range(rng.randint(1, 2)))
+            index.put(entity, name, [], rng.randint(0, 3))
+        fresh = PrefixIndex.build(
+            [(other, index.names[other], [], index.popularity[other]) for other in index.names], top_size
+        )
+        differing += sum(index.lookup(query, top_size) != fresh.lookup(query, top_size) for query in queries)
+    return differing
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    limit = settings.TYPEAHEAD_LIMIT
+    rng = random.Random(7)
+
+    print(f"🔍 {count} names")
+    rows = [(str(uuid.uuid4()), make_name(rng), [], int(rng.paretovariate(1.2))) for _ in range(count)]
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    index = PrefixIndex.build(rows, limit)
+    elapsed = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"📊 Build   {elapsed:.1f} s ({count / elapsed:,.0f} names/s)   "
+          f"+{(rss_after - rss_before) / 1024:.0f} MB peak RSS")
+
+    classes = query_classes(rng, rows, lookups)
+    print(f"📊 Lookups ({limit} suggestions)")
+    for label, queries in classes.items():
+        timings, found = [], 0
+        for query in queries:
+            start = time.perf_counter()
+            found += len(index.lookup(query, limit))
+            timings.append(time.perf_counter() - start)
+        print(f"  {label:<12} p50 {percentile(timings, 0.5) * 1000:.3f} ms   "
+              f"p95 {percentile(timings, 0.95) * 1000:.3f} ms   p99 {percentile(timings, 0.99) * 1000:.3f} ms   "
+              f"max {max(timings) * 1000:.3f} ms   ({found / len(queries):.1f} results)")
+
+    # 1% renamed, 1% more popular, 1% deleted
+    batch = count // 100
+    start = time.perf_counter()
+    for entity, _, _, popularity in rng.sample(rows, batch):
+        index.put(entity, make_name(rng), [], popularity)
+    for entity, name, _, popularity in rng.sample(rows, batch):
+        index.put(entity, name, [], popularity + rng.randint(1, 50))
+    for entity, _, _, _ in rng.sample(rows, batch):
+        index.delete(entity)
+    elapsed = time.perf_counter() - start
+    print(f"📊 Updates {3 * batch / elapsed:,.0f} changes/s")
+
+    fresh = PrefixIndex.build(
+        [(entity, index.names[entity], [], index.popularity[entity]) for entity in index.names], limit
+    )
+    queries = [query for group in classes.values() for query in group[:200]]
+    differing = sum(index.lookup(query, limit) != fresh.lookup(query, limit) for query in queries)
+    print(f"  {differing} of {len(queries)} lookups differ from a fresh build")
+
+    steps = 4_000
+    print(f"📊 Churn   {steps} random puts and deletes on a small index")
+    print(f"  {churn(rng, steps)} of {steps * 8} lookups differ from a fresh build")
+
+
+if __name__ == "__main__":
+    main()
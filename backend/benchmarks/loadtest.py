@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+API Load Test Harness
+Boots the FastAPI app with uvicorn against a local PostgreSQL, a local S3
+stand-in and (optionally) Redis, drives a request mix with concurrent virtual
+users and reports throughput and latency percentiles per endpoint.
+
+Results are written as JSON (with the git commit, settings and the app's own
+/metrics and /health/db snapshots, read with MONITORING_TOKEN) so runs can
+be compared between commits:
+
+    python benchmarks/loadtest.py --mix mixed --users 50 --duration 60
+    python benchmarks/loadtest.py --compare results/before.json results/after.json
+
+Mixes:
+    login-storm    POST /auth/login
+    refresh-churn  POST /auth/refresh, rotating the refresh token
+    reads          /auth/me and /sessions/{active,stats,security}
+    uploads        POST /files/upload/resume with a small PDF
+    mixed          all of the above, weighted like production traffic
+
+Local services:
+    PostgreSQL  DATABASE_URL (schema from migration.sql)
+    S3          --s3 moto starts an in-process moto server (pip install "moto[server]"),
+                otherwise --s3-endpoint points at MinIO or another S3 stand-in
+    Redis       --redis-url is passed to the app as REDIS_URL when given
+
+Use --url to load an already running server instead of booting one.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+# Get the backend directory (parent of this script's directory)
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+os.chdir(backend_dir)
+
+RESULTS_DIR = backend_dir / "benchmarks" / "results"
+API = "/api/v1"
+PASSWORD = "LoadTest#2024"
+
+MIXES: Dict[str, Dict[str, float]] = {
+    "login-storm": {"login": 1.0},
+    "refresh-churn": {"refresh": 1.0},
+    "reads": {"me": 0.4, "sessions_active": 0.3, "sessions_stats": 0.2, "sessions_security": 0.1},
+    "uploads": {"upload": 1.0},
+    "mixed": {
+        "login": 0.05, "refresh": 0.15, "me": 0.35, "sessions_active": 0.15,
+        "sessions_stats": 0.1, "sessions_security": 0.05, "upload": 0.15,
+    },
+}
+
+# Smallest document that passes the PDF magic-byte check
+PDF_BYTES = (
+    b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+    b"2 0 obj<</Type/Pages/Kids[]/Count 0>>endobj\n"
+    b"trailer<</Root 1 0 R>>\n%%EOF\n"
+) + b"%" + b"x" * 48 * 1024 + b"\n"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of floats"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Recorder:
+    """Latencies and errors per endpoint"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+
+    def add(self, endpoint: str, seconds: float, status: int) -> None:
+        self.latencies.setdefault(endpoint, []).append(seconds)
+        by_status = self.statuses.setdefault(endpoint, {})
+        by_status[str(status)] = by_status.get(str(status), 0) + 1
+        if status >= 400 or status == 0:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def summary(self, duration: float) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for endpoint, values in sorted(self.latencies.items()):
+            result[endpoint] = {
+                "requests": len(values),
+                "errors": self.errors.get(endpoint, 0),
+                "statuses": self.statuses.get(endpoint, {}),
+                "throughput_rps": round(len(values) / duration, 2),
+                "p50_ms": round(percentile(values, 50) * 1000, 3),
+                "p90_ms": round(percentile(values, 90) * 1000, 3),
+                "p99_ms": round(percentile(values, 99) * 1000, 3),
+                "max_ms": round(max(values) * 1000, 3),
+                "mean_ms": round(sum(values) / len(values) * 1000, 3),
+            }
+        return result
+
+
+class VirtualUser:
+    """One account with its current token pair"""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, email: str):
+        self.client = client
+        self.recorder = recorder
+        self.email = email
+        self.access_token: Optional[str] = None
+        self.refresh_token: Optional[str] = None
+
+    async def request(self, endpoint: str, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        if self.access_token and "headers" not in kwargs:
+            kwargs["headers"] = {"Authorization": f"Bearer {self.access_token}"}
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.add(endpoint, time.perf_counter() - start, 0)
+            return None
+        self.recorder.add(endpoint, time.perf_counter() - start, response.status_code)
+        return response
+
+    def _take_tokens(self, response: Optional[httpx.Response]) -> None:
+        if response is not None and response.status_code in (200, 201):
+            body = response.json()
+            self.access_token = body["access_token"]
+            self.refresh_token = body["refresh_token"]
+
+    async def register(self) -> bool:
+        response = await self.request(
+            "POST /auth/register", "POST", f"{API}/auth/register",
+            json={"email": self.email, "name": "Load Test", "password": PASSWORD}
+        )
+        self._take_tokens(response)
+        return self.access_token is not None
+
+    async def login(self) -> None:
+        response = await self.request(
+            "POST /auth/login", "POST", f"{API}/auth/login",
+            json={"email": self.email, "password": PASSWORD}, headers={}
+        )
+        self._take_tokens(response)
+
+    async def refresh(self) -> None:
+        if not self.refresh_token:
+            return await self.login()
+        response = await self.request(
+            "POST /auth/refresh", "POST", f"{API}/auth/refresh",
+            json={"refresh_token": self.refresh_token}, headers={}
+        )
+        if response is not None and response.status_code == 401:
+            return await self.login()
+        self._take_tokens(response)
+
+    async def me(self) -> None:
+        await self.request("GET /auth/me", "GET", f"{API}/auth/me")
+
+    async def sessions_active(self) -> None:
+        await self.request("GET /sessions/active", "GET", f"{API}/sessions/active")
+
+    async def sessions_stats(self) -> None:
+        await self.request("GET /sessions/stats", "GET", f"{API}/sessions/stats")
+
+    async def sessions_security(self) -> None:
+        await self.request("GET /sessions/security", "GET", f"{API}/sessions/security")
+
+    async def upload(self) -> None:
+        await self.request(
+            "POST /files/upload/resume", "POST", f"{API}/files/upload/resume",
+            files={"file": ("resume.pdf", PDF_BYTES, "application/pdf")}
+        )
+
+
+async def run_users(base_url: str, mix: Dict[str, float], users: int, duration: float, warmup: float):
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        run_id = uuid.uuid4().hex[:8]
+        setup = Recorder()
+        virtual_users = [
+            VirtualUser(client, setup, f"loadtest+{run_id}-{i}@example.com") for i in range(users)
+        ]
+        registered = await asyncio.gather(*(user.register() for user in virtual_users))
+        if not any(registered):
+            raise RuntimeError("Could not register any load test users; is the schema loaded?")
+        virtual_users = [user for user, ok in zip(virtual_users, registered) if ok]
+
+        actions = list(mix.keys())
+        weights = list(mix.values())
+
+        async def loop(user: VirtualUser, until: float):
+            rng = random.Random(user.email)
+            while time.perf_counter() < until:
+                await getattr(user, rng.choices(actions, weights)[0])()
+
+        if warmup > 0:
+            await asyncio.gather(*(loop(user, time.perf_counter() + warmup) for user in virtual_users))
+
+        for user in virtual_users:
+            user.recorder = recorder
+        start = time.perf_counter()
+        await asyncio.gather(*(loop(user, start + duration) for user in virtual_users))
+        elapsed = time.perf_counter() - start
+
+        snapshots = {}
+        monitoring = {"Authorization": f"Bearer {os.environ.get('MONITORING_TOKEN', '')}"}
+        for name, path in (("health_db", "/health/db"), ("metrics", "/metrics")):
+            try:
+                response = await client.get(path, headers=monitoring)
+                response.raise_for_status()
+                snapshots[name] = response.json() if name == "health_db" else response.text
+            except Exception as e:
+                snapshots[name] = f"unavailable: {e}"
+
+    return recorder.summary(elapsed), elapsed, len(virtual_users), run_id, snapshots
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_moto() -> str:
+    from moto.server import ThreadedMotoServer
+
+    port = free_port()
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port)
+    server.start()
+    return f"http://127.0.0.1:{port}"
+
+
+def ensure_bucket(endpoint: str, bucket: str, access_key: str, secret_key: str) -> None:
+    import boto3
+
+    client = boto3.session.Session().client(
+        "s3", endpoint_url=endpoint, region_name="us-east-1",
+        aws_access_key_id=access_key, aws_secret_access_key=secret_key
+    )
+    try:
+        client.create_bucket(Bucket=bucket)
+    except client.exceptions.BucketAlreadyOwnedByYou:
+        pass
+    except Exception as e:
+        if "BucketAlreadyExists" not in str(e):
+            raise
+
+
+def boot_server(args, env: Dict[str, str]) -> Tuple[subprocess.Popen, str]:
+    port = args.port or free_port()
+    command = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(args.workers), "--no-access-log",
+    ]
+    process = subprocess.Popen(command, cwd=backend_dir, env=env)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError("Server did not become healthy within 60s")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=backend_dir, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+async def cleanup_users() -> int:
+    from sqlalchemy import text
+    from app.core.database import AsyncSessionLocal, engine
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(text("DELETE FROM users WHERE email LIKE 'loadtest+%@example.com'"))
+        await db.commit()
+    await engine.dispose()
+    return result.rowcount
+
+
+def print_summary(summary: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'endpoint':<28} {'req/s':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    for endpoint, stats in summary.items():
+        print(
+            f"{endpoint:<28} {stats['throughput_rps']:>9.1f} {stats['p50_ms']:>9.2f} "
+            f"{stats['p90_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['max_ms']:>9.2f} {stats['errors']:>7}"
+        )
+
+
+def compare(old_path: str, new_path: str, threshold: float) -> bool:
+    """Print per-endpoint deltas; False if any endpoint regressed beyond the threshold"""
+    old = json.loads(Path(old_path).read_text())
+    new = json.loads(Path(new_path).read_text())
+    print(f"📊 {old.get('commit')} ({old['mix']}) -> {new.get('commit')} ({new['mix']})")
+    print(f"{'endpoint':<28} {'req/s':>18} {'p50 ms':>18} {'p99 ms':>18}")
+    ok = True
+    for endpoint, after in new["endpoints"].items():
+        before = old["endpoints"].get(endpoint)
+        if before is None:
+            continue
+
+        def delta(key):
+            return (after[key] - before[key]) / before[key] if before[key] else 0.0
+
+        rps, p50, p99 = delta("throughput_rps"), delta("p50_ms"), delta("p99_ms")
+        regressed = rps < -threshold or p99 > threshold
+        ok = ok and not regressed
+        print(
+            f"{endpoint:<28} {after['throughput_rps']:>9.1f} ({rps:+6.1%}) "
+            f"{after['p50_ms']:>9.2f} ({p50:+6.1%}) {after['p99_ms']:>9.2f} ({p99:+6.1%})"
+            + ("  ⚠️ regression" if regressed else "")
+        )
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--users", type=int, default=50, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds before the run")
+    parser.add_argument("--url", help="load an already running server instead of booting one")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers when booting")
+    parser.add_argument("--database-url", help="DATABASE_URL for the booted app")
+    parser.add_argument("--s3", choices=("moto", "external"), default="external")
+    parser.add_argument("--s3-endpoint", default="http://127.0.0.1:9000", help="S3 stand-in for --s3 external")
+    parser.add_argument("--s3-bucket", default="loadtest")
+    parser.add_argument("--redis-url", help="REDIS_URL for the booted app")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<time>-<commit>-<mix>.json)")
+    parser.add_argument("--cleanup", action="store_true", help="delete load test users afterwards")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    parser.add_argument("--threshold", type=float, default=0.10, help="regression threshold for --compare")
+    args = parser.parse_args()
+
+    if args.compare:
+        return 0 if compare(*args.compare, args.threshold) else 1
+
+    process = None
+    base_url = args.url
+    if base_url is None:
+        env = dict(os.environ)
+        if args.database_url:
+            env["DATABASE_URL"] = args.database_url
+        if args.redis_url:
+            env["REDIS_URL"] = args.redis_url
+        endpoint = start_moto() if args.s3 == "moto" else args.s3_endpoint
+        env.setdefault("DO_SPACES_ACCESS_KEY", "loadtest")
+        env.setdefault("DO_SPACES_SECRET_KEY", "loadtest-secret")
+        env.setdefault("JWT_SECRET_KEY", "loadtest-" + uuid.uuid4().hex)
+        # Read back by run_users() for the /metrics and /health/db snapshots
+        os.environ["MONITORING_TOKEN"] = env.setdefault("MONITORING_TOKEN", "loadtest-" + uuid.uuid4().hex)
+        env.update({
+            "DO_SPACES_ENDPOINT": endpoint,
+            "DO_SPACES_BUCKET_NAME": args.s3_bucket,
+            "DO_SPACES_REGION": "us-east-1",
+            "DEBUG": "false",
+            "ENVIRONMENT": "loadtest",
+            "ALLOWED_HOSTS": "127.0.0.1,localhost",
+        })
+        ensure_bucket(endpoint, args.s3_bucket, env["DO_SPACES_ACCESS_KEY"], env["DO_SPACES_SECRET_KEY"])
+        process, base_url = boot_server(args, env)
+
+    try:
+        print(f"🔍 {args.mix}: {args.users} users, {args.duration:.0f}s against {base_url}")
+        summary, elapsed, users, run_id, snapshots = asyncio.run(
+            run_users(base_url, MIXES[args.mix], args.users, args.duration, args.warmup)
+        )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    print_summary(summary)
+    total = sum(stats["requests"] for stats in summary.values())
+    print(f"📊 {total / elapsed:.1f} req/s overall")
+
+    commit = git_commit()
+    result = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "mix": args.mix,
+        "mix_weights": MIXES[args.mix],
+        "users": users,
+        "duration_seconds": round(elapsed, 3),
+        "workers": args.workers if args.url is None else None,
+        "run_id": run_id,
+        "overall_rps": round(total / elapsed, 2),
+        "endpoints": summary,
+        "server": snapshots,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{commit or 'nogit'}-{args.mix}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"💾 {output}")
+
+    if args.cleanup:
+        print(f"🧹 Removed {asyncio.run(cleanup_users())} load test users")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Ingest job feed files into the jobs table
+Feeds are JSON Lines (.jsonl/.ndjson) or CSV (.csv), optionally gzipped (.gz);
+re-running a feed updates changed jobs and leaves unchanged ones untouched.
+
+Usage: python ingest_jobs.py <source> <feed file> [<feed file> ...] [--format jsonl|csv]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+# Get the backend directory (where this script is located)
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+# Change to backend directory to find .env file
+os.chdir(backend_dir)
+
+from app.core.database import close_db
+from app.services.job_ingest import job_ingestor
+
+
+async def ingest(source, paths, feed_format):
+    failed = False
+    try:
+        for path in paths:
+            print(f"📥 Ingesting {path} as '{source}'...")
+            try:
+                result = await job_ingestor.ingest_file(path, source, feed_format)
+            except Exception as e:
+                print(f"❌ {path}: {e}")
+                failed = True
+                continue
+            print(json.dumps(result, indent=2, default=str))
+    finally:
+        await close_db()
+    return not failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest job feed files")
+    parser.add_argument("source", help="external_source of the feed, e.g. indeed")
+    parser.add_argument("paths", nargs="+", help="feed files")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="feed format (default: from the extension)")
+    args = parser.parse_args()
+
+    success = asyncio.run(ingest(args.source, args.paths, args.format))
+    sys.exit(0 if success else 1)
@@ -3,53 +3,121 @@ SkillMatch AI - FastAPI Backend Application
 Main application entry point with FastAPI setup
 """
 
-from fastapi import FastAPI, Request
+# Imported first: the time from here to the lifespan start is reported as the "imports" phase
+from app.core.startup import startup, warm_pool
+
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
+import asyncio
 import structlog
-import time
 
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.logs import configure_logging
+from app.core.metrics import metrics, MetricsMiddleware
+from app.core.profiler import profiler, install_signal_trigger
+from app.core.auth import require_monitoring_token
+from app.core.keys import key_ring
+from app.core.database import engine, init_db, close_db, start_replica_routing, get_pool_stats
+from app.services.security_monitor import alert_sink
+from app.services.audit import audit_log
+from app.services.session_epochs import session_epochs
+from app.services.storage import storage_service
+from app.services.object_cache import object_cache
+from app.services.uploads import upload_verifier
+from app.services.previews import preview_renderer
+from app.services.job_facets import job_facets
+from app.services.job_search import job_search
+from app.services.job_geo import job_geo
+from app.services.typeahead import typeahead
 from app.api.v1.router import api_router
 from app.core.exceptions import AppException
 
 
 # Configure structured logging
-structlog.configure(
-    processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer()
-    ],
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    cache_logger_on_first_use=True,
+configure_logging(
+    level=settings.LOG_LEVEL,
+    queue_size=settings.LOG_QUEUE_SIZE,
+    sample_rates=settings.LOG_SAMPLE_RATES,
+    asynchronous=settings.LOG_ASYNC
 )
 
 logger = structlog.get_logger()
 
 
+async def start_database() -> bool:
+    async with startup.phase("database"):
+        database = await init_db()
+    if database:
+        async with startup.phase("pool_warmup"):
+            startup.warmed_connections = await warm_pool(
+                engine, settings.DATABASE_POOL_WARM_SIZE, settings.STARTUP_WARM_TIMEOUT_SECONDS
+            )
+    return database
+
+
+async def start_signing_keys() -> None:
+    async with startup.phase("signing_keys"):
+        await key_ring.start()
+
+
+async def start_listeners() -> None:
+    """Background services that need the database"""
+    async with startup.phase("listeners"):
+        await asyncio.gather(
+            start_replica_routing(), audit_log.start(), session_epochs.start(), job_facets.start(),
+            typeahead.start()
+        )
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
+    startup.mark_imported()
     logger.info("🚀 Starting SkillMatch AI Backend", version=settings.APP_VERSION)
-    await init_db()
+    # Database connections, key loading and blocking preloads do not depend on each other
+    database, _, _ = await asyncio.gather(
+        start_database(),
+        start_signing_keys(),
+        startup.preload() if settings.STARTUP_PRELOAD == "blocking" else asyncio.sleep(0)
+    )
     logger.info("✅ Database initialized successfully")
+    await start_listeners()
+    alert_sink.start()
+    upload_verifier.start()
+    await object_cache.start()
+    preview_renderer.start()
+    if settings.PROFILER_ENABLED:
+        install_signal_trigger(
+            asyncio.get_running_loop(),
+            profiler,
+            seconds=settings.PROFILER_SIGNAL_SECONDS,
+            interval_ms=settings.PROFILER_INTERVAL_MS,
+            output_dir=settings.PROFILER_OUTPUT_DIR
+        )
+    startup.mark_ready(database)
+    if settings.STARTUP_PRELOAD == "background":
+        startup.preload_in_background()
     
     yield
     
     # Shutdown
     logger.info("🛑 Shutting down SkillMatch AI Backend")
+    await startup.stop()
+    profiler.stop()
+    await alert_sink.stop()
+    await upload_verifier.stop()
+    await preview_renderer.stop()
+    await asyncio.to_thread(storage_service.transfers.shutdown)
+    await audit_log.stop()
+    await session_epochs.stop()
+    await job_facets.stop()
+    await typeahead.stop()
+    await key_ring.stop()
+    await close_db()
 
 
 # Create FastAPI application
@@ -66,7 +134,7 @@ app = FastAPI(
 if not settings.DEBUG:
     app.add_middleware(
         TrustedHostMiddleware, 
-        allowed_hosts=["yourdomain.com", "*.yourdomain.com"]
+        allowed_hosts=[host.strip() for host in settings.ALLOWED_HOSTS.split(",") if host.strip()]
     )
 
 # Add CORS middleware
@@ -80,24 +148,13 @@ app.add_middleware(
 )
 
 
-# Request timing middleware
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    
-    # Log request
-    logger.info(
-        "HTTP Request",
-        method=request.method,
-        url=str(request.url),
-        status_code=response.status_code,
-        process_time=process_time
+# Request latency metrics (also sets X-Process-Time)
+if settings.METRICS_ENABLED:
+    app.add_middleware(
+        MetricsMiddleware,
+        registry=metrics,
+        slow_request_ms=settings.METRICS_SLOW_REQUEST_MS
     )
-    
-    return response
 
 
 # Global exception handler
@@ -131,6 +188,36 @@ async def health_check():
     }
 
 
+# Readiness endpoint (liveness is /health)
+@app.get("/health/ready")
+async def readiness_check():
+    """Ready once startup has finished with a reachable database; not ready while shutting down"""
+    return JSONResponse(startup.snapshot(), status_code=200 if startup.ready else 503)
+
+
+# Database pool metrics endpoint
+@app.get("/health/db", dependencies=[Depends(require_monitoring_token)])
+async def database_pool_stats():
+    """Connection pool checkout, wait-time and saturation metrics"""
+    return {**get_pool_stats(), "audit": audit_log.snapshot(), "session_epochs": session_epochs.snapshot(),
+            "uploads": upload_verifier.snapshot(), "object_cache": object_cache.snapshot(),
+            "previews": preview_renderer.snapshot(), "job_facets": job_facets.snapshot(),
+            "job_search": job_search.snapshot(), "typeahead": typeahead.snapshot(),
+            "job_geo": job_geo.snapshot()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_monitoring_token)])
+async def prometheus_metrics():
+    """Prometheus text exposition of request, database and storage metrics"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/.well-known/jwks.json")
+async def jwks():
+    """Public keys for verifying access tokens (empty with HS256)"""
+    return JSONResponse(key_ring.jwks(), headers={"Cache-Control": "public, max-age=300"})
+
+
 # Root endpoint
 @app.get("/")
 async def root():
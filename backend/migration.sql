@@ -103,6 +103,7 @@ CREATE TABLE users (
     is_active BOOLEAN DEFAULT TRUE,
     last_login_at TIMESTAMPTZ,
     failed_login_attempts INTEGER DEFAULT 0,
+    last_failed_login_at TIMESTAMPTZ,
     locked_until TIMESTAMPTZ,
     created_at TIMESTAMPTZ DEFAULT NOW(),
     updated_at TIMESTAMPTZ DEFAULT NOW(),
@@ -120,9 +121,36 @@ CREATE TABLE user_sessions (
     ip_address INET,
     expires_at TIMESTAMPTZ NOT NULL,
     is_revoked BOOLEAN DEFAULT FALSE,
+    expiry_counted BOOLEAN NOT NULL DEFAULT FALSE, -- Expiry already folded into user_session_stats
+    refresh_generation INTEGER NOT NULL DEFAULT 0, -- Bumped on every refresh; older refresh tokens are reuse
+    refreshed_at TIMESTAMPTZ,
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Incrementally maintained per-user session counters (see maintain_user_session_stats)
+-- Every session is in exactly one bucket: active, revoked or expired
+CREATE TABLE user_session_stats (
+    user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    total_sessions INTEGER NOT NULL DEFAULT 0,
+    revoked_sessions INTEGER NOT NULL DEFAULT 0,
+    expired_sessions INTEGER NOT NULL DEFAULT 0,
+    device_types TEXT[] NOT NULL DEFAULT '{}',
+    most_recent_activity TIMESTAMPTZ,
+    ended_sessions INTEGER NOT NULL DEFAULT 0,
+    ended_duration_seconds DOUBLE PRECISION NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Per-user revocation counter carried in access tokens (see bump_session_epochs)
+-- No foreign key: the epoch of a deleted user must outlive its unexpired tokens
+CREATE TABLE user_session_epochs (
+    user_id UUID PRIMARY KEY,
+    epoch BIGINT NOT NULL DEFAULT 0,
+    bumped_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX idx_user_session_epochs_bumped ON user_session_epochs(bumped_at);
+
 -- User preferences and settings
 CREATE TABLE user_preferences (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -238,6 +266,7 @@ CREATE TABLE jobs (
     company_id UUID NOT NULL REFERENCES companies(id) ON DELETE CASCADE,
     external_id VARCHAR(255),
     external_source VARCHAR(50), -- 'linkedin', 'indeed', 'manual', etc.
+    canonical_job_id UUID REFERENCES jobs(id) ON DELETE SET NULL, -- set on near-duplicates of another job
     title VARCHAR(255) NOT NULL,
     description TEXT NOT NULL,
     requirements TEXT,
@@ -257,6 +286,11 @@ CREATE TABLE jobs (
     view_count INTEGER DEFAULT 0,
     application_count INTEGER DEFAULT 0,
     revision INTEGER DEFAULT 0 NOT NULL,
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(requirements, '') || ' ' || coalesce(responsibilities, '')), 'B') ||
+        setweight(to_tsvector('english', description), 'C')
+    ) STORED,
     created_at TIMESTAMPTZ DEFAULT NOW(),
     updated_at TIMESTAMPTZ DEFAULT NOW(),
     CONSTRAINT valid_salary_range CHECK (salary_min <= salary_max),
@@ -426,6 +460,7 @@ CREATE TABLE notifications (
     title VARCHAR(255) NOT NULL,
     message TEXT NOT NULL,
     action_url TEXT,
+    data JSONB, -- Security alerts: {type, timestamp, metadata} as raised by the security monitor
     is_read BOOLEAN DEFAULT FALSE,
     priority VARCHAR(20) DEFAULT 'normal' CHECK (priority IN ('low', 'normal', 'high', 'urgent')),
     expires_at TIMESTAMPTZ,
@@ -486,6 +521,9 @@ CREATE INDEX idx_user_sessions_expires ON user_sessions(expires_at);
 CREATE INDEX idx_user_sessions_jwt ON user_sessions(jwt_jti) WHERE jwt_jti IS NOT NULL;
 CREATE INDEX idx_user_sessions_cleanup ON user_sessions(expires_at, is_revoked) 
     WHERE is_revoked = TRUE;
+-- Only live sessions (plus expired ones not yet swept), independent of history length
+CREATE INDEX idx_user_sessions_live ON user_sessions(user_id, expires_at)
+    WHERE is_revoked = FALSE AND expiry_counted = FALSE;
 
 -- Enhanced resume indexes
 CREATE INDEX idx_resumes_user_id ON resumes(user_id);
@@ -525,9 +563,20 @@ CREATE INDEX idx_jobs_search_optimized ON jobs
 CREATE INDEX idx_jobs_company_active ON jobs(company_id, is_active) WHERE is_active = TRUE;
 CREATE INDEX idx_jobs_location_salary ON jobs(location_id, salary_min, salary_max) 
     WHERE is_active = TRUE AND salary_min IS NOT NULL;
-CREATE INDEX idx_jobs_title_search ON jobs USING GIN(to_tsvector('english', title));
-CREATE INDEX idx_jobs_desc_search ON jobs USING GIN(to_tsvector('english', description));
+-- Full-text search over listable jobs (app/services/job_search.py)
+CREATE INDEX idx_jobs_search_vector ON jobs USING GIN(search_vector)
+    WHERE is_active = TRUE AND canonical_job_id IS NULL;
 CREATE INDEX idx_jobs_expires ON jobs(expires_at) WHERE expires_at IS NOT NULL;
+-- Feed ingestion upserts on the source's own job ID (app/services/job_ingest.py)
+CREATE UNIQUE INDEX idx_jobs_external ON jobs(external_source, external_id) WHERE external_id IS NOT NULL;
+CREATE INDEX idx_jobs_canonical ON jobs(canonical_job_id) WHERE canonical_job_id IS NOT NULL;
+-- Keyset the job facet index polls for changes (app/services/job_facets.py)
+CREATE INDEX idx_jobs_updated ON jobs(updated_at, id);
+-- Radius search: newest listable jobs per location, and remote jobs (app/services/job_geo.py)
+CREATE INDEX idx_jobs_location_recent ON jobs(location_id, posted_at DESC NULLS LAST, id DESC)
+    WHERE is_active = TRUE AND canonical_job_id IS NULL;
+CREATE INDEX idx_jobs_remote_recent ON jobs(posted_at DESC NULLS LAST, id DESC)
+    WHERE remote_type = 'remote' AND is_active = TRUE AND canonical_job_id IS NULL;
 
 -- Enhanced skill indexes
 CREATE INDEX idx_job_skills_job ON job_skills(job_id, importance_level);
@@ -628,7 +677,7 @@ BEGIN
     VALUES (
         NEW.id, 
         next_version, 
-        to_jsonb(NEW), 
+        to_jsonb(NEW) - 'search_vector', 
         current_user_id,
         current_setting('app.change_reason', true)
     );
@@ -706,6 +755,202 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Per-user session counters, updated as sessions are created, revoked and expired
+CREATE OR REPLACE FUNCTION maintain_user_session_stats()
+RETURNS TRIGGER AS $$
+DECLARE
+    new_device_type TEXT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        new_device_type := NEW.device_info->>'device_type';
+        
+        INSERT INTO user_session_stats AS s (user_id, total_sessions, device_types, most_recent_activity)
+        VALUES (
+            NEW.user_id,
+            1,
+            CASE WHEN new_device_type IS NULL THEN '{}'::TEXT[] ELSE ARRAY[new_device_type] END,
+            NEW.created_at
+        )
+        ON CONFLICT (user_id) DO UPDATE SET
+            total_sessions = s.total_sessions + 1,
+            device_types = CASE
+                WHEN new_device_type IS NULL OR new_device_type = ANY(s.device_types) THEN s.device_types
+                ELSE array_append(s.device_types, new_device_type)
+            END,
+            most_recent_activity = GREATEST(s.most_recent_activity, EXCLUDED.most_recent_activity),
+            updated_at = NOW();
+        
+        RETURN NEW;
+    END IF;
+    
+    -- Revocation moves an active (or already expired) session to revoked
+    IF NEW.is_revoked AND NOT COALESCE(OLD.is_revoked, FALSE) THEN
+        IF OLD.expiry_counted THEN
+            UPDATE user_session_stats SET
+                revoked_sessions = revoked_sessions + 1,
+                expired_sessions = expired_sessions - 1,
+                updated_at = NOW()
+            WHERE user_id = NEW.user_id;
+        ELSE
+            UPDATE user_session_stats SET
+                revoked_sessions = revoked_sessions + 1,
+                ended_sessions = ended_sessions + 1,
+                ended_duration_seconds = ended_duration_seconds
+                    + GREATEST(EXTRACT(EPOCH FROM LEAST(NEW.expires_at, NOW()) - NEW.created_at), 0),
+                updated_at = NOW()
+            WHERE user_id = NEW.user_id;
+        END IF;
+    -- Expiry sweep moves an active session to expired
+    ELSIF NEW.expiry_counted AND NOT OLD.expiry_counted AND NOT COALESCE(NEW.is_revoked, FALSE) THEN
+        UPDATE user_session_stats SET
+            expired_sessions = expired_sessions + 1,
+            ended_sessions = ended_sessions + 1,
+            ended_duration_seconds = ended_duration_seconds
+                + GREATEST(EXTRACT(EPOCH FROM NEW.expires_at - NEW.created_at), 0),
+            updated_at = NOW()
+        WHERE user_id = NEW.user_id;
+    END IF;
+    
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Fold newly expired sessions into user_session_stats
+CREATE OR REPLACE FUNCTION sweep_expired_sessions()
+RETURNS INTEGER AS $$
+DECLARE
+    swept INTEGER;
+BEGIN
+    UPDATE user_sessions SET expiry_counted = TRUE
+    WHERE is_revoked = FALSE
+    AND expiry_counted = FALSE
+    AND expires_at <= NOW();
+    
+    GET DIAGNOSTICS swept = ROW_COUNT;
+    RETURN swept;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Rebuild user_session_stats from user_sessions (for existing deployments)
+CREATE OR REPLACE FUNCTION rebuild_user_session_stats()
+RETURNS VOID AS $$
+BEGIN
+    UPDATE user_sessions SET expiry_counted = (is_revoked = FALSE AND expires_at <= NOW())
+    WHERE expiry_counted IS DISTINCT FROM (is_revoked = FALSE AND expires_at <= NOW());
+    
+    DELETE FROM user_session_stats;
+    
+    INSERT INTO user_session_stats (
+        user_id, total_sessions, revoked_sessions, expired_sessions, device_types,
+        most_recent_activity, ended_sessions, ended_duration_seconds
+    )
+    SELECT
+        user_id,
+        COUNT(*),
+        COUNT(*) FILTER (WHERE is_revoked),
+        COUNT(*) FILTER (WHERE expiry_counted),
+        COALESCE(ARRAY_AGG(DISTINCT device_info->>'device_type')
+            FILTER (WHERE device_info->>'device_type' IS NOT NULL), '{}'),
+        MAX(created_at),
+        COUNT(*) FILTER (WHERE is_revoked OR expiry_counted),
+        COALESCE(SUM(GREATEST(EXTRACT(EPOCH FROM LEAST(expires_at, NOW()) - created_at), 0))
+            FILTER (WHERE is_revoked OR expiry_counted), 0)
+    FROM user_sessions
+    GROUP BY user_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Increment session epochs and tell every worker (LISTEN session_epochs)
+CREATE OR REPLACE FUNCTION bump_session_epochs(user_ids UUID[])
+RETURNS VOID AS $$
+DECLARE
+    bumped RECORD;
+BEGIN
+    IF COALESCE(array_length(user_ids, 1), 0) = 0 THEN
+        RETURN;
+    END IF;
+    
+    -- Sorted, so concurrent bumps lock rows in the same order
+    FOR bumped IN
+        INSERT INTO user_session_epochs AS e (user_id, epoch, bumped_at)
+        SELECT DISTINCT u, 1, NOW() FROM unnest(user_ids) AS u ORDER BY u
+        ON CONFLICT (user_id) DO UPDATE SET
+            epoch = e.epoch + 1,
+            bumped_at = NOW()
+        RETURNING e.user_id, e.epoch
+    LOOP
+        -- Delivered on commit; a rolled back revocation sends nothing
+        PERFORM pg_notify('session_epochs', bumped.user_id::TEXT || ':' || bumped.epoch);
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Statement-level, so revoking all of a user's sessions bumps the epoch once
+CREATE OR REPLACE FUNCTION bump_epochs_on_session_revoke()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM bump_session_epochs(ARRAY(
+        SELECT DISTINCT n.user_id
+        FROM revoked_new n
+        JOIN revoked_old o ON o.id = n.id
+        WHERE n.is_revoked AND NOT COALESCE(o.is_revoked, FALSE)
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION bump_epochs_on_session_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM bump_session_epochs(ARRAY(
+        SELECT DISTINCT user_id FROM deleted_old
+        WHERE NOT COALESCE(is_revoked, FALSE) AND expires_at > NOW()
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Deactivation, credential changes and deletion end every session of the user
+CREATE OR REPLACE FUNCTION bump_epoch_on_user_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM bump_session_epochs(ARRAY[OLD.id]);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Tell the job facet index (LISTEN job_changes) to re-read changed jobs.
+-- Identical payloads are folded, so this is one notification per transaction.
+CREATE OR REPLACE FUNCTION notify_job_changes()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('job_changes', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Deleted jobs cannot be re-read, so their IDs are sent
+CREATE OR REPLACE FUNCTION notify_job_deletes()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('job_changes', OLD.id::TEXT);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Tell the typeahead index (LISTEN typeahead) which company or skill to re-read
+CREATE OR REPLACE FUNCTION notify_typeahead()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('typeahead', TG_TABLE_NAME || ':' || OLD.id::TEXT);
+    ELSE
+        PERFORM pg_notify('typeahead', TG_TABLE_NAME || ':' || NEW.id::TEXT);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
 -- Apply triggers to tables
 CREATE TRIGGER users_updated
     BEFORE UPDATE ON users
@@ -731,6 +976,22 @@ CREATE TRIGGER jobs_update_history
     AFTER UPDATE ON jobs
     FOR EACH ROW EXECUTE FUNCTION capture_job_history();
 
+CREATE TRIGGER jobs_notify_changes
+    AFTER INSERT OR UPDATE ON jobs
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_job_changes();
+
+CREATE TRIGGER jobs_notify_deletes
+    AFTER DELETE ON jobs
+    FOR EACH ROW EXECUTE FUNCTION notify_job_deletes();
+
+CREATE TRIGGER companies_notify_typeahead
+    AFTER INSERT OR UPDATE OF name OR DELETE ON companies
+    FOR EACH ROW EXECUTE FUNCTION notify_typeahead();
+
+CREATE TRIGGER skills_taxonomy_notify_typeahead
+    AFTER INSERT OR UPDATE OF name, aliases, is_active OR DELETE ON skills_taxonomy
+    FOR EACH ROW EXECUTE FUNCTION notify_typeahead();
+
 CREATE TRIGGER job_applications_updated
     BEFORE UPDATE ON job_applications
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
@@ -747,6 +1008,33 @@ CREATE TRIGGER ensure_single_base_resume_trigger
     BEFORE INSERT OR UPDATE ON resumes 
     FOR EACH ROW EXECUTE FUNCTION ensure_single_base_resume();
 
+CREATE TRIGGER user_sessions_maintain_stats
+    AFTER INSERT OR UPDATE OF is_revoked, expiry_counted ON user_sessions
+    FOR EACH ROW EXECUTE FUNCTION maintain_user_session_stats();
+
+-- Session epoch triggers (transition tables need one trigger per event)
+CREATE TRIGGER user_sessions_bump_epoch_on_revoke
+    AFTER UPDATE ON user_sessions
+    REFERENCING OLD TABLE AS revoked_old NEW TABLE AS revoked_new
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_epochs_on_session_revoke();
+
+CREATE TRIGGER user_sessions_bump_epoch_on_delete
+    AFTER DELETE ON user_sessions
+    REFERENCING OLD TABLE AS deleted_old
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_epochs_on_session_delete();
+
+CREATE TRIGGER users_bump_epoch_on_change
+    AFTER UPDATE OF is_active, password_hash, email ON users
+    FOR EACH ROW
+    WHEN (OLD.is_active IS DISTINCT FROM NEW.is_active
+          OR OLD.password_hash IS DISTINCT FROM NEW.password_hash
+          OR OLD.email IS DISTINCT FROM NEW.email)
+    EXECUTE FUNCTION bump_epoch_on_user_change();
+
+CREATE TRIGGER users_bump_epoch_on_delete
+    AFTER DELETE ON users
+    FOR EACH ROW EXECUTE FUNCTION bump_epoch_on_user_change();
+
 -- Purge date triggers
 CREATE TRIGGER users_set_purge_date
     BEFORE INSERT ON users
@@ -779,6 +1067,7 @@ ALTER TABLE user_analytics ENABLE ROW LEVEL SECURITY;
 ALTER TABLE user_preferences ENABLE ROW LEVEL SECURITY;
 ALTER TABLE interviews ENABLE ROW LEVEL SECURITY;
 ALTER TABLE user_sessions ENABLE ROW LEVEL SECURITY;
+ALTER TABLE user_session_stats ENABLE ROW LEVEL SECURITY;
 
 -- FIXED: Secure current user function with JWT verification
 CREATE OR REPLACE FUNCTION current_user_id()
@@ -859,6 +1148,10 @@ CREATE POLICY user_sessions_policy ON user_sessions
     FOR ALL TO authenticated
     USING (user_id = current_user_id());
 
+CREATE POLICY user_session_stats_policy ON user_session_stats
+    FOR ALL TO authenticated
+    USING (user_id = current_user_id());
+
 CREATE POLICY user_interviews_policy ON interviews
     FOR ALL TO authenticated
     USING (application_id IN (
@@ -902,6 +1195,7 @@ BEGIN
         JOIN companies c ON j.company_id = c.id
         JOIN locations l ON j.location_id = l.id
         WHERE j.is_active = true
+            AND j.canonical_job_id IS NULL
             AND ST_DWithin(l.geo, center_point, radius_km * 1000)
         ORDER BY l.geo <-> center_point
         LIMIT limit_count;
@@ -950,6 +1244,7 @@ EXCEPTION
             JOIN companies c ON j.company_id = c.id
             JOIN locations l ON j.location_id = l.id
             WHERE j.is_active = true
+                AND j.canonical_job_id IS NULL
             ORDER BY 
                 CASE 
                     WHEN l.latitude IS NOT NULL AND l.longitude IS NOT NULL THEN
@@ -1020,7 +1315,7 @@ FROM jobs j
 JOIN job_skills js ON j.id = js.job_id
 JOIN skills_taxonomy st ON js.skill_id = st.id
 LEFT JOIN locations l ON j.location_id = l.id
-WHERE j.is_active AND j.posted_at >= CURRENT_DATE - INTERVAL '12 months'
+WHERE j.is_active AND j.canonical_job_id IS NULL AND j.posted_at >= CURRENT_DATE - INTERVAL '12 months'
     AND st.is_active = TRUE
 GROUP BY st.name, st.category, l.city, l.country_code, DATE_TRUNC('month', j.posted_at)
 HAVING COUNT(*) >= 3 -- Only include trends with sufficient data
@@ -1151,7 +1446,7 @@ BEGIN
         SELECT schemaname, tablename 
         FROM pg_tables 
         WHERE tablename ~ '^audit_logs_\d{4}_\d{2}$'
-        AND schemaname = 'public'
+        AND schemaname IN ('public', 'audit_archive')
     LOOP
         -- Extract date from partition name and check if it's old enough to drop
         IF to_date(substring(partition_record.tablename from '\d{4}_\d{2}'), 'YYYY_MM') < cutoff_date THEN
@@ -1164,6 +1459,42 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Archived partitions are detached from audit_logs and kept here until dropped
+CREATE SCHEMA IF NOT EXISTS audit_archive;
+
+-- Detach partitions older than the online window and move them to audit_archive.
+-- Detached partitions stop costing planning time and index maintenance on audit_logs
+-- but remain queryable (and exportable) until drop_old_audit_partitions removes them.
+CREATE OR REPLACE FUNCTION archive_old_audit_partitions(months_online INTEGER DEFAULT 12)
+RETURNS INTEGER AS $$
+DECLARE
+    partition_record RECORD;
+    cutoff_date DATE;
+    archived INTEGER := 0;
+BEGIN
+    cutoff_date := DATE_TRUNC('month', CURRENT_DATE) - (months_online || ' months')::INTERVAL;
+    
+    FOR partition_record IN
+        SELECT c.relname AS tablename
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = 'audit_logs'
+        AND c.relname ~ '^audit_logs_\d{4}_\d{2}$'
+    LOOP
+        IF to_date(substring(partition_record.tablename from '\d{4}_\d{2}'), 'YYYY_MM') < cutoff_date THEN
+            EXECUTE format('ALTER TABLE audit_logs DETACH PARTITION %I', partition_record.tablename);
+            EXECUTE format('ALTER TABLE %I SET SCHEMA audit_archive', partition_record.tablename);
+            archived := archived + 1;
+            
+            RAISE NOTICE 'Archived audit partition: %', partition_record.tablename;
+        END IF;
+    END LOOP;
+    
+    RETURN archived;
+END;
+$$ LANGUAGE plpgsql;
+
 -- ================================
 -- ENHANCED MAINTENANCE PROCEDURES
 -- ================================
@@ -1321,8 +1652,9 @@ BEGIN
     GET DIAGNOSTICS purged_count = ROW_COUNT;
     total_purged := total_purged + purged_count;
     
-    -- Drop old audit partitions
-    CALL drop_old_audit_partitions();
+    -- Archive, then drop old audit partitions
+    PERFORM archive_old_audit_partitions();
+    PERFORM drop_old_audit_partitions();
     
     -- Log summary
     INSERT INTO audit_logs (entity_type, entity_id, action, system_action, service_account, new_values)
@@ -1586,6 +1918,9 @@ BEGIN
     PERFORM cron.schedule('partition-maintenance', '0 1 1 * *', 
         'SELECT create_audit_partitions(13);'); -- Monthly partition creation
     
+    PERFORM cron.schedule('session-expiry-sweep', '*/5 * * * *', 
+        'SELECT sweep_expired_sessions();'); -- Fold expired sessions into user_session_stats
+    
     PERFORM cron.schedule('daily-data-purge', '0 2 * * *', 
         'CALL execute_data_purge();'); -- Daily cleanup at 2 AM
     
@@ -1901,8 +2236,13 @@ COMMENT ON COLUMN users.failed_login_attempts IS 'Account lockout protection - r
 COMMENT ON COLUMN users.locked_until IS 'Account lockout expiration timestamp for security';
 COMMENT ON COLUMN user_sessions.jwt_jti IS 'JWT ID for token revocation and session invalidation';
 COMMENT ON COLUMN user_sessions.is_revoked IS 'Manual session revocation flag for security';
+COMMENT ON COLUMN user_sessions.refresh_generation IS 'Refresh rotation counter; a refresh token from an earlier generation revokes the session';
+COMMENT ON TABLE user_session_epochs IS 'Per-user session epoch; access tokens with the current epoch skip the user_sessions lookup';
 COMMENT ON COLUMN resumes.parsed_content IS 'AI-extracted structured JSON containing resume sections, skills, experience, and education';
+COMMENT ON INDEX idx_jobs_external IS 'One row per feed job; conflict target of the ingestion merge';
+COMMENT ON COLUMN jobs.canonical_job_id IS 'First-seen job this posting near-duplicates (MinHash/LSH at ingest); NULL for canonical jobs';
 COMMENT ON COLUMN jobs.revision IS 'Optimistic locking field with transaction-level advisory locks to prevent conflicts';
+COMMENT ON COLUMN jobs.search_vector IS 'Weighted full-text vector: title (A), requirements and responsibilities (B), description (C)';
 COMMENT ON COLUMN job_applications.status IS 'Application progress: saved→applied→interview→(offer|rejected)→(accepted|declined)';
 COMMENT ON COLUMN scan_records.detailed_analysis IS 'Comprehensive AI analysis: keyword matches, ATS compatibility, improvement suggestions, scoring breakdown';
 COMMENT ON COLUMN skill_gaps.gap_type IS 'Gap classification: missing (not mentioned), weak (insufficient), outdated (old version/framework)';
@@ -1912,6 +2252,7 @@ COMMENT ON COLUMN audit_logs.created_at IS 'Partition key for monthly time-based
 COMMENT ON FUNCTION current_user_id() IS 'SECURITY-CRITICAL: JWT-verified user identification with active user validation and fallback support';
 COMMENT ON FUNCTION increment_revision() IS 'CONCURRENCY-SAFE: Uses advisory locks to prevent revision conflicts under high load';
 COMMENT ON FUNCTION create_audit_partitions(INTEGER) IS 'AUTOMATED: Creates future audit log partitions with proper indexing';
+COMMENT ON FUNCTION archive_old_audit_partitions(INTEGER) IS 'AUTOMATED: Detaches audit partitions past the online window into the audit_archive schema';
 -- Add conditional comments for geospatial functions
 DO $$
 BEGIN